@@ -1,13 +1,21 @@
 """
 Exporters for activity programming to Excel files.
+
+The Excel exporters write through ``apps.core.excel_escritura``: write-only
+workbooks, shared named styles and querysets consumed with ``.iterator()``,
+saved to a temporary file that the views stream back to the client.
 """
 import logging
+from collections import defaultdict
 from datetime import date, timedelta
 from io import BytesIO
 
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils import get_column_letter
+from apps.core.excel_escritura import (
+    LibroStreaming,
+    celda,
+    en_chunks,
+    estilo_relleno,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,21 +28,24 @@ class ProgramacionSemanalExporter:
     Formato flexible que incluye toda la información requerida.
     """
 
-    # Estilos
-    HEADER_FILL = PatternFill(start_color='1F4E79', end_color='1F4E79', fill_type='solid')
-    HEADER_FONT = Font(bold=True, color='FFFFFF', size=11)
-    CELL_BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    CENTER_ALIGNMENT = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    LEFT_ALIGNMENT = Alignment(horizontal='left', vertical='center', wrap_text=True)
+    HEADERS = [
+        'Cuadrilla',
+        'Fecha',
+        'Actividad',
+        'Aviso SAP',
+        'Línea',
+        'Tramo (Torre Inicio - Torre Fin)',
+        'Personal',
+        'Vehículo (Placa)',
+        'Estado',
+    ]
+    COLUMN_WIDTHS = [15, 12, 30, 15, 15, 35, 50, 12, 15]
+    # Columnas (1-based) alineadas a la izquierda
+    COLUMNAS_IZQ = {3, 6, 7}
 
     def __init__(self):
-        self.workbook = None
-        self.sheet = None
+        self.libro = None
+        self._personal = {}
 
     def generar_excel(self, semana_inicio, semana_fin=None, linea_id=None, cuadrilla_id=None):
         """
@@ -47,7 +58,7 @@ class ProgramacionSemanalExporter:
             cuadrilla_id: UUID - filtrar por cuadrilla (opcional)
 
         Returns:
-            BytesIO with Excel file content
+            Archivo temporal (rebobinado) con el contenido del Excel
         """
 
         from .models import Actividad
@@ -62,6 +73,7 @@ class ProgramacionSemanalExporter:
             estado__in=['PENDIENTE', 'PROGRAMADA', 'EN_CURSO']
         ).select_related(
             'linea', 'torre', 'tipo_actividad', 'cuadrilla', 'tramo',
+            'tramo__torre_inicio', 'tramo__torre_fin',
             'cuadrilla__supervisor', 'cuadrilla__vehiculo'
         ).prefetch_related(
             'cuadrilla__miembros__usuario'
@@ -73,111 +85,92 @@ class ProgramacionSemanalExporter:
         if cuadrilla_id:
             qs = qs.filter(cuadrilla_id=cuadrilla_id)
 
-        # Crear workbook
-        self.workbook = Workbook()
-        self.sheet = self.workbook.active
-        self.sheet.title = 'Programación Semanal'
-
-        # Título
-        self.sheet.merge_cells('A1:I1')
-        titulo_cell = self.sheet['A1']
-        titulo_cell.value = f'PROGRAMACIÓN SEMANAL - {semana_inicio.strftime("%d/%m/%Y")} al {semana_fin.strftime("%d/%m/%Y")}'
-        titulo_cell.font = Font(bold=True, size=14)
-        titulo_cell.alignment = self.CENTER_ALIGNMENT
-
-        # Encabezados
-        headers = [
-            'Cuadrilla',
-            'Fecha',
-            'Actividad',
-            'Aviso SAP',
-            'Línea',
-            'Tramo (Torre Inicio - Torre Fin)',
-            'Personal',
-            'Vehículo (Placa)',
-            'Estado',
-        ]
+        self.libro = LibroStreaming()
+        self._personal = {}
+        hoja = self.libro.hoja('Programación Semanal', self.COLUMN_WIDTHS)
 
-        for col_idx, header in enumerate(headers, start=1):
-            cell = self.sheet.cell(row=3, column=col_idx, value=header)
-            cell.fill = self.HEADER_FILL
-            cell.font = self.HEADER_FONT
-            cell.border = self.CELL_BORDER
-            cell.alignment = self.CENTER_ALIGNMENT
+        # Título (write-only: sin celdas combinadas)
+        hoja.fila([celda(
+            f'PROGRAMACIÓN SEMANAL - {semana_inicio.strftime("%d/%m/%Y")} al {semana_fin.strftime("%d/%m/%Y")}',
+            'titulo',
+        )])
+        hoja.vacias()
+        hoja.fila(self.HEADERS, estilo='encabezado')
 
-        # Datos
-        row_num = 4
+        # Datos + resumen por cuadrilla en la misma pasada
+        resumen = defaultdict(lambda: {'total': 0, 'lineas': set(), 'supervisor': ''})
         cuadrilla_anterior = None
 
-        for actividad in qs:
-            # Información de cuadrilla
-            cuadrilla_codigo = actividad.cuadrilla.codigo if actividad.cuadrilla else 'Sin asignar'
-
-            # Agregar separador visual entre cuadrillas
-            if cuadrilla_anterior and cuadrilla_anterior != cuadrilla_codigo:
-                row_num += 1
-
-            cuadrilla_anterior = cuadrilla_codigo
-
-            # Información del tramo
-            if actividad.tramo:
-                tramo_info = f"{actividad.tramo.nombre} (T{actividad.tramo.torre_inicio.numero} - T{actividad.tramo.torre_fin.numero})"
-            elif actividad.torre:
-                tramo_info = f"Torre {actividad.torre.numero_display}"
-            else:
-                tramo_info = '-'
-
-            # Información del personal
-            personal_info = self._formatear_personal(actividad.cuadrilla) if actividad.cuadrilla else '-'
-
-            # Placa del vehículo
-            placa = actividad.cuadrilla.vehiculo.placa if actividad.cuadrilla and actividad.cuadrilla.vehiculo else '-'
-
-            # Llenar fila
-            row_data = [
-                cuadrilla_codigo,
-                actividad.fecha_programada.strftime('%d/%m/%Y'),
-                actividad.tipo_actividad.nombre,
-                actividad.aviso_sap or '-',
-                actividad.linea.codigo,
-                tramo_info,
-                personal_info,
-                placa,
-                actividad.get_estado_display(),
-            ]
-
-            for col_idx, value in enumerate(row_data, start=1):
-                cell = self.sheet.cell(row=row_num, column=col_idx, value=value)
-                cell.border = self.CELL_BORDER
-                cell.alignment = self.LEFT_ALIGNMENT if col_idx in [3, 6, 7] else self.CENTER_ALIGNMENT
-
-            row_num += 1
-
-        # Ajustar anchos de columna
-        column_widths = [15, 12, 30, 15, 15, 35, 50, 12, 15]
-        for col_idx, width in enumerate(column_widths, start=1):
-            self.sheet.column_dimensions[get_column_letter(col_idx)].width = width
+        for lote in en_chunks(qs):
+            for actividad in lote:
+                cuadrilla = actividad.cuadrilla
+                # Información de cuadrilla
+                cuadrilla_codigo = cuadrilla.codigo if cuadrilla else 'Sin asignar'
+
+                # Agregar separador visual entre cuadrillas
+                if cuadrilla_anterior and cuadrilla_anterior != cuadrilla_codigo:
+                    hoja.vacias()
+
+                cuadrilla_anterior = cuadrilla_codigo
+
+                # Información del tramo
+                if actividad.tramo:
+                    tramo_info = f"{actividad.tramo.nombre} (T{actividad.tramo.torre_inicio.numero} - T{actividad.tramo.torre_fin.numero})"
+                elif actividad.torre:
+                    tramo_info = f"Torre {actividad.torre.numero_display}"
+                else:
+                    tramo_info = '-'
+
+                # Información del personal
+                personal_info = self._formatear_personal(cuadrilla) if cuadrilla else '-'
+
+                # Placa del vehículo
+                placa = cuadrilla.vehiculo.placa if cuadrilla and cuadrilla.vehiculo else '-'
+
+                row_data = [
+                    cuadrilla_codigo,
+                    actividad.fecha_programada.strftime('%d/%m/%Y'),
+                    actividad.tipo_actividad.nombre,
+                    actividad.aviso_sap or '-',
+                    actividad.linea.codigo,
+                    tramo_info,
+                    personal_info,
+                    placa,
+                    actividad.get_estado_display(),
+                ]
+                hoja.fila([
+                    celda(value, 'celda_izq' if col_idx in self.COLUMNAS_IZQ else 'celda')
+                    for col_idx, value in enumerate(row_data, start=1)
+                ])
 
-        # Agregar hoja con resumen por cuadrilla
-        self._agregar_hoja_resumen(qs)
+                if cuadrilla:
+                    datos = resumen[cuadrilla.codigo]
+                    datos['total'] += 1
+                    datos['lineas'].add(actividad.linea.codigo)
+                    if cuadrilla.supervisor:
+                        datos['supervisor'] = cuadrilla.supervisor.get_full_name()
 
-        # Guardar en BytesIO
-        output = BytesIO()
-        self.workbook.save(output)
-        output.seek(0)
+        # Agregar hoja con resumen por cuadrilla
+        self._agregar_hoja_resumen(resumen)
 
-        return output
+        return self.libro.guardar()
 
     def _formatear_personal(self, cuadrilla):
         """
         Formatea la información del personal de la cuadrilla.
         Formato: Nombre (Cédula, Tel, Cargo)
+
+        Usa los miembros prefetcheados y memoiza por cuadrilla (una cuadrilla
+        aparece en muchas actividades de la semana).
         """
         if not cuadrilla:
             return '-'
 
+        if cuadrilla.pk in self._personal:
+            return self._personal[cuadrilla.pk]
+
         personal_lista = []
-        miembros = cuadrilla.miembros.filter(activo=True).select_related('usuario')
+        miembros = [m for m in cuadrilla.miembros.all() if m.activo]
 
         for miembro in miembros:
             usuario = miembro.usuario
@@ -193,52 +186,24 @@ class ProgramacionSemanalExporter:
             info_personal = f"{nombre} ({cedula}, {telefono}, {cargo}){cta_tag}"
             personal_lista.append(info_personal)
 
-        return '\n'.join(personal_lista) if personal_lista else '-'
-
-    def _agregar_hoja_resumen(self, actividades):
-        """Agrega una hoja con resumen de actividades por cuadrilla."""
-        resumen_sheet = self.workbook.create_sheet(title='Resumen')
-
-        # Título
-        resumen_sheet.merge_cells('A1:D1')
-        titulo_cell = resumen_sheet['A1']
-        titulo_cell.value = 'RESUMEN POR CUADRILLA'
-        titulo_cell.font = Font(bold=True, size=12)
-        titulo_cell.alignment = self.CENTER_ALIGNMENT
-
-        # Encabezados
-        headers = ['Cuadrilla', 'Total Actividades', 'Líneas', 'Supervisor']
-        for col_idx, header in enumerate(headers, start=1):
-            cell = resumen_sheet.cell(row=3, column=col_idx, value=header)
-            cell.fill = self.HEADER_FILL
-            cell.font = self.HEADER_FONT
-            cell.border = self.CELL_BORDER
-            cell.alignment = self.CENTER_ALIGNMENT
-
-        # Agrupar por cuadrilla
-        from collections import defaultdict
-        resumen = defaultdict(lambda: {'total': 0, 'lineas': set(), 'supervisor': ''})
+        texto = '\n'.join(personal_lista) if personal_lista else '-'
+        self._personal[cuadrilla.pk] = texto
+        return texto
 
-        for act in actividades:
-            if act.cuadrilla:
-                codigo = act.cuadrilla.codigo
-                resumen[codigo]['total'] += 1
-                resumen[codigo]['lineas'].add(act.linea.codigo)
-                if act.cuadrilla.supervisor:
-                    resumen[codigo]['supervisor'] = act.cuadrilla.supervisor.get_full_name()
+    def _agregar_hoja_resumen(self, resumen):
+        """Agrega una hoja con resumen de actividades por cuadrilla
+        (acumulado durante la escritura de la hoja principal)."""
+        hoja = self.libro.hoja('Resumen', [15, 18, 25, 30])
 
-        # Datos
-        row_num = 4
-        for codigo, datos in sorted(resumen.items()):
-            resumen_sheet.cell(row=row_num, column=1, value=codigo).border = self.CELL_BORDER
-            resumen_sheet.cell(row=row_num, column=2, value=datos['total']).border = self.CELL_BORDER
-            resumen_sheet.cell(row=row_num, column=3, value=', '.join(sorted(datos['lineas']))).border = self.CELL_BORDER
-            resumen_sheet.cell(row=row_num, column=4, value=datos['supervisor']).border = self.CELL_BORDER
-            row_num += 1
+        hoja.fila([celda('RESUMEN POR CUADRILLA', 'subtitulo')])
+        hoja.vacias()
+        hoja.fila(['Cuadrilla', 'Total Actividades', 'Líneas', 'Supervisor'], estilo='encabezado')
 
-        # Ajustar anchos
-        for col_idx, width in enumerate([15, 18, 25, 30], start=1):
-            resumen_sheet.column_dimensions[get_column_letter(col_idx)].width = width
+        for codigo, datos in sorted(resumen.items()):
+            hoja.fila(
+                [codigo, datos['total'], ', '.join(sorted(datos['lineas'])), datos['supervisor']],
+                estilo='celda_borde',
+            )
 
 
 def _parsear_avisos_orden_ptsap(observaciones):
@@ -327,19 +292,11 @@ class ProgramacionSemanalHorizontalExporter:
         "Comentarios",
     ]
 
-    HEADER_FILL = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
-    HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
-    CELL_BORDER = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
-    LEFT_ALIGNMENT = Alignment(horizontal="left", vertical="center", wrap_text=True)
+    COLUMN_WIDTHS = [5, 28, 12, 20, 12, 12, 28, 14, 14, 18, 18, 10, 30, 16, 12, 30]
 
     def __init__(self):
-        self.workbook = None
-        self.sheet = None
+        self.libro = None
+        self.hoja = None
 
     def generar_excel(self, anio, semana):
         """
@@ -350,7 +307,7 @@ class ProgramacionSemanalHorizontalExporter:
             semana: int (semana ISO)
 
         Returns:
-            BytesIO con el contenido del .xlsx
+            Archivo temporal (rebobinado) con el contenido del .xlsx
         """
         from apps.cuadrillas.views_semanal import _bloques_qs
 
@@ -373,7 +330,7 @@ class ProgramacionSemanalHorizontalExporter:
             fecha_fin: date
 
         Returns:
-            BytesIO con el contenido del .xlsx
+            Archivo temporal (rebobinado) con el contenido del .xlsx
         """
         from apps.cuadrillas.models import Cuadrilla
 
@@ -397,44 +354,37 @@ class ProgramacionSemanalHorizontalExporter:
 
     def _escribir_hoja(self, cuadrillas_qs, titulo_hoja):
         """Helper compartido: escribe headers + itera ``cuadrillas_qs`` (vía
-        ``_bloque_a_dict``/``_escribir_bloque``) + ajusta column_widths.
+        ``_bloque_a_dict``/``_escribir_bloque``) con los anchos de columna.
         Extraído de ``generar_excel`` (issue #211) para que
         ``generar_excel_rango`` reuse el MISMO layout ya validado por el
-        cliente sin duplicar HEADERS/estilos/anchos de columna."""
-        from apps.cuadrillas.views_semanal import _bloque_a_dict
-
-        self.workbook = Workbook()
-        self.sheet = self.workbook.active
-        self.sheet.title = titulo_hoja[:31]
-
-        for col_idx, header in enumerate(self.HEADERS, start=1):
-            cell = self.sheet.cell(row=1, column=col_idx, value=header)
-            cell.fill = self.HEADER_FILL
-            cell.font = self.HEADER_FONT
-            cell.border = self.CELL_BORDER
-            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-        row_num = 2
-        for numero, cuadrilla in enumerate(cuadrillas_qs, start=1):
-            b = _bloque_a_dict(cuadrilla)
-            row_num = self._escribir_bloque(numero, cuadrilla.fecha_fin, b, row_num)
-
-        column_widths = [5, 28, 12, 20, 12, 12, 28, 14, 14, 18, 18, 10, 30, 16, 12, 30]
-        for col_idx, width in enumerate(column_widths, start=1):
-            self.sheet.column_dimensions[get_column_letter(col_idx)].width = width
-
-        output = BytesIO()
-        self.workbook.save(output)
-        output.seek(0)
-        return output
-
-    def _escribir_bloque(self, numero, fecha_fin, b, row_num):
+        cliente sin duplicar HEADERS/estilos/anchos de columna.
+
+        Los bloques se leen por lotes (``en_chunks``): cada lote trae sus
+        miembros prefetcheados y los celulares de TODO el lote en un query,
+        y sus filas van directo al archivo -- un rango de un año no arma el
+        libro completo en memoria."""
+        from apps.cuadrillas.views_semanal import _bloque_a_dict, _celulares_por_documento
+
+        self.libro = LibroStreaming()
+        self.hoja = self.libro.hoja(titulo_hoja, self.COLUMN_WIDTHS)
+        self.hoja.fila(self.HEADERS, estilo="encabezado")
+
+        numero = 0
+        for lote in en_chunks(cuadrillas_qs):
+            celulares = _celulares_por_documento(lote)
+            for cuadrilla in lote:
+                numero += 1
+                b = _bloque_a_dict(cuadrilla, celulares)
+                self._escribir_bloque(numero, cuadrilla.fecha_fin, b)
+
+        return self.libro.guardar()
+
+    def _escribir_bloque(self, numero, fecha_fin, b):
         """Escribe TODAS las filas de un bloque (1 por miembro activo). Si el
         bloque no tiene ningún miembro activo, igual escribe 1 fila con los
         datos de la actividad y las columnas de personal en blanco -- no lo
         omite del export (issue #178, robustez ante bloques sin personal,
-        mismo caso que puede producir C1/reprogramar). Devuelve el siguiente
-        ``row_num`` libre."""
+        mismo caso que puede producir C1/reprogramar)."""
         avisos, orden, pt_sap, comentarios = _parsear_avisos_orden_ptsap(b["observaciones"])
         # ACTIVIDAD: tipo_actividad (moderno, issue #188) si está seteado, si
         # no cae a nombre -- los bloques importados por S18 NUNCA setean
@@ -449,7 +399,6 @@ class ProgramacionSemanalHorizontalExporter:
         miembros = b["miembros"]
         if not miembros:
             self._escribir_fila(
-                row_num,
                 numero,
                 actividad,
                 linea,
@@ -467,12 +416,11 @@ class ProgramacionSemanalHorizontalExporter:
                 pt_sap,
                 comentarios,
             )
-            return row_num + 1
+            return
 
         for idx, m in enumerate(miembros):
             primera = idx == 0
             self._escribir_fila(
-                row_num,
                 numero if primera else "",
                 actividad if primera else "",
                 linea if primera else "",
@@ -493,14 +441,9 @@ class ProgramacionSemanalHorizontalExporter:
                 pt_sap if primera else "",
                 comentarios if primera else "",
             )
-            row_num += 1
-        return row_num
 
-    def _escribir_fila(self, row_num, *valores):
-        for col_idx, valor in enumerate(valores, start=1):
-            cell = self.sheet.cell(row=row_num, column=col_idx, value=valor)
-            cell.border = self.CELL_BORDER
-            cell.alignment = self.LEFT_ALIGNMENT
+    def _escribir_fila(self, *valores):
+        self.hoja.fila(valores, estilo="celda_izq")
 
 
 class ReporteAvanceExporter:
@@ -511,14 +454,16 @@ class ReporteAvanceExporter:
     - Gráfico de avance (si es posible)
     """
 
-    # Colores para estado de vanos
-    COLOR_COMPLETO = PatternFill(start_color='006400', end_color='006400', fill_type='solid')  # Verde oscuro
-    COLOR_PARCIAL = PatternFill(start_color='90EE90', end_color='90EE90', fill_type='solid')  # Verde claro
-    COLOR_PENDIENTE = PatternFill(start_color='4169E1', end_color='4169E1', fill_type='solid')  # Azul
-    COLOR_CON_PENDIENTE = PatternFill(start_color='FFD700', end_color='FFD700', fill_type='solid')  # Amarillo
+    # Estilos con nombre para estado de torres
+    ESTILOS = {
+        'completo': estilo_relleno('006400', texto_blanco=True),  # Verde oscuro
+        'parcial': estilo_relleno('90EE90'),  # Verde claro
+        'pendiente': estilo_relleno('4169E1', texto_blanco=True),  # Azul
+        'con_pendiente': estilo_relleno('FFD700'),  # Amarillo
+    }
 
     def __init__(self):
-        self.workbook = None
+        self.libro = None
 
     def generar_excel(self, linea_id, fecha_corte=None):
         """
@@ -529,7 +474,7 @@ class ReporteAvanceExporter:
             fecha_corte: Date para calcular avance (default: hoy)
 
         Returns:
-            BytesIO with Excel file content
+            Archivo temporal (rebobinado) con el contenido del Excel
         """
         from apps.lineas.models import Linea
 
@@ -542,128 +487,96 @@ class ReporteAvanceExporter:
         except Linea.DoesNotExist as e:
             raise ValueError(f'Línea no encontrada: {linea_id}') from e
 
-        self.workbook = Workbook()
+        self.libro = LibroStreaming(self.ESTILOS)
 
         # Hoja principal: Estado por Torre
-        self._generar_hoja_torres(linea, fecha_corte)
+        total_torres = self._generar_hoja_torres(linea, fecha_corte)
 
         # Hoja de pendientes
         self._generar_hoja_pendientes(linea)
 
         # Hoja de resumen
-        self._generar_hoja_resumen(linea, fecha_corte)
-
-        output = BytesIO()
-        self.workbook.save(output)
-        output.seek(0)
+        self._generar_hoja_resumen(linea, fecha_corte, total_torres)
 
-        return output
+        return self.libro.guardar()
 
     def _generar_hoja_torres(self, linea, fecha_corte):
-        """Genera hoja con estado de torres."""
-        from apps.lineas.models import Torre
+        """Genera hoja con estado de torres. Devuelve el total de torres.
 
-        from .models import Actividad
+        Actividades y pendientes se agregan por torre en dos queries (antes
+        eran varias por torre)."""
+        from django.db.models import Avg, Count
 
-        sheet = self.workbook.active
-        sheet.title = 'Estado Torres'
+        from apps.campo.models import RegistroCampo
+        from apps.lineas.models import Torre
 
-        # Título
-        sheet.merge_cells('A1:F1')
-        titulo = sheet['A1']
-        titulo.value = f'ESTADO DE AVANCE - {linea.codigo} - {linea.nombre}'
-        titulo.font = Font(bold=True, size=14)
+        from .models import Actividad
 
-        sheet['A2'] = f'Fecha de corte: {fecha_corte.strftime("%d/%m/%Y")}'
+        hoja = self.libro.hoja('Estado Torres', [10, 15, 15, 12, 15, 40])
 
-        # Encabezados
-        headers = ['Torre', 'Tipo', 'Actividades', 'Avance %', 'Estado', 'Observaciones']
-        for col_idx, header in enumerate(headers, start=1):
-            cell = sheet.cell(row=4, column=col_idx, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color='D9D9D9', end_color='D9D9D9', fill_type='solid')
+        # Título (write-only: sin celdas combinadas)
+        hoja.fila([celda(f'ESTADO DE AVANCE - {linea.codigo} - {linea.nombre}', 'titulo')])
+        hoja.fila([f'Fecha de corte: {fecha_corte.strftime("%d/%m/%Y")}'])
+        hoja.vacias()
+        hoja.fila(
+            ['Torre', 'Tipo', 'Actividades', 'Avance %', 'Estado', 'Observaciones'],
+            estilo='encabezado_gris',
+        )
 
-        # Torres
+        avance_por_torre = {
+            fila['torre_id']: (fila['total'], fila['avance'] or 0)
+            for fila in Actividad.objects.filter(linea=linea, torre__isnull=False)
+            .values('torre_id')
+            .annotate(total=Count('id'), avance=Avg('porcentaje_avance'))
+        }
+        pendientes_por_torre = defaultdict(list)
+        for torre_id, descripcion in RegistroCampo.objects.filter(
+            actividad__linea=linea, actividad__torre__isnull=False, tiene_pendiente=True,
+        ).order_by('created_at').values_list('actividad__torre_id', 'descripcion_pendiente').iterator():
+            pendientes_por_torre[torre_id].append(descripcion[:50] if descripcion else '')
+
+        total_torres = 0
         torres = Torre.objects.filter(linea=linea).order_by('numero')
-        row_num = 5
-
-        for torre in torres:
-            # Obtener actividades de esta torre
-            actividades = Actividad.objects.filter(
-                linea=linea,
-                torre=torre
-            )
-
-            total_actividades = actividades.count()
-            if total_actividades > 0:
-                avance_promedio = sum(a.porcentaje_avance for a in actividades) / total_actividades
-            else:
-                avance_promedio = 0
-
-            # Verificar si hay pendientes
-            registros_pendientes = any(
-                r.tiene_pendiente
-                for a in actividades
-                for r in a.registros_campo.all()
-            )
+        for lote in en_chunks(torres):
+            for torre in lote:
+                total_torres += 1
+                total_actividades, avance_promedio = avance_por_torre.get(torre.pk, (0, 0))
+                obs_list = pendientes_por_torre.get(torre.pk, [])
+
+                # Determinar estado y estilo
+                if avance_promedio >= 100:
+                    estado, estilo = 'Completo', 'completo'
+                elif avance_promedio > 0:
+                    estado, estilo = 'En progreso', 'parcial'
+                elif obs_list:
+                    estado, estilo = 'Con pendiente', 'con_pendiente'
+                else:
+                    estado, estilo = 'Pendiente', 'pendiente'
+
+                hoja.fila([
+                    torre.numero_display,
+                    torre.get_tipo_display(),
+                    total_actividades,
+                    f'{avance_promedio:.1f}%',
+                    celda(estado, estilo),
+                    '; '.join(obs_list),
+                ])
 
-            # Determinar estado y color
-            if avance_promedio >= 100:
-                estado = 'Completo'
-                fill = self.COLOR_COMPLETO
-            elif avance_promedio > 0:
-                estado = 'En progreso'
-                fill = self.COLOR_PARCIAL
-            elif registros_pendientes:
-                estado = 'Con pendiente'
-                fill = self.COLOR_CON_PENDIENTE
-            else:
-                estado = 'Pendiente'
-                fill = self.COLOR_PENDIENTE
-
-            # Observaciones
-            obs_list = []
-            for act in actividades:
-                for reg in act.registros_campo.filter(tiene_pendiente=True):
-                    obs_list.append(reg.descripcion_pendiente[:50] if reg.descripcion_pendiente else '')
-
-            observaciones = '; '.join(obs_list) if obs_list else ''
-
-            # Llenar fila
-            sheet.cell(row=row_num, column=1, value=torre.numero_display)
-            sheet.cell(row=row_num, column=2, value=torre.get_tipo_display())
-            sheet.cell(row=row_num, column=3, value=total_actividades)
-            sheet.cell(row=row_num, column=4, value=f'{avance_promedio:.1f}%')
-            cell_estado = sheet.cell(row=row_num, column=5, value=estado)
-            cell_estado.fill = fill
-            if fill in [self.COLOR_COMPLETO, self.COLOR_PENDIENTE]:
-                cell_estado.font = Font(color='FFFFFF')
-            sheet.cell(row=row_num, column=6, value=observaciones)
-
-            row_num += 1
-
-        # Ajustar anchos
-        for col_idx, width in enumerate([10, 15, 15, 12, 15, 40], start=1):
-            sheet.column_dimensions[get_column_letter(col_idx)].width = width
+        return total_torres
 
     def _generar_hoja_pendientes(self, linea):
         """Genera hoja con lista de pendientes."""
         from apps.campo.models import RegistroCampo
 
-        sheet = self.workbook.create_sheet(title='Pendientes')
+        hoja = self.libro.hoja('Pendientes', [10, 25, 20, 50, 15, 25])
 
-        # Título
-        sheet['A1'] = 'LISTA DE PENDIENTES'
-        sheet['A1'].font = Font(bold=True, size=14)
-
-        # Encabezados
-        headers = ['Torre', 'Actividad', 'Tipo Pendiente', 'Descripción', 'Fecha Reporte', 'Reportado por']
-        for col_idx, header in enumerate(headers, start=1):
-            cell = sheet.cell(row=3, column=col_idx, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color='D9D9D9', end_color='D9D9D9', fill_type='solid')
+        hoja.fila([celda('LISTA DE PENDIENTES', 'titulo')])
+        hoja.vacias()
+        hoja.fila(
+            ['Torre', 'Actividad', 'Tipo Pendiente', 'Descripción', 'Fecha Reporte', 'Reportado por'],
+            estilo='encabezado_gris',
+        )
 
-        # Pendientes
         registros = RegistroCampo.objects.filter(
             actividad__linea=linea,
             tiene_pendiente=True
@@ -671,45 +584,41 @@ class ReporteAvanceExporter:
             'actividad__torre', 'actividad__tipo_actividad', 'usuario'
         ).order_by('-created_at')
 
-        row_num = 4
-        for reg in registros:
-            sheet.cell(row=row_num, column=1, value=reg.actividad.torre.numero_display if reg.actividad.torre else '-')
-            sheet.cell(row=row_num, column=2, value=reg.actividad.tipo_actividad.nombre)
-            sheet.cell(row=row_num, column=3, value=reg.get_tipo_pendiente_display())
-            sheet.cell(row=row_num, column=4, value=reg.descripcion_pendiente)
-            sheet.cell(row=row_num, column=5, value=reg.created_at.strftime('%d/%m/%Y'))
-            sheet.cell(row=row_num, column=6, value=reg.usuario.get_full_name())
-            row_num += 1
-
-        # Ajustar anchos
-        for col_idx, width in enumerate([10, 25, 20, 50, 15, 25], start=1):
-            sheet.column_dimensions[get_column_letter(col_idx)].width = width
-
-    def _generar_hoja_resumen(self, linea, fecha_corte):
+        for reg in registros.iterator(chunk_size=500):
+            hoja.fila([
+                reg.actividad.torre.numero_display if reg.actividad.torre else '-',
+                reg.actividad.tipo_actividad.nombre,
+                reg.get_tipo_pendiente_display(),
+                reg.descripcion_pendiente,
+                reg.created_at.strftime('%d/%m/%Y'),
+                reg.usuario.get_full_name(),
+            ])
+
+    def _generar_hoja_resumen(self, linea, fecha_corte, total_torres):
         """Genera hoja con resumen de avance."""
-        from apps.lineas.models import Torre
+        from django.db.models import Count, Q
 
         from .models import Actividad
 
-        sheet = self.workbook.create_sheet(title='Resumen')
+        hoja = self.libro.hoja('Resumen', [20, 40])
 
-        # Título
-        sheet['A1'] = 'RESUMEN DE AVANCE'
-        sheet['A1'].font = Font(bold=True, size=14)
+        hoja.fila([celda('RESUMEN DE AVANCE', 'titulo')])
+        hoja.vacias()
 
-        # Estadísticas
-        total_torres = Torre.objects.filter(linea=linea).count()
-
-        actividades = Actividad.objects.filter(linea=linea)
-        total_actividades = actividades.count()
-
-        completadas = actividades.filter(estado='COMPLETADA').count()
-        en_curso = actividades.filter(estado='EN_CURSO').count()
-        pendientes = actividades.filter(estado__in=['PENDIENTE', 'PROGRAMADA']).count()
+        # Estadísticas (un solo query)
+        conteos = Actividad.objects.filter(linea=linea).aggregate(
+            total=Count('id'),
+            completadas=Count('id', filter=Q(estado='COMPLETADA')),
+            en_curso=Count('id', filter=Q(estado='EN_CURSO')),
+            pendientes=Count('id', filter=Q(estado__in=['PENDIENTE', 'PROGRAMADA'])),
+        )
+        total_actividades = conteos['total']
+        completadas = conteos['completadas']
+        en_curso = conteos['en_curso']
+        pendientes = conteos['pendientes']
 
         avance_general = (completadas / total_actividades * 100) if total_actividades > 0 else 0
 
-        # Mostrar estadísticas
         datos = [
             ('Línea:', f'{linea.codigo} - {linea.nombre}'),
             ('Fecha de corte:', fecha_corte.strftime('%d/%m/%Y')),
@@ -721,21 +630,12 @@ class ReporteAvanceExporter:
             ('En Curso:', f'{en_curso} ({en_curso/total_actividades*100:.1f}%)' if total_actividades else '0'),
             ('Pendientes:', f'{pendientes} ({pendientes/total_actividades*100:.1f}%)' if total_actividades else '0'),
             ('', ''),
-            ('AVANCE GENERAL:', f'{avance_general:.1f}%'),
         ]
-
-        row_num = 3
         for label, value in datos:
-            sheet.cell(row=row_num, column=1, value=label).font = Font(bold=True)
-            sheet.cell(row=row_num, column=2, value=value)
-            row_num += 1
+            hoja.fila([celda(label, 'negrita'), value])
 
         # Destacar avance general
-        sheet.cell(row=row_num-1, column=2).font = Font(bold=True, size=16)
-
-        # Ajustar anchos
-        sheet.column_dimensions['A'].width = 20
-        sheet.column_dimensions['B'].width = 40
+        hoja.fila([celda('AVANCE GENERAL:', 'negrita'), celda(f'{avance_general:.1f}%', 'destacado')])
 
 
 class InformeDiarioPDFExporter:
@@ -0,0 +1,331 @@
+"""
+Procesadores de importación de actividades (ver ``apps.core.importaciones``).
+
+La lógica que vivía en ``ImportarProgramacionView.post`` e
+``ImportarAvancesView.post`` se mudó acá para que la misma función corra en
+la request (archivos chicos) o en el worker de Celery (archivos grandes).
+Devuelven ``{'resultado', 'mensajes', 'redirect_url'}``; los textos de los
+mensajes son los mismos que mostraba la vista.
+"""
+from django.urls import reverse
+from django.utils import timezone
+
+NOMBRES_MES = {
+    1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
+    5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
+    9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre',
+}
+
+
+def resumen_advertencias(advertencias, limite=15):
+    """Issue #200: construye el detalle real (hoja/fila/mensaje) de las
+    advertencias del importador en vez de descartarlas y mostrar solo un
+    conteo — antes era imposible saber qué falló en una fila concreta."""
+    lineas = []
+    for adv in advertencias[:limite]:
+        hoja = adv.get('hoja')
+        fila = adv.get('fila')
+        mensaje = adv.get('mensaje', '')
+        if hoja and fila is not None:
+            lineas.append(f"Hoja {hoja}, fila {fila}: {mensaje}")
+        elif hoja:
+            lineas.append(f"Hoja {hoja}: {mensaje}")
+        elif fila is not None:
+            lineas.append(f"Fila {fila}: {mensaje}")
+        else:
+            lineas.append(mensaje)
+    restantes = len(advertencias) - len(lineas)
+    detalle = ' | '.join(lineas)
+    if restantes > 0:
+        detalle += f' | ... y {restantes} advertencia(s) más (ver logs del servidor).'
+    return detalle
+
+
+def es_formato_semanal(archivo):
+    """True si el Excel tiene ≥1 hoja con nombre numérico y headers
+    que incluyen AVISOS+ACTIVIDAD (formato real Instelec)."""
+    from openpyxl import load_workbook
+    try:
+        archivo.seek(0)
+    except Exception:
+        pass
+    try:
+        wb = load_workbook(archivo, read_only=True, data_only=True)
+    except Exception:
+        return False
+    finally:
+        try:
+            archivo.seek(0)
+        except Exception:
+            pass
+    for sheet_name in wb.sheetnames:
+        token = sheet_name.strip().lower().lstrip('s').replace('semana', '').strip()
+        if not token.isdigit():
+            continue
+        ws = wb[sheet_name]
+        rows = ws.iter_rows(min_row=2, max_row=2, values_only=True)
+        try:
+            header = next(rows)
+        except StopIteration:
+            continue
+        header_lower = {str(c).lower().strip() for c in header if c is not None}
+        if 'avisos' in header_lower and 'actividad' in header_lower:
+            return True
+    return False
+
+
+def _etiquetas_meses(meses_tocados):
+    return ', '.join(
+        f"{NOMBRES_MES.get(mes_t, mes_t)} {anio_t}" for anio_t, mes_t in meses_tocados
+    )
+
+
+def _url_programacion(resultado, meses_tocados):
+    """Issue #200 (root cause 1): si todas las actividades importadas
+    cayeron en un único mes/año, llevar al usuario directo a esa vista de
+    Programación Mensual — el filtro por defecto (mes de hoy) es lo que
+    hacía "desaparecer" las actividades recién creadas cuando el Excel
+    programaba a futuro."""
+    url = reverse('actividades:programacion')
+    if resultado['exito'] and len(meses_tocados) == 1:
+        anio_dest, mes_dest = meses_tocados[0]
+        return f"{url}?mes={mes_dest}&anio={anio_dest}"
+    return url
+
+
+def procesar_programacion(archivo, parametros, usuario=None, progreso=None):
+    """Importa programación: formato semanal, avisos (sin línea) o programa
+    Transelca de una línea. ``parametros``: ``linea_id``, ``anio``, ``mes``,
+    ``actualizar_existentes``."""
+    if not parametros.get('linea_id') and es_formato_semanal(archivo):
+        return _procesar_semanal(archivo, parametros)
+    if not parametros.get('linea_id'):
+        return _procesar_avisos(archivo, parametros)
+    return _procesar_programa(archivo, parametros, usuario)
+
+
+def _procesar_semanal(archivo, parametros):
+    from .importers import ProgramacionSemanalImporter
+
+    mensajes = []
+    resultado = ProgramacionSemanalImporter().importar(
+        archivo,
+        opciones={'actualizar_existentes': parametros.get('actualizar_existentes', False)},
+    )
+    if not resultado['exito']:
+        mensajes.append(['error', f"Error: {resultado.get('error', 'desconocido')}"])
+        return {
+            'resultado': resultado,
+            'mensajes': mensajes,
+            'redirect_url': reverse('actividades:programacion'),
+        }
+
+    hojas = ', '.join(resultado.get('sheets_procesadas', []))
+    mensaje = (
+        f"Programación semanal importada: "
+        f"{resultado['actividades_creadas']} creadas, "
+        f"{resultado['actividades_actualizadas']} actualizadas "
+        f"en hojas [{hojas}]."
+    )
+    # Issue #200 (root cause 1): las actividades quedan programadas con la
+    # fecha real del Excel (columna INICIO), casi nunca el mes actual.
+    # Decirlo explícito en el mensaje — antes el usuario buscaba en
+    # "Programación Mensual" con el filtro por defecto (mes de hoy) y no
+    # encontraba nada.
+    meses_tocados = sorted(tuple(m) for m in resultado.get('meses_tocados') or [])
+    if meses_tocados:
+        mensaje += f" Quedaron programadas para: {_etiquetas_meses(meses_tocados)}."
+    if resultado.get('advertencias'):
+        mensaje += f" {len(resultado['advertencias'])} advertencias (detalle abajo)."
+    mensajes.append(['success', mensaje])
+
+    # Issue #200 (root cause 2): antes solo se mostraba el CONTEO de
+    # advertencias/errores — el detalle por fila se descartaba por completo
+    # y nunca quedaba visible en ningún lado (ni UI ni logs).
+    if resultado.get('advertencias'):
+        mensajes.append(['warning', resumen_advertencias(resultado['advertencias'])])
+    for error_hoja in resultado.get('errores') or []:
+        mensajes.append([
+            'error',
+            f"Error procesando hoja '{error_hoja.get('hoja', '?')}': "
+            f"{error_hoja.get('error', 'desconocido')}",
+        ])
+
+    return {
+        'resultado': resultado,
+        'mensajes': mensajes,
+        'redirect_url': _url_programacion(resultado, meses_tocados),
+    }
+
+
+def _procesar_avisos(archivo, parametros):
+    """Sin línea: importar como avisos (detecta la línea del Excel)."""
+    from .importers import AvisosTranselcaImporter
+
+    mensajes = []
+    resultado = AvisosTranselcaImporter().importar(
+        archivo,
+        anio=parametros.get('anio'),
+        mes=parametros.get('mes'),
+        opciones={'actualizar_existentes': parametros.get('actualizar_existentes', False)},
+    )
+
+    meses_tocados = []
+    if resultado['exito']:
+        mensaje = (
+            f"Importación exitosa: {resultado['actividades_creadas']} actividades creadas, "
+            f"{resultado['actividades_actualizadas']} actualizadas."
+        )
+        meses_tocados = sorted(tuple(m) for m in resultado.get('meses_tocados') or [])
+        if meses_tocados:
+            mensaje += f" Quedaron programadas para: {_etiquetas_meses(meses_tocados)}."
+        if resultado.get('advertencias'):
+            mensaje += f" {len(resultado['advertencias'])} advertencias (detalle abajo)."
+        mensajes.append(['success', mensaje])
+        if resultado.get('advertencias'):
+            mensajes.append(['warning', resumen_advertencias(resultado['advertencias'])])
+        for error_fila in resultado.get('errores') or []:
+            mensajes.append([
+                'error',
+                f"Error procesando fila {error_fila.get('fila', '?')}: "
+                f"{error_fila.get('error', 'desconocido')}",
+            ])
+    else:
+        mensajes.append(['error', f"Error en importación: {resultado.get('error', 'Error desconocido')}"])
+
+    return {
+        'resultado': resultado,
+        'mensajes': mensajes,
+        'redirect_url': _url_programacion(resultado, meses_tocados),
+    }
+
+
+def _procesar_programa(archivo, parametros, usuario):
+    """Programa Transelca de una línea → ``ProgramacionMensual`` del mes."""
+    from apps.lineas.models import Linea
+
+    from .importers import ProgramaTranselcaImporter
+    from .models import ProgramacionMensual
+
+    try:
+        linea = Linea.objects.get(id=parametros['linea_id'])
+    except Linea.DoesNotExist as e:
+        return {
+            'resultado': {'exito': False, 'error': str(e)},
+            'mensajes': [['error', f'Línea no encontrada: {e}']],
+            'redirect_url': reverse('actividades:importar'),
+        }
+
+    anio = parametros.get('anio')
+    mes = parametros.get('mes')
+
+    # Si año o mes no se especifican, detectarlos del Excel
+    if not anio or not mes:
+        importer_detect = ProgramaTranselcaImporter()
+        from contextlib import closing
+        from itertools import islice
+
+        from apps.core.excel_streaming import abrir_libro
+        try:
+            with closing(abrir_libro(archivo)) as wb:
+                # Solo el header + las 5 filas que mira `_detectar_fecha_excel`.
+                rows = list(islice(wb.active.iter_rows(values_only=True), 6))
+            importer_detect._detectar_columnas(rows[0])
+            anio_excel, mes_excel = importer_detect._detectar_fecha_excel(rows[1:])
+            anio = anio or anio_excel
+            mes = mes or mes_excel
+        except Exception:
+            pass
+        finally:
+            archivo.seek(0)
+
+    # Usar valores por defecto si no se encuentran
+    if not anio or not mes:
+        from datetime import date
+        hoy = date.today()
+        anio = anio or hoy.year
+        mes = mes or hoy.month
+
+    # Crear o obtener programación mensual
+    programacion, created = ProgramacionMensual.objects.get_or_create(
+        anio=anio,
+        mes=mes,
+        linea=linea,
+        defaults={
+            'archivo_origen': archivo,
+        }
+    )
+
+    if not created:
+        programacion.archivo_origen = archivo
+        programacion.save(update_fields=['archivo_origen', 'updated_at'])
+    archivo.seek(0)
+
+    resultado = ProgramaTranselcaImporter().importar(
+        archivo,
+        programacion,
+        opciones={'actualizar_existentes': parametros.get('actualizar_existentes', False)},
+    )
+
+    mensajes = []
+    if resultado['exito']:
+        mensaje = (
+            f"Importación exitosa: {resultado['actividades_creadas']} actividades creadas, "
+            f"{resultado['actividades_actualizadas']} actualizadas, "
+            f"{resultado['filas_omitidas']} filas omitidas."
+        )
+        if resultado['advertencias']:
+            mensaje += f" {len(resultado['advertencias'])} advertencias."
+        mensajes.append(['success', mensaje])
+
+        # Guardar datos importados en la programación
+        programacion.datos_importados = {
+            'resultado': resultado,
+            'fecha_importacion': timezone.now().isoformat(),
+            'usuario': usuario.get_full_name() if usuario else '',
+        }
+        programacion.save(update_fields=['datos_importados', 'updated_at'])
+    else:
+        mensajes.append(['error', f"Error en importación: {resultado.get('error', 'Error desconocido')}"])
+
+    return {
+        'resultado': resultado,
+        'mensajes': mensajes,
+        'redirect_url': reverse('actividades:programacion'),
+    }
+
+
+def procesar_avances(archivo, parametros, usuario=None, progreso=None):
+    """Importa avances por aviso SAP.
+
+    Único procesador de actividades que confirma por lote: con ``progreso``
+    cada lote confirmado se guarda como checkpoint y un reintento del
+    trabajo retoma desde la fila siguiente.
+    """
+    from .importers import AvancesImporter
+
+    importer = AvancesImporter()
+    if progreso is not None:
+        resultado = importer.importar(
+            archivo, checkpoint=progreso.datos, al_confirmar_lote=progreso.checkpoint,
+        )
+    else:
+        resultado = importer.importar(archivo)
+
+    if resultado['exito']:
+        parts = [f"✓ {resultado['actividades_actualizadas']} actividades actualizadas"]
+        if resultado['filas_omitidas']:
+            parts.append(f"{resultado['filas_omitidas']} filas omitidas")
+        if resultado['advertencias']:
+            parts.append(f"{len(resultado['advertencias'])} advertencias")
+        if resultado['errores']:
+            parts.append(f"{len(resultado['errores'])} errores")
+        mensajes = [['success', ' | '.join(parts)]]
+    else:
+        mensajes = [['error', f"Error: {resultado.get('error', 'Error desconocido')}"]]
+
+    return {
+        'resultado': resultado,
+        'mensajes': mensajes,
+        'redirect_url': reverse('actividades:programacion'),
+    }
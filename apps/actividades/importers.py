@@ -4,9 +4,17 @@ Importers for activity programming from Excel files.
 import logging
 from datetime import date, datetime
 from decimal import Decimal
+from itertools import chain, islice
 
-from django.db import transaction
-from openpyxl import load_workbook
+from django.db import DatabaseError, transaction
+
+from apps.core.excel_streaming import (
+    TAMANO_LOTE,
+    abrir_libro,
+    en_lotes,
+    filas_numeradas,
+    rangos_combinados,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -70,7 +78,7 @@ class ProgramaTranselcaImporter:
         actualizar_existentes = opciones.get('actualizar_existentes', False)
 
         try:
-            workbook = load_workbook(archivo_excel, read_only=True, data_only=True)
+            workbook = abrir_libro(archivo_excel)
             sheet = workbook.active
         except Exception as e:
             logger.error(f"Error loading Excel file: {e}")
@@ -81,56 +89,75 @@ class ProgramaTranselcaImporter:
                 'actividades_actualizadas': 0,
             }
 
-        # Detectar columnas en la primera fila
-        rows = list(sheet.iter_rows(values_only=True))
-        if not rows:
-            return {
-                'exito': False,
-                'error': 'El archivo está vacío',
-                'actividades_creadas': 0,
-                'actividades_actualizadas': 0,
-            }
-
-        header_row = rows[0]
-        self._detectar_columnas(header_row)
-
-        if 'linea' not in self.column_indices:
-            return {
-                'exito': False,
-                'error': 'No se encontró la columna de Línea en el archivo',
-                'actividades_creadas': 0,
-                'actividades_actualizadas': 0,
-            }
+        try:
+            # Detectar columnas en la primera fila; el resto se consume en lotes
+            # sin materializar la hoja.
+            filas = filas_numeradas(sheet)
+            _, header_row = next(filas, (None, None))
+            if header_row is None:
+                return {
+                    'exito': False,
+                    'error': 'El archivo está vacío',
+                    'actividades_creadas': 0,
+                    'actividades_actualizadas': 0,
+                }
+
+            self._detectar_columnas(header_row)
+
+            if 'linea' not in self.column_indices:
+                return {
+                    'exito': False,
+                    'error': 'No se encontró la columna de Línea en el archivo',
+                    'actividades_creadas': 0,
+                    'actividades_actualizadas': 0,
+                }
+
+            if 'tipo_actividad' not in self.column_indices:
+                return {
+                    'exito': False,
+                    'error': 'No se encontró la columna de Tipo de Actividad en el archivo',
+                    'actividades_creadas': 0,
+                    'actividades_actualizadas': 0,
+                }
+
+            linea_asociada = programacion_mensual.linea
+
+            # Fase 1: parsear todas las filas (sin queries).
+            filas_parseadas = []
+            for lote in en_lotes(filas):
+                for row_num, row in lote:
+                    try:
+                        fila = self._parsear_fila(row, row_num, linea_asociada)
+                    except Exception as e:
+                        logger.warning(f"Error processing row {row_num}: {e}")
+                        self.errores.append({
+                            'fila': row_num,
+                            'error': str(e)
+                        })
+                        continue
+                    if fila is None:
+                        self.filas_omitidas.append(row_num)
+                    else:
+                        filas_parseadas.append(fila)
+        finally:
+            workbook.close()
 
-        if 'tipo_actividad' not in self.column_indices:
+        # Fase 2: resolver y escribir en bloque.
+        try:
+            with transaction.atomic():
+                self._importar_en_lote(
+                    filas_parseadas, programacion_mensual, linea_asociada, actualizar_existentes
+                )
+        except DatabaseError as e:
+            logger.exception('ProgramaTranselcaImporter: error escribiendo actividades')
             return {
                 'exito': False,
-                'error': 'No se encontró la columna de Tipo de Actividad en el archivo',
+                'error': f'Error al guardar las actividades: {e}',
                 'actividades_creadas': 0,
                 'actividades_actualizadas': 0,
             }
-
-        # Procesar filas de datos
-        linea_asociada = programacion_mensual.linea
-
-        with transaction.atomic():
-            for row_num, row in enumerate(rows[1:], start=2):
-                try:
-                    resultado = self._procesar_fila(
-                        row, row_num, programacion_mensual, linea_asociada, actualizar_existentes
-                    )
-                    if resultado == 'creada':
-                        self.actividades_creadas.append(row_num)
-                    elif resultado == 'actualizada':
-                        self.actividades_actualizadas.append(row_num)
-                    elif resultado == 'omitida':
-                        self.filas_omitidas.append(row_num)
-                except Exception as e:
-                    logger.warning(f"Error processing row {row_num}: {e}")
-                    self.errores.append({
-                        'fila': row_num,
-                        'error': str(e)
-                    })
+        self.advertencias.sort(key=lambda a: a.get('fila', 0))
+        self.errores.sort(key=lambda e: e.get('fila', 0))
 
         # Actualizar programación mensual
         programacion_mensual.total_actividades = Actividad.objects.filter(
@@ -199,13 +226,8 @@ class ProgramaTranselcaImporter:
 
         return anio, mes
 
-    def _procesar_fila(self, row, row_num, programacion_mensual, linea_asociada, actualizar_existentes):
-        """Procesa una fila del Excel y crea/actualiza la actividad."""
-        from apps.lineas.models import Linea, Torre, Tramo
-
-        from .models import Actividad, TipoActividad
-
-        # Obtener valores de la fila
+    def _parsear_fila(self, row, row_num, linea_asociada):
+        """Fase 1: valores de la fila, sin tocar la BD. ``None`` = omitida."""
         aviso_sap = self._get_cell_value(row, 'aviso_sap')
         linea_codigo = self._get_cell_value(row, 'linea')
         tipo_actividad_nombre = self._get_cell_value(row, 'tipo_actividad')
@@ -221,135 +243,240 @@ class ProgramaTranselcaImporter:
                 'fila': row_num,
                 'mensaje': 'No se especificó línea y no hay línea asociada a la programación'
             })
-            return 'omitida'
+            return None
 
         if not tipo_actividad_nombre:
             self.advertencias.append({
                 'fila': row_num,
                 'mensaje': 'No se especificó tipo de actividad'
             })
-            return 'omitida'
+            return None
 
-        # Buscar línea
-        linea = linea_asociada
-        if linea_codigo:
+        # Preparar valor de facturación
+        valor_fact = Decimal('0')
+        if valor_facturacion:
             try:
-                linea = Linea.objects.get(codigo__iexact=str(linea_codigo).strip())
-            except Linea.DoesNotExist:
+                valor_fact = Decimal(str(valor_facturacion).replace(',', '.').replace('$', '').strip())
+            except (ValueError, TypeError):
                 self.advertencias.append({
                     'fila': row_num,
-                    'mensaje': f'Línea no encontrada: {linea_codigo}'
+                    'mensaje': f'Valor de facturación inválido: {valor_facturacion}'
                 })
-                if not linea_asociada:
-                    return 'omitida'
 
-        # Buscar tipo de actividad
-        try:
-            tipo_actividad = TipoActividad.objects.get(
-                nombre__iexact=str(tipo_actividad_nombre).strip()
+        return {
+            'fila': row_num,
+            'aviso_sap': str(aviso_sap).strip() if aviso_sap else '',
+            'linea_codigo': str(linea_codigo).strip() if linea_codigo else '',
+            'tipo_actividad': str(tipo_actividad_nombre).strip(),
+            'tramo_codigo': str(tramo_codigo).strip() if tramo_codigo else '',
+            'torre_numero': str(torre_inicio_num).strip() if torre_inicio_num else '',
+            'valor_facturacion': valor_fact,
+            'observaciones': str(observaciones) if observaciones else '',
+        }
+
+    @staticmethod
+    def _resolver_tipo(nombre, tipos):
+        """Mismo criterio que ``nombre__iexact`` y, si no hay, el primer
+        ``nombre__icontains`` (orden del modelo). Devuelve ``(tipo, mapeado)``."""
+        nombre_lower = nombre.lower()
+        exactos = [t for t in tipos if t.nombre.lower() == nombre_lower]
+        if len(exactos) > 1:
+            raise ValueError(f'Hay {len(exactos)} tipos de actividad con nombre "{nombre}"')
+        if exactos:
+            return exactos[0], False
+        parcial = next((t for t in tipos if nombre_lower in t.nombre.lower()), None)
+        return parcial, parcial is not None
+
+    def _importar_en_lote(self, filas, programacion_mensual, linea_asociada, actualizar_existentes):
+        """Fase 2: resuelve las claves de TODAS las filas con una query por
+        modelo y escribe con ``bulk_create`` / ``bulk_update``.
+
+        Debe correr dentro de ``transaction.atomic()``. Los avisos repetidos
+        dentro del archivo se resuelven contra la actividad ya vista (igual
+        que el procesamiento fila a fila: la segunda aparición la actualiza o
+        se omite).
+        """
+        from django.db.models.functions import Upper
+        from django.utils import timezone
+
+        from apps.lineas.models import Linea, Torre, Tramo
+
+        from .models import Actividad, TipoActividad
+
+        lineas = {
+            linea.codigo_upper: linea
+            for linea in Linea.objects.annotate(codigo_upper=Upper('codigo')).filter(
+                codigo_upper__in={f['linea_codigo'].upper() for f in filas if f['linea_codigo']}
             )
-        except TipoActividad.DoesNotExist:
-            # Intentar búsqueda parcial
-            tipos = TipoActividad.objects.filter(
-                nombre__icontains=str(tipo_actividad_nombre).strip()
+        }
+        tramos = {
+            tramo.codigo_upper: tramo
+            for tramo in Tramo.objects.select_related('torre_inicio').annotate(
+                codigo_upper=Upper('codigo')
+            ).filter(
+                codigo_upper__in={f['tramo_codigo'].upper() for f in filas if f['tramo_codigo']}
             )
-            if tipos.exists():
-                tipo_actividad = tipos.first()
-                self.advertencias.append({
-                    'fila': row_num,
-                    'mensaje': f'Tipo de actividad "{tipo_actividad_nombre}" mapeado a "{tipo_actividad.nombre}"'
-                })
-            else:
-                self.advertencias.append({
-                    'fila': row_num,
-                    'mensaje': f'Tipo de actividad no encontrado: {tipo_actividad_nombre}'
-                })
-                return 'omitida'
+        }
+        # Catálogo chico: exacto + parcial se resuelven en memoria.
+        tipos = list(TipoActividad.objects.all())
 
-        # Buscar tramo (opcional)
-        tramo = None
-        if tramo_codigo:
+        # Línea, tipo y tramo por fila; la torre depende de la línea resuelta.
+        resueltas = []
+        for fila in filas:
+            row_num = fila['fila']
             try:
-                tramo = Tramo.objects.get(codigo__iexact=str(tramo_codigo).strip())
-            except Tramo.DoesNotExist:
-                self.advertencias.append({
-                    'fila': row_num,
-                    'mensaje': f'Tramo no encontrado: {tramo_codigo}'
-                })
+                linea = linea_asociada
+                if fila['linea_codigo']:
+                    linea = lineas.get(fila['linea_codigo'].upper())
+                    if linea is None:
+                        self.advertencias.append({
+                            'fila': row_num,
+                            'mensaje': f'Línea no encontrada: {fila["linea_codigo"]}'
+                        })
+                        if not linea_asociada:
+                            self.filas_omitidas.append(row_num)
+                            continue
+                        linea = linea_asociada
+
+                tipo_actividad, mapeado = self._resolver_tipo(fila['tipo_actividad'], tipos)
+                if tipo_actividad is None:
+                    self.advertencias.append({
+                        'fila': row_num,
+                        'mensaje': f'Tipo de actividad no encontrado: {fila["tipo_actividad"]}'
+                    })
+                    self.filas_omitidas.append(row_num)
+                    continue
+                if mapeado:
+                    self.advertencias.append({
+                        'fila': row_num,
+                        'mensaje': f'Tipo de actividad "{fila["tipo_actividad"]}" mapeado a "{tipo_actividad.nombre}"'
+                    })
 
-        # Buscar torre (opcional, usa la torre de inicio del tramo si hay tramo)
-        torre = None
-        if tramo:
-            torre = tramo.torre_inicio
-        elif torre_inicio_num:
-            try:
-                torre = Torre.objects.get(
-                    linea=linea,
-                    numero=str(torre_inicio_num).strip()
+                tramo = None
+                if fila['tramo_codigo']:
+                    tramo = tramos.get(fila['tramo_codigo'].upper())
+                    if tramo is None:
+                        self.advertencias.append({
+                            'fila': row_num,
+                            'mensaje': f'Tramo no encontrado: {fila["tramo_codigo"]}'
+                        })
+            except Exception as e:
+                logger.warning(f"Error processing row {row_num}: {e}")
+                self.errores.append({'fila': row_num, 'error': str(e)})
+                continue
+            resueltas.append((fila, linea, tipo_actividad, tramo))
+
+        # Torre de inicio (si no viene del tramo) y actividades existentes.
+        claves_torre = [
+            (linea.id, fila['torre_numero'])
+            for fila, linea, _, tramo in resueltas
+            if tramo is None and fila['torre_numero']
+        ]
+        torres = {}
+        if claves_torre:
+            torres = {
+                (torre.linea_id, torre.numero): torre
+                for torre in Torre.objects.filter(
+                    linea_id__in={linea_id for linea_id, _ in claves_torre},
+                    numero__in={numero for _, numero in claves_torre},
                 )
-            except Torre.DoesNotExist:
-                self.advertencias.append({
-                    'fila': row_num,
-                    'mensaje': f'Torre no encontrada: {torre_inicio_num}'
-                })
+            }
+        existentes = {}
+        avisos = {fila['aviso_sap'] for fila, *_ in resueltas if fila['aviso_sap']}
+        if avisos:
+            for actividad in Actividad.objects.filter(aviso_sap__in=avisos):
+                existentes.setdefault(actividad.aviso_sap, []).append(actividad)
+
+        fecha_programada = date(programacion_mensual.anio, programacion_mensual.mes, 1)
+        nuevas = []
+        actualizadas = {}
+        ahora = timezone.now()
+        for fila, linea, tipo_actividad, tramo in resueltas:
+            row_num = fila['fila']
+            torre = None
+            if tramo:
+                torre = tramo.torre_inicio
+            elif fila['torre_numero']:
+                torre = torres.get((linea.id, fila['torre_numero']))
+                if torre is None:
+                    self.advertencias.append({
+                        'fila': row_num,
+                        'mensaje': f'Torre no encontrada: {fila["torre_numero"]}'
+                    })
 
-        # Preparar valor de facturación
-        valor_fact = Decimal('0')
-        if valor_facturacion:
-            try:
-                valor_fact = Decimal(str(valor_facturacion).replace(',', '.').replace('$', '').strip())
-            except (ValueError, TypeError):
+            # Verificar si ya existe (por aviso SAP)
+            actividad = None
+            if fila['aviso_sap']:
+                encontradas = existentes.get(fila['aviso_sap'], [])
+                if len(encontradas) > 1:
+                    self.errores.append({
+                        'fila': row_num,
+                        'error': f'Hay {len(encontradas)} actividades con Aviso SAP {fila["aviso_sap"]}',
+                    })
+                    continue
+                actividad = encontradas[0] if encontradas else None
+
+            if actividad is not None and not actualizar_existentes:
                 self.advertencias.append({
                     'fila': row_num,
-                    'mensaje': f'Valor de facturación inválido: {valor_facturacion}'
+                    'mensaje': f'Actividad con Aviso SAP {fila["aviso_sap"]} ya existe, omitiendo'
                 })
+                self.filas_omitidas.append(row_num)
+                continue
 
-        # Verificar si ya existe (por aviso SAP)
-        actividad_existente = None
-        if aviso_sap:
-            aviso_sap_str = str(aviso_sap).strip()
-            try:
-                actividad_existente = Actividad.objects.get(aviso_sap=aviso_sap_str)
-            except Actividad.DoesNotExist:
-                pass
-
-        if actividad_existente:
-            if actualizar_existentes:
-                # Actualizar actividad existente
-                actividad_existente.linea = linea
-                actividad_existente.tipo_actividad = tipo_actividad
-                actividad_existente.torre = torre
-                actividad_existente.tramo = tramo
-                actividad_existente.programacion = programacion_mensual
-                if valor_fact > 0:
-                    actividad_existente.valor_facturacion = valor_fact
-                if observaciones:
-                    actividad_existente.observaciones_programacion = str(observaciones)
-                actividad_existente.save()
-                return 'actualizada'
-            else:
-                self.advertencias.append({
+            if torre is None:
+                self.errores.append({
                     'fila': row_num,
-                    'mensaje': f'Actividad con Aviso SAP {aviso_sap} ya existe, omitiendo'
+                    'error': 'La actividad requiere torre (torre de inicio o tramo)',
                 })
-                return 'omitida'
+                continue
 
-        # Crear nueva actividad
-        Actividad.objects.create(
-            linea=linea,
-            torre=torre,
-            tipo_actividad=tipo_actividad,
-            programacion=programacion_mensual,
-            tramo=tramo,
-            aviso_sap=str(aviso_sap).strip() if aviso_sap else '',
-            fecha_programada=date(programacion_mensual.anio, programacion_mensual.mes, 1),
-            estado=Actividad.Estado.PENDIENTE,
-            prioridad=Actividad.Prioridad.NORMAL,
-            valor_facturacion=valor_fact,
-            observaciones_programacion=str(observaciones) if observaciones else '',
+            if actividad is not None:
+                actividad.linea = linea
+                actividad.tipo_actividad = tipo_actividad
+                actividad.torre = torre
+                actividad.tramo = tramo
+                actividad.programacion = programacion_mensual
+                if fila['valor_facturacion'] > 0:
+                    actividad.valor_facturacion = fila['valor_facturacion']
+                if fila['observaciones']:
+                    actividad.observaciones_programacion = fila['observaciones']
+                if not actividad._state.adding:
+                    actividad.updated_at = ahora
+                    actualizadas[actividad.pk] = actividad
+                self.actividades_actualizadas.append(row_num)
+                continue
+
+            actividad = Actividad(
+                linea=linea,
+                torre=torre,
+                tipo_actividad=tipo_actividad,
+                programacion=programacion_mensual,
+                tramo=tramo,
+                aviso_sap=fila['aviso_sap'],
+                fecha_programada=fecha_programada,
+                estado=Actividad.Estado.PENDIENTE,
+                prioridad=Actividad.Prioridad.NORMAL,
+                valor_facturacion=fila['valor_facturacion'],
+                observaciones_programacion=fila['observaciones'],
+            )
+            nuevas.append(actividad)
+            if fila['aviso_sap']:
+                existentes[fila['aviso_sap']] = [actividad]
+            self.actividades_creadas.append(row_num)
+
+        Actividad.objects.bulk_create(nuevas, batch_size=TAMANO_LOTE)
+        Actividad.objects.bulk_update(
+            list(actualizadas.values()),
+            ['linea', 'tipo_actividad', 'torre', 'tramo', 'programacion',
+             'valor_facturacion', 'observaciones_programacion', 'updated_at'],
+            batch_size=TAMANO_LOTE,
         )
 
-        return 'creada'
+        # bulk_create/update no disparan las señales del dashboard de indicadores.
+        from apps.indicadores.snapshots import invalidar_dashboard
+        invalidar_dashboard()
+        transaction.on_commit(invalidar_dashboard)
 
 
 class AvisosTranselcaImporter:
@@ -442,10 +569,9 @@ class AvisosTranselcaImporter:
 
         opciones = opciones or {}
         actualizar_existentes = opciones.get('actualizar_existentes', False)
-        crear_lineas = opciones.get('crear_lineas', False)
 
         try:
-            workbook = load_workbook(archivo_excel, read_only=True, data_only=True)
+            workbook = abrir_libro(archivo_excel)
             sheet = workbook.active
         except Exception as e:
             logger.error(f"Error loading Excel file: {e}")
@@ -455,57 +581,77 @@ class AvisosTranselcaImporter:
                 'actividades_creadas': 0,
             }
 
-        rows = list(sheet.iter_rows(values_only=True))
-        if not rows:
-            return {'exito': False, 'error': 'El archivo está vacío'}
-
-        # Detectar columnas
-        header_row = rows[0]
-        self._detectar_columnas(header_row)
+        try:
+            filas = filas_numeradas(sheet)
+            _, header_row = next(filas, (None, None))
+            if header_row is None:
+                return {'exito': False, 'error': 'El archivo está vacío'}
+
+            # Detectar columnas
+            self._detectar_columnas(header_row)
+
+            if 'aviso' not in self.column_indices:
+                return {
+                    'exito': False,
+                    'error': 'No se encontró la columna de Aviso SAP',
+                }
+
+            # El primer lote ya trae las filas que mira `_detectar_fecha_excel`.
+            lotes = en_lotes(filas)
+            primer_lote = next(lotes, [])
+
+            # Detectar año y mes del Excel si no se proporcionan
+            if not anio or not mes:
+                anio_excel, mes_excel = self._detectar_fecha_excel([row for _, row in primer_lote])
+                if anio_excel and mes_excel:
+                    anio = anio or anio_excel
+                    mes = mes or mes_excel
+
+            # Usar valores por defecto si no se encuentran
+            if not anio or not mes:
+                hoy = date.today()
+                anio = anio or hoy.year
+                mes = mes or hoy.month
+
+            # Cache de líneas y tipos de actividad (por categoría y por nombre)
+            lineas_cache = {linea_obj.codigo: linea_obj for linea_obj in Linea.objects.all()}
+            tipos_activos = list(TipoActividad.objects.filter(activo=True))
+            tipos_cache = {t.categoria: t for t in tipos_activos}
+            tipos_nombre_cache = {t.nombre.lower(): t for t in tipos_activos}
+
+            # Fase 1: parsear todas las filas contra los caches (sin queries).
+            filas_parseadas = []
+            for lote in chain([primer_lote], lotes):
+                for row_num, row in lote:
+                    try:
+                        fila = self._parsear_fila(
+                            row, row_num, anio, mes,
+                            lineas_cache, tipos_cache, tipos_nombre_cache,
+                        )
+                    except Exception as e:
+                        logger.warning(f"Error processing row {row_num}: {e}")
+                        self.errores.append({'fila': row_num, 'error': str(e)})
+                        continue
+                    if fila is None:
+                        self.actividades_omitidas.append(row_num)
+                    else:
+                        filas_parseadas.append(fila)
+        finally:
+            workbook.close()
 
-        if 'aviso' not in self.column_indices:
+        # Fase 2: resolver y escribir en bloque.
+        try:
+            with transaction.atomic():
+                self._importar_en_lote(filas_parseadas, actualizar_existentes)
+        except DatabaseError as e:
+            logger.exception('AvisosTranselcaImporter: error escribiendo actividades')
             return {
                 'exito': False,
-                'error': 'No se encontró la columna de Aviso SAP',
+                'error': f'Error al guardar las actividades: {e}',
+                'actividades_creadas': 0,
             }
-
-        # Detectar año y mes del Excel si no se proporcionan
-        if not anio or not mes:
-            anio_excel, mes_excel = self._detectar_fecha_excel(rows[1:])
-            if anio_excel and mes_excel:
-                anio = anio or anio_excel
-                mes = mes or mes_excel
-
-        # Usar valores por defecto si no se encuentran
-        if not anio or not mes:
-            hoy = date.today()
-            anio = anio or hoy.year
-            mes = mes or hoy.month
-
-        # Cache de líneas y tipos de actividad
-        lineas_cache = {linea_obj.codigo: linea_obj for linea_obj in Linea.objects.all()}
-        tipos_cache = {t.categoria: t for t in TipoActividad.objects.filter(activo=True)}
-
-        # También crear cache por nombre
-        tipos_nombre_cache = {t.nombre.lower(): t for t in TipoActividad.objects.filter(activo=True)}
-
-        with transaction.atomic():
-            for row_num, row in enumerate(rows[1:], start=2):
-                try:
-                    resultado = self._procesar_fila(
-                        row, row_num, anio, mes,
-                        lineas_cache, tipos_cache, tipos_nombre_cache,
-                        actualizar_existentes, crear_lineas
-                    )
-                    if resultado == 'creada':
-                        self.actividades_creadas.append(row_num)
-                    elif resultado == 'actualizada':
-                        self.actividades_actualizadas.append(row_num)
-                    elif resultado == 'omitida':
-                        self.actividades_omitidas.append(row_num)
-                except Exception as e:
-                    logger.warning(f"Error processing row {row_num}: {e}")
-                    self.errores.append({'fila': row_num, 'error': str(e)})
+        self.advertencias.sort(key=lambda a: a.get('fila', 0))
+        self.errores.sort(key=lambda e: e.get('fila', 0))
 
         from .models import Actividad, ProgramacionMensual
         for anio_tocado, mes_tocado, linea_id in self.programaciones_tocadas:
@@ -611,15 +757,12 @@ class AvisosTranselcaImporter:
     def _normalizar_torre(valor):
         return ''.join(c for c in str(valor or '').upper() if c.isalnum())
 
-    def _procesar_fila(self, row, row_num, anio, mes, lineas_cache, tipos_cache,
-                       tipos_nombre_cache, actualizar_existentes, crear_lineas):
-        """Procesa una fila del Excel."""
-
-        from .models import Actividad, ProgramacionMensual
-
+    def _parsear_fila(self, row, row_num, anio, mes, lineas_cache, tipos_cache, tipos_nombre_cache):
+        """Fase 1: resuelve línea/tipo contra los caches en memoria y la
+        fecha de la fila. ``None`` = omitida."""
         aviso_sap = self._get_cell(row, 'aviso')
         if not aviso_sap:
-            return 'omitida'
+            return None
 
         aviso_sap = str(aviso_sap).strip()
 
@@ -648,7 +791,7 @@ class AvisosTranselcaImporter:
                     'fila': row_num,
                     'mensaje': f'Línea no encontrada: {linea_codigo_str}'
                 })
-                return 'omitida'
+                return None
 
         # Buscar tipo de actividad
         tipo_actividad = None
@@ -678,77 +821,157 @@ class AvisosTranselcaImporter:
                 'fila': row_num,
                 'mensaje': 'Faltan datos requeridos (línea o tipo)'
             })
-            return 'omitida'
+            return None
 
-        fecha_programada = self._fecha_por_fila(row, row_num, anio, mes)
-        anio, mes = fecha_programada.year, fecha_programada.month
+        torre_excel = self._get_cell(row, 'torre_inicio')
+        return {
+            'fila': row_num,
+            'aviso_sap': aviso_sap,
+            'linea': linea,
+            'tipo_actividad': tipo_actividad,
+            'pt_sap': str(pt_sap).strip() if pt_sap else '',
+            'descripcion': str(descripcion) if descripcion else '',
+            'torre_excel': torre_excel,
+            'fecha_programada': self._fecha_por_fila(row, row_num, anio, mes),
+        }
 
-        # Buscar o crear programación mensual
-        programacion, _ = ProgramacionMensual.objects.get_or_create(
-            anio=anio,
-            mes=mes,
-            linea=linea,
-            defaults={'total_actividades': 0}
-        )
+    def _importar_en_lote(self, filas, actualizar_existentes):
+        """Fase 2: torres, programaciones mensuales y actividades existentes
+        de TODAS las filas en una query por modelo; escritura con
+        ``bulk_create`` / ``bulk_update``. Debe correr dentro de
+        ``transaction.atomic()``.
+        """
+        from django.utils import timezone
+
+        from apps.lineas.models import Torre
+
+        from .models import Actividad, ProgramacionMensual
+
+        lineas_ids = {fila['linea'].id for fila in filas}
+        torres_por_linea = {}
+        for torre in Torre.objects.filter(linea_id__in=lineas_ids):
+            torres_por_linea.setdefault(torre.linea_id, []).append(torre)
+
+        claves_programacion = {
+            (f['fecha_programada'].year, f['fecha_programada'].month, f['linea'].id) for f in filas
+        }
+        programaciones = {}
+        if claves_programacion:
+            programaciones = {
+                (p.anio, p.mes, p.linea_id): p
+                for p in ProgramacionMensual.objects.filter(
+                    linea_id__in=lineas_ids,
+                    anio__in={anio for anio, _, _ in claves_programacion},
+                    mes__in={mes for _, mes, _ in claves_programacion},
+                )
+            }
+        programaciones_nuevas = []
+
+        existentes = {}
+        for actividad in Actividad.objects.filter(aviso_sap__in={f['aviso_sap'] for f in filas}):
+            existentes.setdefault(actividad.aviso_sap, []).append(actividad)
+
+        nuevas = []
+        actualizadas = {}
+        ahora = timezone.now()
+        for fila in filas:
+            row_num = fila['fila']
+            linea = fila['linea']
+            torres = torres_por_linea.get(linea.id, [])
+
+            torre = torres[0] if torres else None
+            if fila['torre_excel']:
+                torre_normalizada = self._normalizar_torre(fila['torre_excel'])
+                torre = next(
+                    (torre_obj for torre_obj in torres
+                     if self._normalizar_torre(torre_obj.numero) == torre_normalizada),
+                    None,
+                )
+                if not torre:
+                    self.advertencias.append({
+                        'fila': row_num,
+                        'mensaje': f'Torre no encontrada en {linea.codigo}: {fila["torre_excel"]}',
+                    })
+                    self.actividades_omitidas.append(row_num)
+                    continue
 
-        torre_excel = self._get_cell(row, 'torre_inicio')
-        torre = linea.torres.first()
-        if torre_excel:
-            torre_normalizada = self._normalizar_torre(torre_excel)
-            torre = next(
-                (torre_obj for torre_obj in linea.torres.all()
-                 if self._normalizar_torre(torre_obj.numero) == torre_normalizada),
-                None,
-            )
             if not torre:
                 self.advertencias.append({
                     'fila': row_num,
-                    'mensaje': f'Torre no encontrada en {linea.codigo}: {torre_excel}',
+                    'mensaje': f'Línea {linea.codigo} no tiene torres configuradas',
                 })
-                return 'omitida'
+                self.actividades_omitidas.append(row_num)
+                continue
 
-        if not torre:
-            self.advertencias.append({
-                'fila': row_num,
-                'mensaje': f'Línea {linea.codigo} no tiene torres configuradas',
-            })
-            return 'omitida'
+            encontradas = existentes.get(fila['aviso_sap'], [])
+            if len(encontradas) > 1:
+                self.errores.append({
+                    'fila': row_num,
+                    'error': f'Hay {len(encontradas)} actividades con Aviso SAP {fila["aviso_sap"]}',
+                })
+                continue
+            actividad = encontradas[0] if encontradas else None
+            if actividad is not None and not actualizar_existentes:
+                self.actividades_omitidas.append(row_num)
+                continue
 
-        # Verificar si existe
-        try:
-            actividad = Actividad.objects.get(aviso_sap=aviso_sap)
-            if actualizar_existentes:
+            fecha_programada = fila['fecha_programada']
+            clave = (fecha_programada.year, fecha_programada.month, linea.id)
+            programacion = programaciones.get(clave)
+            if programacion is None:
+                programacion = ProgramacionMensual(
+                    anio=fecha_programada.year, mes=fecha_programada.month, linea=linea,
+                    total_actividades=0,
+                )
+                programaciones[clave] = programacion
+                programaciones_nuevas.append(programacion)
+
+            if actividad is not None:
                 actividad.linea = linea
-                actividad.tipo_actividad = tipo_actividad
-                actividad.pt_sap = str(pt_sap).strip() if pt_sap else ''
+                actividad.tipo_actividad = fila['tipo_actividad']
+                actividad.pt_sap = fila['pt_sap']
                 actividad.programacion = programacion
                 actividad.torre = torre
                 actividad.fecha_programada = fecha_programada
-                if descripcion:
-                    actividad.observaciones_programacion = str(descripcion)
-                actividad.save()
-                self.programaciones_tocadas.add((anio, mes, linea.id))
-                return 'actualizada'
-            return 'omitida'
-        except Actividad.DoesNotExist:
-            pass
+                if fila['descripcion']:
+                    actividad.observaciones_programacion = fila['descripcion']
+                if not actividad._state.adding:
+                    actividad.updated_at = ahora
+                    actualizadas[actividad.pk] = actividad
+                self.programaciones_tocadas.add(clave)
+                self.actividades_actualizadas.append(row_num)
+                continue
 
-        # Crear actividad
-        Actividad.objects.create(
-            linea=linea,
-            torre=torre,
-            tipo_actividad=tipo_actividad,
-            programacion=programacion,
-            aviso_sap=aviso_sap,
-            pt_sap=str(pt_sap).strip() if pt_sap else '',
-            fecha_programada=fecha_programada,
-            estado=Actividad.Estado.PENDIENTE,
-            prioridad=Actividad.Prioridad.NORMAL,
-            observaciones_programacion=str(descripcion) if descripcion else '',
+            actividad = Actividad(
+                linea=linea,
+                torre=torre,
+                tipo_actividad=fila['tipo_actividad'],
+                programacion=programacion,
+                aviso_sap=fila['aviso_sap'],
+                pt_sap=fila['pt_sap'],
+                fecha_programada=fecha_programada,
+                estado=Actividad.Estado.PENDIENTE,
+                prioridad=Actividad.Prioridad.NORMAL,
+                observaciones_programacion=fila['descripcion'],
+            )
+            nuevas.append(actividad)
+            existentes[fila['aviso_sap']] = [actividad]
+            self.programaciones_tocadas.add(clave)
+            self.actividades_creadas.append(row_num)
+
+        ProgramacionMensual.objects.bulk_create(programaciones_nuevas, batch_size=TAMANO_LOTE)
+        Actividad.objects.bulk_create(nuevas, batch_size=TAMANO_LOTE)
+        Actividad.objects.bulk_update(
+            list(actualizadas.values()),
+            ['linea', 'tipo_actividad', 'pt_sap', 'programacion', 'torre',
+             'fecha_programada', 'observaciones_programacion', 'updated_at'],
+            batch_size=TAMANO_LOTE,
         )
 
-        self.programaciones_tocadas.add((anio, mes, linea.id))
-        return 'creada'
+        # bulk_create/update no disparan las señales del dashboard de indicadores.
+        from apps.indicadores.snapshots import invalidar_dashboard
+        invalidar_dashboard()
+        transaction.on_commit(invalidar_dashboard)
 
 
 class ImportadorExcelGenerico:
@@ -773,35 +996,35 @@ class ImportadorExcelGenerico:
         Returns:
             List of dicts with row data
         """
+        return list(self.iterar_excel(archivo_excel, hoja))
+
+    def iterar_excel(self, archivo_excel, hoja=None):
+        """Como `leer_excel`, pero genera los dicts fila a fila (streaming)."""
         try:
-            workbook = load_workbook(archivo_excel, read_only=True, data_only=True)
+            workbook = abrir_libro(archivo_excel)
             if hoja:
                 sheet = workbook[hoja]
             else:
                 sheet = workbook.active
         except Exception as e:
             logger.error(f"Error loading Excel: {e}")
-            return []
-
-        rows = list(sheet.iter_rows(values_only=True))
-        if not rows:
-            return []
+            return
 
-        headers = [str(h).strip() if h else f'col_{i}' for i, h in enumerate(rows[0])]
-        data = []
+        try:
+            filas = filas_numeradas(sheet)
+            _, header_row = next(filas, (None, None))
+            if header_row is None:
+                return
 
-        for row in rows[1:]:
-            row_dict = {}
-            for i, value in enumerate(row):
-                if i < len(headers):
-                    col_name = headers[i]
-                    # Aplicar mapping si existe
-                    if col_name.lower() in self.mapping_columnas:
-                        col_name = self.mapping_columnas[col_name.lower()]
-                    row_dict[col_name] = value
-            data.append(row_dict)
+            headers = [str(h).strip() if h else f'col_{i}' for i, h in enumerate(header_row)]
+            # Aplicar mapping si existe
+            headers = [self.mapping_columnas.get(h.lower(), h) for h in headers]
 
-        return data
+            for lote in en_lotes(filas):
+                for _, row in lote:
+                    yield {col_name: value for col_name, value in zip(headers, row)}
+        finally:
+            workbook.close()
 
 
 class AvancesImporter:
@@ -834,36 +1057,55 @@ class AvancesImporter:
         self.filas_omitidas = []
         self.column_indices = {}
 
-    def importar(self, archivo_excel):
-        """Importa avances desde un archivo Excel."""
+    def importar(self, archivo_excel, checkpoint=None, al_confirmar_lote=None):
+        """Importa avances desde un archivo Excel.
+
+        Cada lote se confirma en su propia transacción: las filas son
+        independientes (una actividad por aviso) y así un trabajo en segundo
+        plano puede reanudar desde el último lote confirmado. ``checkpoint``
+        es el dict que devolvió ``_checkpoint`` en una corrida anterior;
+        ``al_confirmar_lote(checkpoint)`` se llama tras cada commit.
+        """
+        desde_fila = self._restaurar_checkpoint(checkpoint or {})
         try:
-            workbook = load_workbook(archivo_excel, read_only=True, data_only=True)
+            workbook = abrir_libro(archivo_excel)
             sheet = workbook.active
         except Exception as e:
             logger.error(f"Error loading Excel file: {e}")
             return {'exito': False, 'error': f'Error al cargar archivo Excel: {str(e)}'}
 
-        rows = list(sheet.iter_rows(values_only=True))
-        if not rows:
-            return {'exito': False, 'error': 'El archivo está vacío'}
-
-        self._detectar_columnas(rows[0])
-
-        if 'aviso_sap' not in self.column_indices:
-            columnas_recibidas = [str(h) for h in rows[0] if h]
-            return {
-                'exito': False,
-                'error': f'No se encontró columna de Aviso SAP. Columnas detectadas: {", ".join(columnas_recibidas)}',
-                'columnas_recibidas': columnas_recibidas,
-            }
-
-        with transaction.atomic():
-            for row_num, row in enumerate(rows[1:], start=2):
-                try:
-                    self._procesar_fila(row, row_num)
-                except Exception as e:
-                    logger.warning(f"Error processing row {row_num}: {e}")
-                    self.errores.append({'fila': row_num, 'error': str(e)})
+        try:
+            filas = filas_numeradas(sheet)
+            _, header_row = next(filas, (None, None))
+            if header_row is None:
+                return {'exito': False, 'error': 'El archivo está vacío'}
+
+            self._detectar_columnas(header_row)
+
+            if 'aviso_sap' not in self.column_indices:
+                columnas_recibidas = [str(h) for h in header_row if h]
+                return {
+                    'exito': False,
+                    'error': f'No se encontró columna de Aviso SAP. Columnas detectadas: {", ".join(columnas_recibidas)}',
+                    'columnas_recibidas': columnas_recibidas,
+                }
+
+            for lote in en_lotes(filas):
+                if lote[-1][0] <= desde_fila:
+                    continue
+                with transaction.atomic():
+                    for row_num, row in lote:
+                        if row_num <= desde_fila:
+                            continue
+                        try:
+                            self._procesar_fila(row, row_num)
+                        except Exception as e:
+                            logger.warning(f"Error processing row {row_num}: {e}")
+                            self.errores.append({'fila': row_num, 'error': str(e)})
+                if al_confirmar_lote is not None:
+                    al_confirmar_lote(self._checkpoint(lote[-1][0]))
+        finally:
+            workbook.close()
 
         return {
             'exito': True,
@@ -887,6 +1129,24 @@ class AvancesImporter:
 
         logger.info(f"Avances importer detected columns: {self.column_indices}")
 
+    def _checkpoint(self, fila):
+        """Estado acumulado hasta ``fila`` (inclusive), serializable a JSON."""
+        return {
+            'fila': fila,
+            'actividades_actualizadas': self.actividades_actualizadas,
+            'filas_omitidas': self.filas_omitidas,
+            'errores': self.errores,
+            'advertencias': self.advertencias,
+        }
+
+    def _restaurar_checkpoint(self, checkpoint):
+        """Recupera los acumulados de ``checkpoint``; devuelve la última fila ya confirmada."""
+        self.actividades_actualizadas = list(checkpoint.get('actividades_actualizadas', []))
+        self.filas_omitidas = list(checkpoint.get('filas_omitidas', []))
+        self.errores = list(checkpoint.get('errores', []))
+        self.advertencias = list(checkpoint.get('advertencias', []))
+        return checkpoint.get('fila', 0)
+
     def _get_cell(self, row, field_name):
         """Obtiene el valor de una celda por nombre de campo."""
         if field_name not in self.column_indices:
@@ -1017,30 +1277,37 @@ class ProgramacionSemanalImporter:
         opciones = opciones or {}
 
         try:
-            # Issue #178 (A1): NO usar read_only=True — openpyxl no expone
-            # `Worksheet.merged_cells` en modo read_only (AttributeError), y el
-            # parser de bloques necesita el RANGO real de la celda combinada de
-            # columna A/D para detectar el fin de bloque de forma 100% confiable
-            # (antes se dependía implícitamente de que la celda "#" viniera en
-            # blanco por el merge, sin verificar el merge en sí).
-            workbook = load_workbook(archivo_excel, data_only=True)
+            # Issue #178 (A1): el parser de bloques necesita el RANGO real de
+            # la celda combinada de columna A/D para detectar el fin de bloque
+            # de forma 100% confiable. openpyxl no expone
+            # `Worksheet.merged_cells` en modo read_only, así que los rangos
+            # salen de una pre-pasada liviana sobre el XML de las hojas y las
+            # filas se leen en streaming (read_only) — memoria acotada aun con
+            # programas de varios meses.
+            merges = rangos_combinados(archivo_excel)
+            workbook = abrir_libro(archivo_excel)
         except Exception as e:
             logger.error(f"Error loading Excel file: {e}")
             return self._resultado_error(f'Error al cargar archivo Excel: {e}')
 
-        sheets_procesadas = []
-        for sheet_name in workbook.sheetnames:
-            if not self._es_hoja_semanal(sheet_name):
-                logger.info(f"Hoja '{sheet_name}' omitida (no es semana válida)")
-                continue
-            try:
-                semana = self._numero_semana(sheet_name)
-                resumen_hoja = self._procesar_hoja(workbook[sheet_name], opciones, semana)
-                self.resumen_por_hoja[sheet_name] = resumen_hoja
-                sheets_procesadas.append(sheet_name)
-            except Exception as e:
-                logger.exception(f"Error procesando hoja {sheet_name!r}")
-                self.errores.append({'hoja': sheet_name, 'error': str(e)})
+        try:
+            sheets_procesadas = []
+            for sheet_name in workbook.sheetnames:
+                if not self._es_hoja_semanal(sheet_name):
+                    logger.info(f"Hoja '{sheet_name}' omitida (no es semana válida)")
+                    continue
+                try:
+                    semana = self._numero_semana(sheet_name)
+                    resumen_hoja = self._procesar_hoja(
+                        workbook[sheet_name], opciones, semana, merges.get(sheet_name, []),
+                    )
+                    self.resumen_por_hoja[sheet_name] = resumen_hoja
+                    sheets_procesadas.append(sheet_name)
+                except Exception as e:
+                    logger.exception(f"Error procesando hoja {sheet_name!r}")
+                    self.errores.append({'hoja': sheet_name, 'error': str(e)})
+        finally:
+            workbook.close()
 
         # Refresco contadores en cada ProgramacionMensual tocada
         from .models import Actividad, ProgramacionMensual
@@ -1101,13 +1368,13 @@ class ProgramacionSemanalImporter:
         return bool(re.fullmatch(r'(s(emana)?|[a-z]{1,2})?[\s_]*\d+(\s*\(\d+\))?', nombre))
 
     @staticmethod
-    def _mapa_bloques_por_merge(sheet, col_numero, col_alt=None):
+    def _mapa_bloques_por_merge(merges, col_numero, col_alt=None):
         """Mapa ``{fila_excel_1based: 'inicio'|'continuacion'}`` derivado del
         RANGO de la celda combinada en la columna ``numero`` (o ``col_alt``,
-        p.ej. ``tramo``/columna D, como respaldo) de ``sheet`` (issue #178, A1).
+        p.ej. ``tramo``/columna D, como respaldo) de la hoja (issue #178, A1).
 
-        Requiere que ``sheet`` se haya cargado SIN ``read_only=True`` —
-        openpyxl no expone ``merged_cells`` en modo read_only.
+        ``merges`` son los ``CellRange`` de la hoja tal como los devuelve
+        ``apps.core.excel_streaming.rangos_combinados``.
 
         Devuelve ``{}`` si no se encontró ningún merge de ≥2 filas en esas
         columnas (hoja "plana", sin formato de bloques) — el llamador debe
@@ -1115,13 +1382,10 @@ class ProgramacionSemanalImporter:
         """
         mapa = {}
         columnas = [c for c in (col_numero, col_alt) if c is not None]
-        merges = getattr(sheet, 'merged_cells', None)
-        if merges is None:
-            return mapa
         for col_idx in columnas:
             col_excel = col_idx + 1  # openpyxl es 1-based
             encontrados = False
-            for rango in merges.ranges:
+            for rango in merges:
                 if (
                     rango.min_col == col_excel
                     and rango.max_col == col_excel
@@ -1247,13 +1511,17 @@ class ProgramacionSemanalImporter:
         partes = [p.strip() for p in re.split(r'[\n/;,]+', texto) if p.strip()]
         return partes or []
 
-    def _procesar_hoja(self, sheet, opciones, semana=0):
+    def _procesar_hoja(self, sheet, opciones, semana=0, merges=()):
 
         from .models import Actividad
 
         actualizar_existentes = opciones.get('actualizar_existentes', False)
 
-        rows = list(sheet.iter_rows(values_only=True))
+        # Solo las primeras filas (banner + header) se retienen; los datos se
+        # consumen en streaming desde `filas`.
+        filas = filas_numeradas(sheet)
+        cabecera = list(islice(filas, 6))
+        rows = [row for _, row in cabecera]
         if len(rows) < 3:
             return {'creadas': 0, 'actualizadas': 0, 'omitidas': 0, 'nota': 'hoja vacía'}
 
@@ -1285,7 +1553,7 @@ class ProgramacionSemanalImporter:
         # hoja no trae merges en ninguna columna (caso raro/manual) se cae al
         # heurístico legado con advertencia explícita.
         mapa_bloques = self._mapa_bloques_por_merge(
-            sheet, self.column_indices.get('numero'), self.column_indices.get('tramo')
+            merges, self.column_indices.get('numero'), self.column_indices.get('tramo')
         )
         usa_fallback_legado = not mapa_bloques
         if usa_fallback_legado:
@@ -1309,7 +1577,9 @@ class ProgramacionSemanalImporter:
         ultimo_anio = None
         novedades_hoja = 0
 
-        for row_idx, row in enumerate(rows[header_row_idx + 1:], start=header_row_idx + 2):
+        # En lotes solo para que el progreso de los trabajos en segundo plano avance.
+        datos = chain.from_iterable(en_lotes(filas))
+        for row_idx, row in chain(cabecera[header_row_idx + 1:], datos):
             numero = self._get_cell(row, 'numero')
             cedula = self._get_cell(row, 'cedula')
 
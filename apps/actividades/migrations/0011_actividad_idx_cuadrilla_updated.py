@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('actividades', '0010_ampliar_aviso_sap_legacy'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='actividad',
+            index=models.Index(fields=['cuadrilla', 'updated_at'], name='idx_actividad_cuad_updated'),
+        ),
+    ]
@@ -369,6 +369,8 @@ class Actividad(BaseModel):
             models.Index(fields=['linea', 'fecha_programada']),
             models.Index(fields=['aviso_sap']),
             models.Index(fields=['tramo']),
+            # Change-feed móvil (apps.campo.sync.cambios_desde)
+            models.Index(fields=['cuadrilla', 'updated_at'], name='idx_actividad_cuad_updated'),
         ]
 
     def __str__(self):
@@ -13,6 +13,8 @@ from openpyxl.chart import PieChart, Reference
 from openpyxl.chart.label import DataLabelList
 from openpyxl.utils import get_column_letter
 
+from apps.core.excel_escritura import LibroStreaming, celda, estilo_relleno
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,25 +24,39 @@ class ReporteAvanceServidumbre:
     - Vanos ejecutados (verde oscuro = completo, verde claro = parcial, azul = pendiente)
     - Lista de pendientes con descripción
     - Gráfico de torta de avance
+
+    Se escribe en modo write-only (``apps.core.excel_escritura``) con el
+    avance agregado por torre en un solo query, en vez de consultar
+    actividades y registros por cada vano.
     """
 
-    # Colores
-    COLOR_COMPLETO = PatternFill(start_color='006400', end_color='006400', fill_type='solid')
-    COLOR_PARCIAL = PatternFill(start_color='90EE90', end_color='90EE90', fill_type='solid')
-    COLOR_PENDIENTE = PatternFill(start_color='4169E1', end_color='4169E1', fill_type='solid')
-    COLOR_CON_CONDICION = PatternFill(start_color='FFA500', end_color='FFA500', fill_type='solid')
+    VANOS_POR_FILA = 10
 
-    HEADER_FILL = PatternFill(start_color='1F4E79', end_color='1F4E79', fill_type='solid')
-    HEADER_FONT = Font(bold=True, color='FFFFFF', size=11)
     CELL_BORDER = Border(
         left=Side(style='thin'),
         right=Side(style='thin'),
         top=Side(style='thin'),
         bottom=Side(style='thin')
     )
+    CENTRO = Alignment(horizontal='center')
+
+    # Estilos con nombre (leyenda y celdas de la matriz de vanos)
+    ESTILOS = {
+        'leyenda_completo': estilo_relleno('006400', texto_blanco=True),
+        'leyenda_parcial': estilo_relleno('90EE90'),
+        'leyenda_pendiente': estilo_relleno('4169E1', texto_blanco=True),
+        'leyenda_con_condicion': estilo_relleno('FFA500'),
+        'vano_completo': estilo_relleno('006400', texto_blanco=True, border=CELL_BORDER, alignment=CENTRO),
+        'vano_parcial': estilo_relleno('90EE90', border=CELL_BORDER, alignment=CENTRO),
+        'vano_pendiente': estilo_relleno('4169E1', texto_blanco=True, border=CELL_BORDER, alignment=CENTRO),
+        'vano_con_condicion': estilo_relleno('FFA500', border=CELL_BORDER, alignment=CENTRO),
+        'encabezado_vano': {'font': Font(bold=True), 'alignment': CENTRO},
+        'resuelto': estilo_relleno('90EE90', border=CELL_BORDER),
+        'sin_resolver': estilo_relleno('FFCCCC', border=CELL_BORDER),
+    }
 
     def __init__(self):
-        self.workbook = None
+        self.libro = None
 
     def generar(self, linea_id, tramo_id=None, fecha_corte=None):
         """
@@ -52,11 +68,9 @@ class ReporteAvanceServidumbre:
             fecha_corte: Fecha de corte para el reporte
 
         Returns:
-            BytesIO con el archivo Excel
+            Archivo temporal (rebobinado) con el archivo Excel
         """
         from apps.lineas.models import Linea, Torre, Tramo
-        from apps.actividades.models import Actividad
-        from apps.campo.models import RegistroCampo
 
         if fecha_corte is None:
             fecha_corte = date.today()
@@ -66,7 +80,7 @@ class ReporteAvanceServidumbre:
         except Linea.DoesNotExist:
             raise ValueError(f'Línea no encontrada: {linea_id}')
 
-        self.workbook = Workbook()
+        self.libro = LibroStreaming(self.ESTILOS)
 
         # Obtener torres (filtrar por tramo si se especifica)
         if tramo_id:
@@ -80,136 +94,127 @@ class ReporteAvanceServidumbre:
 
         torres = torres.order_by('numero')
 
-        # Generar hojas
-        self._generar_hoja_vanos(linea, torres, fecha_corte)
+        # Generar hojas (la de vanos acumula los conteos del resumen)
+        conteos = self._generar_hoja_vanos(linea, torres, fecha_corte)
         self._generar_hoja_pendientes(linea, torres)
-        self._generar_hoja_resumen_con_grafico(linea, torres, fecha_corte)
+        self._generar_hoja_resumen_con_grafico(linea, conteos, fecha_corte)
 
-        output = BytesIO()
-        self.workbook.save(output)
-        output.seek(0)
+        return self.libro.guardar()
 
-        return output
+    @staticmethod
+    def _avance_por_torre(linea):
+        """``{torre_id: (suma_avance, cantidad)}`` de las actividades de la
+        línea y el conjunto de torres con registros pendientes (2 queries)."""
+        from django.db.models import Count, Sum
 
-    def _generar_hoja_vanos(self, linea, torres, fecha_corte):
-        """Genera matriz visual de vanos con colores."""
         from apps.actividades.models import Actividad
+        from apps.campo.models import RegistroCampo
 
-        sheet = self.workbook.active
-        sheet.title = 'Estado Vanos'
-
-        # Título
-        sheet.merge_cells('A1:L1')
-        titulo = sheet['A1']
-        titulo.value = f'ESTADO DE VANOS - {linea.codigo}'
-        titulo.font = Font(bold=True, size=14)
-        titulo.alignment = Alignment(horizontal='center')
-
-        sheet['A2'] = f'Fecha de corte: {fecha_corte.strftime("%d/%m/%Y")}'
-        sheet['A3'] = 'Leyenda: '
-        sheet['B3'] = 'Completo (100%)'
-        sheet['B3'].fill = self.COLOR_COMPLETO
-        sheet['B3'].font = Font(color='FFFFFF')
-        sheet['D3'] = 'Parcial (1-99%)'
-        sheet['D3'].fill = self.COLOR_PARCIAL
-        sheet['F3'] = 'Pendiente (0%)'
-        sheet['F3'].fill = self.COLOR_PENDIENTE
-        sheet['F3'].font = Font(color='FFFFFF')
-        sheet['H3'] = 'Con Condición'
-        sheet['H3'].fill = self.COLOR_CON_CONDICION
-
-        # Crear matriz de vanos
-        # Cada fila representa un rango de 10 vanos
-        row_num = 5
-        torres_list = list(torres)
-        vanos_por_fila = 10
-
-        # Encabezado de columnas
-        sheet.cell(row=row_num, column=1, value='Vano').font = Font(bold=True)
-        for i in range(vanos_por_fila):
-            cell = sheet.cell(row=row_num, column=i+2, value=f'+{i}')
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal='center')
-
-        row_num += 1
-
-        # Procesar vanos
-        for i in range(0, len(torres_list) - 1, vanos_por_fila):
-            # Etiqueta de fila (rango de vanos)
-            vano_inicio = i + 1
-            vano_fin = min(i + vanos_por_fila, len(torres_list) - 1)
-            sheet.cell(row=row_num, column=1, value=f'V{vano_inicio}-V{vano_fin}')
-
-            for j in range(vanos_por_fila):
-                vano_idx = i + j
-                if vano_idx >= len(torres_list) - 1:
-                    break
-
-                torre_inicio = torres_list[vano_idx]
-                torre_fin = torres_list[vano_idx + 1]
+        avance = {
+            fila['torre_id']: (fila['suma'] or 0, fila['cantidad'])
+            for fila in Actividad.objects.filter(linea=linea, torre__isnull=False)
+            .values('torre_id')
+            .annotate(suma=Sum('porcentaje_avance'), cantidad=Count('id'))
+        }
+        con_pendiente = set(
+            RegistroCampo.objects.filter(
+                actividad__linea=linea, actividad__torre__isnull=False, tiene_pendiente=True,
+            ).values_list('actividad__torre_id', flat=True).distinct()
+        )
+        return avance, con_pendiente
 
-                # Obtener actividades para este vano
-                actividades = Actividad.objects.filter(
-                    linea=linea,
-                    torre__in=[torre_inicio, torre_fin]
+    def _generar_hoja_vanos(self, linea, torres, fecha_corte):
+        """Genera matriz visual de vanos con colores.
+
+        Recorre las torres en orden con ``.iterator()`` (vano = torre
+        anterior → torre actual) y devuelve los conteos por estado para la
+        hoja de resumen."""
+        hoja = self.libro.hoja(
+            'Estado Vanos', [12] + [8] * self.VANOS_POR_FILA,
+        )
+
+        # Título (write-only: sin celdas combinadas)
+        hoja.fila([celda(f'ESTADO DE VANOS - {linea.codigo}', 'titulo')])
+        hoja.fila([f'Fecha de corte: {fecha_corte.strftime("%d/%m/%Y")}'])
+        hoja.fila([
+            'Leyenda: ',
+            celda('Completo (100%)', 'leyenda_completo'), None,
+            celda('Parcial (1-99%)', 'leyenda_parcial'), None,
+            celda('Pendiente (0%)', 'leyenda_pendiente'), None,
+            celda('Con Condición', 'leyenda_con_condicion'),
+        ])
+        hoja.vacias()
+
+        # Encabezado de columnas (cada fila representa un rango de 10 vanos)
+        hoja.fila(
+            ['Vano'] + [f'+{i}' for i in range(self.VANOS_POR_FILA)],
+            estilo='encabezado_vano',
+        )
+
+        avance, con_pendiente = self._avance_por_torre(linea)
+        conteos = {'total': 0, 'completos': 0, 'parciales': 0, 'pendientes': 0}
+        celdas = []
+
+        def _volcar_fila():
+            vano_fin = conteos['total']
+            vano_inicio = vano_fin - len(celdas) + 1
+            hoja.fila([f'V{vano_inicio}-V{vano_fin}'] + celdas)
+            celdas.clear()
+
+        anterior = None
+        for torre_id in torres.values_list('id', flat=True).iterator(chunk_size=2000):
+            if anterior is not None:
+                conteos['total'] += 1
+
+                # Estado del vano: actividades de sus dos torres
+                suma_i, n_i = avance.get(anterior, (0, 0))
+                suma_f, n_f = avance.get(torre_id, (0, 0))
+                cantidad = n_i + n_f
+                avance_promedio = (suma_i + suma_f) / cantidad if cantidad else 0
+                tiene_condicion = bool(cantidad) and (
+                    anterior in con_pendiente or torre_id in con_pendiente
                 )
 
-                # Calcular estado del vano
-                if actividades.exists():
-                    avance_total = sum(a.porcentaje_avance for a in actividades)
-                    avance_promedio = avance_total / actividades.count()
-
-                    # Verificar si hay condiciones/pendientes
-                    tiene_condicion = any(
-                        r.tiene_pendiente
-                        for a in actividades
-                        for r in a.registros_campo.all()
-                    )
-                else:
-                    avance_promedio = 0
-                    tiene_condicion = False
-
-                # Determinar color
-                cell = sheet.cell(row=row_num, column=j+2)
-                cell.value = f'{avance_promedio:.0f}%'
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = self.CELL_BORDER
-
                 if tiene_condicion:
-                    cell.fill = self.COLOR_CON_CONDICION
+                    estilo = 'vano_con_condicion'
                 elif avance_promedio >= 100:
-                    cell.fill = self.COLOR_COMPLETO
-                    cell.font = Font(color='FFFFFF')
+                    estilo = 'vano_completo'
                 elif avance_promedio > 0:
-                    cell.fill = self.COLOR_PARCIAL
+                    estilo = 'vano_parcial'
+                else:
+                    estilo = 'vano_pendiente'
+                celdas.append(celda(f'{avance_promedio:.0f}%', estilo))
+
+                # Resumen: el vano cuenta con el avance de su torre inicial
+                avance_torre = suma_i / n_i if n_i else 0
+                if avance_torre >= 100:
+                    conteos['completos'] += 1
+                elif avance_torre > 0:
+                    conteos['parciales'] += 1
                 else:
-                    cell.fill = self.COLOR_PENDIENTE
-                    cell.font = Font(color='FFFFFF')
+                    conteos['pendientes'] += 1
 
-            row_num += 1
+                if len(celdas) == self.VANOS_POR_FILA:
+                    _volcar_fila()
+            anterior = torre_id
 
-        # Ajustar anchos
-        sheet.column_dimensions['A'].width = 12
-        for i in range(vanos_por_fila):
-            sheet.column_dimensions[get_column_letter(i+2)].width = 8
+        if celdas:
+            _volcar_fila()
+
+        return conteos
 
     def _generar_hoja_pendientes(self, linea, torres):
         """Genera lista detallada de pendientes/condiciones."""
         from apps.campo.models import RegistroCampo
 
-        sheet = self.workbook.create_sheet(title='Pendientes')
-
-        # Título
-        sheet['A1'] = 'LISTA DE PENDIENTES Y CONDICIONES ESPECIALES'
-        sheet['A1'].font = Font(bold=True, size=12)
+        hoja = self.libro.hoja('Pendientes', [5, 10, 20, 50, 25, 15, 12])
 
-        # Encabezados
-        headers = ['#', 'Torre', 'Tipo Pendiente', 'Descripción', 'Actividad', 'Fecha Reporte', 'Estado']
-        for col_idx, header in enumerate(headers, start=1):
-            cell = sheet.cell(row=3, column=col_idx, value=header)
-            cell.fill = self.HEADER_FILL
-            cell.font = self.HEADER_FONT
-            cell.border = self.CELL_BORDER
+        hoja.fila([celda('LISTA DE PENDIENTES Y CONDICIONES ESPECIALES', 'subtitulo')])
+        hoja.vacias()
+        hoja.fila(
+            ['#', 'Torre', 'Tipo Pendiente', 'Descripción', 'Actividad', 'Fecha Reporte', 'Estado'],
+            estilo='encabezado',
+        )
 
         # Obtener pendientes
         registros = RegistroCampo.objects.filter(
@@ -219,8 +224,7 @@ class ReporteAvanceServidumbre:
             'actividad__torre', 'actividad__tipo_actividad'
         ).order_by('actividad__torre__numero')
 
-        row_num = 4
-        for idx, reg in enumerate(registros, start=1):
+        for idx, reg in enumerate(registros.iterator(chunk_size=500), start=1):
             torre = reg.actividad.torre.numero_display if reg.actividad.torre else '-'
             tipo = reg.get_tipo_pendiente_display() if reg.tipo_pendiente else '-'
             descripcion = reg.descripcion_pendiente or '-'
@@ -229,85 +233,39 @@ class ReporteAvanceServidumbre:
 
             # Estado basado en si se resolvió
             if reg.actividad.porcentaje_avance >= 100:
-                estado = 'Resuelto'
-                estado_fill = PatternFill(start_color='90EE90', end_color='90EE90', fill_type='solid')
+                estado = celda('Resuelto', 'resuelto')
             else:
-                estado = 'Pendiente'
-                estado_fill = PatternFill(start_color='FFCCCC', end_color='FFCCCC', fill_type='solid')
-
-            row_data = [idx, torre, tipo, descripcion, actividad, fecha, estado]
-            for col_idx, value in enumerate(row_data, start=1):
-                cell = sheet.cell(row=row_num, column=col_idx, value=value)
-                cell.border = self.CELL_BORDER
-                if col_idx == 7:  # Estado
-                    cell.fill = estado_fill
+                estado = celda('Pendiente', 'sin_resolver')
 
-            row_num += 1
-
-        # Ajustar anchos
-        widths = [5, 10, 20, 50, 25, 15, 12]
-        for col_idx, width in enumerate(widths, start=1):
-            sheet.column_dimensions[get_column_letter(col_idx)].width = width
+            hoja.fila([idx, torre, tipo, descripcion, actividad, fecha, estado], estilo='celda_borde')
 
-    def _generar_hoja_resumen_con_grafico(self, linea, torres, fecha_corte):
+    def _generar_hoja_resumen_con_grafico(self, linea, conteos, fecha_corte):
         """Genera resumen con gráfico de torta."""
-        from apps.actividades.models import Actividad
+        hoja = self.libro.hoja('Resumen', [25, 15, 12])
 
-        sheet = self.workbook.create_sheet(title='Resumen')
+        hoja.fila([celda('RESUMEN DE AVANCE', 'titulo')])
+        hoja.vacias(2)
 
-        # Título
-        sheet['A1'] = 'RESUMEN DE AVANCE'
-        sheet['A1'].font = Font(bold=True, size=14)
-
-        # Calcular estadísticas
-        total_vanos = max(0, torres.count() - 1)
-
-        actividades = Actividad.objects.filter(linea=linea)
-        total_actividades = actividades.count()
-
-        # Contar por estado
-        completos = 0
-        parciales = 0
-        pendientes = 0
-
-        torres_list = list(torres)
-        for i in range(len(torres_list) - 1):
-            torre = torres_list[i]
-            acts = actividades.filter(torre=torre)
-            if acts.exists():
-                avance = sum(a.porcentaje_avance for a in acts) / acts.count()
-                if avance >= 100:
-                    completos += 1
-                elif avance > 0:
-                    parciales += 1
-                else:
-                    pendientes += 1
-            else:
-                pendientes += 1
-
-        # Datos para el gráfico
-        sheet['A4'] = 'Estado'
-        sheet['B4'] = 'Cantidad'
-        sheet['C4'] = 'Porcentaje'
+        total_vanos = conteos['total']
+        completos = conteos['completos']
+        parciales = conteos['parciales']
+        pendientes = conteos['pendientes']
 
+        # Datos para el gráfico (A4:C7)
+        hoja.fila(['Estado', 'Cantidad', 'Porcentaje'])
         datos = [
             ('Completos (100%)', completos),
             ('Parciales (1-99%)', parciales),
             ('Pendientes (0%)', pendientes),
         ]
-
-        for idx, (estado, cantidad) in enumerate(datos, start=5):
-            sheet[f'A{idx}'] = estado
-            sheet[f'B{idx}'] = cantidad
-            if total_vanos > 0:
-                sheet[f'C{idx}'] = f'{cantidad/total_vanos*100:.1f}%'
-            else:
-                sheet[f'C{idx}'] = '0%'
+        for estado, cantidad in datos:
+            porcentaje = f'{cantidad/total_vanos*100:.1f}%' if total_vanos > 0 else '0%'
+            hoja.fila([estado, cantidad, porcentaje])
 
         # Crear gráfico de torta
         chart = PieChart()
-        labels = Reference(sheet, min_col=1, min_row=5, max_row=7)
-        data = Reference(sheet, min_col=2, min_row=4, max_row=7)
+        labels = Reference(hoja.worksheet, min_col=1, min_row=5, max_row=7)
+        data = Reference(hoja.worksheet, min_col=2, min_row=4, max_row=7)
         chart.add_data(data, titles_from_data=True)
         chart.set_categories(labels)
         chart.title = "Distribución de Avance"
@@ -317,11 +275,11 @@ class ReporteAvanceServidumbre:
         chart.dataLabels.showPercent = True
         chart.dataLabels.showVal = False
 
-        sheet.add_chart(chart, "E4")
+        hoja.worksheet.add_chart(chart, "E4")
 
-        # Resumen textual
-        sheet['A12'] = 'ESTADÍSTICAS GENERALES'
-        sheet['A12'].font = Font(bold=True)
+        # Resumen textual (desde A12)
+        hoja.vacias(4)
+        hoja.fila([celda('ESTADÍSTICAS GENERALES', 'negrita')])
 
         resumen = [
             ('Línea:', f'{linea.codigo} - {linea.nombre}'),
@@ -331,20 +289,14 @@ class ReporteAvanceServidumbre:
             ('Vanos parciales:', f'{parciales} ({parciales/total_vanos*100:.1f}%)' if total_vanos else '0'),
             ('Vanos pendientes:', f'{pendientes} ({pendientes/total_vanos*100:.1f}%)' if total_vanos else '0'),
             ('', ''),
-            ('AVANCE GENERAL:', f'{(completos + parciales*0.5)/total_vanos*100:.1f}%' if total_vanos else '0%'),
         ]
+        for label, value in resumen:
+            hoja.fila([label, value])
 
-        for idx, (label, value) in enumerate(resumen, start=13):
-            sheet[f'A{idx}'] = label
-            sheet[f'A{idx}'].font = Font(bold=True) if label.startswith('AVANCE') else None
-            sheet[f'B{idx}'] = value
-            if label.startswith('AVANCE'):
-                sheet[f'B{idx}'].font = Font(bold=True, size=16)
-
-        # Ajustar anchos
-        sheet.column_dimensions['A'].width = 25
-        sheet.column_dimensions['B'].width = 15
-        sheet.column_dimensions['C'].width = 12
+        hoja.fila([
+            celda('AVANCE GENERAL:', 'negrita'),
+            celda(f'{(completos + parciales*0.5)/total_vanos*100:.1f}%' if total_vanos else '0%', 'destacado'),
+        ])
 
 
 class ReporteComparativoCuadrillas:
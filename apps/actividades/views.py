@@ -11,13 +11,13 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.utils import timezone
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse
 from django.contrib import messages
 from apps.core.mixins import HTMXMixin, RoleRequiredMixin
 from apps.core.cache import get_lineas_activas, get_cuadrillas_activas, get_tipos_actividad_activos
 from apps.core.utils import get_unidad_negocio, UNIDAD_NEGOCIO_TODOS
 from .models import Actividad, ProgramacionMensual, TipoActividad, HistorialIntervencion
 from .forms import TipoActividadForm
+from .importaciones import NOMBRES_MES, es_formato_semanal, resumen_advertencias
 
 
 class ActividadListView(LoginRequiredMixin, HTMXMixin, ListView):
@@ -351,68 +351,11 @@ class ImportarProgramacionView(LoginRequiredMixin, RoleRequiredMixin, TemplateVi
     template_name = 'actividades/importar.html'
     allowed_roles = ['admin', 'director', 'coordinador']
 
-    NOMBRES_MES = {
-        1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
-        5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
-        9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre',
-    }
-
-    @staticmethod
-    def _resumen_advertencias(advertencias, limite=15):
-        """Issue #200: construye el detalle real (hoja/fila/mensaje) de las
-        advertencias del importador en vez de descartarlas y mostrar solo un
-        conteo — antes era imposible saber qué falló en una fila concreta."""
-        lineas = []
-        for adv in advertencias[:limite]:
-            hoja = adv.get('hoja')
-            fila = adv.get('fila')
-            mensaje = adv.get('mensaje', '')
-            if hoja and fila is not None:
-                lineas.append(f"Hoja {hoja}, fila {fila}: {mensaje}")
-            elif hoja:
-                lineas.append(f"Hoja {hoja}: {mensaje}")
-            elif fila is not None:
-                lineas.append(f"Fila {fila}: {mensaje}")
-            else:
-                lineas.append(mensaje)
-        restantes = len(advertencias) - len(lineas)
-        detalle = ' | '.join(lineas)
-        if restantes > 0:
-            detalle += f' | ... y {restantes} advertencia(s) más (ver logs del servidor).'
-        return detalle
-
-    @staticmethod
-    def _es_formato_semanal(archivo):
-        """True si el Excel tiene ≥1 hoja con nombre numérico y headers
-        que incluyen AVISOS+ACTIVIDAD (formato real Instelec)."""
-        from openpyxl import load_workbook
-        try:
-            archivo.seek(0)
-        except Exception:
-            pass
-        try:
-            wb = load_workbook(archivo, read_only=True, data_only=True)
-        except Exception:
-            return False
-        finally:
-            try:
-                archivo.seek(0)
-            except Exception:
-                pass
-        for sheet_name in wb.sheetnames:
-            token = sheet_name.strip().lower().lstrip('s').replace('semana', '').strip()
-            if not token.isdigit():
-                continue
-            ws = wb[sheet_name]
-            rows = ws.iter_rows(min_row=2, max_row=2, values_only=True)
-            try:
-                header = next(rows)
-            except StopIteration:
-                continue
-            header_lower = {str(c).lower().strip() for c in header if c is not None}
-            if 'avisos' in header_lower and 'actividad' in header_lower:
-                return True
-        return False
+    # La lógica de importación vive en `importaciones.py` (corre en la
+    # request o en un TrabajoImportacion de Celery); se conservan los alias.
+    NOMBRES_MES = NOMBRES_MES
+    _resumen_advertencias = staticmethod(resumen_advertencias)
+    _es_formato_semanal = staticmethod(es_formato_semanal)
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -427,13 +370,13 @@ class ImportarProgramacionView(LoginRequiredMixin, RoleRequiredMixin, TemplateVi
         return context
 
     def post(self, request, *args, **kwargs):
-        """Handle Excel file upload and import."""
-        from .importers import (
-            ProgramaTranselcaImporter,
-            AvisosTranselcaImporter,
-            ProgramacionSemanalImporter,
-        )
-        from apps.lineas.models import Linea
+        """Handle Excel file upload and import.
+
+        Archivos grandes se encolan como TrabajoImportacion y el usuario
+        sigue el avance en la página del trabajo.
+        """
+        from apps.core.importaciones import aplicar_salida, debe_encolar, ejecutar, encolar
+        from apps.core.models import TrabajoImportacion
 
         archivo = request.FILES.get('archivo')
         if not archivo:
@@ -446,193 +389,21 @@ class ImportarProgramacionView(LoginRequiredMixin, RoleRequiredMixin, TemplateVi
             return redirect('actividades:importar')
 
         # Obtener parámetros
-        linea_id = request.POST.get('linea')
         anio_str = request.POST.get('anio', '').strip()
         mes_str = request.POST.get('mes', '').strip()
-        actualizar_existentes = request.POST.get('actualizar_existentes') == 'on'
-
-        # Convertir a int, permitir None para detección automática
-        anio = int(anio_str) if anio_str else None
-        mes = int(mes_str) if mes_str else None
-
-        # Autodetectar formato: si el Excel tiene hojas con nombre numérico
-        # ('02', '18') y columnas AVISOS+ACTIVIDAD → formato semanal Instelec.
-        if not linea_id and self._es_formato_semanal(archivo):
-            importer = ProgramacionSemanalImporter()
-            resultado = importer.importar(
-                archivo,
-                opciones={'actualizar_existentes': actualizar_existentes},
-            )
-            if resultado['exito']:
-                hojas = ', '.join(resultado.get('sheets_procesadas', []))
-                mensaje = (
-                    f"Programación semanal importada: "
-                    f"{resultado['actividades_creadas']} creadas, "
-                    f"{resultado['actividades_actualizadas']} actualizadas "
-                    f"en hojas [{hojas}]."
-                )
-                # Issue #200 (root cause 1): las actividades quedan
-                # programadas con la fecha real del Excel (columna INICIO),
-                # casi nunca el mes actual. Decirlo explícito en el mensaje
-                # — antes el usuario buscaba en "Programación Mensual" con
-                # el filtro por defecto (mes de hoy) y no encontraba nada.
-                meses_tocados = sorted(resultado.get('meses_tocados') or [])
-                if meses_tocados:
-                    etiquetas = [
-                        f"{self.NOMBRES_MES.get(mes_t, mes_t)} {anio_t}"
-                        for (anio_t, mes_t) in meses_tocados
-                    ]
-                    mensaje += f" Quedaron programadas para: {', '.join(etiquetas)}."
-
-                if resultado.get('advertencias'):
-                    mensaje += f" {len(resultado['advertencias'])} advertencias (detalle abajo)."
-                messages.success(request, mensaje)
-
-                # Issue #200 (root cause 2): antes solo se mostraba el
-                # CONTEO de advertencias/errores — el detalle por fila se
-                # descartaba por completo y nunca quedaba visible en ningún
-                # lado (ni UI ni logs). Ahora se muestra el detalle real.
-                if resultado.get('advertencias'):
-                    messages.warning(
-                        request, self._resumen_advertencias(resultado['advertencias'])
-                    )
-                if resultado.get('errores'):
-                    for error_hoja in resultado['errores']:
-                        messages.error(
-                            request,
-                            f"Error procesando hoja '{error_hoja.get('hoja', '?')}': "
-                            f"{error_hoja.get('error', 'desconocido')}",
-                        )
-            else:
-                messages.error(request, f"Error: {resultado.get('error', 'desconocido')}")
-                return redirect('actividades:programacion')
-
-            # Issue #200 (root cause 1): si todas las actividades importadas
-            # cayeron en un único mes/año, llevar al usuario directo a esa
-            # vista de Programación Mensual — el filtro por defecto (mes de
-            # hoy) es lo que hacía "desaparecer" las actividades recién
-            # creadas cuando el Excel programaba a futuro.
-            if resultado['exito'] and len(meses_tocados) == 1:
-                anio_dest, mes_dest = meses_tocados[0]
-                url = f"{reverse('actividades:programacion')}?mes={mes_dest}&anio={anio_dest}"
-                return redirect(url)
-            return redirect('actividades:programacion')
-
-        # Si no hay línea, intentar importar como avisos (detecta línea del Excel)
-        if not linea_id:
-            importer = AvisosTranselcaImporter()
-            resultado = importer.importar(
-                archivo,
-                anio=anio,
-                mes=mes,
-                opciones={'actualizar_existentes': actualizar_existentes}
-            )
-
-            if resultado['exito']:
-                mensaje = (
-                    f"Importación exitosa: {resultado['actividades_creadas']} actividades creadas, "
-                    f"{resultado['actividades_actualizadas']} actualizadas."
-                )
-                meses_tocados = sorted(resultado.get('meses_tocados') or [])
-                if meses_tocados:
-                    etiquetas = [
-                        f"{self.NOMBRES_MES.get(mes_t, mes_t)} {anio_t}"
-                        for anio_t, mes_t in meses_tocados
-                    ]
-                    mensaje += f" Quedaron programadas para: {', '.join(etiquetas)}."
-                if resultado.get('advertencias'):
-                    mensaje += f" {len(resultado['advertencias'])} advertencias (detalle abajo)."
-                messages.success(request, mensaje)
-                if resultado.get('advertencias'):
-                    messages.warning(
-                        request, self._resumen_advertencias(resultado['advertencias'])
-                    )
-                if resultado.get('errores'):
-                    for error_fila in resultado['errores']:
-                        messages.error(
-                            request,
-                            f"Error procesando fila {error_fila.get('fila', '?')}: "
-                            f"{error_fila.get('error', 'desconocido')}",
-                        )
-            else:
-                messages.error(request, f"Error en importación: {resultado.get('error', 'Error desconocido')}")
-
-            if resultado['exito'] and len(meses_tocados) == 1:
-                anio_dest, mes_dest = meses_tocados[0]
-                url = f"{reverse('actividades:programacion')}?mes={mes_dest}&anio={anio_dest}"
-                return redirect(url)
-            return redirect('actividades:programacion')
-
-        try:
-            linea = Linea.objects.get(id=linea_id)
-        except Linea.DoesNotExist as e:
-            messages.error(request, f'Línea no encontrada: {e}')
-            return redirect('actividades:importar')
-
-        # Si año o mes no se especifican, detectarlos del Excel
-        if not anio or not mes:
-            importer_detect = ProgramaTranselcaImporter()
-            from openpyxl import load_workbook
-            try:
-                wb = load_workbook(archivo, read_only=True, data_only=True)
-                rows = list(wb.active.iter_rows(values_only=True))
-                importer_detect._detectar_columnas(rows[0])
-                anio_excel, mes_excel = importer_detect._detectar_fecha_excel(rows[1:])
-                anio = anio or anio_excel
-                mes = mes or mes_excel
-            except Exception:
-                pass
-
-        # Usar valores por defecto si no se encuentran
-        if not anio or not mes:
-            from datetime import date
-            hoy = date.today()
-            anio = anio or hoy.year
-            mes = mes or hoy.month
-
-        # Crear o obtener programación mensual
-        programacion, created = ProgramacionMensual.objects.get_or_create(
-            anio=anio,
-            mes=mes,
-            linea=linea,
-            defaults={
-                'archivo_origen': archivo,
-            }
-        )
-
-        if not created:
-            programacion.archivo_origen = archivo
-            programacion.save(update_fields=['archivo_origen', 'updated_at'])
-
-        # Importar
-        importer = ProgramaTranselcaImporter()
-        resultado = importer.importar(
-            archivo,
-            programacion,
-            opciones={'actualizar_existentes': actualizar_existentes}
-        )
-
-        if resultado['exito']:
-            mensaje = (
-                f"Importación exitosa: {resultado['actividades_creadas']} actividades creadas, "
-                f"{resultado['actividades_actualizadas']} actualizadas, "
-                f"{resultado['filas_omitidas']} filas omitidas."
-            )
-            if resultado['advertencias']:
-                mensaje += f" {len(resultado['advertencias'])} advertencias."
-            messages.success(request, mensaje)
-
-            # Guardar datos importados en la programación
-            programacion.datos_importados = {
-                'resultado': resultado,
-                'fecha_importacion': timezone.now().isoformat(),
-                'usuario': request.user.get_full_name(),
-            }
-            programacion.save(update_fields=['datos_importados', 'updated_at'])
-        else:
-            messages.error(request, f"Error en importación: {resultado.get('error', 'Error desconocido')}")
+        parametros = {
+            'linea_id': request.POST.get('linea') or None,
+            # Convertir a int, permitir None para detección automática
+            'anio': int(anio_str) if anio_str else None,
+            'mes': int(mes_str) if mes_str else None,
+            'actualizar_existentes': request.POST.get('actualizar_existentes') == 'on',
+        }
 
-        return redirect('actividades:programacion')
+        tipo = TrabajoImportacion.Tipo.PROGRAMACION
+        if debe_encolar(archivo):
+            trabajo = encolar(tipo, parametros, usuario=request.user, archivo=archivo)
+            return redirect(trabajo.get_absolute_url())
+        return aplicar_salida(request, ejecutar(tipo, archivo, parametros, usuario=request.user))
 
 
 class ImportarAvancesView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
@@ -651,29 +422,19 @@ class ImportarAvancesView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
         return context
 
     def post(self, request, *args, **kwargs):
-        from .importers import AvancesImporter
+        from apps.core.importaciones import aplicar_salida, debe_encolar, ejecutar, encolar
+        from apps.core.models import TrabajoImportacion
 
         archivo = request.FILES.get('archivo')
         if not archivo or not archivo.name.endswith(('.xlsx', '.xls')):
             messages.error(request, 'Por favor suba un archivo Excel (.xlsx o .xls)')
             return redirect('actividades:importar_avances')
 
-        importer = AvancesImporter()
-        resultado = importer.importar(archivo)
-
-        if resultado['exito']:
-            parts = [f"✓ {resultado['actividades_actualizadas']} actividades actualizadas"]
-            if resultado['filas_omitidas']:
-                parts.append(f"{resultado['filas_omitidas']} filas omitidas")
-            if resultado['advertencias']:
-                parts.append(f"{len(resultado['advertencias'])} advertencias")
-            if resultado['errores']:
-                parts.append(f"{len(resultado['errores'])} errores")
-            messages.success(request, ' | '.join(parts))
-        else:
-            messages.error(request, f"Error: {resultado.get('error', 'Error desconocido')}")
-
-        return redirect('actividades:programacion')
+        tipo = TrabajoImportacion.Tipo.AVANCES
+        if debe_encolar(archivo):
+            trabajo = encolar(tipo, {}, usuario=request.user, archivo=archivo)
+            return redirect(trabajo.get_absolute_url())
+        return aplicar_salida(request, ejecutar(tipo, archivo, {}, usuario=request.user))
 
 
 class TorresParaLineaView(LoginRequiredMixin, View):
@@ -1013,7 +774,12 @@ class BulkCambiarEstadoView(LoginRequiredMixin, RoleRequiredMixin, View):
         if not nuevo_estado or nuevo_estado not in dict(Actividad.Estado.choices):
             return JsonResponse({'success': False, 'error': 'Estado invalido'}, status=400)
 
-        updated = Actividad.objects.filter(id__in=actividad_ids).update(estado=nuevo_estado)
+        updated = Actividad.objects.filter(id__in=actividad_ids).update(
+            estado=nuevo_estado, updated_at=timezone.now(),
+        )
+        # QuerySet.update no dispara las señales del dashboard de indicadores.
+        from apps.indicadores.snapshots import invalidar_dashboard
+        invalidar_dashboard()
 
         if request.headers.get('HX-Request'):
             response = HttpResponse()
@@ -1035,6 +801,8 @@ class ExportarProgramacionView(LoginRequiredMixin, RoleRequiredMixin, View):
 
     def get(self, request, *args, **kwargs):
         """Generate and download weekly programming Excel."""
+        from apps.core.excel_escritura import respuesta_xlsx
+
         from .exporters import ProgramacionSemanalExporter
 
         # Obtener parámetros de fecha
@@ -1070,15 +838,9 @@ class ExportarProgramacionView(LoginRequiredMixin, RoleRequiredMixin, View):
             cuadrilla_id=cuadrilla_id
         )
 
-        # Preparar respuesta
+        # Preparar respuesta (streaming del archivo temporal)
         filename = f"programacion_semanal_{fecha_inicio.strftime('%Y%m%d')}_{fecha_fin.strftime('%Y%m%d')}.xlsx"
-        response = HttpResponse(
-            excel_content.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        return response
+        return respuesta_xlsx(excel_content, filename)
 
 
 class ExportarAvanceView(LoginRequiredMixin, RoleRequiredMixin, View):
@@ -1087,6 +849,8 @@ class ExportarAvanceView(LoginRequiredMixin, RoleRequiredMixin, View):
 
     def get(self, request, *args, **kwargs):
         """Generate and download advance report Excel."""
+        from apps.core.excel_escritura import respuesta_xlsx
+
         from .exporters import ReporteAvanceExporter
 
         linea_id = request.GET.get('linea')
@@ -1108,15 +872,9 @@ class ExportarAvanceView(LoginRequiredMixin, RoleRequiredMixin, View):
         except ValueError as e:
             return JsonResponse({'error': str(e)}, status=404)
 
-        # Preparar respuesta
+        # Preparar respuesta (streaming del archivo temporal)
         filename = f"reporte_avance_{date.today().strftime('%Y%m%d')}.xlsx"
-        response = HttpResponse(
-            excel_content.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        return response
+        return respuesta_xlsx(excel_content, filename)
 
 
 class EventosAPIView(LoginRequiredMixin, View):
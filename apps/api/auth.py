@@ -7,11 +7,11 @@ from typing import Any, Optional
 from ninja.security import HttpBearer
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
-from django.contrib.auth import get_user_model
 from django.http import HttpRequest
 
+from apps.core.cache import get_usuario_jwt
+
 logger = logging.getLogger(__name__)
-User = get_user_model()
 
 
 class JWTAuth(HttpBearer):
@@ -41,20 +41,13 @@ class JWTAuth(HttpBearer):
             if not user_id:
                 return None
 
-            # Get user from database
-            user = User.objects.get(id=user_id)
-
-            if not user.is_active:
-                return None
-
-            return user
+            # Active user, cached per token (invalidated on save/delete)
+            return get_usuario_jwt(user_id, access_token.get('jti', ''))
 
         except TokenError:
             return None
         except InvalidToken:
             return None
-        except User.DoesNotExist:
-            return None
         except (ValueError, KeyError, AttributeError) as e:
             logger.warning(f"JWT authentication error: {e}")
             return None
@@ -2,7 +2,8 @@
 Rate limiting decorators for Django Ninja API.
 
 This module provides rate limiting functionality compatible with Django Ninja,
-using Redis as the backend for distributed rate limiting.
+using Redis as the backend for distributed rate limiting (one atomic
+sliding-window check per request, in-process fallback without Redis).
 
 Usage:
     from apps.api.ratelimit import ratelimit_login, ratelimit_api, ratelimit_upload
@@ -25,6 +26,7 @@ Usage:
 import functools
 import hashlib
 import logging
+import threading
 import time
 from typing import Any, Callable
 
@@ -52,6 +54,7 @@ RATELIMIT_CONFIG: dict[str, dict[str, str]] = getattr(settings, 'RATELIMIT_CONFI
 })
 
 
+@functools.lru_cache(maxsize=32)
 def parse_rate(rate_string: str) -> tuple[int, int]:
     """
     Parse rate limit string into (count, period_seconds).
@@ -139,10 +142,122 @@ def get_rate_limit_key(request: HttpRequest, key_type: str, group: str) -> str:
     return hashlib.md5(key_data.encode(), usedforsecurity=False).hexdigest()
 
 
+# Sliding-window counter: the estimate is the current fixed window count plus
+# the previous window's count weighted by how much of it still overlaps the
+# sliding window. The whole check-and-increment runs as one Lua script, so it
+# is a single round-trip (EVALSHA) and atomic across workers: concurrent
+# requests can never both see "limit - 1" and both pass.
+_SLIDING_WINDOW_LUA = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local weight = tonumber(ARGV[2])
+if previous * weight + current >= limit then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+end
+return {1, current, previous}
+"""
+
+_sliding_window_script: Any = None
+
+# Logged once per outage, not once per request.
+_redis_down = False
+
+
+def _get_redis_client() -> Any:
+    """
+    Raw redis-py client behind the default cache, or None when the cache
+    is not Redis (LocMem in local/CI settings, dummy cache).
+    """
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        pass
+
+    # django.core.cache.backends.redis.RedisCache
+    client = getattr(cache, '_cache', None)
+    if hasattr(client, 'get_client'):
+        return client.get_client(write=True)
+    return None
+
+
+def _redis_sliding_window(
+    client: Any, key: str, window: int, max_requests: int, period: int, weight: float,
+) -> tuple[bool, int, int]:
+    global _sliding_window_script
+    if _sliding_window_script is None:
+        _sliding_window_script = client.register_script(_SLIDING_WINDOW_LUA)
+
+    # Hash tag keeps both windows on the same Redis Cluster slot.
+    keys = [f"ratelimit:{{{key}}}:{window}", f"ratelimit:{{{key}}}:{window - 1}"]
+    allowed, current, previous = _sliding_window_script(
+        keys=keys,
+        args=[max_requests, weight, 2 * period + 1],
+        client=client,
+    )
+    return bool(allowed), int(current), int(previous)
+
+
+class LocalSlidingWindow:
+    """
+    In-process sliding-window counter.
+
+    Used when the cache is not Redis and as a fallback while Redis is
+    unreachable: limits then hold per worker instead of globally, which
+    is still better than letting every request through.
+    """
+
+    max_keys = 10_000
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, tuple[int, int, int]] = {}
+
+    def hit(
+        self, key: str, window: int, max_requests: int, weight: float,
+    ) -> tuple[bool, int, int]:
+        with self._lock:
+            counted_window, current, previous = self._counters.get(key, (window, 0, 0))
+            if counted_window != window:
+                previous = current if counted_window == window - 1 else 0
+                current = 0
+
+            if previous * weight + current >= max_requests:
+                self._counters[key] = (window, current, previous)
+                return False, current, previous
+
+            current += 1
+            self._counters[key] = (window, current, previous)
+            if len(self._counters) > self.max_keys:
+                self._prune(window)
+            return True, current, previous
+
+    def _prune(self, window: int) -> None:
+        self._counters = {
+            key: value for key, value in self._counters.items() if value[0] >= window - 1
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+_local_limiter = LocalSlidingWindow()
+
+
 def check_rate_limit(request: HttpRequest, group: str) -> tuple[bool, dict[str, Any]]:
     """
     Check if the request exceeds the rate limit.
 
+    Sliding-window counter, checked and incremented atomically in a single
+    Redis round-trip; in-process counter when Redis is not configured or
+    not reachable.
+
     Args:
         request: The HTTP request
         group: The rate limit group name
@@ -151,48 +266,49 @@ def check_rate_limit(request: HttpRequest, group: str) -> tuple[bool, dict[str,
         Tuple of (is_allowed, info_dict)
         info_dict contains: limit, remaining, reset_time
     """
+    global _redis_down
+
     config = RATELIMIT_CONFIG.get(group, RATELIMIT_CONFIG['api'])
     max_requests, period = parse_rate(config['rate'])
     key_type = config.get('key', 'user')
 
     cache_key = get_rate_limit_key(request, key_type, group)
 
-    # Get current window data
     now = time.time()
-    window_start = int(now // period) * period
-    window_key = f"{cache_key}:{int(window_start)}"
+    window = int(now // period)
+    # Share of the previous window still inside the sliding window.
+    weight = 1.0 - (now - window * period) / period
 
     try:
-        # Get current count
-        current_count = cache.get(window_key, 0)
-
-        # Calculate remaining time in window
-        reset_time = int(window_start + period)
-        remaining = max(0, max_requests - current_count - 1)
-
-        info: dict[str, Any] = {
-            'limit': max_requests,
-            'remaining': remaining,
-            'reset': reset_time,
-            'period': period,
-        }
-
-        if current_count >= max_requests:
-            logger.warning(
-                f"Rate limit exceeded for {group}: key={cache_key}, "
-                f"count={current_count}, limit={max_requests}"
-            )
-            return False, info
-
-        # Increment counter with TTL
-        cache.set(window_key, current_count + 1, timeout=period + 1)
+        client = _get_redis_client()
+        if client is None:
+            result = _local_limiter.hit(cache_key, window, max_requests, weight)
+        else:
+            result = _redis_sliding_window(client, cache_key, window, max_requests, period, weight)
+            _redis_down = False
+    except Exception as e:
+        if not _redis_down:
+            logger.error(f"Rate limit backend unavailable, using in-process limiter: {e}")
+            _redis_down = True
+        result = _local_limiter.hit(cache_key, window, max_requests, weight)
+
+    is_allowed, current, previous = result
+    estimate = previous * weight + current
+
+    info: dict[str, Any] = {
+        'limit': max_requests,
+        'remaining': max(0, int(max_requests - estimate)),
+        'reset': int((window + 1) * period),
+        'period': period,
+    }
 
-        return True, info
+    if not is_allowed:
+        logger.warning(
+            f"Rate limit exceeded for {group}: key={cache_key}, "
+            f"count={estimate:.1f}, limit={max_requests}"
+        )
 
-    except Exception as e:
-        # If cache fails, allow the request but log the error
-        logger.error(f"Rate limit check failed: {e}")
-        return True, {'limit': max_requests, 'remaining': max_requests, 'reset': 0, 'period': period}
+    return is_allowed, info
 
 
 def ratelimit(group: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
@@ -8,12 +8,13 @@ from datetime import datetime
 from decimal import Decimal
 
 from ninja import Router, Schema, File, UploadedFile
-from django.db import DatabaseError, IntegrityError
 from django.core.exceptions import ValidationError
 from django.http import HttpRequest
 from ninja.errors import HttpError
 
+from apps.actividades.api import ActividadOut
 from apps.api.auth import OptionalJWTAuth
+from apps.lineas.api import TorreOut
 from apps.api.ratelimit import ratelimit_api, ratelimit_upload
 from .models import RegistroCampo, Evidencia, RegistroAvance
 from .tasks import procesar_evidencia
@@ -44,6 +45,7 @@ class EvidenciaOut(Schema):
     tipo: str
     url_original: str
     url_thumbnail: str
+    url_preview: str
     latitud: Optional[Decimal]
     longitud: Optional[Decimal]
     fecha_captura: datetime
@@ -130,6 +132,7 @@ def obtener_registro(request: HttpRequest, registro_id: UUID) -> RegistroDetailO
             tipo=e.tipo,
             url_original=e.url_original,
             url_thumbnail=e.url_thumbnail or e.url_original,
+            url_preview=e.url_preview or e.url_original,
             latitud=e.latitud,
             longitud=e.longitud,
             fecha_captura=e.fecha_captura,
@@ -163,70 +166,17 @@ def sincronizar_registros(request: HttpRequest, data: RegistroSyncIn) -> list[Sy
     Sync multiple field records from mobile app.
     Used when device comes back online.
 
+    The whole batch is applied in one transaction with a constant number of
+    queries (see ``apps.campo.sync``); results keep one entry per record.
+
     Rate limited: 100 requests per minute per user.
     """
-    from django.utils import timezone
-    from apps.actividades.models import Actividad
+    from .sync import sincronizar_registros_lote
 
-    resultados: list[SyncResultOut] = []
-
-    for reg in data.registros:
-        try:
-            registro = RegistroCampo.objects.get(actividad_id=reg.actividad_id)
-
-            # Update record
-            registro.datos_formulario = reg.datos_formulario
-            registro.observaciones = reg.observaciones
-            registro.latitud_fin = reg.latitud_fin
-            registro.longitud_fin = reg.longitud_fin
-            registro.fecha_fin = timezone.now()
-            registro.sincronizado = True
-            registro.fecha_sincronizacion = timezone.now()
-            # New fields for avance and pendientes
-            registro.porcentaje_avance_reportado = reg.porcentaje_avance_reportado
-            registro.tiene_pendiente = reg.tiene_pendiente
-            registro.tipo_pendiente = reg.tipo_pendiente
-            registro.descripcion_pendiente = reg.descripcion_pendiente
-            registro.save()
-
-            # Update activity status and avance
-            actividad = registro.actividad
-            # Update porcentaje_avance if reported avance is higher
-            if reg.porcentaje_avance_reportado > actividad.porcentaje_avance:
-                actividad.porcentaje_avance = reg.porcentaje_avance_reportado
-            # Mark as completed only if 100% advance
-            if reg.porcentaje_avance_reportado >= 100:
-                actividad.estado = Actividad.Estado.COMPLETADA
-            actividad.save(update_fields=['estado', 'porcentaje_avance', 'updated_at'])
-
-            resultados.append(SyncResultOut(
-                id=str(reg.actividad_id),
-                status='ok',
-                message='Sincronizado correctamente'
-            ))
-
-        except RegistroCampo.DoesNotExist:
-            resultados.append(SyncResultOut(
-                id=str(reg.actividad_id),
-                status='error',
-                message='Registro no encontrado'
-            ))
-        except (DatabaseError, IntegrityError) as e:
-            logger.error(f"Database error syncing record {reg.actividad_id}: {e}")
-            resultados.append(SyncResultOut(
-                id=str(reg.actividad_id),
-                status='error',
-                message=f'Error de base de datos: {str(e)[:100]}'
-            ))
-        except (ValueError, TypeError, KeyError) as e:
-            logger.warning(f"Data validation error syncing record {reg.actividad_id}: {e}")
-            resultados.append(SyncResultOut(
-                id=str(reg.actividad_id),
-                status='error',
-                message=f'Error de validacion: {str(e)}'
-            ))
-
-    return resultados
+    return [
+        SyncResultOut(**resultado)
+        for resultado in sincronizar_registros_lote(data.registros)
+    ]
 
 
 @router.post('/evidencias/upload', response={200: dict, 429: ErrorOut})
@@ -379,6 +329,54 @@ class MarcarVanoIn(Schema):
     observaciones: str = ""
 
 
+class TorreCercanaOut(Schema):
+    torre_id: UUID
+    numero: str
+    distancia_m: float
+
+
+class VanoCercanoOut(Schema):
+    vano_id: UUID
+    numero: str
+    torre_inicio_id: UUID
+    torre_fin_id: UUID
+    distancia_m: float
+
+
+class EstructuraCercanaOut(Schema):
+    """Torre y vano de la línea más cercanos a un fix GPS."""
+    torre: Optional[TorreCercanaOut]
+    vano: Optional[VanoCercanoOut]
+
+
+@router.get('/estructura-cercana', response=EstructuraCercanaOut, tags=['Vanos'])
+@ratelimit_api
+def estructura_cercana(
+    request: HttpRequest,
+    linea_id: UUID,
+    latitud: float,
+    longitud: float,
+):
+    """
+    Torre y vano más cercanos al punto, para auto-seleccionar la estructura
+    donde está la cuadrilla.
+
+    Resuelto contra el índice en memoria de la línea
+    (``apps.lineas.indice_espacial``): sin queries mientras la línea no
+    cambie.
+    """
+    from apps.lineas.indice_espacial import indice_linea
+
+    if not (-90 <= latitud <= 90 and -180 <= longitud <= 180):
+        raise HttpError(400, 'Coordenadas fuera de rango')
+
+    indice = indice_linea(linea_id)
+    return {
+        'torre': indice.torre_cercana(latitud, longitud),
+        'vano': indice.vano_cercano(latitud, longitud),
+    }
+
+
 @router.get('/cuadrilla/avances', response=ActividadVanosOut, tags=['Vanos'])
 @ratelimit_api
 def listar_avances_cuadrilla(request: HttpRequest):
@@ -672,3 +670,62 @@ def listar_avances(
         )
         for r in qs
     ]
+
+
+# ==================== CHANGE-FEED (DELTA SYNC) ====================
+
+class VanoCambioOut(VanoOut):
+    """Vano del change-feed: incluye la actividad para ubicarlo en el dispositivo."""
+    actividad_id: UUID
+
+
+class EliminadoOut(Schema):
+    """Tombstone: entidad ('actividades', 'torres', 'vanos', 'avances') + id."""
+    entidad: str
+    id: UUID
+
+
+class CambiosOut(Schema):
+    """Cambios desde el cursor del cliente; repetir mientras `has_more`."""
+    cursor: str
+    has_more: bool
+    actividades: list[ActividadOut]
+    torres: list[TorreOut]
+    vanos: list[VanoCambioOut]
+    avances: list[RegistroAvanceOut]
+    eliminados: list[EliminadoOut]
+
+
+@router.get('/sync/cambios', response={200: CambiosOut, 429: ErrorOut}, tags=['Sync'])
+@ratelimit_api
+def listar_cambios(
+    request: HttpRequest,
+    cursor: str = '',
+    limite: int = 500,
+    linea_id: Optional[UUID] = None,
+):
+    """
+    Change-feed incremental para la app móvil.
+
+    Devuelve solo actividades, torres, vanos y avances creados/modificados
+    (por `updated_at`) o eliminados desde `cursor`, acotados a la cuadrilla
+    del usuario. Sin `cursor` equivale a la descarga inicial completa.
+
+    Parámetros:
+    - cursor: token opaco devuelto por la llamada anterior (vacío = inicial)
+    - limite: máximo de filas por entidad (default: 500, máximo: 1000)
+    - linea_id: restringe actividades/torres a una línea
+    """
+    from .sync import CursorInvalido, cambios_desde
+
+    if not request.auth:
+        raise HttpError(401, 'Autenticación requerida')
+
+    cuadrilla = request.auth.cuadrilla_actual
+    if not cuadrilla:
+        raise HttpError(400, 'Usuario no asignado a cuadrilla activa')
+
+    try:
+        return cambios_desde(cuadrilla, cursor=cursor, limite=limite, linea_id=linea_id)
+    except CursorInvalido:
+        raise HttpError(400, 'Cursor inválido; reinicie la sincronización sin cursor')
@@ -0,0 +1,133 @@
+"""
+Métricas de calidad de fotos de evidencia (iluminación, contraste, nitidez).
+
+Única implementación para la validación asíncrona (``tasks.validar_imagen_simple``,
+vía el pipeline de ``evidencias``) y la de subida (``PhotoValidator``). Antes
+cada una calculaba sobre el array RGB a resolución completa: en una foto de
+12 MP eran ~36 MB de uint8 más varios arrays float64 del mismo tamaño
+(``np.gradient`` dos veces) — cientos de MB de temporales por foto.
+
+Acá todo corre sobre una versión en escala de grises con el lado mayor en
+``LADO_ANALISIS`` px:
+
+- Si la imagen es un JPEG aún sin decodificar, libjpeg la entrega ya en gris
+  y reducida (*draft mode*), sin pasar nunca por el RGB completo.
+- Si ya está decodificada, se reduce primero con ``Image.reduce`` (promedio
+  por bloques, en C) y recién después se pasa a gris.
+- La nitidez es la varianza de un Laplaciano real (kernel de 4 vecinos) y no
+  el gradiente del gradiente.
+
+Todas las operaciones son deterministas (PIL + NumPy en float64): la misma
+imagen da siempre las mismas métricas, sin importar el tamaño con que se
+decodificó mientras sea ≥ ``LADO_ANALISIS``.
+"""
+import io
+import math
+from dataclasses import dataclass
+
+#: Lado mayor de la versión de análisis (px).
+LADO_ANALISIS = 512
+
+MIN_ILUMINACION = 0.15
+MAX_ILUMINACION = 0.95
+MIN_CONTRASTE = 0.1
+MIN_NITIDEZ = 0.3
+
+#: Varianza del Laplaciano (sobre la versión de análisis) que marca el corte
+#: borrosa/nítida —el 100 habitual con OpenCV—. Se escala para que ese valor
+#: caiga justo en ``MIN_NITIDEZ``.
+UMBRAL_LAPLACIANO = 100.0
+
+
+@dataclass(frozen=True)
+class MetricasCalidad:
+    """Métricas normalizadas a [0, 1] (contraste puede superar 1)."""
+    iluminacion: float
+    contraste: float
+    nitidez: float
+
+    @property
+    def es_valida(self) -> bool:
+        return (
+            MIN_ILUMINACION < self.iluminacion < MAX_ILUMINACION and
+            self.nitidez > MIN_NITIDEZ and
+            self.contraste > MIN_CONTRASTE
+        )
+
+    @property
+    def mensaje(self) -> str:
+        if self.es_valida:
+            return "Imagen válida"
+        if self.iluminacion < MIN_ILUMINACION:
+            return "Imagen muy oscura"
+        if self.iluminacion > MAX_ILUMINACION:
+            return "Imagen sobreexpuesta"
+        if self.nitidez < MIN_NITIDEZ:
+            return "Imagen borrosa"
+        if self.contraste < MIN_CONTRASTE:
+            return "Imagen sin contraste suficiente"
+        return ""
+
+
+def gris_reducido(imagen):
+    """Array float64 en gris con el lado mayor ≤ ``LADO_ANALISIS``.
+
+    Si ``imagen`` es un JPEG sin decodificar se le aplica draft mode (la
+    instancia queda en modo reducido).
+    """
+    import numpy as np
+    from PIL import Image
+
+    # Caja con la proporción de la foto: draft elige la mayor reducción
+    # (1/2, 1/4, 1/8) que siga cubriéndola en AMBOS lados. No-op si la
+    # imagen ya está cargada o no es JPEG.
+    ancho, alto = imagen.size
+    escala = LADO_ANALISIS / max(ancho, alto)
+    if escala < 1:
+        imagen.draft('L', (math.ceil(ancho * escala), math.ceil(alto * escala)))
+
+    if imagen.mode not in ('L', 'RGB', 'RGBA'):
+        # `reduce` no soporta paleta (P) ni modos raros.
+        imagen = imagen.convert('RGB')
+    factor = max(imagen.size) // LADO_ANALISIS
+    if factor >= 2:
+        imagen = imagen.reduce(factor)
+    gris = imagen.convert('L')
+
+    ancho, alto = gris.size
+    if max(ancho, alto) > LADO_ANALISIS:
+        escala = LADO_ANALISIS / max(ancho, alto)
+        gris = gris.resize(
+            (max(1, round(ancho * escala)), max(1, round(alto * escala))),
+            Image.Resampling.BOX,
+        )
+    return np.asarray(gris, dtype=np.float64)
+
+
+def varianza_laplaciano(gris) -> float:
+    """Varianza del Laplaciano de 4 vecinos (sin bordes)."""
+    if gris.shape[0] < 3 or gris.shape[1] < 3:
+        return 0.0
+    laplaciano = (
+        gris[:-2, 1:-1] + gris[2:, 1:-1] + gris[1:-1, :-2] + gris[1:-1, 2:]
+        - 4.0 * gris[1:-1, 1:-1]
+    )
+    return float(laplaciano.var())
+
+
+def medir(imagen) -> MetricasCalidad:
+    """Métricas de una imagen PIL (decodificada o recién abierta)."""
+    gris = gris_reducido(imagen)
+    nitidez = varianza_laplaciano(gris) * MIN_NITIDEZ / UMBRAL_LAPLACIANO
+    return MetricasCalidad(
+        iluminacion=round(float(gris.mean()) / 255.0, 4),
+        contraste=round(float(gris.std()) / 128.0, 4),
+        nitidez=round(min(nitidez, 1.0), 4),
+    )
+
+
+def medir_bytes(datos: bytes) -> MetricasCalidad:
+    """Métricas desde el archivo: en JPEG nunca decodifica a resolución completa."""
+    from PIL import Image
+
+    return medir(Image.open(io.BytesIO(datos)))
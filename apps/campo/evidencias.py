@@ -0,0 +1,190 @@
+"""
+Pipeline de procesamiento de evidencias fotográficas.
+
+Antes cada foto se decodificaba tres veces: ``procesar_evidencia`` (miniatura
++ validación sobre el array a resolución completa), ``estampar_metadata_imagen``
+(descarga y decodificación de nuevo) y ``PhotoValidator`` (una tercera).
+Una foto de celular de 12 MP son ~36 MB de RGB por decodificación, más los
+arrays float de la validación.
+
+``procesar_imagen`` decodifica UNA vez y produce todas las versiones:
+
+- JPEG en *draft mode*: libjpeg decodifica directo a 1/2, 1/4 u 1/8 de la
+  resolución (DCT reducida), lo más chico que siga cubriendo la versión más
+  grande pedida (``ESTAMPADA_MAX_LADO``). Otros formatos se decodifican
+  completos.
+- Las versiones se derivan en cascada (estampada → preview → miniatura): cada
+  reducción parte de la anterior, no del original.
+- La validación (nitidez, iluminación, contraste) corre sobre la imagen ya
+  decodificada, con las mismas métricas que ``PhotoValidator``
+  (``calidad_foto``).
+"""
+import io
+
+#: Lado mayor de cada versión (px).
+ESTAMPADA_MAX_LADO = 1920
+PREVIEW_MAX_LADO = 1280
+THUMB_MAX_LADO = 400
+
+CALIDAD_JPEG = {
+    'estampada': 90,
+    'preview': 85,
+    'thumb': 85,
+}
+
+#: Carpeta de cada versión: reemplaza ``/evidencias/`` en la URL original.
+CARPETAS = {
+    'thumb': '/thumbs/',
+    'preview': '/previews/',
+    'estampada': '/estampadas/',
+}
+
+
+def decodificar(imagen_bytes: bytes, max_lado: int = None):
+    """Abre y decodifica la imagen una sola vez, en RGB.
+
+    Con ``max_lado`` y un JPEG usa draft mode: la imagen resultante puede
+    ser más chica que el original pero nunca menor que ``max_lado`` en su
+    lado mayor (salvo que el original ya lo sea).
+
+    Returns:
+        (imagen RGB cargada, formato original, tamaño original)
+    """
+    from PIL import Image
+
+    imagen = Image.open(io.BytesIO(imagen_bytes))
+    formato = imagen.format
+    tamano_original = imagen.size
+    if max_lado and formato == 'JPEG':
+        ancho, alto = imagen.size
+        escala = max_lado / max(ancho, alto)
+        if escala < 1:
+            imagen.draft('RGB', (int(ancho * escala), int(alto * escala)))
+    if imagen.mode != 'RGB':
+        imagen = imagen.convert('RGB')
+    imagen.load()
+    return imagen, formato, tamano_original
+
+
+def _reducida(imagen, max_lado):
+    """Copia de ``imagen`` con el lado mayor ≤ ``max_lado``."""
+    from PIL import Image
+
+    if max(imagen.size) <= max_lado:
+        return imagen.copy()
+    copia = imagen.copy()
+    # `reducing_gap` hace primero un `reduce()` entero (barato) y solo el
+    # último tramo con LANCZOS: misma calidad visual, fracción del costo.
+    copia.thumbnail((max_lado, max_lado), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    return copia
+
+
+def _jpeg(imagen, calidad):
+    buffer = io.BytesIO()
+    imagen.save(buffer, format='JPEG', quality=calidad, optimize=True)
+    return buffer.getvalue()
+
+
+def estampar(imagen, texto):
+    """Dibuja ``texto`` con fondo negro en la esquina inferior izquierda."""
+    from PIL import ImageDraw
+
+    draw = ImageDraw.Draw(imagen)
+    origen = (10, imagen.height - 100)
+    bbox = draw.textbbox(origen, texto)
+    draw.rectangle(
+        [bbox[0] - 5, bbox[1] - 5, bbox[2] + 5, bbox[3] + 5],
+        fill=(0, 0, 0, 180)
+    )
+    draw.text(origen, texto, fill=(255, 255, 255))
+    return imagen
+
+
+def texto_estampa(evidencia):
+    """Fecha, hora, coordenadas y torre/línea de la evidencia."""
+    actividad = evidencia.registro_campo.actividad
+    torre = actividad.torre
+    linea = actividad.linea
+    return (
+        f"Torre: {torre.numero_display if torre else '-'} | "
+        f"Línea: {linea.codigo if linea else '-'}\n"
+        f"Fecha: {evidencia.fecha_captura.strftime('%Y-%m-%d %H:%M')}\n"
+        f"GPS: {evidencia.latitud}, {evidencia.longitud}\n"
+        f"Tipo: {evidencia.get_tipo_display()}"
+    )
+
+
+def procesar_imagen(imagen_bytes: bytes, texto: str = None) -> dict:
+    """Decodifica una vez y devuelve versiones JPEG + validación.
+
+    Args:
+        imagen_bytes: contenido del original
+        texto: texto a estampar; sin texto no se genera la versión estampada
+            y el decode apunta a ``PREVIEW_MAX_LADO``.
+
+    Returns:
+        ``{'thumb': bytes, 'preview': bytes, 'estampada': bytes | None,
+        'validacion': dict, 'imagen': PIL.Image, 'formato': str,
+        'tamano_original': (ancho, alto)}``. ``imagen`` es la decodificación
+        compartida (sin estampa).
+    """
+    from .tasks import validar_imagen_simple
+
+    max_lado = ESTAMPADA_MAX_LADO if texto else PREVIEW_MAX_LADO
+    imagen, formato, tamano_original = decodificar(imagen_bytes, max_lado)
+
+    # Validación antes de estampar: la estampa alteraría brillo y nitidez.
+    validacion = validar_imagen_simple(imagen)
+
+    base = _reducida(imagen, max_lado)
+    preview = _reducida(base, PREVIEW_MAX_LADO)
+    thumb = _reducida(preview, THUMB_MAX_LADO)
+
+    estampada = None
+    if texto:
+        # `base` es una copia propia: se estampa in-place sin tocar `imagen`.
+        estampada = _jpeg(estampar(base, texto), CALIDAD_JPEG['estampada'])
+
+    return {
+        'thumb': _jpeg(thumb, CALIDAD_JPEG['thumb']),
+        'preview': _jpeg(preview, CALIDAD_JPEG['preview']),
+        'estampada': estampada,
+        'validacion': validacion,
+        'imagen': imagen,
+        'formato': formato,
+        'tamano_original': tamano_original,
+    }
+
+
+def ruta_version(url_original: str, version: str) -> str:
+    return url_original.replace('/evidencias/', CARPETAS[version])
+
+
+def procesar_evidencia(evidencia, estampada=True) -> dict:
+    """Descarga el original una vez, genera las versiones y las sube.
+
+    Actualiza ``url_thumbnail``, ``url_preview``, ``url_estampada`` y
+    ``validacion_ia`` de la evidencia.
+    """
+    from apps.core.utils import download_from_gcs, upload_to_gcs
+
+    imagen_bytes = download_from_gcs(evidencia.url_original)
+    salida = procesar_imagen(
+        imagen_bytes, texto=texto_estampa(evidencia) if estampada else None,
+    )
+
+    campos = ['validacion_ia', 'updated_at']
+    evidencia.validacion_ia = salida['validacion']
+    for version, campo in (
+        ('thumb', 'url_thumbnail'),
+        ('preview', 'url_preview'),
+        ('estampada', 'url_estampada'),
+    ):
+        if salida[version] is None:
+            continue
+        url = upload_to_gcs(salida[version], ruta_version(evidencia.url_original, version))
+        setattr(evidencia, campo, url)
+        campos.append(campo)
+
+    evidencia.save(update_fields=campos)
+    return salida
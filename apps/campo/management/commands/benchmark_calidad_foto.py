@@ -0,0 +1,66 @@
+"""Compara ``apps.campo.calidad_foto`` con el cálculo anterior a resolución
+completa sobre fotos reales: tiempo, pico de memoria y clasificación.
+
+No corre en la suite (los tiempos dependen de la máquina). Sirve para
+revisar ``UMBRAL_LAPLACIANO`` / ``MIN_NITIDEZ`` contra evidencias de campo
+antes de tocarlos: pasar fotos que se sepa que son nítidas y borrosas y
+mirar la columna de nitidez.
+
+Uso:
+    python manage.py benchmark_calidad_foto fotos/*.jpg
+    python manage.py benchmark_calidad_foto fotos/*.jpg --repeticiones 5
+"""
+import io
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from apps.campo.calidad_foto import medir_bytes
+
+
+def _resolucion_completa(datos):
+    """Cálculo anterior: RGB completo y gradiente del gradiente."""
+    import numpy as np
+    from PIL import Image
+
+    img_array = np.array(Image.open(io.BytesIO(datos)).convert('RGB'))
+    gray = np.mean(img_array, axis=2)
+    return min(np.var(np.gradient(np.gradient(gray))) / 500.0, 1.0)
+
+
+def _medir_recursos(funcion, datos, repeticiones):
+    resultado = funcion(datos)  # calentamiento
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(datos)
+    duracion = (time.perf_counter() - inicio) / repeticiones
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, duracion, pico
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de las métricas de calidad de foto contra el cálculo anterior'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fotos', nargs='+', help='Archivos JPEG de evidencia')
+        parser.add_argument('--repeticiones', type=int, default=3)
+
+    def handle(self, *args, **opts):
+        for ruta in opts['fotos']:
+            datos = Path(ruta).read_bytes()
+            nitidez_anterior, t_anterior, mem_anterior = _medir_recursos(
+                _resolucion_completa, datos, opts['repeticiones'],
+            )
+            metricas, t_nuevo, mem_nuevo = _medir_recursos(
+                medir_bytes, datos, opts['repeticiones'],
+            )
+            self.stdout.write(
+                f'{ruta}: nitidez {nitidez_anterior:.3f} -> {metricas.nitidez:.3f} '
+                f'({metricas.mensaje}) | {t_anterior * 1000:.0f} ms / '
+                f'{mem_anterior / 2**20:.0f} MB -> {t_nuevo * 1000:.0f} ms / '
+                f'{mem_nuevo / 2**20:.1f} MB'
+            )
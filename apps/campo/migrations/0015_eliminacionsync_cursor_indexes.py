@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-17 10:00
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campo', '0014_procedimiento_categoria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EliminacionSync',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('entidad', models.CharField(choices=[('actividades', 'Actividad'), ('torres', 'Torre'), ('vanos', 'Avance de vano'), ('avances', 'Registro de avance')], max_length=20, verbose_name='Entidad')),
+                ('objeto_id', models.UUIDField(verbose_name='ID del objeto eliminado')),
+            ],
+            options={
+                'verbose_name': 'Eliminación sincronizable',
+                'verbose_name_plural': 'Eliminaciones sincronizables',
+                'db_table': 'eliminaciones_sync',
+                'ordering': ['updated_at', 'id'],
+                'indexes': [models.Index(fields=['updated_at', 'id'], name='idx_eliminacion_sync_cursor')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='avancevano',
+            index=models.Index(fields=['cuadrilla', 'updated_at'], name='idx_avancevano_cuad_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='registroavance',
+            index=models.Index(fields=['cuadrilla', 'updated_at'], name='idx_regavance_cuad_updated'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.15 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campo', '0015_eliminacionsync_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evidencia',
+            name='url_preview',
+            field=models.URLField(
+                blank=True,
+                help_text='Versión reducida para visualizar en la web',
+                verbose_name='URL preview web',
+            ),
+        ),
+    ]
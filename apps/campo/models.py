@@ -251,6 +251,11 @@ class Evidencia(BaseModel):
         'URL thumbnail',
         blank=True
     )
+    url_preview = models.URLField(
+        'URL preview web',
+        blank=True,
+        help_text='Versión reducida para visualizar en la web'
+    )
     url_estampada = models.URLField(
         'URL imagen estampada',
         blank=True,
@@ -656,6 +661,8 @@ class AvanceVano(BaseModel):
             models.Index(fields=['actividad', 'cuadrilla']),
             models.Index(fields=['estado']),
             models.Index(fields=['cuadrilla', 'fecha_marcado']),
+            # Change-feed móvil (apps.campo.sync.cambios_desde)
+            models.Index(fields=['cuadrilla', 'updated_at'], name='idx_avancevano_cuad_updated'),
         ]
 
     def __str__(self):
@@ -777,6 +784,8 @@ class RegistroAvance(BaseModel):
             models.Index(fields=['cuadrilla', 'fecha_avance']),
             models.Index(fields=['linea', 'fecha_avance']),
             models.Index(fields=['torre', 'fecha_avance']),
+            # Change-feed móvil (apps.campo.sync.cambios_desde)
+            models.Index(fields=['cuadrilla', 'updated_at'], name='idx_regavance_cuad_updated'),
         ]
 
     def __str__(self):
@@ -796,3 +805,39 @@ class RegistroAvance(BaseModel):
         if self.torre and not self.linea:
             self.linea = self.torre.linea
         super().save(*args, **kwargs)
+
+
+class EliminacionSync(BaseModel):
+    """
+    Tombstone de filas borradas que la app móvil tiene en su base local.
+
+    El change-feed (``apps.campo.sync.cambios_desde``) detecta altas y
+    modificaciones por ``updated_at``; un DELETE no deja rastro en la tabla
+    original, así que los receivers ``post_delete`` de ``apps.campo.signals``
+    registran aquí la entidad y el id para que el cliente la purgue.
+    """
+
+    class Entidad(models.TextChoices):
+        ACTIVIDAD = 'actividades', 'Actividad'
+        TORRE = 'torres', 'Torre'
+        VANO = 'vanos', 'Avance de vano'
+        AVANCE = 'avances', 'Registro de avance'
+
+    entidad = models.CharField(
+        'Entidad',
+        max_length=20,
+        choices=Entidad.choices,
+    )
+    objeto_id = models.UUIDField('ID del objeto eliminado')
+
+    class Meta:
+        db_table = 'eliminaciones_sync'
+        verbose_name = 'Eliminación sincronizable'
+        verbose_name_plural = 'Eliminaciones sincronizables'
+        ordering = ['updated_at', 'id']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='idx_eliminacion_sync_cursor'),
+        ]
+
+    def __str__(self):
+        return f"{self.entidad} {self.objeto_id}"
@@ -2,10 +2,21 @@
 Signals para el módulo de campo.
 
 Agregado: 1 abril 2026
+
+La lógica vive en ``registrar_historial_lote`` / ``propagar_inspeccion_lote``
+para que el sync masivo (``apps.campo.sync``), que escribe con
+``bulk_update`` y por lo tanto NO dispara ``post_save``, pueda ejecutarla una
+sola vez por lote en vez de una vez por registro.
 """
-from django.db.models.signals import post_save
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import RegistroCampo
+
+from apps.actividades.models import Actividad
+from apps.lineas.models import Torre
+from .models import AvanceVano, EliminacionSync, RegistroAvance, RegistroCampo
 
 
 # Mapea severidad del registro a inspection_status agregado en Línea/Torre.
@@ -17,6 +28,131 @@ _STATUS_DESDE_SEVERIDAD = {
     '': 'OK',
 }
 
+_CAMPOS_INSPECCION = ['last_inspection_date', 'last_inspection_type', 'inspection_status']
+
+
+def _primera_cuadrilla(actividad):
+    """Primera cuadrilla asignada (usa el prefetch de ``cuadrillas`` si existe)."""
+    return next(iter(actividad.cuadrillas.all()), None)
+
+
+def registrar_historial_lote(registros):
+    """
+    Crea HistorialIntervencion para los registros sincronizados que aún no lo tienen.
+
+    1 SELECT de duplicados + 1 ``bulk_create`` para todo el lote. Se espera
+    que ``actividad`` venga con ``select_related`` de linea/torre/tramo/
+    tipo_actividad y ``prefetch_related('actividad__cuadrillas')``; si no, cae
+    en los lazy loads de siempre (caso del signal de un solo registro).
+    """
+    from apps.actividades.models import HistorialIntervencion
+
+    candidatos = [
+        r for r in registros
+        if r.sincronizado and r.actividad and r.actividad.linea
+    ]
+    if not candidatos:
+        return []
+
+    # Evitar duplicados - registros que ya tienen historial
+    con_historial = set(
+        HistorialIntervencion.objects.filter(
+            registro_campo__in=[r.pk for r in candidatos]
+        ).values_list('registro_campo_id', flat=True)
+    )
+
+    nuevos = []
+    vistos = set()
+    for instance in candidatos:
+        if instance.pk in con_historial or instance.pk in vistos:
+            continue
+        vistos.add(instance.pk)
+        actividad = instance.actividad
+
+        # Determinar torre inicio y fin
+        torre_inicio = actividad.torre
+        torre_fin = None
+        if actividad.tramo:
+            torre_inicio = actividad.tramo.torre_inicio
+            torre_fin = actividad.tramo.torre_fin
+
+        nuevos.append(HistorialIntervencion(
+            linea=actividad.linea,
+            actividad=actividad,
+            registro_campo=instance,
+            fecha_intervencion=instance.fecha_inicio,
+            tipo_intervencion=actividad.tipo_actividad.nombre if actividad.tipo_actividad else 'N/A',
+            cuadrilla=_primera_cuadrilla(actividad),
+            usuario_id=instance.usuario_id,
+            torre_inicio=torre_inicio,
+            torre_fin=torre_fin,
+            observaciones=instance.observaciones or '',
+        ))
+
+    if nuevos:
+        HistorialIntervencion.objects.bulk_create(nuevos, batch_size=500)
+    return nuevos
+
+
+def propagar_inspeccion_lote(registros):
+    """Mantiene `last_inspection_*` e `inspection_status` en Línea y Torre.
+
+    Aplica los registros en orden sobre una única instancia en memoria por
+    Línea/Torre (mismo resultado que procesarlos uno a uno) y persiste con un
+    ``bulk_update`` por modelo — 2 UPDATE por lote sin importar cuántos
+    registros apunten a la misma línea.
+    """
+    lineas = {}
+    torres = {}
+    lineas_cambiadas = {}
+    torres_cambiadas = {}
+
+    for instance in registros:
+        if not instance.sincronizado or not instance.actividad or not instance.actividad.linea:
+            continue
+        if not instance.fecha_inicio:
+            continue
+
+        actividad = instance.actividad
+        fecha = instance.fecha_inicio.date()
+        tipo = actividad.tipo_actividad.nombre[:50] if actividad.tipo_actividad else ''
+        status = _STATUS_DESDE_SEVERIDAD.get(instance.severidad or '', 'OK')
+
+        # Torre: solo si el registro la tiene asociada.
+        if actividad.torre is not None:
+            torre = torres.setdefault(actividad.torre.pk, actividad.torre)
+            if torre.last_inspection_date is None or fecha >= torre.last_inspection_date:
+                torre.last_inspection_date = fecha
+                torre.last_inspection_type = tipo
+                torre.inspection_status = status
+                torres_cambiadas[torre.pk] = torre
+
+        # Línea: peor estado entre torres + última fecha.
+        linea = lineas.setdefault(actividad.linea.pk, actividad.linea)
+        if linea.last_inspection_date is None or fecha >= linea.last_inspection_date:
+            # Si la nueva severidad escala el status, lo refleja; si no, conserva el peor.
+            linea.inspection_status = 'CRITICA' if linea.inspection_status == 'CRITICA' else status
+            linea.last_inspection_date = fecha
+            linea.last_inspection_type = tipo
+            lineas_cambiadas[linea.pk] = linea
+
+    if torres_cambiadas:
+        model = type(next(iter(torres_cambiadas.values())))
+        model.objects.bulk_update(torres_cambiadas.values(), _CAMPOS_INSPECCION)
+        # bulk_update no dispara señales: el estado de inspección pinta el
+        # mapa. Solo las teselas de estas torres (no se mueven), ya y al
+        # commit para no dejar en cache lo que otro request lea en el medio.
+        from apps.lineas.tiles import invalidar_teselas
+        puntos = [
+            (t.latitud, t.longitud) for t in torres_cambiadas.values()
+            if t.latitud is not None and t.longitud is not None
+        ]
+        invalidar_teselas(puntos)
+        transaction.on_commit(partial(invalidar_teselas, puntos))
+    if lineas_cambiadas:
+        model = type(next(iter(lineas_cambiadas.values())))
+        model.objects.bulk_update(lineas_cambiadas.values(), _CAMPOS_INSPECCION)
+
 
 @receiver(post_save, sender=RegistroCampo)
 def crear_historial_intervencion(sender, instance, created, **kwargs):
@@ -27,46 +163,7 @@ def crear_historial_intervencion(sender, instance, created, **kwargs):
     - Se marca un registro como sincronizado
     - El registro tiene actividad, linea y cuadrilla asociados
     """
-    from apps.actividades.models import HistorialIntervencion
-
-    # Solo crear historial si está sincronizado y tiene los datos necesarios
-    if not instance.sincronizado:
-        return
-
-    if not instance.actividad or not instance.actividad.linea:
-        return
-
-    # Evitar duplicados - verificar que no exista ya un historial para este registro
-    if HistorialIntervencion.objects.filter(registro_campo=instance).exists():
-        return
-
-    # Determinar torre inicio y fin
-    torre_inicio = None
-    torre_fin = None
-
-    if instance.actividad.torre:
-        torre_inicio = instance.actividad.torre
-
-    if instance.actividad.tramo:
-        torre_inicio = instance.actividad.tramo.torre_inicio
-        torre_fin = instance.actividad.tramo.torre_fin
-
-    # Obtener cuadrilla
-    cuadrilla = instance.actividad.cuadrillas.first() if instance.actividad.cuadrillas.exists() else None
-
-    # Crear historial
-    HistorialIntervencion.objects.create(
-        linea=instance.actividad.linea,
-        actividad=instance.actividad,
-        registro_campo=instance,
-        fecha_intervencion=instance.fecha_inicio,
-        tipo_intervencion=instance.actividad.tipo_actividad.nombre if instance.actividad.tipo_actividad else 'N/A',
-        cuadrilla=cuadrilla,
-        usuario=instance.usuario,
-        torre_inicio=torre_inicio,
-        torre_fin=torre_fin,
-        observaciones=instance.observaciones or '',
-    )
+    registrar_historial_lote([instance])
 
 
 @receiver(post_save, sender=RegistroCampo)
@@ -76,40 +173,23 @@ def actualizar_inspeccion_linea_torre(sender, instance, created, **kwargs):
     Toma efecto cuando el registro está sincronizado y tiene actividad/línea.
     Llamado en cada save porque `severidad` puede editarse después.
     """
-    if not instance.sincronizado or not instance.actividad or not instance.actividad.linea:
-        return
-
-    fecha = instance.fecha_inicio.date() if instance.fecha_inicio else None
-    tipo = ''
-    if instance.actividad.tipo_actividad:
-        tipo = instance.actividad.tipo_actividad.nombre[:50]
-    status = _STATUS_DESDE_SEVERIDAD.get(instance.severidad or '', 'OK')
-
-    linea = instance.actividad.linea
-    torre = instance.actividad.torre
-
-    # Torre: solo si el registro la tiene asociada.
-    if torre is not None and fecha is not None:
-        update_torre = {}
-        if linea.__class__._meta.get_field('last_inspection_date') and (
-            torre.last_inspection_date is None or fecha >= torre.last_inspection_date
-        ):
-            update_torre['last_inspection_date'] = fecha
-            update_torre['last_inspection_type'] = tipo
-            update_torre['inspection_status'] = status
-        if update_torre:
-            type(torre).objects.filter(pk=torre.pk).update(**update_torre)
-
-    # Línea: peor estado entre torres + última fecha.
-    if fecha is not None and (
-        linea.last_inspection_date is None or fecha >= linea.last_inspection_date
-    ):
-        # Si la nueva severidad escala el status, lo refleja; si no, conserva el peor.
-        nuevo_status = status
-        if linea.inspection_status == 'CRITICA':
-            nuevo_status = 'CRITICA'
-        type(linea).objects.filter(pk=linea.pk).update(
-            last_inspection_date=fecha,
-            last_inspection_type=tipo,
-            inspection_status=nuevo_status,
-        )
+    propagar_inspeccion_lote([instance])
+
+
+# Tombstones del change-feed móvil: un DELETE no deja `updated_at` que el
+# cursor pueda ver, así que se registra aparte.
+_ENTIDAD_SYNC = {
+    Actividad: EliminacionSync.Entidad.ACTIVIDAD,
+    Torre: EliminacionSync.Entidad.TORRE,
+    AvanceVano: EliminacionSync.Entidad.VANO,
+    RegistroAvance: EliminacionSync.Entidad.AVANCE,
+}
+
+
+@receiver(post_delete, sender=Actividad)
+@receiver(post_delete, sender=Torre)
+@receiver(post_delete, sender=AvanceVano)
+@receiver(post_delete, sender=RegistroAvance)
+def registrar_eliminacion_sync(sender, instance, **kwargs):
+    """Registra el borrado para que ``cambios_desde`` lo informe al cliente."""
+    EliminacionSync.objects.create(entidad=_ENTIDAD_SYNC[sender], objeto_id=instance.pk)
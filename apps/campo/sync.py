@@ -0,0 +1,400 @@
+"""
+Sincronización con la app móvil: subida masiva de registros y change-feed.
+
+Cuando una cuadrilla recupera señal con 200+ registros en cola, el camino
+registro-a-registro (``get`` + ``save`` + lazy ``actividad`` + ``save`` de la
+actividad + 2 signals por fila) se convierte en miles de queries y el request
+vence. ``sincronizar_registros_lote`` hace el mismo trabajo en un número
+constante de queries:
+
+1. 1 SELECT de ``RegistroCampo`` con su actividad (línea/torre/tramo/tipo) y
+   1 prefetch de cuadrillas.
+2. Mutaciones en memoria, en el orden del payload.
+3. Dentro de UNA transacción: ``bulk_update`` de registros y actividades, y
+   la propagación de historial/inspección (``apps.campo.signals``) una vez
+   por lote.
+
+Conserva el contrato por-registro de ``SyncResultOut`` (``id``/``status``/
+``message``).
+
+En sentido inverso, ``cambios_desde`` reemplaza la re-descarga completa de
+listas: devuelve solo lo creado/modificado (por ``BaseModel.updated_at``) o
+eliminado (tombstones ``EliminacionSync``) desde el cursor del cliente.
+"""
+import base64
+import binascii
+import json
+import logging
+from datetime import datetime, timedelta
+
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AvanceVano, EliminacionSync, RegistroAvance, RegistroCampo
+from .signals import propagar_inspeccion_lote, registrar_historial_lote
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_REGISTRO_SYNC = [
+    'datos_formulario',
+    'observaciones',
+    'latitud_fin',
+    'longitud_fin',
+    'fecha_fin',
+    'sincronizado',
+    'fecha_sincronizacion',
+    'porcentaje_avance_reportado',
+    'tiene_pendiente',
+    'tipo_pendiente',
+    'descripcion_pendiente',
+    'updated_at',
+]
+CAMPOS_ACTIVIDAD_SYNC = ['estado', 'porcentaje_avance', 'updated_at']
+
+
+def _resultado(actividad_id, status, message):
+    return {'id': str(actividad_id), 'status': status, 'message': message}
+
+
+def _cargar_registros(actividad_ids):
+    """Registros por actividad_id, con todo lo que usan los signals precargado."""
+    qs = (
+        RegistroCampo.objects
+        .filter(actividad_id__in=actividad_ids)
+        .select_related(
+            'actividad__linea',
+            'actividad__torre',
+            'actividad__tipo_actividad',
+            'actividad__tramo__torre_inicio',
+            'actividad__tramo__torre_fin',
+        )
+        .prefetch_related('actividad__cuadrillas')
+    )
+    por_actividad = {}
+    for registro in qs:
+        por_actividad.setdefault(registro.actividad_id, []).append(registro)
+    return por_actividad
+
+
+def _aplicar(registro, reg, ahora):
+    """Copia el payload al registro y refleja el avance en su actividad."""
+    from apps.actividades.models import Actividad
+
+    registro.datos_formulario = reg.datos_formulario
+    registro.observaciones = reg.observaciones
+    registro.latitud_fin = reg.latitud_fin
+    registro.longitud_fin = reg.longitud_fin
+    registro.fecha_fin = ahora
+    registro.sincronizado = True
+    registro.fecha_sincronizacion = ahora
+    registro.porcentaje_avance_reportado = reg.porcentaje_avance_reportado
+    registro.tiene_pendiente = reg.tiene_pendiente
+    registro.tipo_pendiente = reg.tipo_pendiente
+    registro.descripcion_pendiente = reg.descripcion_pendiente
+    registro.updated_at = ahora
+
+    actividad = registro.actividad
+    # Update porcentaje_avance if reported avance is higher
+    if reg.porcentaje_avance_reportado > actividad.porcentaje_avance:
+        actividad.porcentaje_avance = reg.porcentaje_avance_reportado
+    # Mark as completed only if 100% advance
+    if reg.porcentaje_avance_reportado >= 100:
+        actividad.estado = Actividad.Estado.COMPLETADA
+    actividad.updated_at = ahora
+
+
+def sincronizar_registros_lote(registros_in):
+    """
+    Aplica un lote de ``RegistroIn`` en una sola transacción.
+
+    Retorna una lista de dicts ``{'id', 'status', 'message'}`` en el mismo
+    orden del payload. Errores de datos se reportan por registro; un error de
+    base de datos revierte el lote completo y se reporta en cada registro que
+    iba a quedar ``ok`` (la app móvil los reintenta en el próximo sync).
+    """
+    from apps.actividades.models import Actividad
+
+    if not registros_in:
+        return []
+
+    ahora = timezone.now()
+    por_actividad = _cargar_registros({reg.actividad_id for reg in registros_in})
+
+    resultados = []
+    pendientes = []  # índices de resultados que dependen del commit
+    registros_ok = {}
+    actividades_ok = {}
+
+    for reg in registros_in:
+        candidatos = por_actividad.get(reg.actividad_id, [])
+        if not candidatos:
+            resultados.append(_resultado(reg.actividad_id, 'error', 'Registro no encontrado'))
+            continue
+        if len(candidatos) > 1:
+            resultados.append(_resultado(
+                reg.actividad_id, 'error', 'Múltiples registros para la actividad'
+            ))
+            continue
+
+        registro = candidatos[0]
+        try:
+            _aplicar(registro, reg, ahora)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Data validation error syncing record {reg.actividad_id}: {e}")
+            resultados.append(_resultado(
+                reg.actividad_id, 'error', f'Error de validacion: {str(e)}'
+            ))
+            continue
+
+        registros_ok[registro.pk] = registro
+        actividades_ok[registro.actividad.pk] = registro.actividad
+        pendientes.append(len(resultados))
+        resultados.append(_resultado(reg.actividad_id, 'ok', 'Sincronizado correctamente'))
+
+    if not registros_ok:
+        return resultados
+
+    try:
+        with transaction.atomic():
+            RegistroCampo.objects.bulk_update(
+                registros_ok.values(), CAMPOS_REGISTRO_SYNC, batch_size=500
+            )
+            Actividad.objects.bulk_update(
+                actividades_ok.values(), CAMPOS_ACTIVIDAD_SYNC, batch_size=500
+            )
+            # bulk_update no dispara post_save: propagación explícita, 1 vez por lote.
+            registros = list(registros_ok.values())
+            registrar_historial_lote(registros)
+            propagar_inspeccion_lote(registros)
+            # Estados de actividad: fuente del dashboard de indicadores.
+            from apps.indicadores.snapshots import invalidar_dashboard
+            invalidar_dashboard()
+            transaction.on_commit(invalidar_dashboard)
+    except (DatabaseError, IntegrityError) as e:
+        logger.error(f"Database error syncing batch of {len(registros_ok)} records: {e}")
+        for idx in pendientes:
+            resultados[idx]['status'] = 'error'
+            resultados[idx]['message'] = f'Error de base de datos: {str(e)[:100]}'
+
+    return resultados
+
+
+# ==================== CHANGE-FEED (DELTA SYNC) ====================
+
+ENTIDADES_SYNC = ('actividades', 'torres', 'vanos', 'avances', 'eliminados')
+LIMITE_CAMBIOS_MAX = 1000
+
+#: ``updated_at`` se fija al escribir, no al confirmar: una transacción que
+#: confirma tarde deja filas con un ``updated_at`` anterior al cursor ya
+#: devuelto. Al ponerse al día, el cursor de cada entidad nunca queda más
+#: adelante que ``ahora - MARGEN_CURSOR``; lo más reciente se reenvía en la
+#: próxima llamada (el cliente hace upsert por id). Una transacción más
+#: larga que el margen todavía puede perder cambios hasta la próxima
+#: descarga completa.
+MARGEN_CURSOR = timedelta(seconds=60)
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido no se pudo decodificar."""
+
+
+def codificar_cursor(posiciones):
+    """``{entidad: (updated_at, pk)}`` -> token opaco url-safe."""
+    data = {
+        entidad: [ts.isoformat(), '' if pk is None else str(pk)]
+        for entidad, (ts, pk) in posiciones.items()
+    }
+    raw = json.dumps(data, separators=(',', ':'), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Token opaco -> ``{entidad: (updated_at, pk)}``. Cursor vacío = sync inicial."""
+    if not cursor:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return {
+            entidad: (datetime.fromisoformat(ts), pk or None)
+            for entidad, (ts, pk) in data.items()
+            if entidad in ENTIDADES_SYNC
+        }
+    except (binascii.Error, ValueError, TypeError, AttributeError) as e:
+        raise CursorInvalido(str(e)) from e
+
+
+def _despues_de(qs, posicion, limite):
+    """Keyset ``(updated_at, id) > posicion``; trae ``limite + 1`` para saber si hay más.
+
+    Sin ``pk`` (posición acotada por ``MARGEN_CURSOR``) es ``updated_at > ts``.
+    """
+    if posicion is not None:
+        ts, pk = posicion
+        if pk is None:
+            qs = qs.filter(updated_at__gt=ts)
+        else:
+            qs = qs.filter(Q(updated_at__gt=ts) | Q(updated_at=ts, id__gt=pk))
+    return list(qs.order_by('updated_at', 'id')[:limite + 1])
+
+
+def _actividad_dict(a):
+    return {
+        'id': a.id,
+        'linea_id': a.linea_id,
+        'linea_codigo': a.linea.codigo,
+        'linea_nombre': a.linea.nombre,
+        'torre_id': a.torre_id,
+        'torre_numero': a.torre.numero,
+        'torre_latitud': a.torre.latitud,
+        'torre_longitud': a.torre.longitud,
+        'tipo_actividad_id': a.tipo_actividad_id,
+        'tipo_actividad_nombre': a.tipo_actividad.nombre,
+        'tipo_actividad_categoria': a.tipo_actividad.categoria,
+        'fecha_programada': a.fecha_programada,
+        'estado': a.estado,
+        'prioridad': a.prioridad,
+        'campos_formulario': a.tipo_actividad.campos_formulario or [],
+    }
+
+
+def _torre_dict(t):
+    return {
+        'id': t.id,
+        'numero': t.numero,
+        'tipo': t.tipo,
+        'estado': t.estado,
+        'latitud': t.latitud,
+        'longitud': t.longitud,
+        'altitud': t.altitud,
+        'municipio': t.municipio,
+        'linea_codigo': t.linea.codigo,
+        'linea_nombre': t.linea.nombre,
+    }
+
+
+def _vano_dict(v):
+    return {
+        'id': v.id,
+        'actividad_id': v.actividad_id,
+        'numero_vano': v.numero_vano,
+        'estado': v.estado,
+        'torre_inicio_numero': v.torre_inicio.numero,
+        'torre_fin_numero': v.torre_fin.numero,
+        'es_apoyo': bool(v.es_apoyo),
+        'marcado_por_nombre': v.marcado_por.get_full_name() if v.marcado_por else None,
+        'fecha_marcado': v.fecha_marcado,
+        'observaciones': v.observaciones,
+        'aprobado': v.aprobado,
+    }
+
+
+def _avance_dict(r):
+    return {
+        'id': r.id,
+        'usuario_id': r.usuario_id,
+        'usuario_nombre': r.usuario.get_full_name(),
+        'cuadrilla_id': r.cuadrilla_id,
+        'cuadrilla_nombre': r.cuadrilla.nombre,
+        'linea_id': r.linea_id,
+        'linea_codigo': r.linea.codigo,
+        'torre_id': r.torre_id,
+        'torre_numero': r.torre.numero,
+        'tipo_avance': r.tipo_avance,
+        'fecha_avance': r.fecha_avance,
+        'observaciones': r.observaciones,
+        'porcentaje': r.porcentaje,
+    }
+
+
+def _querysets_cambios(cuadrilla, linea_id=None):
+    """Querysets por entidad, acotados a lo que la cuadrilla tiene en el dispositivo."""
+    from apps.actividades.models import Actividad
+    from apps.lineas.models import Torre
+
+    # Mismo alcance que /actividades/mis-actividades (FK `cuadrilla`).
+    actividades = Actividad.objects.filter(cuadrilla=cuadrilla)
+    if linea_id:
+        actividades = actividades.filter(linea_id=linea_id)
+        lineas_ids = {linea_id}
+    else:
+        lineas_ids = set(actividades.values_list('linea_id', flat=True).distinct())
+        if cuadrilla.linea_asignada_id:
+            lineas_ids.add(cuadrilla.linea_asignada_id)
+
+    return {
+        'actividades': (
+            actividades.select_related('linea', 'torre', 'tipo_actividad'),
+            _actividad_dict,
+        ),
+        'torres': (
+            Torre.objects.filter(linea_id__in=lineas_ids).select_related('linea'),
+            _torre_dict,
+        ),
+        'vanos': (
+            AvanceVano.objects.filter(cuadrilla=cuadrilla).select_related(
+                'torre_inicio', 'torre_fin', 'marcado_por', 'cuadrilla_asignada_original'
+            ),
+            _vano_dict,
+        ),
+        'avances': (
+            RegistroAvance.objects.filter(cuadrilla=cuadrilla).select_related(
+                'usuario', 'cuadrilla', 'linea', 'torre'
+            ),
+            _avance_dict,
+        ),
+        'eliminados': (
+            EliminacionSync.objects.all(),
+            lambda e: {'entidad': e.entidad, 'id': e.objeto_id},
+        ),
+    }
+
+
+def cambios_desde(cuadrilla, cursor='', limite=500, linea_id=None):
+    """
+    Change-feed para la app móvil.
+
+    Cada entidad avanza con su propio keyset ``(updated_at, id)``, así que la
+    paginación es estable aunque ``bulk_update`` deje muchas filas con
+    el mismo ``updated_at`` (el sync masivo lo hace). Con ``has_more=True``
+    el cliente repite con el cursor devuelto hasta agotar los cambios; un
+    cursor vacío equivale a la descarga inicial completa, paginada igual.
+
+    Mientras ``has_more`` el keyset es exacto; la respuesta que pone al día
+    al cliente no deja ninguna posición más adelante que
+    ``ahora - MARGEN_CURSOR`` (commits tardíos), así que la próxima llamada
+    puede reenviar filas recientes que el cliente ya tenía.
+
+    Los tombstones no se filtran por cuadrilla: son solo ids, y el cliente
+    ignora los que no tiene. Un cambio de alcance (p.ej. una actividad
+    reasignada a otra cuadrilla) no genera tombstone — ese caso lo sigue
+    cubriendo la re-descarga completa con cursor vacío.
+
+    Raises:
+        CursorInvalido: si ``cursor`` no es un token emitido por este endpoint.
+    """
+    posiciones = decodificar_cursor(cursor)
+    limite = max(1, min(limite, LIMITE_CAMBIOS_MAX))
+
+    resultado = {'has_more': False}
+    nuevas_posiciones = dict(posiciones)
+    horizonte = timezone.now() - MARGEN_CURSOR
+    for entidad, (qs, serializar) in _querysets_cambios(cuadrilla, linea_id).items():
+        filas = _despues_de(qs, posiciones.get(entidad), limite)
+        if len(filas) > limite:
+            filas = filas[:limite]
+            resultado['has_more'] = True
+        if filas:
+            nuevas_posiciones[entidad] = (filas[-1].updated_at, filas[-1].pk)
+        resultado[entidad] = [serializar(f) for f in filas]
+
+    if not resultado['has_more']:
+        # Al día: ningún cursor queda más adelante que el horizonte.
+        nuevas_posiciones = {
+            entidad: (ts, pk) if ts < horizonte else (horizonte, None)
+            for entidad, (ts, pk) in nuevas_posiciones.items()
+        }
+
+    resultado['cursor'] = codificar_cursor(nuevas_posiciones)
+    return resultado
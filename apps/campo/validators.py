@@ -319,6 +319,11 @@ class PhotoValidator:
     MAX_TIME_DIFF_HOURS = 24  # Max time difference from expected
 
     def __init__(self, image_bytes: bytes):
+        """
+        Args:
+            image_bytes: Original file content (format, size and EXIF come
+                from its header; opening it does not decode pixels)
+        """
         self.image_bytes = image_bytes
         self.image = None
         self.errors = []
@@ -432,14 +437,17 @@ class PhotoValidator:
         return 1.0
 
     def _validate_quality(self) -> float:
-        """Validate image quality (brightness, contrast, sharpness)."""
-        import numpy as np
+        """Validate image quality (brightness, contrast, sharpness).
+
+        Uses apps.campo.calidad_foto on a small grayscale downsample of the
+        file (JPEGs are decoded directly at reduced size).
+        """
+        from .calidad_foto import medir_bytes
 
-        # Convert to numpy array
-        img_array = np.array(self.image.convert('RGB'))
+        metricas = medir_bytes(self.image_bytes)
 
         # Calculate brightness
-        brightness = np.mean(img_array) / 255.0
+        brightness = metricas.iluminacion
         self.metadata['brightness'] = round(brightness, 2)
 
         if brightness < self.MIN_BRIGHTNESS:
@@ -452,7 +460,7 @@ class PhotoValidator:
             brightness_score = 1.0
 
         # Calculate contrast
-        contrast = np.std(img_array) / 128.0
+        contrast = metricas.contraste
         self.metadata['contrast'] = round(contrast, 2)
 
         if contrast < self.MIN_CONTRAST:
@@ -462,9 +470,7 @@ class PhotoValidator:
             contrast_score = 1.0
 
         # Calculate sharpness (Laplacian variance)
-        gray = np.mean(img_array, axis=2) if len(img_array.shape) == 3 else img_array
-        laplacian_var = np.var(np.gradient(np.gradient(gray)))
-        sharpness = min(laplacian_var / 500.0, 1.0)
+        sharpness = metricas.nitidez
         self.metadata['sharpness'] = round(sharpness, 2)
 
         if sharpness < self.MIN_SHARPNESS:
@@ -660,11 +660,14 @@ class ProcedimientoProxyView(LoginRequiredMixin, RoleRequiredMixin, View):
     """
     Proxy endpoint to serve procedure files, bypassing CORS restrictions.
     Used by frontend to fetch Excel files for preview.
+
+    Streams the file (no full read into memory), honours ``Range`` and
+    answers 304 to revalidations (ETag/Last-Modified from ``updated_at``).
     """
     allowed_roles = ['admin', 'director', 'coordinador', 'ing_residente', 'supervisor', 'liniero']
 
     def get(self, request, pk):
-        from django.http import FileResponse, HttpResponse
+        from apps.core.descargas import respuesta_archivo
         try:
             procedimiento = Procedimiento.objects.get(pk=pk)
         except Procedimiento.DoesNotExist:
@@ -674,10 +677,15 @@ class ProcedimientoProxyView(LoginRequiredMixin, RoleRequiredMixin, View):
             return HttpResponse('Archivo no encontrado', status=404)
 
         try:
-            file_content = procedimiento.archivo.read()
-            response = HttpResponse(file_content, content_type=procedimiento.tipo_archivo or 'application/octet-stream')
-            response['Content-Disposition'] = f'inline; filename="{procedimiento.nombre_original}"'
-            return response
+            return respuesta_archivo(
+                request,
+                procedimiento.archivo,
+                content_type=procedimiento.tipo_archivo or 'application/octet-stream',
+                nombre=procedimiento.nombre_original,
+                modificado=procedimiento.updated_at,
+            )
+        except FileNotFoundError:
+            return HttpResponse('Archivo no encontrado', status=404)
         except Exception as e:
             return HttpResponse(f'Error al leer el archivo: {str(e)}', status=500)
 
@@ -7,12 +7,13 @@ Issues #72 y #95. Reemplaza el acceso directo a `procedimiento.archivo.url`
   ProcedimientoViewerView).
 - Abre el archivo en modo binario via storage backend (django-storages GCS o
   FileSystemStorage local), de forma transparente.
-- Devuelve `FileResponse` streaming con `Content-Type` inferido (MIME del modelo
+- Devuelve una respuesta streaming (``apps.core.descargas``: Range, ETag,
+  304) con `Content-Type` inferido (MIME del modelo
   o fallback por extensión via `mimetypes`) y `Content-Disposition: inline`
   para que el navegador haga preview embebido.
 
 Es distinto del legacy `ProcedimientoProxyView` (`/procedimientos/<pk>/proxy/`)
-porque ese leía todo el archivo en memoria y solo lo usaba el viewer Excel.
+porque ese solo lo usa el viewer Excel (ambos comparten la entrega streaming).
 B6 expone `/procedimientos/<pk>/download/` (alias semantico, sirve cualquier
 tipo) y centraliza el flujo PDF + Excel + fallback descarga.
 """
@@ -23,12 +24,13 @@ import mimetypes
 import os
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import FileResponse, Http404
+from django.http import Http404
 from django.urls import path
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.clickjacking import xframe_options_sameorigin
 
+from apps.core.descargas import respuesta_archivo
 from apps.core.mixins import RoleRequiredMixin
 
 from .models import Procedimiento
@@ -76,12 +78,6 @@ class ProcedimientoDownloadView(LoginRequiredMixin, RoleRequiredMixin, View):
         if not procedimiento.archivo:
             raise Http404('Archivo no disponible')
 
-        try:
-            fh = procedimiento.archivo.open('rb')
-        except (FileNotFoundError, OSError) as exc:
-            # archivo registrado en BD pero no presente en storage
-            raise Http404('Archivo no accesible en storage') from exc
-
         content_type = self._content_type_for(procedimiento)
 
         # nombre legible para el navegador; sanitizar saltos de línea
@@ -89,15 +85,24 @@ class ProcedimientoDownloadView(LoginRequiredMixin, RoleRequiredMixin, View):
             procedimiento.archivo.name or 'archivo'
         )).replace('"', '').replace('\n', '').replace('\r', '')
 
-        response = FileResponse(fh, content_type=content_type)
-        # inline para que iframe/<embed>/SheetJS lo previsualicen sin forzar
-        # descarga; el botón "Descargar" del template añade el atributo
-        # `download` en el cliente cuando hace falta.
-        response['Content-Disposition'] = f'inline; filename="{filename}"'
-        # cache hint (1h) — el archivo en sí no cambia tras upload; ayuda al
-        # preview Excel que hace fetch dos veces (selector de hojas + render).
-        response['Cache-Control'] = 'private, max-age=3600'
-        return response
+        try:
+            # inline para que iframe/<embed>/SheetJS lo previsualicen sin forzar
+            # descarga; el botón "Descargar" del template añade el atributo
+            # `download` en el cliente cuando hace falta.
+            # cache hint (1h) — el archivo en sí no cambia tras upload; ayuda al
+            # preview Excel que hace fetch dos veces (selector de hojas + render).
+            # Pasada la hora el navegador revalida con ETag y recibe 304.
+            return respuesta_archivo(
+                request,
+                procedimiento.archivo,
+                content_type=content_type,
+                nombre=filename,
+                modificado=procedimiento.updated_at,
+                cache_control='private, max-age=3600',
+            )
+        except (FileNotFoundError, OSError) as exc:
+            # archivo registrado en BD pero no presente en storage
+            raise Http404('Archivo no accesible en storage') from exc
 
 
 urlpatterns = [
@@ -0,0 +1,174 @@
+"""Avance ponderado por lote: TODAS las torres de un proyecto en un capítulo.
+
+``ObraCivilTorre.avance_ponderado``, ``MontajeEstructuraTorre.avance_ponderado``
+y ``TendidoTorre._avance_ponderado_capitulo`` calculan por instancia: cada
+torre re-filtra ``proyecto.columnas_configurables`` y, por cada columna
+custom, ``ColumnaConfigurable.valor_para_torre`` hace un
+``valores.get(torre=...)`` — N torres × M columnas custom queries en las
+matrices (#171 B7).
+
+Acá los pesos de las columnas activas y TODOS los ``ColumnaConfigurableValor``
+del capítulo salen de UNA query (LEFT JOIN columna → valores), y el
+SUMPRODUCT se arma como matriz torres × columnas contra el vector de pesos.
+La aritmética replica la de las properties (``Decimal`` para Obra Civil y
+Montaje, enteros/float para Tendido) para que el resultado sea idéntico.
+
+``aplicar_avance_ponderado`` deja el resultado en cada instancia (atributo
+``_avance_lote``) y las properties lo devuelven sin recalcular — los
+templates de las matrices no cambian.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+
+#: Capítulos cuyo avance de sistema es ``DecimalField`` (vía ``avances_dict``).
+_CAPITULOS_DECIMAL = ('OBRA_CIVIL', 'MONTAJE')
+
+
+def _modelo_capitulo(capitulo):
+    from .models import ColumnaConfigurable, MontajeEstructuraTorre, ObraCivilTorre, TendidoTorre
+    return {
+        ColumnaConfigurable.CAPITULO_OBRA_CIVIL: ObraCivilTorre,
+        ColumnaConfigurable.CAPITULO_MONTAJE: MontajeEstructuraTorre,
+        ColumnaConfigurable.CAPITULO_TENDIDO_CONDUCTOR: TendidoTorre,
+        ColumnaConfigurable.CAPITULO_TENDIDO_FIBRA: TendidoTorre,
+    }[capitulo]
+
+
+def cargar_columnas_y_valores(proyecto, capitulos) -> tuple[dict, dict]:
+    """Columnas activas + valores EAV de los ``capitulos`` en UNA query.
+
+    Devuelve ``(columnas, valores)``:
+      - ``columnas``: ``{capitulo: [{'id','clave','peso_pct','es_sistema',
+        'tipo_valor'}]}`` en el orden de ``Meta.ordering`` (``orden``).
+      - ``valores``: ``{(columna_id, torre_id): valor}`` con el valor ya
+        normalizado como lo devuelve ``valor_para_torre`` (``bool`` o
+        ``Decimal``).
+    """
+    from .models import ColumnaConfigurable
+
+    filas = (ColumnaConfigurable.objects
+             .filter(proyecto=proyecto, capitulo__in=list(capitulos), activa=True)
+             .order_by('capitulo', 'orden')
+             .values('id', 'capitulo', 'clave', 'peso_pct', 'es_sistema', 'tipo_valor',
+                     'valores__torre_id', 'valores__valor_decimal', 'valores__valor_boolean'))
+
+    columnas = {capitulo: [] for capitulo in capitulos}
+    vistas = set()
+    valores = {}
+    for fila in filas:
+        if fila['id'] not in vistas:
+            vistas.add(fila['id'])
+            columnas[fila['capitulo']].append({
+                'id': fila['id'],
+                'clave': fila['clave'],
+                'peso_pct': fila['peso_pct'],
+                'es_sistema': fila['es_sistema'],
+                'tipo_valor': fila['tipo_valor'],
+            })
+        torre_id = fila['valores__torre_id']
+        if torre_id is None:
+            continue
+        if fila['tipo_valor'] == ColumnaConfigurable.TIPO_BOOLEAN:
+            valor = bool(fila['valores__valor_boolean'])
+        else:
+            decimal = fila['valores__valor_decimal']
+            valor = decimal if decimal is not None else Decimal('0')
+        valores[(fila['id'], torre_id)] = valor
+    return columnas, valores
+
+
+def valor_custom(valores, columna_id, tipo_valor, torre_id):
+    """Equivalente sin query de ``ColumnaConfigurable.valor_para_torre``."""
+    from .models import ColumnaConfigurable
+    try:
+        return valores[(columna_id, torre_id)]
+    except KeyError:
+        return Decimal('0') if tipo_valor == ColumnaConfigurable.TIPO_DECIMAL else False
+
+
+def _matriz(capitulo, columnas, valores, filas):
+    """Matriz torres × columnas con el aporte 0..1 de cada celda.
+
+    ``None`` marca una columna de sistema desconocida (drift): no participa
+    ni en la suma ni en el total de pesos de esa torre, igual que en las
+    properties.
+    """
+    es_decimal = capitulo in _CAPITULOS_DECIMAL
+    matriz = []
+    for fila in filas:
+        avances = fila.avances_dict if es_decimal else None
+        vector = []
+        for columna in columnas:
+            if columna['es_sistema']:
+                if es_decimal:
+                    valor = avances.get(columna['clave'])
+                elif hasattr(fila, columna['clave']):
+                    valor = 1 if getattr(fila, columna['clave']) else 0
+                else:
+                    valor = None
+            else:
+                raw = valor_custom(valores, columna['id'], columna['tipo_valor'], fila.torre_id)
+                if not es_decimal:
+                    valor = 1 if raw else 0
+                elif isinstance(raw, bool):
+                    valor = Decimal('1') if raw else Decimal('0')
+                else:
+                    valor = Decimal(str(raw))
+            vector.append(valor)
+        matriz.append(vector)
+    return matriz
+
+
+def _sumproducto(pesos, vector, es_decimal):
+    total_peso = Decimal('0') if es_decimal else 0
+    suma = Decimal('0') if es_decimal else 0
+    for peso, valor in zip(pesos, vector):
+        if valor is None:
+            continue
+        total_peso += peso
+        suma += (Decimal(valor) if es_decimal else valor) * peso
+    if total_peso == 0:
+        return Decimal('0') if es_decimal else 0
+    return suma / total_peso
+
+
+def avance_ponderado_por_torre(proyecto, capitulo, filas=None, cargado=None) -> dict:
+    """``{torre_id: avance 0..1}`` de todas las torres del capítulo.
+
+    ``filas`` son las instancias del modelo del capítulo (``ObraCivilTorre``,
+    ``MontajeEstructuraTorre`` o ``TendidoTorre``); si no se pasan se cargan
+    todas las del proyecto. ``cargado`` permite reusar el resultado de
+    ``cargar_columnas_y_valores`` entre capítulos (Tendido conductor+fibra).
+    """
+    if filas is None:
+        filas = list(_modelo_capitulo(capitulo).objects.filter(proyecto=proyecto))
+    if cargado is None:
+        cargado = cargar_columnas_y_valores(proyecto, [capitulo])
+    columnas, valores = cargado
+    columnas = columnas.get(capitulo, [])
+
+    es_decimal = capitulo in _CAPITULOS_DECIMAL
+    pesos = [Decimal(c['peso_pct']) if es_decimal else c['peso_pct'] for c in columnas]
+    matriz = _matriz(capitulo, columnas, valores, filas)
+    return {
+        fila.torre_id: _sumproducto(pesos, vector, es_decimal)
+        for fila, vector in zip(filas, matriz)
+    }
+
+
+def aplicar_avance_ponderado(proyecto, capitulos, filas, cargado=None) -> tuple[dict, dict]:
+    """Calcula los ``capitulos`` para ``filas`` y lo fija en cada instancia.
+
+    Tras esta llamada ``fila.avance_ponderado`` (o ``avance_conductor`` /
+    ``avance_fibra``) devuelve el valor precalculado sin queries. Pensado para
+    vistas de solo lectura: si la instancia se modifica después, el valor
+    fijado queda viejo. Devuelve ``cargado`` para reusar los valores EAV.
+    """
+    if cargado is None:
+        cargado = cargar_columnas_y_valores(proyecto, capitulos)
+    for capitulo in capitulos:
+        avances = avance_ponderado_por_torre(proyecto, capitulo, filas, cargado)
+        for fila in filas:
+            fila.__dict__.setdefault('_avance_lote', {})[capitulo] = avances[fila.torre_id]
+    return cargado
@@ -27,6 +27,12 @@ None. Esto permite distribuir el avance acumulado a lo largo del tiempo.
 
 Las fases del contrato son las de ``DashboardAvanceSemanal.Fase``:
 ``OOCC`` (Obra Civil), ``MONTAJE``, ``TENDIDO``.
+
+Lecturas materializadas: el avance por torre (pct, fecha de avance, etapas
+pendientes y tramo de Gantt) se calcula UNA vez por escritura en
+``materializar_avance_torres`` y queda en ``AvanceTorreFase``. Curva S real,
+vista por torre, Gantt consolidado y los % de fase de ``avance_general`` leen
+de ahí, así que su costo ya no crece con torres × patas.
 """
 from __future__ import annotations
 
@@ -324,6 +330,203 @@ def _tendido_torres(proyecto):
             .select_related('torre', 'proyecto'))
 
 
+# ==========================================================================
+# Avance materializado por torre (AvanceTorreFase)
+# ==========================================================================
+
+def _etapa_oc_completa(patas, campo, es_bool) -> bool:
+    """True si TODAS las patas tienen la etapa al 100%."""
+    if es_bool:
+        return all(bool(getattr(p, campo, False)) for p in patas)
+    return all(_to_float(getattr(p, campo, 0)) >= 1.0 for p in patas)
+
+
+def _pendientes_oc(patas) -> list:
+    return [label for _c, label, campo, _pa, _d, es_bool in ETAPAS_OC_PESOS
+            if not _etapa_oc_completa(patas, campo, es_bool)]
+
+
+def _pendientes_montaje(d) -> list:
+    return [label for (_c, label, campo, _pa, _df) in ETAPAS_MONTAJE_PESOS
+            if not bool(getattr(d, campo, False))]
+
+
+def _pendientes_tendido(t) -> list:
+    return [label for (_c, label, campo, _pa, _df)
+            in ETAPAS_TENDIDO_CONDUCTOR_PESOS + ETAPAS_TENDIDO_FIBRA_PESOS
+            if not bool(getattr(t, campo, False))]
+
+
+def _fechas_fase_torre(fase_torre) -> list:
+    """Fechas reales diligenciadas en ``FaseTorre`` (sin filtrar futuras)."""
+    if fase_torre is None:
+        return []
+    fechas = [getattr(fase_torre, campo, None) for campo in _CAMPOS_FECHA_TENDIDO_FASETORRE]
+    return [fecha for fecha in fechas if fecha]
+
+
+def _filas_materializadas_oc(proyecto_id, torre_ids):
+    from collections import defaultdict
+    from .models_b3_oc_detalle import ObraCivilTorreDetalle
+    qs = ObraCivilTorreDetalle.objects.filter(proyecto_id=proyecto_id).select_related('proyecto')
+    if torre_ids is not None:
+        qs = qs.filter(torre_id__in=torre_ids)
+    by_torre = defaultdict(list)
+    for det in qs:
+        by_torre[det.torre_id].append(det)
+    for torre_id, patas in by_torre.items():
+        yield torre_id, {
+            'avance': _avance_oc_torre(patas),
+            # Ancla en la fecha más reciente entre las patas de la torre.
+            'fecha_avance': max(fecha_avance_oc(p) for p in patas),
+            'pendientes': _pendientes_oc(patas),
+        }
+
+
+def _filas_materializadas_montaje(proyecto_id, torre_ids):
+    from .models_b3_mont_detalle import MontajeEstructuraTorreDetalle
+    qs = MontajeEstructuraTorreDetalle.objects.filter(proyecto_id=proyecto_id)
+    if torre_ids is not None:
+        qs = qs.filter(torre_id__in=torre_ids)
+    for d in qs:
+        fechas = [f for f in (d.prearmado_fecha_inicio, d.prearmado_fecha_fin,
+                              d.montaje_fecha_inicio, d.montaje_fecha_fin) if f]
+        yield d.torre_id, {
+            'avance': _to_float(d.avance_ponderado),
+            'fecha_avance': fecha_avance_montaje(d),
+            'pendientes': _pendientes_montaje(d),
+            'fecha_inicio': min(fechas) if fechas else None,
+            'fecha_fin': max(fechas) if fechas else None,
+            'fecha_orden': d.montaje_fecha_fin,
+        }
+
+
+def _filas_materializadas_tendido(proyecto_id, torre_ids):
+    """Torres con ``TendidoTorre`` (avance) + torres con solo ``FaseTorre``
+    (únicamente fechas de Gantt, ``con_detalle=False``)."""
+    from .models import FaseTorre, TendidoTorre
+    tendidos = (TendidoTorre.objects
+                .filter(proyecto_id=proyecto_id)
+                .select_related('proyecto', 'torre', 'torre__fase')
+                .prefetch_related('proyecto__columnas_configurables'))
+    fases = FaseTorre.objects.filter(proyecto_id=proyecto_id)
+    if torre_ids is not None:
+        tendidos = tendidos.filter(torre_id__in=torre_ids)
+        fases = fases.filter(torre_id__in=torre_ids)
+
+    vistos = set()
+    for t in tendidos:
+        vistos.add(t.torre_id)
+        fechas = _fechas_fase_torre(getattr(t.torre, 'fase', None))
+        yield t.torre_id, {
+            'avance': (_to_float(t.avance_conductor) + _to_float(t.avance_fibra)) / 2.0,
+            'fecha_avance': fecha_avance_tendido(t),
+            'pendientes': _pendientes_tendido(t),
+            'fecha_inicio': min(fechas) if fechas else None,
+            'fecha_fin': max(fechas) if fechas else None,
+            'fecha_orden': max(fechas) if fechas else None,
+        }
+    for fase_torre in fases.exclude(torre_id__in=vistos):
+        fechas = _fechas_fase_torre(fase_torre)
+        yield fase_torre.torre_id, {
+            'con_detalle': False,
+            'fecha_inicio': min(fechas) if fechas else None,
+            'fecha_fin': max(fechas) if fechas else None,
+            'fecha_orden': max(fechas) if fechas else None,
+        }
+
+
+#: Capítulo de ``ColumnaConfigurable`` -> fase cuyo avance materializado
+#: depende de su peso. El detalle OC pondera con ``proyecto.peso_*_pct`` (que
+#: el signal de ``ProyectoConstruccion`` sincroniza a las columnas); Tendido
+#: lee las columnas directamente. Montaje detalle usa pesos fijos.
+FASE_POR_CAPITULO_PESO_PROYECTO = {
+    'OBRA_CIVIL': FASE_OOCC,
+    'TENDIDO_CONDUCTOR': FASE_TENDIDO,
+    'TENDIDO_FIBRA': FASE_TENDIDO,
+}
+
+_FILAS_MATERIALIZADAS = {
+    FASE_OOCC: _filas_materializadas_oc,
+    FASE_MONTAJE: _filas_materializadas_montaje,
+    FASE_TENDIDO: _filas_materializadas_tendido,
+}
+
+
+def materializar_avance_torres(proyecto, fase, torre_ids=None) -> int:
+    """Recalcula ``AvanceTorreFase`` del proyecto en la fase.
+
+    ``torre_ids`` acota el recálculo a esas torres (receivers de signal); con
+    ``None`` se regenera la fase completa. Las torres del alcance que ya no
+    tienen detalle se eliminan de la tabla. Incluye torres ``aplica=False``:
+    el filtro #160 se aplica al leer, así que cambiar ``aplica`` no exige
+    recalcular. Devuelve el número de filas escritas.
+    """
+    from .models_avance_torre import AvanceTorreFase
+
+    fase = (fase or '').upper()
+    generador = _FILAS_MATERIALIZADAS.get(fase)
+    if generador is None:
+        return 0
+    proyecto_id = getattr(proyecto, 'pk', proyecto)
+    if torre_ids is not None:
+        torre_ids = list(torre_ids)
+
+    filas = []
+    for torre_id, valores in generador(proyecto_id, torre_ids):
+        filas.append(AvanceTorreFase(
+            proyecto_id=proyecto_id,
+            torre_id=torre_id,
+            fase=fase,
+            con_detalle=valores.get('con_detalle', True),
+            avance=Decimal(str(round(valores.get('avance', 0.0), 6))),
+            fecha_avance=valores.get('fecha_avance'),
+            pendientes=valores.get('pendientes', []),
+            fecha_inicio=valores.get('fecha_inicio'),
+            fecha_fin=valores.get('fecha_fin'),
+            fecha_orden=valores.get('fecha_orden'),
+        ))
+
+    obsoletas = AvanceTorreFase.objects.filter(proyecto_id=proyecto_id, fase=fase)
+    if torre_ids is not None:
+        obsoletas = obsoletas.filter(torre_id__in=torre_ids)
+    obsoletas.exclude(torre_id__in=[f.torre_id for f in filas]).delete()
+
+    if filas:
+        AvanceTorreFase.objects.bulk_create(
+            filas,
+            update_conflicts=True,
+            unique_fields=['torre', 'fase'],
+            update_fields=[
+                'proyecto', 'con_detalle', 'avance', 'fecha_avance', 'pendientes',
+                'fecha_inicio', 'fecha_fin', 'fecha_orden', 'updated_at',
+            ],
+        )
+    return len(filas)
+
+
+def _avances_torre(proyecto, fase, con_detalle=True) -> list:
+    """Filas ``AvanceTorreFase`` de torres ``aplica=True`` (#160) de la fase.
+
+    Si la fase del proyecto nunca se materializó (datos previos a la tabla)
+    se regenera en el momento — autocorrección barata: un proyecto sin
+    detalle solo cuesta las queries vacías del generador.
+    """
+    from .models_avance_torre import AvanceTorreFase
+
+    def _leer():
+        qs = AvanceTorreFase.objects.filter(proyecto=proyecto, fase=fase, torre__aplica=True)
+        if con_detalle is not None:
+            qs = qs.filter(con_detalle=con_detalle)
+        return list(qs.select_related('torre'))
+
+    filas = _leer()
+    if not filas and not AvanceTorreFase.objects.filter(proyecto=proyecto, fase=fase).exists():
+        if materializar_avance_torres(proyecto, fase):
+            filas = _leer()
+    return filas
+
+
 # ==========================================================================
 # serie_curva_s_real — núcleo del punto 1
 # ==========================================================================
@@ -363,27 +566,14 @@ def serie_curva_s_real(proyecto, fase) -> dict:
 
     fase ∈ {OOCC, MONTAJE, TENDIDO}. Devuelve {'labels', 'ejecutado'}.
     Para TENDIDO el avance por torre = promedio(avance_conductor, avance_fibra).
+    Lee el avance y la fecha ya calculados de ``AvanceTorreFase``.
     """
     fase = (fase or '').upper()
-    n_torres = proyecto.torres.filter(aplica=True).count() or 0
-    pares = []
-
-    if fase == FASE_OOCC:
-        for torre_id, patas in _detalles_oc_por_torre(proyecto).items():
-            avance = _avance_oc_torre(patas)
-            # Ancla en la fecha más reciente entre las patas de la torre.
-            fecha = max(fecha_avance_oc(p) for p in patas)
-            pares.append((fecha, avance))
-    elif fase == FASE_MONTAJE:
-        for d in _detalles_montaje(proyecto):
-            pares.append((fecha_avance_montaje(d), _to_float(d.avance_ponderado)))
-    elif fase == FASE_TENDIDO:
-        for t in _tendido_torres(proyecto):
-            avance = (_to_float(t.avance_conductor) + _to_float(t.avance_fibra)) / 2.0
-            pares.append((fecha_avance_tendido(t), avance))
-    else:
+    if fase not in FASES_VALIDAS:
         return {'labels': [], 'ejecutado': []}
-
+    n_torres = proyecto.torres.filter(aplica=True).count() or 0
+    pares = [(fila.fecha_avance, _to_float(fila.avance))
+             for fila in _avances_torre(proyecto, fase)]
     return _acumular_por_fecha(pares, n_torres)
 
 
@@ -601,7 +791,8 @@ def gantt_consolidado(proyecto, orden='numero') -> list:
     Tendido no tiene fechas en ``TendidoTorre``: las fechas reales se capturan
     en la relación legacy ``FaseTorre``.  Por eso su tramo se forma entre la
     primera y última fecha diligenciada allí, sin usar ``updated_at`` (que es
-    fecha de guardado, no de ejecución).
+    fecha de guardado, no de ejecución). Los tramos de Montaje y Tendido se
+    leen ya resueltos de ``AvanceTorreFase``.
     """
     filas = []
 
@@ -613,49 +804,20 @@ def gantt_consolidado(proyecto, orden='numero') -> list:
             'orden_bloque': 0,
         })
 
-    from .models_b3_mont_detalle import MontajeEstructuraTorreDetalle
-    montajes = (MontajeEstructuraTorreDetalle.objects
-                .filter(proyecto=proyecto, torre__aplica=True)
-                .select_related('torre'))
-    for detalle in montajes:
-        fechas = [
-            detalle.prearmado_fecha_inicio,
-            detalle.prearmado_fecha_fin,
-            detalle.montaje_fecha_inicio,
-            detalle.montaje_fecha_fin,
-        ]
-        fechas = [fecha for fecha in fechas if fecha]
-        if not fechas:
-            continue
-        filas.append({
-            'bloque': 'Montaje',
-            'torre': detalle.torre.numero_display or (detalle.torre.numero or ''),
-            'inicio': min(fechas).isoformat(),
-            'esperada': None,
-            'final': max(fechas).isoformat(),
-            'fecha_orden': detalle.montaje_fecha_fin,
-            'orden_bloque': 1,
-        })
-
-    from .models import FaseTorre
-    tendidos = (FaseTorre.objects
-                .filter(proyecto=proyecto, torre__aplica=True)
-                .select_related('torre'))
-    for fase in tendidos:
-        fechas = [getattr(fase, campo, None)
-                  for campo in _CAMPOS_FECHA_TENDIDO_FASETORRE]
-        fechas = [fecha for fecha in fechas if fecha]
-        if not fechas:
-            continue
-        filas.append({
-            'bloque': 'Tendido',
-            'torre': fase.torre.numero_display or (fase.torre.numero or ''),
-            'inicio': min(fechas).isoformat(),
-            'esperada': None,
-            'final': max(fechas).isoformat(),
-            'fecha_orden': max(fechas),
-            'orden_bloque': 2,
-        })
+    for fase, bloque, orden_bloque in ((FASE_MONTAJE, 'Montaje', 1),
+                                       (FASE_TENDIDO, 'Tendido', 2)):
+        for avance in _avances_torre(proyecto, fase, con_detalle=None):
+            if not avance.fecha_inicio:
+                continue
+            filas.append({
+                'bloque': bloque,
+                'torre': avance.torre.numero_display or (avance.torre.numero or ''),
+                'inicio': avance.fecha_inicio.isoformat(),
+                'esperada': None,
+                'final': avance.fecha_fin.isoformat(),
+                'fecha_orden': avance.fecha_orden,
+                'orden_bloque': orden_bloque,
+            })
 
     return _sin_fecha_orden(
         ordenar_filas_dashboard(filas, orden, claves_precedencia=('orden_bloque',))
@@ -706,11 +868,7 @@ def avance_por_etapa(proyecto, fase) -> list:
             totales = len(by_torre)
             completas = 0
             for _torre_id, patas in by_torre.items():
-                if es_bool:
-                    ok = all(bool(getattr(p, campo, False)) for p in patas)
-                else:
-                    ok = all(_to_float(getattr(p, campo, 0)) >= 1.0 for p in patas)
-                if ok:
+                if _etapa_oc_completa(patas, campo, es_bool):
                     completas += 1
             pct = round((completas / totales) * 100, 2) if totales else 0.0
             resultado.append({'etapa': codigo, 'label': label, 'pct': pct,
@@ -760,34 +918,23 @@ def avance_por_etapa_tendido(proyecto) -> dict:
 # vista_por_torre — punto 3
 # ==========================================================================
 
-def _fechas_rectoras_por_torre(proyecto, fase):
+def _fechas_rectoras_por_torre(proyecto, fase, avances):
     """Devuelve la fecha real rectora disponible de cada torre por fase.
 
     No usa ``updated_at`` ni ``created_at``: ambos describen cuándo se guardó
     un registro, no cuándo se ejecutó el trabajo. Las torres legacy sin fecha
     quedan explícitamente en ``None`` para que el orden cronológico las deje al
-    final.
+    final. Montaje (``montaje_fecha_fin``) y Tendido (MAX de ``FaseTorre``)
+    vienen materializadas en ``avances``; Obra Civil se lee de
+    ``ObraCivilTorre.fecha_final``, que no depende del detalle por pata.
     """
     fase = (fase or '').upper()
     if fase == FASE_OOCC:
         from .models import ObraCivilTorre
-        return {
-            fila.torre_id: fila.fecha_final
-            for fila in ObraCivilTorre.objects.filter(proyecto=proyecto, torre__aplica=True)
-        }
-    if fase == FASE_MONTAJE:
-        return {
-            fila.torre_id: fila.montaje_fecha_fin
-            for fila in _detalles_montaje(proyecto)
-        }
-    if fase == FASE_TENDIDO:
-        from .models import FaseTorre
-        fechas = {}
-        for fila in FaseTorre.objects.filter(proyecto=proyecto, torre__aplica=True):
-            candidatas = [getattr(fila, campo, None) for campo in _CAMPOS_FECHA_TENDIDO_FASETORRE]
-            fechas[fila.torre_id] = max((fecha for fecha in candidatas if fecha), default=None)
-        return fechas
-    return {}
+        return dict(ObraCivilTorre.objects
+                    .filter(proyecto=proyecto, torre__aplica=True)
+                    .values_list('torre_id', 'fecha_final'))
+    return {avance.torre_id: avance.fecha_orden for avance in avances}
 
 
 def vista_por_torre(proyecto, fase, orden='numero') -> list:
@@ -799,67 +946,24 @@ def vista_por_torre(proyecto, fase, orden='numero') -> list:
     ambos sets.
     """
     fase = (fase or '').upper()
+    avances = _avances_torre(proyecto, fase) if fase in FASES_VALIDAS else []
     resultado = []
-
-    if fase == FASE_OOCC:
-        by_torre = _detalles_oc_por_torre(proyecto)
-        # Necesitamos numero por torre.
-        from .models import TorreConstruccion
-        numeros = {t.id: t.numero for t in
-                   TorreConstruccion.objects.filter(proyecto=proyecto, aplica=True)}
-        for torre_id, patas in by_torre.items():
-            pct = round(_avance_oc_torre(patas) * 100, 2)
-            pendientes = []
-            for codigo, label, campo, _pa, _d, es_bool in ETAPAS_OC_PESOS:
-                if es_bool:
-                    ok = all(bool(getattr(p, campo, False)) for p in patas)
-                else:
-                    ok = all(_to_float(getattr(p, campo, 0)) >= 1.0 for p in patas)
-                if not ok:
-                    pendientes.append(label)
-            resultado.append({
-                'torre_id': torre_id,
-                'numero': numeros.get(torre_id, ''),
-                'pct': pct,
-                'completa': pct >= 100.0,
-                'pendientes': pendientes,
-            })
-    elif fase == FASE_MONTAJE:
-        for d in _detalles_montaje(proyecto):
-            pct = round(_to_float(d.avance_ponderado) * 100, 2)
-            pendientes = [label for (_c, label, campo, _pa, _df) in ETAPAS_MONTAJE_PESOS
-                          if not bool(getattr(d, campo, False))]
-            resultado.append({
-                'torre_id': d.torre_id,
-                'numero': getattr(d.torre, 'numero', ''),
-                'pct': pct,
-                'completa': pct >= 100.0,
-                'pendientes': pendientes,
-            })
-    elif fase == FASE_TENDIDO:
-        for t in _tendido_torres(proyecto):
-            pct = round(((_to_float(t.avance_conductor) + _to_float(t.avance_fibra)) / 2.0) * 100, 2)
-            pendientes = []
-            for _c, label, campo, _pa, _df in ETAPAS_TENDIDO_CONDUCTOR_PESOS:
-                if not bool(getattr(t, campo, False)):
-                    pendientes.append(label)
-            for _c, label, campo, _pa, _df in ETAPAS_TENDIDO_FIBRA_PESOS:
-                if not bool(getattr(t, campo, False)):
-                    pendientes.append(label)
-            resultado.append({
-                'torre_id': t.torre_id,
-                'numero': getattr(t.torre, 'numero', ''),
-                'pct': pct,
-                'completa': pct >= 100.0,
-                'pendientes': pendientes,
-            })
+    for avance in avances:
+        pct = round(_to_float(avance.avance) * 100, 2)
+        resultado.append({
+            'torre_id': avance.torre_id,
+            'numero': avance.torre.numero or '',
+            'pct': pct,
+            'completa': pct >= 100.0,
+            'pendientes': list(avance.pendientes),
+        })
 
     # #161: una torre al 100% no tiene nada pendiente — limpiar la lista para que
     # el dashboard no muestre etapas "pendientes" en torres completas.
     for r in resultado:
         if r['completa']:
             r['pendientes'] = []
-    fechas_rectoras = _fechas_rectoras_por_torre(proyecto, fase)
+    fechas_rectoras = _fechas_rectoras_por_torre(proyecto, fase, avances)
     for fila in resultado:
         fila['fecha_orden'] = fechas_rectoras.get(fila['torre_id'])
     return _sin_fecha_orden(ordenar_filas_dashboard(resultado, orden, clave_torre='numero'))
@@ -888,34 +992,29 @@ def _pct_preliminares(proyecto):
     return round(sum(vals) / len(vals), 2) if vals else 0.0
 
 
-def _pct_obra_civil(proyecto):
-    # Deriva del oc_detalle real (257 filas en prod) — mismo origen que la Curva
-    # S real, NO del porcentaje_avance_civil_ponderado legacy (que cuelga de
-    # torre.pata_obra y sale en 0% cuando el avance real está en oc_detalle).
-    by_torre = _detalles_oc_por_torre(proyecto)
+def _pct_fase_materializada(proyecto, fase):
+    # Deriva del detalle real (oc_detalle: 257 filas en prod) vía
+    # AvanceTorreFase — mismo origen que la Curva S real, NO del
+    # porcentaje_avance_civil_ponderado legacy (que cuelga de torre.pata_obra
+    # y sale en 0% cuando el avance real está en oc_detalle).
+    avances = _avances_torre(proyecto, fase)
     n = proyecto.torres.filter(aplica=True).count() or 0
-    if n == 0 or not by_torre:
+    if n == 0 or not avances:
         return 0.0
-    suma = sum(_avance_oc_torre(patas) for patas in by_torre.values())
+    suma = sum(_to_float(a.avance) for a in avances)
     return round((suma / n) * 100, 2)
 
 
+def _pct_obra_civil(proyecto):
+    return _pct_fase_materializada(proyecto, FASE_OOCC)
+
+
 def _pct_montaje(proyecto):
-    detalles = list(_detalles_montaje(proyecto))
-    n = proyecto.torres.filter(aplica=True).count() or 0
-    if n == 0 or not detalles:
-        return 0.0
-    suma = sum(_to_float(d.avance_ponderado) for d in detalles)
-    return round((suma / n) * 100, 2)
+    return _pct_fase_materializada(proyecto, FASE_MONTAJE)
 
 
 def _pct_tendido(proyecto):
-    torres = list(_tendido_torres(proyecto))
-    n = proyecto.torres.filter(aplica=True).count() or 0
-    if n == 0 or not torres:
-        return 0.0
-    suma = sum((_to_float(t.avance_conductor) + _to_float(t.avance_fibra)) / 2.0 for t in torres)
-    return round((suma / n) * 100, 2)
+    return _pct_fase_materializada(proyecto, FASE_TENDIDO)
 
 
 def _pct_spt_pintura(proyecto):
@@ -0,0 +1,33 @@
+"""
+Procesador de la carga del Excel PDEO (ver ``apps.core.importaciones``).
+
+La hoja BD trae ~23K transacciones: ``TransaccionesUploadView`` encola los
+archivos grandes y el worker corre este procesador. Todo el import va en
+una sola transacción — ``import_pdeo_workbook`` acumula los movimientos y
+los aplica al final, así que un corte a mitad de camino no debe dejar
+transacciones sin su movimiento. Al reintentar se empieza de cero (el
+importador es idempotente).
+"""
+from django.db import transaction
+from django.urls import reverse
+
+
+def procesar_pdeo(archivo, parametros, usuario=None, progreso=None):
+    """``parametros``: ``proyecto_id``."""
+    from .models import ProyectoConstruccion
+    from .pdeo_importer import import_pdeo_workbook
+
+    proyecto = ProyectoConstruccion.objects.get(pk=parametros['proyecto_id'])
+    with transaction.atomic():
+        stats = import_pdeo_workbook(archivo, proyecto, usuario=usuario)
+
+    return {
+        'resultado': stats,
+        'mensajes': [[
+            'success',
+            f"PDEO cargado: {stats['transacciones_creadas']} transacciones nuevas, "
+            f"{stats['transacciones_omitidas']} omitidas por duplicado, "
+            f"{stats['movimientos_actualizados']} movimientos actualizados.",
+        ]],
+        'redirect_url': reverse('construccion:transacciones_list'),
+    }
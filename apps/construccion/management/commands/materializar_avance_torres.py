@@ -0,0 +1,34 @@
+"""Regenera ``AvanceTorreFase`` (avance materializado por torre y fase).
+
+Los signals lo mantienen al día; este comando es para el backfill inicial
+(después de migrar) o para reparar la tabla si se editó el detalle con
+``QuerySet.update()`` / SQL directo (no disparan signals).
+
+Uso:
+    python manage.py materializar_avance_torres
+    python manage.py materializar_avance_torres --proyecto <uuid>
+"""
+from django.core.management.base import BaseCommand
+
+from apps.construccion.calculators_avance_real import FASES_VALIDAS, materializar_avance_torres
+from apps.construccion.models import ProyectoConstruccion
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el avance materializado por torre y fase de los dashboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proyecto', type=str, default=None,
+                            help='UUID de un proyecto específico')
+
+    def handle(self, *args, **opts):
+        qs = ProyectoConstruccion.objects.all()
+        if opts['proyecto']:
+            qs = qs.filter(id=opts['proyecto'])
+
+        for proyecto in qs:
+            filas = {fase: materializar_avance_torres(proyecto, fase) for fase in FASES_VALIDAS}
+            self.stdout.write(self.style.SUCCESS(
+                f'  ✓ {proyecto.nombre[:50]} → '
+                + ' '.join(f'{fase}:{n}' for fase, n in filas.items())
+            ))
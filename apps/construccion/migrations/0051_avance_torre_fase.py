@@ -0,0 +1,38 @@
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('construccion', '0050_s1_programacion_semanal_construccion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvanceTorreFase',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('fase', models.CharField(max_length=10, verbose_name='Fase')),
+                ('con_detalle', models.BooleanField(default=True, help_text='False = la torre solo aporta fechas (Gantt), no avance.', verbose_name='Con detalle de avance')),
+                ('avance', models.DecimalField(decimal_places=6, default=0, max_digits=9, verbose_name='Avance (0..1)')),
+                ('fecha_avance', models.DateField(blank=True, help_text='Ancla de la Curva S real (cascada fecha_avance_*).', null=True, verbose_name='Fecha de avance')),
+                ('pendientes', models.JSONField(blank=True, default=list, verbose_name='Etapas pendientes')),
+                ('fecha_inicio', models.DateField(blank=True, null=True, verbose_name='Inicio (Gantt)')),
+                ('fecha_fin', models.DateField(blank=True, null=True, verbose_name='Fin (Gantt)')),
+                ('fecha_orden', models.DateField(blank=True, help_text='Fecha usada por el orden cronológico de los dashboards.', null=True, verbose_name='Fecha real rectora')),
+                ('proyecto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='avances_torre_fase', to='construccion.proyectoconstruccion')),
+                ('torre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='avances_fase', to='construccion.torreconstruccion')),
+            ],
+            options={
+                'verbose_name': 'Avance materializado por torre y fase',
+                'verbose_name_plural': 'Avances materializados por torre y fase',
+                'db_table': 'construccion_avance_torre_fase',
+                'unique_together': {('torre', 'fase')},
+                'indexes': [models.Index(fields=['proyecto', 'fase'], name='idx_avance_torre_proy_fase')],
+            },
+        ),
+    ]
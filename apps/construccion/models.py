@@ -938,7 +938,8 @@ def sync_columnas_sistema_pesos_proyecto(proyecto):
 
     Llamada desde el signal `post_save` de `ProyectoConstruccion` en cada
     UPDATE (`created=False`, ver signals.py) — cubre TODO save(), no solo
-    las 3 vistas legacy conocidas hoy.
+    las 3 vistas legacy conocidas hoy. Devuelve el set de capítulos cuyo
+    peso cambió (el signal re-materializa el avance de esas fases).
     """
     peso_field_por_clave = {
         (capitulo, clave): peso_field
@@ -957,6 +958,7 @@ def sync_columnas_sistema_pesos_proyecto(proyecto):
             cambiadas.append(fila)
     if cambiadas:
         ColumnaConfigurable.objects.bulk_update(cambiadas, ['peso_pct'])
+    return {fila.capitulo for fila in cambiadas}
 
 
 class PataObra(BaseModel):
@@ -1313,11 +1315,17 @@ class ObraCivilTorre(BaseModel):
 
         Itera `self.proyecto.columnas_configurables.all()` (no `.filter()`
         directo) para poder aprovechar `prefetch_related` desde las vistas
-        de matriz (B7) sin N+1 queries por torre.
+        de matriz (B7) sin N+1 queries por torre. Las matrices usan además
+        `calculators_avance_ponderado.aplicar_avance_ponderado`, que calcula
+        todas las torres del proyecto de una vez y deja el resultado en
+        `_avance_lote` (esta property lo devuelve sin recalcular).
 
         Devuelve un valor 0–1. El cliente ve el % multiplicando por 100.
         """
         from decimal import Decimal
+        precalculado = self.__dict__.get('_avance_lote', {}).get(ColumnaConfigurable.CAPITULO_OBRA_CIVIL)
+        if precalculado is not None:
+            return precalculado  # calculators_avance_ponderado.aplicar_avance_ponderado
         avances = self.avances_dict
         columnas_activas = [
             c for c in self.proyecto.columnas_configurables.all()
@@ -1465,6 +1473,9 @@ class MontajeEstructuraTorre(BaseModel):
         Valor 0-1.
         """
         from decimal import Decimal
+        precalculado = self.__dict__.get('_avance_lote', {}).get(ColumnaConfigurable.CAPITULO_MONTAJE)
+        if precalculado is not None:
+            return precalculado  # calculators_avance_ponderado.aplicar_avance_ponderado
         avances = self.avances_dict
         columnas_activas = [
             c for c in self.proyecto.columnas_configurables.all()
@@ -1766,7 +1777,13 @@ class TendidoTorre(BaseModel):
         docstring de `ObraCivilTorre.avance_ponderado` para el detalle
         completo (columnas es_sistema vs custom, redistribución de peso al
         desactivar, prefetch-friendly). Devuelve un valor 0-1 (float).
+
+        Las matrices precalculan todas las torres de una vez con
+        `calculators_avance_ponderado.aplicar_avance_ponderado`.
         """
+        precalculado = self.__dict__.get('_avance_lote', {}).get(capitulo)
+        if precalculado is not None:
+            return precalculado
         columnas_activas = [
             c for c in self.proyecto.columnas_configurables.all()
             if c.capitulo == capitulo and c.activa
@@ -3399,3 +3416,6 @@ from .models_fin import *  # noqa: E402,F401,F403
 
 # === #171 Hochiminh Fase 1 (2026-07-12) — marcación/replanteo por torre ===
 from .models_hochiminh import *  # noqa: E402,F401,F403
+
+# === Avance materializado por torre y fase (dashboards de fase) ===
+from .models_avance_torre import *  # noqa: E402,F401,F403
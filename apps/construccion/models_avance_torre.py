@@ -0,0 +1,74 @@
+"""Avance materializado por (proyecto, torre, fase) para los dashboards de fase.
+
+Los dashboards (``calculators_avance_real``: Curva S real, vista por torre,
+Gantt consolidado y Dashboard General) recargaban en cada hit TODOS los
+``ObraCivilTorreDetalle`` (hasta 4 patas por torre),
+``MontajeEstructuraTorreDetalle`` y ``TendidoTorre`` del proyecto y
+recalculaban ``avance_ponderado`` / ``avance_conductor`` / ``avance_fibra`` en
+Python — latencia proporcional a torres × patas (y, en Tendido, una query de
+``ColumnaConfigurable`` por torre).
+
+``AvanceTorreFase`` guarda el resultado ya calculado, una fila por torre y
+fase. Se mantiene con ``calculators_avance_real.materializar_avance_torres``,
+invocado desde los receivers de ``signals_b3_oc_detalle`` /
+``signals_b3_mont_detalle`` / ``signals_avance_torre``. Es un CACHE: la
+fuente de verdad sigue siendo el detalle; se puede regenerar completo con
+``python manage.py materializar_avance_torres``.
+"""
+import uuid
+
+from django.db import models
+
+from apps.core.models import BaseModel
+from .models import ProyectoConstruccion, TorreConstruccion
+
+
+class AvanceTorreFase(BaseModel):
+    """Avance real (0..1) de UNA torre en UNA fase del dashboard.
+
+    ``fase`` usa las etiquetas de ``DashboardAvanceSemanal.Fase``
+    (OOCC / MONTAJE / TENDIDO). ``con_detalle`` distingue las torres que
+    tienen registro de avance en la fase (OC detalle, Montaje detalle o
+    ``TendidoTorre``) de las que solo aportan fechas al Gantt (Tendido con
+    ``FaseTorre`` pero sin matriz CANT TENDIDO).
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    proyecto = models.ForeignKey(
+        ProyectoConstruccion, on_delete=models.CASCADE,
+        related_name='avances_torre_fase',
+    )
+    torre = models.ForeignKey(
+        TorreConstruccion, on_delete=models.CASCADE,
+        related_name='avances_fase',
+    )
+    fase = models.CharField('Fase', max_length=10)
+    con_detalle = models.BooleanField(
+        'Con detalle de avance', default=True,
+        help_text='False = la torre solo aporta fechas (Gantt), no avance.',
+    )
+    avance = models.DecimalField(
+        'Avance (0..1)', max_digits=9, decimal_places=6, default=0,
+    )
+    fecha_avance = models.DateField(
+        'Fecha de avance', null=True, blank=True,
+        help_text='Ancla de la Curva S real (cascada fecha_avance_*).',
+    )
+    pendientes = models.JSONField('Etapas pendientes', default=list, blank=True)
+    fecha_inicio = models.DateField('Inicio (Gantt)', null=True, blank=True)
+    fecha_fin = models.DateField('Fin (Gantt)', null=True, blank=True)
+    fecha_orden = models.DateField(
+        'Fecha real rectora', null=True, blank=True,
+        help_text='Fecha usada por el orden cronológico de los dashboards.',
+    )
+
+    class Meta:
+        db_table = 'construccion_avance_torre_fase'
+        verbose_name = 'Avance materializado por torre y fase'
+        verbose_name_plural = 'Avances materializados por torre y fase'
+        unique_together = [('torre', 'fase')]
+        indexes = [
+            models.Index(fields=['proyecto', 'fase'], name='idx_avance_torre_proy_fase'),
+        ]
+
+    def __str__(self):
+        return f'{self.fase} · {self.torre_id}: {self.avance}'
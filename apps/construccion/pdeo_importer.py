@@ -13,10 +13,13 @@ Las hojas Res EP y pyg son derivadas (cálculo) → no se cargan.
 from __future__ import annotations
 
 from decimal import Decimal, InvalidOperation
+from itertools import chain
 from typing import Any
 
 import openpyxl
 
+from apps.core.excel_streaming import en_lotes, reportar_total
+
 from .models import (
     CategoriaFinanciera,
     MovimientoFinanciero,
@@ -114,7 +117,10 @@ def _import_hoja_bd(ws, proyecto, usuario, stats):
     # Periodo | Tercero movto. | Razón social tercero movto. | Desc. C.O. movto.
     # | Usuario creación | C.O. movto. | Notas | C.Costo | Desc. C.Costo |
     # Cta equivalente | Cargo | Subcontratista | SUBCONTRATA | Q
-    rows = ws.iter_rows(min_row=2, values_only=True)
+    # En lotes de 1000 (el mismo corte del bulk_create) para que el progreso
+    # de los trabajos en segundo plano avance; ver apps/core/excel_streaming.
+    reportar_total(max(0, (ws.max_row or 0) - 1))
+    rows = chain.from_iterable(en_lotes(ws.iter_rows(min_row=2, values_only=True), 1000))
 
     # Cache de movimientos por (periodo_id, categoria_id, tipo) para evitar
     # queries repetidos en 23K filas.
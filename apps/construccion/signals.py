@@ -34,11 +34,21 @@ def crear_columnas_configurables_proyecto_nuevo(sender, instance, created, **kwa
       sobre el avance calculado — hueco encontrado durante B3/B4 (fuera
       del scope original de F2), ver docstring de
       `sync_columnas_sistema_pesos_proyecto`.
+
+    Si algún peso cambió, el avance materializado (``AvanceTorreFase``) de
+    las fases afectadas se recalcula completo.
     """
     if created:
         crear_columnas_configurables_default(instance)
         return
-    sync_columnas_sistema_pesos_proyecto(instance)
+    capitulos = sync_columnas_sistema_pesos_proyecto(instance)
+    if capitulos:
+        from .calculators_avance_real import (
+            FASE_POR_CAPITULO_PESO_PROYECTO, materializar_avance_torres,
+        )
+        fases = {FASE_POR_CAPITULO_PESO_PROYECTO.get(c) for c in capitulos} - {None}
+        for fase in sorted(fases):
+            materializar_avance_torres(instance.pk, fase)
 
 
 @receiver(post_save, sender=PinturaAeronauticaTorre)
@@ -168,3 +178,7 @@ from . import signals_b3_oc_detalle  # noqa: F401, E402
 
 # B3a (#76) — signal post_save MontajeEstructuraTorreDetalle → cache legacy
 from . import signals_b3_mont_detalle  # noqa: F401,E402
+
+# Avance materializado por torre y fase — Tendido, FaseTorre y columnas
+# configurables (OC y Montaje se mantienen desde sus propios signals).
+from . import signals_avance_torre  # noqa: F401,E402
@@ -0,0 +1,83 @@
+"""Signals — mantienen fresco ``AvanceTorreFase`` (avance materializado).
+
+Obra Civil y Montaje se recalculan desde ``signals_b3_oc_detalle`` /
+``signals_b3_mont_detalle``. Acá van las demás fuentes del avance por torre:
+
+- ``TendidoTorre``: matriz CANT TENDIDO (avance conductor/fibra).
+- ``FaseTorre``: fechas reales de Tendido (ancla de la Curva S y Gantt).
+- ``ColumnaConfigurable`` / ``ColumnaConfigurableValor`` de los capítulos de
+  Tendido: pesos y columnas custom que entran en ``avance_conductor`` /
+  ``avance_fibra``.
+
+Todos recalculan solo las torres afectadas, salvo un cambio de columna (que
+mueve el ponderado de todo el proyecto).
+
+Los ``post_delete`` ignoran los borrados en cascada (se borra la torre o el
+proyecto): las filas materializadas caen con la misma cascada, y recalcular a
+mitad del ``Collector`` podría insertar filas de una torre que está por
+desaparecer.
+"""
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.construccion.calculators_avance_real import FASE_TENDIDO, materializar_avance_torres
+from apps.construccion.models import (
+    ColumnaConfigurable,
+    ColumnaConfigurableValor,
+    FaseTorre,
+    TendidoTorre,
+)
+
+_CAPITULOS_TENDIDO = (
+    ColumnaConfigurable.CAPITULO_TENDIDO_CONDUCTOR,
+    ColumnaConfigurable.CAPITULO_TENDIDO_FIBRA,
+)
+
+
+def es_borrado_en_cascada(sender, origin) -> bool:
+    """True si el ``post_delete`` viene de borrar OTRO objeto (cascada)."""
+    if origin is None:
+        return False
+    modelo = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return modelo is not sender
+
+
+@receiver(post_save, sender=TendidoTorre)
+@receiver(post_delete, sender=TendidoTorre)
+@receiver(post_save, sender=FaseTorre)
+@receiver(post_delete, sender=FaseTorre)
+def materializar_tendido_torre(sender, instance, origin=None, **kwargs):
+    """Recalcula el avance de Tendido de la torre guardada/borrada."""
+    if es_borrado_en_cascada(sender, origin):
+        return
+    materializar_avance_torres(instance.proyecto_id, FASE_TENDIDO, [instance.torre_id])
+
+
+@receiver(post_save, sender=ColumnaConfigurable)
+@receiver(post_delete, sender=ColumnaConfigurable)
+def materializar_tendido_por_columna(sender, instance, created=False, origin=None, **kwargs):
+    """Peso/activa/alta/baja de una columna de Tendido → todo el proyecto.
+
+    Las 21 columnas de sistema se crean junto con el proyecto (sin torres
+    todavía): su alta no cambia ningún avance.
+    """
+    if instance.capitulo not in _CAPITULOS_TENDIDO:
+        return
+    if es_borrado_en_cascada(sender, origin):
+        return
+    if created and instance.es_sistema:
+        return
+    materializar_avance_torres(instance.proyecto_id, FASE_TENDIDO)
+
+
+@receiver(post_save, sender=ColumnaConfigurableValor)
+@receiver(post_delete, sender=ColumnaConfigurableValor)
+def materializar_tendido_por_valor(sender, instance, origin=None, **kwargs):
+    """Valor EAV de una columna custom de Tendido → solo esa torre."""
+    if es_borrado_en_cascada(sender, origin):
+        return
+    columna = instance.columna
+    if columna.capitulo not in _CAPITULOS_TENDIDO:
+        return
+    materializar_avance_torres(columna.proyecto_id, FASE_TENDIDO, [instance.torre_id])
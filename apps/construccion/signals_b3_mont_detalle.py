@@ -10,7 +10,7 @@ Relación: OneToOne con TorreConstruccion en ambos lados → mapeo 1↔1 vía to
 """
 from decimal import Decimal
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from apps.construccion.models_b3_mont_detalle import MontajeEstructuraTorreDetalle
@@ -56,3 +56,17 @@ def recalcular_montaje_torre(sender, instance, **kwargs):
         if nuevo and not fase.entrega_carga_fecha:
             cambios['entrega_carga_fecha'] = date.today()
         FaseTorre.objects.filter(pk=fase.pk).update(**cambios)
+
+    # Avance materializado de la torre para los dashboards de fase.
+    from apps.construccion.calculators_avance_real import FASE_MONTAJE, materializar_avance_torres
+    materializar_avance_torres(instance.proyecto_id, FASE_MONTAJE, [instance.torre_id])
+
+
+@receiver(post_delete, sender=MontajeEstructuraTorreDetalle)
+def desmaterializar_montaje_torre(sender, instance, origin=None, **kwargs):
+    """Sin detalle de Montaje la torre sale del avance materializado."""
+    from apps.construccion.signals_avance_torre import es_borrado_en_cascada
+    if es_borrado_en_cascada(sender, origin):
+        return
+    from apps.construccion.calculators_avance_real import FASE_MONTAJE, materializar_avance_torres
+    materializar_avance_torres(instance.proyecto_id, FASE_MONTAJE, [instance.torre_id])
@@ -19,7 +19,7 @@ cubría 4 de los 17 campos reales — ver PLAN_2026-07-25_190_torre_formatos_17.
 from decimal import Decimal
 
 from django.db.models import Avg, Case, DecimalField, Value, When
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from apps.construccion.models_b3_oc_detalle import ObraCivilTorreDetalle
@@ -71,6 +71,21 @@ def recalcular_obra_civil_torre(sender, instance, **kwargs):
         },
     )
 
+    # Avance materializado de la torre para los dashboards de fase.
+    from apps.construccion.calculators_avance_real import FASE_OOCC, materializar_avance_torres
+    materializar_avance_torres(instance.proyecto_id, FASE_OOCC, [instance.torre_id])
+
+
+@receiver(post_delete, sender=ObraCivilTorreDetalle)
+def desmaterializar_pata_obra_civil(sender, instance, origin=None, **kwargs):
+    """Al borrar una pata, recalcula (o retira) el avance materializado de
+    la torre con las patas que quedan."""
+    from apps.construccion.signals_avance_torre import es_borrado_en_cascada
+    if es_borrado_en_cascada(sender, origin):
+        return
+    from apps.construccion.calculators_avance_real import FASE_OOCC, materializar_avance_torres
+    materializar_avance_torres(instance.proyecto_id, FASE_OOCC, [instance.torre_id])
+
 
 # #190 (reopen 2026-07-25, bounce=1) — 17 campos que son un formato técnico
 # ÚNICO por torre en la realidad (se diligencia una sola vez para las 4
@@ -93,6 +93,7 @@ from .models import (
     cruzar_preliminares,
 )
 from . import calculators_avance_real as calculators_avance_real
+from .calculators_avance_ponderado import aplicar_avance_ponderado, valor_custom
 
 
 class ProyectoListView(LoginRequiredMixin, RoleRequiredMixin, ListView):
@@ -1582,7 +1583,11 @@ class ObraCivilMatrizView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
             oc = existentes.get(torre.id)
             if oc is None:
                 oc = ObraCivilTorre.objects.create(proyecto=proyecto, torre=torre)
+            oc.torre = torre  # ya cargada: evita 1 query por fila en la plantilla
             filas.append(oc)
+        # SUMPRODUCT de todas las torres con pesos + valores EAV en 1 query.
+        _columnas, valores = aplicar_avance_ponderado(
+            proyecto, [ColumnaConfigurable.CAPITULO_OBRA_CIVIL], filas)
 
         pesos = {
             'cerramiento': proyecto.peso_cerramiento_pct,
@@ -1628,7 +1633,8 @@ class ObraCivilMatrizView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
         ).order_by('orden'))
         for oc in filas:
             oc.valores_custom = [
-                (columna, columna.valor_para_torre(oc.torre)) for columna in columnas_custom_activas
+                (columna, valor_custom(valores, columna.id, columna.tipo_valor, oc.torre_id))
+                for columna in columnas_custom_activas
             ]
 
         ctx['proyecto'] = proyecto
@@ -1791,7 +1797,10 @@ class MontajeMatrizView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
             m = existentes.get(torre.id)
             if m is None:
                 m = MontajeEstructuraTorre.objects.create(proyecto=proyecto, torre=torre)
+            m.torre = torre
             filas.append(m)
+        _columnas, valores = aplicar_avance_ponderado(
+            proyecto, [ColumnaConfigurable.CAPITULO_MONTAJE], filas)
 
         pesos = {
             'estructura_sitio': proyecto.peso_mont_estructura_sitio_pct,
@@ -1827,7 +1836,8 @@ class MontajeMatrizView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
         ).order_by('orden'))
         for m in filas:
             m.valores_custom = [
-                (columna, columna.valor_para_torre(m.torre)) for columna in columnas_custom_activas
+                (columna, valor_custom(valores, columna.id, columna.tipo_valor, m.torre_id))
+                for columna in columnas_custom_activas
             ]
 
         ctx['proyecto'] = proyecto
@@ -2192,7 +2202,13 @@ class TendidoMatrizView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
             t = existentes.get(torre.id)
             if t is None:
                 t = TendidoTorre.objects.create(proyecto=proyecto, torre=torre)
+            t.torre = torre
             filas.append(t)
+        _columnas, valores = aplicar_avance_ponderado(
+            proyecto,
+            [ColumnaConfigurable.CAPITULO_TENDIDO_CONDUCTOR, ColumnaConfigurable.CAPITULO_TENDIDO_FIBRA],
+            filas,
+        )
 
         pesos_conductor = {
             'riega_manila_conductor': proyecto.peso_tend_riega_manila_pct,
@@ -2236,10 +2252,12 @@ class TendidoMatrizView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
         ).order_by('orden'))
         for t in filas:
             t.valores_custom_conductor = [
-                (columna, columna.valor_para_torre(t.torre)) for columna in columnas_custom_conductor
+                (columna, valor_custom(valores, columna.id, columna.tipo_valor, t.torre_id))
+                for columna in columnas_custom_conductor
             ]
             t.valores_custom_fibra = [
-                (columna, columna.valor_para_torre(t.torre)) for columna in columnas_custom_fibra
+                (columna, valor_custom(valores, columna.id, columna.tipo_valor, t.torre_id))
+                for columna in columnas_custom_fibra
             ]
 
         ctx.update({
@@ -20,7 +20,9 @@ from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.views.generic import FormView, ListView, TemplateView
 
+from apps.core.importaciones import aplicar_salida, debe_encolar, ejecutar, encolar
 from apps.core.mixins import RoleRequiredMixin
+from apps.core.models import TrabajoImportacion
 
 from .forms import CargarPDEOForm
 from .models import (
@@ -30,7 +32,6 @@ from .models import (
     ProyectoConstruccion,
     TransaccionContable,
 )
-from .pdeo_importer import import_pdeo_workbook
 
 
 ALL_ADMIN_ROLES = [
@@ -114,19 +115,19 @@ class TransaccionesUploadView(LoginRequiredMixin, RoleRequiredMixin, FormView):
     def form_valid(self, form):
         proyecto = form.cleaned_data['proyecto']
         archivo = form.cleaned_data['archivo']
+        parametros = {'proyecto_id': str(proyecto.pk)}
+        tipo = TrabajoImportacion.Tipo.PDEO
+        # Excel grande → TrabajoImportacion en Celery (ver importaciones.py).
+        if debe_encolar(archivo):
+            trabajo = encolar(tipo, parametros, usuario=self.request.user, archivo=archivo)
+            return redirect(trabajo.get_absolute_url())
         try:
-            stats = import_pdeo_workbook(
-                archivo, proyecto, usuario=self.request.user)
+            salida = ejecutar(tipo, archivo, parametros, usuario=self.request.user)
         except Exception as exc:
             messages.error(self.request,
                            f'Error al procesar el Excel PDEO: {exc}')
             return self.form_invalid(form)
-        messages.success(
-            self.request,
-            f"PDEO cargado: {stats['transacciones_creadas']} transacciones nuevas, "
-            f"{stats['transacciones_omitidas']} omitidas por duplicado, "
-            f"{stats['movimientos_actualizados']} movimientos actualizados.")
-        return super().form_valid(form)
+        return aplicar_salida(self.request, salida)
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
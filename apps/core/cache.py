@@ -1,6 +1,8 @@
 """
 Caching utilities for frequently accessed data.
 """
+import time
+
 from django.core.cache import cache
 from django.db.models import QuerySet
 from typing import List, Type, TypeVar
@@ -75,6 +77,142 @@ def get_contratos_por_unidad(unidad_negocio: str):
     return get_cached_queryset(key, Contrato, {'unidad_negocio': unidad_negocio})
 
 
+# ---------------------------------------------------------------------------
+# Contexto global del sidebar (context processors `modulo_context` y
+# `recordatorio_pago`): contratos activos, proyectos de construcción y la
+# suscripción. Se renderiza en CADA página y cambia muy poco, así que va
+# cacheado bajo una VERSIÓN: las señales de Contrato/ProyectoConstruccion/
+# Suscripcion (signals_contexto.py) solo incrementan la versión y la próxima
+# request recalcula. La versión arranca en un timestamp (no en 1) para que,
+# si la cache la desaloja, nunca se reuse una clave vieja con datos viejos.
+# ---------------------------------------------------------------------------
+CACHE_KEY_CONTEXTO_VERSION = 'instelec:contexto_global:version'
+CACHE_KEY_CONTEXTO = 'instelec:contexto_global:v{version}'
+
+
+def _contexto_version():
+    version = cache.get(CACHE_KEY_CONTEXTO_VERSION)
+    if version is None:
+        cache.add(CACHE_KEY_CONTEXTO_VERSION, int(time.time() * 1000), None)
+        version = cache.get(CACHE_KEY_CONTEXTO_VERSION)
+    return version
+
+
+def _cargar_contexto_global():
+    from apps.construccion.models import ProyectoConstruccion
+    from apps.contratos.models import Contrato
+    from apps.pagos.models import Suscripcion
+
+    try:
+        suscripcion = Suscripcion.objects.select_related('plan').first()
+    except Exception:
+        suscripcion = None
+
+    return {
+        'contratos_mantenimiento': list(Contrato.objects.filter(
+            unidad_negocio='MANTENIMIENTO',
+            estado='ACTIVO',
+        ).order_by('codigo')),
+        'contratos_construccion': list(Contrato.objects.filter(
+            unidad_negocio='CONSTRUCCION',
+            estado='ACTIVO',
+        ).order_by('codigo')),
+        'proyectos_construccion': list(ProyectoConstruccion.objects.filter(
+            estado__in=['PLANIFICACION', 'EJECUCION', 'CIERRE', 'FINALIZADO'],
+        ).select_related('contrato').order_by('contrato__codigo')),
+        'suscripcion': suscripcion,
+    }
+
+
+def get_contexto_global(request=None):
+    """Datasets del sidebar (cached, versionado).
+
+    Con ``request`` el resultado se memoiza en la request: los dos context
+    processors comparten una sola lectura de cache por render.
+    """
+    if request is not None:
+        memo = getattr(request, '_contexto_global', None)
+        if memo is not None:
+            return memo
+
+    key = CACHE_KEY_CONTEXTO.format(version=_contexto_version())
+    datos = cache.get(key)
+    if datos is None:
+        datos = _cargar_contexto_global()
+        cache.set(key, datos, CACHE_TIMEOUT)
+
+    if request is not None:
+        request._contexto_global = datos
+    return datos
+
+
+def invalidate_contexto_global():
+    """Invalida el contexto global del sidebar (nueva versión)."""
+    try:
+        cache.incr(CACHE_KEY_CONTEXTO_VERSION)
+    except ValueError:
+        # Versión desalojada: la próxima lectura arranca una nueva.
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Usuario autenticado por JWT (``apps.api.auth.JWTAuth``). La app móvil
+# consulta varios endpoints por pantalla y cada uno resolvía el usuario con
+# un SELECT. Se cachea por (usuario, jti del token) junto con la versión del
+# usuario vigente al guardarlo; la lectura trae entrada y versión en un solo
+# ``get_many`` y descarta la entrada si la versión cambió. Cualquier save/
+# delete del usuario (desactivación, cambio de rol) incrementa la versión
+# (usuarios/signals.py). El TTL corto acota lo que no pasa por señales
+# (``QuerySet.update``).
+#
+# En la cache va solo la fila (``values()``) sin ``JWT_USUARIO_EXCLUIDOS``:
+# el hash de la contraseña nunca sale de la BD. El usuario se rearma con
+# ``from_db`` y esos campos quedan diferidos (un ``save()`` no los pisa).
+# ---------------------------------------------------------------------------
+JWT_USUARIO_TIMEOUT = 60  # 1 minuto
+JWT_USUARIO_EXCLUIDOS = ('password',)
+CACHE_KEY_JWT_USUARIO = 'instelec:jwt_usuario:{user_id}:{jti}'
+CACHE_KEY_JWT_USUARIO_VERSION = 'instelec:jwt_usuario:{user_id}:version'
+
+
+def get_usuario_jwt(user_id, jti):
+    """Usuario activo del token (cached por usuario + jti), o None."""
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    campos = [
+        f.attname for f in User._meta.concrete_fields
+        if f.attname not in JWT_USUARIO_EXCLUIDOS
+    ]
+
+    key = CACHE_KEY_JWT_USUARIO.format(user_id=user_id, jti=jti)
+    key_version = CACHE_KEY_JWT_USUARIO_VERSION.format(user_id=user_id)
+    encontrados = cache.get_many([key, key_version])
+    version = encontrados.get(key_version)
+    entrada = encontrados.get(key)
+    if entrada is not None and version is not None and entrada[0] == version:
+        fila = entrada[1]
+    else:
+        fila = User.objects.filter(id=user_id, is_active=True).values(*campos).first()
+        if fila is None:
+            return None
+        if version is None:
+            cache.add(key_version, int(time.time() * 1000), None)
+            version = cache.get(key_version)
+        cache.set(key, (version, fila), JWT_USUARIO_TIMEOUT)
+
+    return User.from_db(User.objects.db, campos, [fila[campo] for campo in campos])
+
+
+def invalidate_usuario_jwt(user_id):
+    """Invalida el usuario cacheado en todos sus tokens (nueva versión)."""
+    try:
+        cache.incr(CACHE_KEY_JWT_USUARIO_VERSION.format(user_id=user_id))
+    except ValueError:
+        # Versión desalojada: ninguna entrada vieja vuelve a coincidir.
+        pass
+
+
 def invalidate_lineas_cache():
     """Invalidate lines cache."""
     cache.delete(CACHE_KEYS['lineas_activas'])
@@ -102,3 +240,4 @@ def invalidate_all_cache():
     invalidate_cuadrillas_cache()
     invalidate_tipos_cache()
     invalidate_contratos_cache()
+    invalidate_contexto_global()
@@ -1,25 +1,20 @@
 """
 Global context processors for all templates.
 """
-from apps.contratos.models import Contrato
-from apps.construccion.models import ProyectoConstruccion
-
+from .cache import get_contexto_global
 from .utils import get_unidad_negocio
 
 
 def modulo_context(request):
-    """Inject construction and maintenance contracts + active business unit."""
+    """Inject construction and maintenance contracts + active business unit.
+
+    Las listas salen del contexto global cacheado (``apps.core.cache``),
+    invalidado por señal al guardar/borrar un Contrato o ProyectoConstruccion.
+    """
+    contexto = get_contexto_global(request)
     return {
-        'contratos_mantenimiento': Contrato.objects.filter(
-            unidad_negocio='MANTENIMIENTO',
-            estado='ACTIVO',
-        ).order_by('codigo'),
-        'contratos_construccion': Contrato.objects.filter(
-            unidad_negocio='CONSTRUCCION',
-            estado='ACTIVO',
-        ).order_by('codigo'),
-        'proyectos_construccion': ProyectoConstruccion.objects.filter(
-            estado__in=['PLANIFICACION', 'EJECUCION', 'CIERRE', 'FINALIZADO'],
-        ).select_related('contrato').order_by('contrato__codigo'),
+        'contratos_mantenimiento': contexto['contratos_mantenimiento'],
+        'contratos_construccion': contexto['contratos_construccion'],
+        'proyectos_construccion': contexto['proyectos_construccion'],
         'unidad_negocio_actual': get_unidad_negocio(request),
     }
@@ -0,0 +1,176 @@
+"""
+Entrega de archivos del storage por streaming, con Range y GET condicional.
+
+Las vistas que sirven archivos (procedimientos PDF/Excel) hacían
+``archivo.read()`` y devolvían los bytes en un ``HttpResponse``: cada preview
+de un archivo grande ocupaba el archivo entero en memoria del worker de
+gunicorn, y el viewer Excel lo pedía dos veces.
+
+``respuesta_archivo``:
+
+- Calcula ETag/Last-Modified desde la BD (nombre en storage + fecha de
+  modificación) ANTES de tocar el storage: una revisita con
+  ``If-None-Match``/``If-Modified-Since`` devuelve 304 sin abrir el archivo.
+- Sin ``Range`` devuelve un ``FileResponse`` (en disco local el servidor usa
+  ``wsgi.file_wrapper``/sendfile: cero copias en Python).
+- Con ``Range: bytes=...`` (un solo rango; varios rangos se responden con
+  el archivo completo, como permite el RFC 9110) devuelve 206 leyendo solo
+  ese tramo por bloques de ``BLOQUE`` bytes. ``If-Range`` desactualizado →
+  archivo completo; rango fuera del archivo → 416.
+- En GCS lee con ``blob.open()``: descargas parciales de a ``BLOQUE``, la
+  memoria por descarga no depende del tamaño del archivo.
+"""
+import hashlib
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+#: Tamaño de cada lectura del storage al servir un archivo.
+BLOQUE = 1024 * 1024
+
+_RANGO_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def etag_archivo(archivo, modificado=None):
+    """ETag fuerte derivado del nombre en storage y la fecha de modificación.
+
+    Los uploads no sobrescriben (``GS_FILE_OVERWRITE = False``): un archivo
+    nuevo siempre tiene otro nombre.
+    """
+    firma = f"{archivo.name}:{modificado.timestamp() if modificado else ''}"
+    return quote_etag(hashlib.md5(firma.encode(), usedforsecurity=False).hexdigest())
+
+
+def abrir_archivo(archivo):
+    """(file-like binario, tamaño) del FieldFile, sin cargarlo en memoria.
+
+    Raises:
+        FileNotFoundError: el archivo está registrado pero no existe en storage.
+    """
+    storage = archivo.storage
+    bucket = getattr(storage, 'bucket', None)
+    if bucket is not None and hasattr(bucket, 'blob'):
+        from google.api_core.exceptions import NotFound
+
+        blob = bucket.blob(archivo.name)
+        try:
+            blob.reload()
+        except NotFound as exc:
+            raise FileNotFoundError(archivo.name) from exc
+        return blob.open('rb', chunk_size=BLOQUE), blob.size
+
+    return storage.open(archivo.name, 'rb'), storage.size(archivo.name)
+
+
+def parsear_rango(cabecera, tamano):
+    """``(inicio, fin)`` inclusivo del header Range, o None si no aplica.
+
+    Raises:
+        ValueError: rango sintácticamente válido pero insatisfacible (416).
+    """
+    if not cabecera:
+        return None
+    match = _RANGO_RE.match(cabecera.strip())
+    if not match:
+        # Multi-rango u otra unidad: se ignora y va el archivo completo.
+        return None
+    inicio, fin = match.groups()
+    if not inicio and not fin:
+        return None
+    if not inicio:
+        # Sufijo: los últimos N bytes.
+        largo = int(fin)
+        if largo == 0:
+            raise ValueError(cabecera)
+        return max(tamano - largo, 0), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano or fin < inicio:
+        raise ValueError(cabecera)
+    return inicio, fin
+
+
+def _tramo(fh, inicio, largo):
+    try:
+        fh.seek(inicio)
+        while largo > 0:
+            bloque = fh.read(min(BLOQUE, largo))
+            if not bloque:
+                break
+            largo -= len(bloque)
+            yield bloque
+    finally:
+        fh.close()
+
+
+def _if_range_vigente(request, etag, last_modified):
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return last_modified is not None and if_range == last_modified
+
+
+def respuesta_archivo(
+    request, archivo, *, content_type, nombre, modificado=None,
+    inline=True, cache_control='private, no-cache',
+):
+    """Sirve ``archivo`` (FieldFile) por streaming con Range/ETag/304.
+
+    Args:
+        archivo: FieldFile del modelo
+        content_type: MIME de la respuesta
+        nombre: nombre sugerido al navegador (Content-Disposition)
+        modificado: datetime de la última modificación (p. ej. ``updated_at``)
+        cache_control: por defecto obliga a revalidar (→ 304 si no cambió)
+
+    Raises:
+        FileNotFoundError: el archivo no existe en storage.
+    """
+    etag = etag_archivo(archivo, modificado)
+    last_modified = http_date(modificado.timestamp()) if modificado else None
+
+    def _cabeceras(response):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = last_modified
+        response['Accept-Ranges'] = 'bytes'
+        response['Cache-Control'] = cache_control
+        return response
+
+    condicional = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(modificado.timestamp()) if modificado else None,
+    )
+    if condicional is not None:
+        return _cabeceras(condicional)
+
+    fh, tamano = abrir_archivo(archivo)
+
+    rango = None
+    if _if_range_vigente(request, etag, last_modified):
+        try:
+            rango = parsear_rango(request.headers.get('Range'), tamano)
+        except ValueError:
+            fh.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{tamano}'
+            return _cabeceras(response)
+
+    if rango is None:
+        response = FileResponse(fh, content_type=content_type)
+        response['Content-Length'] = tamano
+    else:
+        inicio, fin = rango
+        response = StreamingHttpResponse(
+            _tramo(fh, inicio, fin - inicio + 1), status=206, content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {inicio}-{fin}/{tamano}'
+        response['Content-Length'] = fin - inicio + 1
+
+    response['Content-Disposition'] = content_disposition_header(not inline, nombre)
+    return _cabeceras(response)
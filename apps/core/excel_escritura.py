@@ -0,0 +1,164 @@
+"""
+Escritura de Excel en streaming para los exportadores.
+
+Los exportadores armaban un ``Workbook`` normal en memoria —cada celda con
+su propio objeto de estilo (``cell.fill = ...``, ``cell.border = ...``)—
+y recién al final lo serializaban a un ``BytesIO`` que la vista copiaba
+otra vez con ``getvalue()``. Un export de un año de programación (miles de
+bloques × miembros) reventaba la memoria de Cloud Run o se pasaba del
+timeout.
+
+Acá va el motor compartido (contraparte de ``excel_streaming``, que es el
+de lectura):
+
+- ``LibroStreaming``: ``Workbook(write_only=True)``. Cada fila se escribe
+  al archivo temporal de su hoja apenas se agrega; en memoria solo queda la
+  fila actual.
+- Estilos con nombre (``NamedStyle``) registrados UNA vez por libro: las
+  celdas referencian el estilo por nombre (``celda(valor, 'encabezado')``)
+  en vez de crear Font/Fill/Border por celda.
+- ``guardar`` deja el .xlsx en un archivo temporal en disco y
+  ``respuesta_xlsx`` lo envía por chunks con ``FileResponse``.
+
+Limitación del modo write-only: las hojas se escriben en orden, fila por
+fila (sin volver atrás) y sin celdas combinadas; los anchos de columna se
+fijan al crear la hoja.
+"""
+import tempfile
+from collections import namedtuple
+
+CONTENT_TYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+#: Filas por chunk al recorrer querysets con ``.iterator()``.
+TAMANO_CHUNK = 500
+
+Celda = namedtuple('Celda', 'valor estilo')
+
+
+def celda(valor, estilo):
+    """Valor con estilo con nombre para ``HojaStreaming.fila``."""
+    return Celda(valor, estilo)
+
+
+def _relleno(color):
+    from openpyxl.styles import PatternFill
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+def estilos_base():
+    """Estilos con nombre compartidos por todos los exportadores."""
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    borde = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin'),
+    )
+    centro = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    izquierda = Alignment(horizontal='left', vertical='center', wrap_text=True)
+    return {
+        'titulo': {'font': Font(bold=True, size=14)},
+        'subtitulo': {'font': Font(bold=True, size=12)},
+        'negrita': {'font': Font(bold=True)},
+        'destacado': {'font': Font(bold=True, size=16)},
+        'encabezado': {
+            'font': Font(bold=True, color='FFFFFF', size=11),
+            'fill': _relleno('1F4E79'),
+            'border': borde,
+            'alignment': centro,
+        },
+        'encabezado_gris': {'font': Font(bold=True), 'fill': _relleno('D9D9D9')},
+        'celda': {'border': borde, 'alignment': centro},
+        'celda_izq': {'border': borde, 'alignment': izquierda},
+        'celda_borde': {'border': borde},
+    }
+
+
+def estilo_relleno(color, texto_blanco=False, **extra):
+    """Atributos de un estilo de color sólido (estados, leyendas)."""
+    from openpyxl.styles import Font
+
+    atributos = {'fill': _relleno(color), **extra}
+    if texto_blanco:
+        atributos['font'] = Font(color='FFFFFF')
+    return atributos
+
+
+class HojaStreaming:
+    """Hoja write-only: solo se agregan filas, en orden."""
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+        self.filas = 0
+
+    def _celda(self, valor, estilo):
+        from openpyxl.cell import WriteOnlyCell
+
+        if isinstance(valor, Celda):
+            valor, estilo = valor
+        if estilo is None:
+            return valor
+        cell = WriteOnlyCell(self.worksheet, value=valor)
+        cell.style = estilo
+        return cell
+
+    def fila(self, valores=(), estilo=None):
+        """Agrega una fila; ``estilo`` aplica a los valores sin ``celda()``."""
+        self.worksheet.append([self._celda(v, estilo) for v in valores])
+        self.filas += 1
+        return self.filas
+
+    def vacias(self, cantidad=1):
+        for _ in range(cantidad):
+            self.fila()
+
+
+class LibroStreaming:
+    """Libro write-only con estilos con nombre compartidos."""
+
+    def __init__(self, estilos=None):
+        from openpyxl import Workbook
+        from openpyxl.styles import NamedStyle
+
+        self.workbook = Workbook(write_only=True)
+        for nombre, atributos in {**estilos_base(), **(estilos or {})}.items():
+            self.workbook.add_named_style(NamedStyle(name=nombre, **atributos))
+
+    def hoja(self, titulo, anchos=()):
+        """Nueva hoja con ``anchos`` de columna (A, B, ...) ya fijados."""
+        from openpyxl.utils import get_column_letter
+
+        worksheet = self.workbook.create_sheet(title=titulo[:31])
+        for col_idx, ancho in enumerate(anchos, start=1):
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = ancho
+        return HojaStreaming(worksheet)
+
+    def guardar(self):
+        """Archivo temporal (en disco) con el .xlsx, rebobinado."""
+        salida = tempfile.TemporaryFile()
+        self.workbook.save(salida)
+        salida.seek(0)
+        return salida
+
+
+def respuesta_xlsx(archivo, nombre):
+    """Descarga por chunks del .xlsx generado por ``LibroStreaming.guardar``."""
+    from django.http import FileResponse
+
+    return FileResponse(
+        archivo, as_attachment=True, filename=nombre, content_type=CONTENT_TYPE_XLSX,
+    )
+
+
+def en_chunks(queryset, tamano=TAMANO_CHUNK):
+    """Lotes de ``tamano`` objetos de ``queryset.iterator()`` (respeta
+    ``prefetch_related`` por lote)."""
+    from itertools import islice
+
+    iterador = queryset.iterator(chunk_size=tamano)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
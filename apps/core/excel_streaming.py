@@ -0,0 +1,183 @@
+"""
+Lectura de Excel en streaming para los importadores.
+
+Los importadores hacían ``list(sheet.iter_rows(values_only=True))`` (toda la
+hoja en memoria antes de procesar la primera fila) y los de programación
+semanal cargaban el libro completo SIN ``read_only`` solo para leer las
+celdas combinadas — con programas de varios meses eso reventaba las
+instancias chicas de Cloud Run.
+
+Acá va el pipeline compartido:
+
+- ``abrir_libro``: ``load_workbook(read_only=True, data_only=True)``.
+- ``filas_numeradas`` / ``en_lotes``: generador de ``(fila_excel, valores)``
+  consumido en lotes de tamaño fijo (``TAMANO_LOTE``).
+- ``rangos_combinados``: pre-pasada liviana sobre el XML de cada hoja que
+  devuelve solo los ``<mergeCell>`` — sin construir celdas ni estilos.
+- ``observar_progreso``: los trabajos en segundo plano
+  (``apps.core.importaciones``) se enteran de cuántas filas tiene la hoja y
+  de cada lote consumido sin que los importadores cambien de firma.
+"""
+import logging
+import posixpath
+import zipfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 500
+
+_REL_OFFICE_DOCUMENT = (
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+)
+_NS_REL_DOC = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_NS_REL_PKG = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+
+_observador = ContextVar('observador_progreso', default=None)
+
+
+@contextmanager
+def observar_progreso(observador):
+    """Mientras dure el bloque, el pipeline notifica a ``observador``.
+
+    ``observador`` expone ``sumar_total(n)`` (filas que trae cada hoja
+    abierta con ``filas_numeradas``) y ``avanzar(n)`` (filas de cada lote
+    ya procesado por ``en_lotes``).
+    """
+    token = _observador.set(observador)
+    try:
+        yield observador
+    finally:
+        _observador.reset(token)
+
+
+def reportar_total(filas):
+    """Suma ``filas`` al total esperado del observador activo (si hay)."""
+    observador = _observador.get()
+    if observador is not None and filas:
+        observador.sumar_total(filas)
+
+
+def reportar_avance(filas):
+    """Suma ``filas`` a las procesadas del observador activo (si hay)."""
+    observador = _observador.get()
+    if observador is not None and filas:
+        observador.avanzar(filas)
+
+
+def abrir_libro(archivo):
+    """Abre el libro en modo streaming (``read_only``) con valores calculados."""
+    from openpyxl import load_workbook
+    return load_workbook(archivo, read_only=True, data_only=True)
+
+
+def filas_numeradas(sheet, desde=1):
+    """Genera ``(fila_excel_1based, valores)`` sin materializar la hoja.
+
+    En ``read_only`` openpyxl rellena las filas ausentes del XML con tuplas
+    vacías, así que la numeración coincide con la de Excel. ``max_row`` sale
+    de la ``<dimension>`` de la hoja (sin recorrerla) y alimenta el total del
+    observador de progreso.
+    """
+    reportar_total(max(0, (sheet.max_row or 0) - desde + 1))
+    yield from enumerate(sheet.iter_rows(min_row=desde, values_only=True), start=desde)
+
+
+def en_lotes(iterable, tamano=TAMANO_LOTE):
+    """Parte ``iterable`` en listas de a lo sumo ``tamano`` elementos.
+
+    Cada lote cuenta como avance recién cuando el consumidor pide el
+    siguiente (es decir, cuando terminó de procesarlo).
+    """
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+        reportar_avance(len(lote))
+
+
+def rangos_combinados(archivo, hojas=None):
+    """``{nombre_hoja: [CellRange, ...]}`` de las celdas combinadas del libro.
+
+    Lee ``xl/workbook.xml`` + sus relaciones para ubicar cada hoja y recorre
+    su XML con ``iterparse`` descartando cada ``<row>`` apenas se cierra: la
+    memoria no depende del tamaño de la hoja. ``hojas`` limita la pasada a
+    esos nombres.
+
+    Reemplaza ``Worksheet.merged_cells``, que openpyxl no expone en
+    ``read_only``. Si el archivo no es un .xlsx legible devuelve ``{}`` (el
+    llamador cae a su heurístico sin merges).
+    """
+    from openpyxl.worksheet.cell_range import CellRange
+
+    rangos = {}
+    try:
+        with zipfile.ZipFile(archivo) as paquete:
+            for nombre, ruta in _rutas_hojas(paquete).items():
+                if hojas is not None and nombre not in hojas:
+                    continue
+                with paquete.open(ruta) as xml:
+                    rangos[nombre] = [CellRange(ref) for ref in _refs_merge(xml)]
+    except (KeyError, zipfile.BadZipFile, SyntaxError) as e:
+        logger.warning(f"No se pudieron leer las celdas combinadas: {e}")
+        return {}
+    finally:
+        if hasattr(archivo, 'seek'):
+            archivo.seek(0)
+    return rangos
+
+
+def _parse_xml(paquete, ruta):
+    from openpyxl.xml.functions import fromstring
+    return fromstring(paquete.read(ruta))
+
+
+def _rutas_hojas(paquete):
+    """``{nombre_hoja: ruta_en_zip}`` en el orden del libro."""
+    raiz = _parse_xml(paquete, '_rels/.rels')
+    ruta_libro = 'xl/workbook.xml'
+    for rel in raiz.iter(f'{{{_NS_REL_PKG}}}Relationship'):
+        if rel.get('Type') == _REL_OFFICE_DOCUMENT:
+            ruta_libro = rel.get('Target').lstrip('/')
+            break
+
+    base = posixpath.dirname(ruta_libro)
+    ruta_rels = posixpath.join(base, '_rels', posixpath.basename(ruta_libro) + '.rels')
+    destinos = {}
+    for rel in _parse_xml(paquete, ruta_rels).iter(f'{{{_NS_REL_PKG}}}Relationship'):
+        destino = rel.get('Target')
+        if destino.startswith('/'):
+            destino = destino.lstrip('/')
+        else:
+            destino = posixpath.normpath(posixpath.join(base, destino))
+        destinos[rel.get('Id')] = destino
+
+    rutas = {}
+    for hoja in _parse_xml(paquete, ruta_libro).iter(f'{{{_NS_MAIN}}}sheet'):
+        destino = destinos.get(hoja.get(f'{{{_NS_REL_DOC}}}id'))
+        if destino:
+            rutas[hoja.get('name')] = destino
+    return rutas
+
+
+def _refs_merge(xml):
+    """Genera el ``ref`` (ej. ``'A3:A7'``) de cada ``<mergeCell>`` de la hoja."""
+    from openpyxl.xml.functions import iterparse
+
+    tag_datos = f'{{{_NS_MAIN}}}sheetData'
+    tag_fila = f'{{{_NS_MAIN}}}row'
+    tag_merge = f'{{{_NS_MAIN}}}mergeCell'
+    datos = None
+    for evento, elem in iterparse(xml, events=('start', 'end')):
+        if evento == 'start':
+            if elem.tag == tag_datos:
+                datos = elem
+        elif elem.tag == tag_fila and datos is not None:
+            datos.clear()
+        elif elem.tag == tag_merge and elem.get('ref'):
+            yield elem.get('ref')
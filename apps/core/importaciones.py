@@ -0,0 +1,344 @@
+"""
+Importaciones en segundo plano.
+
+Las cargas de Excel (programación, avances, PDEO, cuadrillas) y el cálculo
+de costos desde cuadrillas corrían dentro de la request: con archivos de
+miles de filas la request superaba el timeout de Cloud Run y el usuario no
+sabía si algo había quedado importado.
+
+Flujo:
+
+1. La vista valida el formulario y, si el archivo supera
+   ``IMPORTACION_SINCRONA_MAX_BYTES`` (o el proceso no tiene archivo),
+   llama a ``encolar``: guarda el archivo en el storage por defecto, crea el
+   ``TrabajoImportacion`` y lo despacha a la cola ``default`` al confirmar
+   la transacción. Los archivos chicos siguen el camino síncrono con el
+   mismo procesador (``ejecutar``) — mismos mensajes, mismo redirect.
+2. El worker (``apps.core.tasks.procesar_trabajo_importacion``) llama a
+   ``ejecutar_trabajo``: abre el archivo y corre el procesador del tipo con
+   un ``Progreso`` que el pipeline de ``excel_streaming`` alimenta lote a
+   lote.
+3. La UI hace polling a ``core:trabajo_importacion_estado`` hasta que el
+   trabajo termina y luego muestra los mensajes guardados en ``resultado``.
+
+Cada app registra su procesador en ``PROCESADORES`` con la firma
+``procesar(archivo, parametros, usuario=None, progreso=None)`` y devuelve
+``{'resultado': dict, 'mensajes': [[nivel, texto], ...], 'redirect_url': str}``.
+
+Reanudación: ``Progreso.checkpoint`` persiste el último lote confirmado y el
+procesador lo recibe en ``progreso.datos`` al reintentar. Los procesadores
+que confirman todo en una única transacción no necesitan checkpoint: si el
+worker muere, la transacción se revierte y el reintento empieza de cero.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.shortcuts import redirect
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+PROCESADORES = {
+    'PROGRAMACION': 'apps.actividades.importaciones.procesar_programacion',
+    'AVANCES': 'apps.actividades.importaciones.procesar_avances',
+    'COSTOS_CUADRILLA': 'apps.financiero.importaciones.procesar_costos_cuadrilla',
+    'PDEO': 'apps.construccion.importaciones.procesar_pdeo',
+    'CUADRILLAS': 'apps.cuadrillas.importaciones.procesar_cuadrillas',
+}
+
+#: Por debajo de este tamaño el Excel se importa en la misma request.
+SINCRONO_MAX_BYTES_DEFAULT = 512 * 1024
+
+#: Reintentos automáticos antes de marcar el trabajo como fallido.
+MAX_INTENTOS = 3
+
+
+def _errores_transitorios():
+    from django.db import InterfaceError, OperationalError
+
+    errores = [OperationalError, InterfaceError, ConnectionError, TimeoutError]
+    try:
+        from google.api_core.exceptions import ServerError, TooManyRequests
+    except ImportError:
+        pass
+    else:
+        errores += [ServerError, TooManyRequests]
+    return tuple(errores)
+
+
+#: Caídas de BD, red o storage: el trabajo vuelve a PENDIENTE con su
+#: checkpoint y la tarea se reintenta (``autoretry_for``) en vez de fallar.
+ERRORES_TRANSITORIOS = _errores_transitorios()
+
+#: Sin latido durante este lapso, un trabajo en curso se considera colgado.
+MINUTOS_SIN_LATIDO = 15
+
+CACHE_TIMEOUT = 6 * 3600
+
+NIVELES_MENSAJE = {
+    'success': messages.SUCCESS,
+    'info': messages.INFO,
+    'warning': messages.WARNING,
+    'error': messages.ERROR,
+}
+
+
+def clave_progreso(trabajo_id):
+    return f'instelec:importacion:{trabajo_id}:progreso'
+
+
+def debe_encolar(archivo):
+    """True si ``archivo`` es demasiado grande para procesarlo en la request."""
+    limite = getattr(settings, 'IMPORTACION_SINCRONA_MAX_BYTES', SINCRONO_MAX_BYTES_DEFAULT)
+    return (getattr(archivo, 'size', None) or 0) > limite
+
+
+def procesar(tipo, archivo, parametros, usuario=None, progreso=None):
+    """Corre el procesador registrado para ``tipo``."""
+    procesador = import_string(PROCESADORES[tipo])
+    return procesador(archivo, parametros, usuario=usuario, progreso=progreso)
+
+
+def ejecutar(tipo, archivo, parametros, usuario=None):
+    """Camino síncrono: mismo procesador, sin trabajo ni progreso."""
+    return procesar(tipo, archivo, parametros, usuario=usuario)
+
+
+def aplicar_salida(request, salida):
+    """Publica los mensajes del procesador y redirige a su ``redirect_url``."""
+    for nivel, texto in salida.get('mensajes', []):
+        messages.add_message(request, NIVELES_MENSAJE.get(nivel, messages.INFO), texto)
+    return redirect(salida['redirect_url'])
+
+
+def encolar(tipo, parametros, usuario=None, archivo=None):
+    """Crea el ``TrabajoImportacion`` y lo despacha a Celery tras el commit."""
+    from .models import TrabajoImportacion
+
+    trabajo = TrabajoImportacion(
+        tipo=tipo,
+        parametros=parametros,
+        usuario=usuario if getattr(usuario, 'is_authenticated', False) else None,
+    )
+    if archivo is not None:
+        if hasattr(archivo, 'seek'):
+            archivo.seek(0)
+        nombre = getattr(archivo, 'name', None) or 'importacion.xlsx'
+        trabajo.nombre_archivo = nombre[:255]
+        trabajo.archivo.save(nombre, archivo, save=False)
+    trabajo.save()
+    transaction.on_commit(lambda: despachar(trabajo.pk))
+    return trabajo
+
+
+def despachar(trabajo_id):
+    """Envía el trabajo a la cola ``default``.
+
+    Si el broker no está disponible el trabajo queda PENDIENTE y lo retoma
+    ``reanudar_trabajos_colgados``.
+    """
+    from .models import TrabajoImportacion
+    from .tasks import procesar_trabajo_importacion
+
+    try:
+        tarea = procesar_trabajo_importacion.delay(str(trabajo_id))
+    except Exception as e:
+        logger.error(f"No se pudo encolar el trabajo de importación {trabajo_id}: {e}")
+        return
+    TrabajoImportacion.objects.filter(pk=trabajo_id, tarea_id='').update(tarea_id=tarea.id or '')
+
+
+class Progreso:
+    """Avance de un trabajo: contador vivo en cache + checkpoint en BD.
+
+    Los procesadores suelen correr dentro de ``transaction.atomic``: escribir
+    el avance en la tabla del trabajo no sería visible para el polling hasta
+    el commit (y bloquearía la fila). Por eso el contador va a la cache
+    —throttled a un ``set`` cada ``INTERVALO`` segundos, con un latido que usa
+    ``reanudar_trabajos_colgados``— y a la BD solo van los checkpoints, que
+    los procesadores emiten fuera de su transacción al confirmar un lote.
+    """
+
+    INTERVALO = 2.0
+
+    def __init__(self, trabajo):
+        self.trabajo = trabajo
+        self.datos = dict(trabajo.checkpoint or {})
+        self.total = 0
+        self.procesadas = 0
+        self._publicado = 0.0
+
+    def sumar_total(self, filas):
+        self.total += filas
+        self._publicar()
+
+    def avanzar(self, filas=1):
+        self.procesadas += filas
+        self._publicar()
+
+    def checkpoint(self, datos):
+        """Persiste ``datos`` como punto de reanudación del trabajo."""
+        from .models import TrabajoImportacion
+
+        self.datos = datos
+        TrabajoImportacion.objects.filter(pk=self.trabajo.pk).update(
+            checkpoint=datos,
+            total_filas=self.total or None,
+            filas_procesadas=self.procesadas,
+            updated_at=timezone.now(),
+        )
+        self._publicar(forzar=True)
+
+    def estado(self):
+        return {'total': self.total, 'procesadas': self.procesadas, 'latido': time.time()}
+
+    def _publicar(self, forzar=False):
+        ahora = time.monotonic()
+        if not forzar and ahora - self._publicado < self.INTERVALO:
+            return
+        self._publicado = ahora
+        cache.set(clave_progreso(self.trabajo.pk), self.estado(), CACHE_TIMEOUT)
+
+
+@contextmanager
+def _archivo_de(trabajo):
+    if not trabajo.archivo:
+        yield None
+        return
+    trabajo.archivo.open('rb')
+    try:
+        yield trabajo.archivo
+    finally:
+        trabajo.archivo.close()
+
+
+def _latido_vigente(trabajo_id, limite):
+    """¿El worker del trabajo publicó progreso después de ``limite``?"""
+    vivo = cache.get(clave_progreso(trabajo_id))
+    return bool(vivo and vivo['latido'] > limite.timestamp())
+
+
+def ejecutar_trabajo(trabajo_id):
+    """Procesa (o reanuda) el trabajo.
+
+    Los errores del procesador marcan el trabajo FALLIDO, salvo los
+    ``ERRORES_TRANSITORIOS`` con intentos disponibles: el trabajo vuelve a
+    PENDIENTE (con su checkpoint) y el error se propaga para que la tarea
+    lo reintente.
+    """
+    from datetime import timedelta
+
+    from django.db.models import F, Q, Value
+    from django.db.models.functions import Coalesce
+
+    from .excel_streaming import observar_progreso
+    from .models import TrabajoImportacion
+
+    # Reclamo atómico: pasa a EN_PROCESO un PENDIENTE o un EN_PROCESO
+    # colgado (mismo criterio que ``trabajos_colgados``: worker muerto, sin
+    # latido en ``MINUTOS_SIN_LATIDO``), así la re-entrega de acks_late
+    # retoma desde el checkpoint. Sobre un trabajo que otro worker sigue
+    # corriendo no cambia filas y sale sin procesar.
+    ahora = timezone.now()
+    limite = ahora - timedelta(minutes=MINUTOS_SIN_LATIDO)
+    reclamable = Q(estado=TrabajoImportacion.Estado.PENDIENTE)
+    if not _latido_vigente(trabajo_id, limite):
+        reclamable |= Q(estado=TrabajoImportacion.Estado.EN_PROCESO, updated_at__lt=limite)
+    reclamado = TrabajoImportacion.objects.filter(reclamable, pk=trabajo_id).update(
+        estado=TrabajoImportacion.Estado.EN_PROCESO,
+        intentos=F('intentos') + 1,
+        iniciado_en=Coalesce('iniciado_en', Value(ahora)),
+        error='',
+        updated_at=ahora,
+    )
+    trabajo = TrabajoImportacion.objects.get(pk=trabajo_id)
+    if not reclamado:
+        return trabajo
+
+    progreso = Progreso(trabajo)
+    try:
+        with _archivo_de(trabajo) as archivo, observar_progreso(progreso):
+            salida = procesar(
+                trabajo.tipo, archivo, trabajo.parametros,
+                usuario=trabajo.usuario, progreso=progreso,
+            )
+    except ERRORES_TRANSITORIOS as e:
+        trabajo.error = str(e)
+        trabajo.checkpoint = progreso.datos
+        if trabajo.intentos < MAX_INTENTOS:
+            logger.warning(f"Trabajo de importación {trabajo.pk}: error transitorio, se reintenta: {e}")
+            trabajo.estado = TrabajoImportacion.Estado.PENDIENTE
+            trabajo.filas_procesadas = progreso.procesadas
+            trabajo.save()
+            raise
+        logger.exception(f"Trabajo de importación {trabajo.pk} ({trabajo.tipo}) falló")
+        trabajo.estado = TrabajoImportacion.Estado.FALLIDO
+    except Exception as e:
+        logger.exception(f"Trabajo de importación {trabajo.pk} ({trabajo.tipo}) falló")
+        trabajo.estado = TrabajoImportacion.Estado.FALLIDO
+        trabajo.error = str(e)
+        trabajo.checkpoint = progreso.datos
+    else:
+        trabajo.estado = TrabajoImportacion.Estado.COMPLETADO
+        trabajo.resultado = salida
+        trabajo.checkpoint = {}
+
+    trabajo.total_filas = progreso.total or trabajo.total_filas
+    trabajo.filas_procesadas = progreso.procesadas
+    trabajo.finalizado_en = timezone.now()
+    trabajo.save()
+    cache.delete(clave_progreso(trabajo.pk))
+    return trabajo
+
+
+def estado_trabajo(trabajo):
+    """Dict serializable del avance para el polling (cache si el trabajo corre)."""
+    total = trabajo.total_filas
+    procesadas = trabajo.filas_procesadas
+    if trabajo.estado == trabajo.Estado.EN_PROCESO:
+        vivo = cache.get(clave_progreso(trabajo.pk))
+        if vivo:
+            total = vivo['total'] or total
+            procesadas = max(procesadas, vivo['procesadas'])
+
+    porcentaje = None
+    if trabajo.estado == trabajo.Estado.COMPLETADO:
+        porcentaje = 100
+    elif total:
+        porcentaje = min(99, int(procesadas * 100 / total))
+
+    return {
+        'id': str(trabajo.pk),
+        'tipo': trabajo.tipo,
+        'estado': trabajo.estado,
+        'estado_display': trabajo.get_estado_display(),
+        'terminado': trabajo.terminado,
+        'total_filas': total,
+        'filas_procesadas': procesadas,
+        'porcentaje': porcentaje,
+        'intentos': trabajo.intentos,
+        'error': trabajo.error,
+    }
+
+
+def trabajos_colgados():
+    """Trabajos PENDIENTE/EN_PROCESO sin actividad en ``MINUTOS_SIN_LATIDO``."""
+    from datetime import timedelta
+
+    from .models import TrabajoImportacion
+
+    limite = timezone.now() - timedelta(minutes=MINUTOS_SIN_LATIDO)
+    candidatos = TrabajoImportacion.objects.filter(
+        estado__in=[TrabajoImportacion.Estado.PENDIENTE, TrabajoImportacion.Estado.EN_PROCESO],
+        updated_at__lt=limite,
+    )
+    for trabajo in candidatos:
+        if _latido_vigente(trabajo.pk, limite):
+            continue
+        yield trabajo
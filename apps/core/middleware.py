@@ -6,7 +6,14 @@ Filtra acceso por path-prefix según el rol del usuario:
 - Resto → solo LoginRequired (delegado a vistas)
 
 Paths exentos (login, api pública, static, etc.) pasan sin chequear.
+
+Las tres tablas de prefijos se compilan UNA vez (al instanciar el
+middleware) en una sola regex anclada: una pasada por el path en C en vez
+de tres ``any(startswith)`` en Python. El orden de las alternativas
+preserva la precedencia exento > construcción > mantenimiento.
 """
+import re
+
 from django.conf import settings
 from django.http import HttpResponse
 from django.shortcuts import redirect
@@ -16,7 +23,7 @@ from django.contrib import messages
 from .permissions import (
     MODULO_CONSTRUCCION,
     MODULO_MANTENIMIENTO,
-    user_can_access_modulo,
+    request_can_access_modulo,
 )
 
 
@@ -53,28 +60,55 @@ MANTENIMIENTO_PREFIXES = (
 )
 
 
+_EXENTO = 'exento'
+
+
+def compilar_prefijos(tablas):
+    """Clasificador ``path -> clave | None`` para ``[(clave, prefijos), ...]``.
+
+    Gana la primera tabla (en orden) con un prefijo que matchee, igual que
+    la cadena de ``any(path.startswith(p) ...)`` a la que reemplaza.
+    """
+    grupos = {}
+    partes = []
+    for i, (clave, prefijos) in enumerate(tablas):
+        if not prefijos:
+            continue
+        nombre = f'g{i}'
+        grupos[nombre] = clave
+        partes.append(f"(?P<{nombre}>{'|'.join(re.escape(p) for p in prefijos)})")
+    if not partes:
+        return lambda path: None
+    match = re.compile('|'.join(partes)).match
+
+    def clasificar(path):
+        encontrado = match(path)
+        return grupos[encontrado.lastgroup] if encontrado else None
+
+    return clasificar
+
+
 class RBACModuloMiddleware:
     """Bloquea acceso por prefix-path según permisos RBAC del usuario."""
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.clasificar = compilar_prefijos([
+            (_EXENTO, EXEMPT_PREFIXES),
+            (MODULO_CONSTRUCCION, CONSTRUCCION_PREFIXES),
+            (MODULO_MANTENIMIENTO, MANTENIMIENTO_PREFIXES),
+        ])
 
     def __call__(self, request):
-        path = request.path
-        if any(path.startswith(p) for p in EXEMPT_PREFIXES):
+        modulo_requerido = self.clasificar(request.path)
+        if modulo_requerido == _EXENTO:
             return self.get_response(request)
 
         # Usuario no autenticado → dejar pasar (LoginRequired lo manejará)
         if not request.user.is_authenticated:
             return self.get_response(request)
 
-        modulo_requerido = None
-        if any(path.startswith(p) for p in CONSTRUCCION_PREFIXES):
-            modulo_requerido = MODULO_CONSTRUCCION
-        elif any(path.startswith(p) for p in MANTENIMIENTO_PREFIXES):
-            modulo_requerido = MODULO_MANTENIMIENTO
-
-        if modulo_requerido and not user_can_access_modulo(request.user, modulo_requerido):
+        if modulo_requerido and not request_can_access_modulo(request, modulo_requerido):
             messages.error(
                 request,
                 f"Acceso denegado: su rol ({getattr(request.user, 'rol', 'sin rol')}) "
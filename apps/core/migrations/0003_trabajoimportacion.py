@@ -0,0 +1,49 @@
+# Trabajos de importación en segundo plano (Excel → Celery, ver
+# apps/core/models_importacion.py). Esquema aditivo puro.
+
+import django.core.serializers.json
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_seed_roles_permisos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoImportacion',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('tipo', models.CharField(choices=[('PROGRAMACION', 'Programación de actividades'), ('AVANCES', 'Avances de actividades'), ('COSTOS_CUADRILLA', 'Costos desde cuadrillas'), ('PDEO', 'Excel PDEO'), ('CUADRILLAS', 'Cuadrillas (Aviso SAP / S18)')], max_length=20, verbose_name='Tipo')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En proceso'), ('COMPLETADO', 'Completado'), ('FALLIDO', 'Fallido')], default='PENDIENTE', max_length=20, verbose_name='Estado')),
+                ('archivo', models.FileField(blank=True, upload_to='importaciones/%Y/%m/', verbose_name='Archivo')),
+                ('nombre_archivo', models.CharField(blank=True, max_length=255, verbose_name='Nombre del archivo')),
+                ('parametros', models.JSONField(blank=True, default=dict, help_text='Opciones del formulario (línea, año, mes, contrato...)', verbose_name='Parámetros')),
+                ('total_filas', models.PositiveIntegerField(blank=True, null=True, verbose_name='Total de filas')),
+                ('filas_procesadas', models.PositiveIntegerField(default=0, verbose_name='Filas procesadas')),
+                ('checkpoint', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Último lote confirmado; el worker reanuda desde acá', verbose_name='Checkpoint')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('resultado', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='resultado del importador + mensajes + redirect_url', verbose_name='Resultado')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('tarea_id', models.CharField(blank=True, max_length=255, verbose_name='ID tarea Celery')),
+                ('iniciado_en', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado en')),
+                ('finalizado_en', models.DateTimeField(blank=True, null=True, verbose_name='Finalizado en')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trabajos_importacion', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de importación',
+                'verbose_name_plural': 'Trabajos de importación',
+                'db_table': 'trabajos_importacion',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['estado', 'updated_at'], name='trab_imp_estado_idx'), models.Index(fields=['usuario', '-created_at'], name='trab_imp_usuario_idx')],
+            },
+        ),
+    ]
@@ -125,10 +125,10 @@ class ModuloRequiredMixin(UserPassesTestMixin):
     required_modulo = None
 
     def test_func(self):
-        from .permissions import user_can_access_modulo
+        from .permissions import request_can_access_modulo
         if not self.request.user.is_authenticated:
             return False
-        return user_can_access_modulo(self.request.user, self.required_modulo)
+        return request_can_access_modulo(self.request, self.required_modulo)
 
     def handle_no_permission(self):
         from django.core.exceptions import PermissionDenied
@@ -166,10 +166,10 @@ class SubModuloRequiredMixin(UserPassesTestMixin):
     required_submodulo = None
 
     def test_func(self):
-        from .permissions import user_can_access_submodulo
+        from .permissions import request_can_access_submodulo
         if not self.request.user.is_authenticated:
             return False
-        return user_can_access_submodulo(self.request.user, self.required_submodulo)
+        return request_can_access_submodulo(self.request, self.required_submodulo)
 
     def handle_no_permission(self):
         from django.core.exceptions import PermissionDenied
@@ -98,3 +98,4 @@ class SoftDeleteModelWithManager(SoftDeleteModel):
 # Import al final del archivo (después de BaseModel) para evitar import
 # circular: models_roles.py hace `from apps.core.models import BaseModel`.
 from .models_roles import *  # noqa: E402, F401, F403 — issue #186
+from .models_importacion import *  # noqa: E402, F401, F403 — importaciones en segundo plano
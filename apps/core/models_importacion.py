@@ -0,0 +1,146 @@
+"""Trabajos de importación en segundo plano.
+
+NEW MODELS GO IN A NEW FILE (convención del repo, ver models_roles.py) —
+re-exportado en apps/core/models.py.
+
+Un ``TrabajoImportacion`` es un Excel subido (o un cálculo sin archivo,
+como la carga de costos desde cuadrillas) que la request deja encolado en
+Celery y un worker procesa en lotes. El avance vivo va a la cache (ver
+``apps.core.importaciones.Progreso``); acá quedan el ``checkpoint`` desde
+el cual reanudar y el resultado final que la UI consulta por polling.
+"""
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.urls import reverse
+
+from apps.core.models import BaseModel
+
+
+class TrabajoImportacion(BaseModel):
+    """Importación encolada: archivo, parámetros, avance y resultado."""
+
+    class Tipo(models.TextChoices):
+        PROGRAMACION = 'PROGRAMACION', 'Programación de actividades'
+        AVANCES = 'AVANCES', 'Avances de actividades'
+        COSTOS_CUADRILLA = 'COSTOS_CUADRILLA', 'Costos desde cuadrillas'
+        PDEO = 'PDEO', 'Excel PDEO'
+        CUADRILLAS = 'CUADRILLAS', 'Cuadrillas (Aviso SAP / S18)'
+
+    class Estado(models.TextChoices):
+        PENDIENTE = 'PENDIENTE', 'Pendiente'
+        EN_PROCESO = 'EN_PROCESO', 'En proceso'
+        COMPLETADO = 'COMPLETADO', 'Completado'
+        FALLIDO = 'FALLIDO', 'Fallido'
+
+    tipo = models.CharField(
+        max_length=20,
+        choices=Tipo.choices,
+        verbose_name='Tipo',
+    )
+    estado = models.CharField(
+        max_length=20,
+        choices=Estado.choices,
+        default=Estado.PENDIENTE,
+        verbose_name='Estado',
+    )
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='trabajos_importacion',
+        verbose_name='Usuario',
+    )
+    archivo = models.FileField(
+        upload_to='importaciones/%Y/%m/',
+        blank=True,
+        verbose_name='Archivo',
+    )
+    nombre_archivo = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='Nombre del archivo',
+    )
+    parametros = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Parámetros',
+        help_text='Opciones del formulario (línea, año, mes, contrato...)',
+    )
+    total_filas = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Total de filas',
+    )
+    filas_procesadas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Filas procesadas',
+    )
+    checkpoint = models.JSONField(
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name='Checkpoint',
+        help_text='Último lote confirmado; el worker reanuda desde acá',
+    )
+    intentos = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Intentos',
+    )
+    resultado = models.JSONField(
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name='Resultado',
+        help_text='resultado del importador + mensajes + redirect_url',
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Error',
+    )
+    tarea_id = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='ID tarea Celery',
+    )
+    iniciado_en = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Iniciado en',
+    )
+    finalizado_en = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Finalizado en',
+    )
+
+    class Meta:
+        db_table = 'trabajos_importacion'
+        verbose_name = 'Trabajo de importación'
+        verbose_name_plural = 'Trabajos de importación'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['estado', 'updated_at'], name='trab_imp_estado_idx'),
+            models.Index(fields=['usuario', '-created_at'], name='trab_imp_usuario_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - {self.nombre_archivo or self.id} ({self.get_estado_display()})"
+
+    def get_absolute_url(self):
+        return reverse('core:trabajo_importacion', kwargs={'pk': self.pk})
+
+    @property
+    def terminado(self):
+        return self.estado in (self.Estado.COMPLETADO, self.Estado.FALLIDO)
+
+    @property
+    def porcentaje(self):
+        """Avance 0..100; ``None`` si todavía no se conoce el total."""
+        if self.estado == self.Estado.COMPLETADO:
+            return 100
+        if not self.total_filas:
+            return None
+        return min(99, int(self.filas_procesadas * 100 / self.total_filas))
@@ -198,6 +198,43 @@ def user_can_access_submodulo(user, submodulo):
     return submodulo in user_submodulos(user)
 
 
+def permisos_de_request(request):
+    """``{'modulos', 'submodulos'}`` del usuario de la request, resueltos UNA
+    vez por request.
+
+    El middleware, los mixins y los template tags del sidebar
+    (``puede_acceder``/``puede_submodulo``, decenas por render) consultan
+    lo mismo; sin memo cada consulta era un ``cache.get`` (round-trip a
+    Redis + unpickle). La memo vive en la request —nunca en sesión: una
+    edición de la matriz (A5) tiene efecto en el próximo request— y se
+    descarta si ``request.user`` cambia a mitad de request (login/logout).
+    """
+    user = getattr(request, 'user', None)
+    clave = (getattr(user, 'pk', None), bool(user and user.is_authenticated))
+    memo = getattr(request, '_rbac_permisos', None)
+    if memo is None or memo[0] != clave:
+        memo = (clave, {
+            'modulos': user_modulos(user),
+            'submodulos': user_submodulos(user),
+        })
+        request._rbac_permisos = memo
+    return memo[1]
+
+
+def request_can_access_modulo(request, modulo):
+    """``user_can_access_modulo`` para ``request.user``, memoizado en la request."""
+    if not modulo:
+        return True
+    return modulo in permisos_de_request(request)['modulos']
+
+
+def request_can_access_submodulo(request, submodulo):
+    """``user_can_access_submodulo`` para ``request.user``, memoizado en la request."""
+    if not submodulo:
+        return True
+    return submodulo in permisos_de_request(request)['submodulos']
+
+
 def url_inicio_para_usuario(user):
     """URL adonde redirigir al usuario tras login según su rol."""
     if not user or not user.is_authenticated:
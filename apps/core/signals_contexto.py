@@ -0,0 +1,27 @@
+"""Invalidación del contexto global del sidebar (``apps.core.cache``).
+
+Cualquier alta/edición/baja de Contrato, ProyectoConstruccion o Suscripcion
+incrementa la versión del contexto. Se invalida en el momento y de nuevo
+tras el commit: si otra request recalculó la cache mientras la transacción
+seguía abierta, habría guardado los datos previos al cambio.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.construccion.models import ProyectoConstruccion
+from apps.contratos.models import Contrato
+from apps.pagos.models import Suscripcion
+
+from .cache import invalidate_contexto_global
+
+
+@receiver(post_save, sender=Contrato, dispatch_uid='contexto_global_contrato_save')
+@receiver(post_delete, sender=Contrato, dispatch_uid='contexto_global_contrato_delete')
+@receiver(post_save, sender=ProyectoConstruccion, dispatch_uid='contexto_global_proyecto_save')
+@receiver(post_delete, sender=ProyectoConstruccion, dispatch_uid='contexto_global_proyecto_delete')
+@receiver(post_save, sender=Suscripcion, dispatch_uid='contexto_global_suscripcion_save')
+@receiver(post_delete, sender=Suscripcion, dispatch_uid='contexto_global_suscripcion_delete')
+def _invalidar_contexto_global(sender, **kwargs):
+    invalidate_contexto_global()
+    transaction.on_commit(invalidate_contexto_global)
@@ -0,0 +1,25 @@
+"""
+Backend de `default_storage` en producción sobre el cliente GCS compartido.
+
+`storages.backends.gcloud.GoogleCloudStorage` crea su propio
+`storage.Client` por instancia de storage. Este backend usa el cliente por
+proceso de `apps.core.utils.get_storage_client` (pool HTTP keep-alive), así
+los FileField (KMZ de líneas, procedimientos, archivos de importación) y
+`upload_to_gcs`/`download_from_gcs` comparten conexiones.
+"""
+from storages.backends.gcloud import GoogleCloudStorage
+
+from .utils import get_storage_client
+
+
+class PooledGoogleCloudStorage(GoogleCloudStorage):
+
+    @property
+    def client(self):
+        return get_storage_client()
+
+    @property
+    def bucket(self):
+        # Sin cachear: el bucket guarda una referencia al cliente, que se
+        # recrea tras un fork.
+        return self.client.bucket(self.bucket_name)
@@ -0,0 +1,74 @@
+"""Celery tasks for background Excel imports (see apps.core.importaciones)."""
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+from .importaciones import ERRORES_TRANSITORIOS, MAX_INTENTOS, MINUTOS_SIN_LATIDO
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(
+    bind=True, acks_late=True, reject_on_worker_lost=True, ignore_result=True,
+    autoretry_for=ERRORES_TRANSITORIOS, max_retries=MAX_INTENTOS, retry_backoff=True,
+)
+def procesar_trabajo_importacion(self, trabajo_id):
+    """
+    Process (or resume) a queued import job.
+
+    acks_late + reject_on_worker_lost: if the worker dies mid-import the
+    message goes back to the queue. The job is still EN_PROCESO then, and
+    ejecutar_trabajo only claims it once its heartbeat is older than
+    MINUTOS_SIN_LATIDO, so the task retries after that window and resumes
+    from the job's checkpoint. If another worker is really running it, the
+    retry finds it finished and does nothing.
+
+    Transient DB/network/storage errors (ERRORES_TRANSITORIOS) put the job
+    back to PENDIENTE and are retried with backoff; the job is marked failed
+    after MAX_INTENTOS attempts.
+    """
+    from .importaciones import ejecutar_trabajo
+
+    trabajo = ejecutar_trabajo(trabajo_id)
+    if trabajo.estado == trabajo.Estado.EN_PROCESO:
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=MINUTOS_SIN_LATIDO * 60)
+        logger.warning(f"Import job {trabajo_id} still claimed; leaving it to the stall sweep")
+        return trabajo.estado
+    logger.info(f"Import job {trabajo_id} finished as {trabajo.estado}")
+    return trabajo.estado
+
+
+@shared_task
+def reanudar_trabajos_colgados():
+    """
+    Re-dispatch import jobs with no heartbeat (worker lost, broker down at
+    enqueue time). Jobs that exhausted their retries are marked as failed.
+    """
+    from django.utils import timezone
+
+    from .importaciones import MAX_INTENTOS, despachar, trabajos_colgados
+
+    reanudados = 0
+    for trabajo in trabajos_colgados():
+        # Conditional on the row being untouched since it was read, so a
+        # worker that checkpointed meanwhile keeps its job.
+        sin_cambios = type(trabajo).objects.filter(
+            pk=trabajo.pk, estado=trabajo.estado, updated_at=trabajo.updated_at,
+        )
+        if trabajo.intentos >= MAX_INTENTOS:
+            sin_cambios.update(
+                estado=trabajo.Estado.FALLIDO,
+                error=trabajo.error or f'Sin respuesta del worker tras {trabajo.intentos} intentos',
+                finalizado_en=timezone.now(),
+                updated_at=timezone.now(),
+            )
+            continue
+        # Back to PENDIENTE so ejecutar_trabajo can claim it again; touching
+        # updated_at keeps the next sweep from re-dispatching it.
+        if sin_cambios.update(estado=trabajo.Estado.PENDIENTE, updated_at=timezone.now()):
+            despachar(trabajo.pk)
+            reanudados += 1
+
+    logger.info(f"Re-dispatched {reanudados} stalled import jobs")
+    return reanudados
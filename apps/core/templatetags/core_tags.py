@@ -11,10 +11,11 @@ def get_item(dictionary, key):
 @register.simple_tag(takes_context=True)
 def puede_acceder(context, modulo):
     """{% puede_acceder 'CONSTRUCCION' as ok %} → True/False según RBAC del usuario (#44)."""
-    from apps.core.permissions import user_can_access_modulo
+    from apps.core.permissions import request_can_access_modulo, user_can_access_modulo
     request = context.get('request')
-    user = getattr(request, 'user', None)
-    return user_can_access_modulo(user, modulo)
+    if request is None:
+        return user_can_access_modulo(None, modulo)
+    return request_can_access_modulo(request, modulo)
 
 
 @register.simple_tag(takes_context=True)
@@ -29,7 +30,8 @@ def es_admin_rbac(context):
 @register.simple_tag(takes_context=True)
 def puede_submodulo(context, submodulo):
     """{% puede_submodulo 'FINANCIERO' as ok %} → True/False (#62 iter 2)."""
-    from apps.core.permissions import user_can_access_submodulo
+    from apps.core.permissions import request_can_access_submodulo, user_can_access_submodulo
     request = context.get('request')
-    user = getattr(request, 'user', None)
-    return user_can_access_submodulo(user, submodulo)
+    if request is None:
+        return user_can_access_submodulo(None, submodulo)
+    return request_can_access_submodulo(request, submodulo)
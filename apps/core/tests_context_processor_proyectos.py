@@ -55,7 +55,7 @@ def test_proyecto_finalizado_aparece_en_selector(request_obj):
     proyecto = _make_proyecto('FINALIZADO', 'C144-FIN-001')
 
     ctx = modulo_context(request_obj)
-    ids = list(ctx['proyectos_construccion'].values_list('id', flat=True))
+    ids = [p.id for p in ctx['proyectos_construccion']]
 
     assert proyecto.id in ids, (
         'Un proyecto en estado FINALIZADO debe aparecer en el selector '
@@ -72,7 +72,7 @@ def test_todos_los_estados_incluidos(request_obj):
     }
 
     ctx = modulo_context(request_obj)
-    ids = set(ctx['proyectos_construccion'].values_list('id', flat=True))
+    ids = {p.id for p in ctx['proyectos_construccion']}
 
     for estado, proyecto in proyectos.items():
         assert proyecto.id in ids, f'Proyecto {estado} ausente del selector'
@@ -94,7 +94,7 @@ def test_whitelist_cubre_choices_del_modelo(request_obj):
     }
 
     ctx = modulo_context(request_obj)
-    ids = set(ctx['proyectos_construccion'].values_list('id', flat=True))
+    ids = {p.id for p in ctx['proyectos_construccion']}
 
     faltantes = [
         estado for estado, p in proyectos_por_estado.items() if p.id not in ids
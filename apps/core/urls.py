@@ -2,7 +2,7 @@
 Core URL patterns.
 """
 from django.urls import path
-from . import views
+from . import views, views_importacion
 from apps.cuadrillas import views as cuadrillas_views
 
 app_name = 'core'
@@ -25,6 +25,18 @@ urlpatterns = [
         views.RoleModuloPermisoCeldaView.as_view(),
         name='roles_matriz_celda',
     ),
+    # Trabajos de importación en segundo plano (apps/core/importaciones.py)
+    path('importaciones/<uuid:pk>/', views_importacion.TrabajoImportacionView.as_view(), name='trabajo_importacion'),
+    path(
+        'importaciones/<uuid:pk>/estado/',
+        views_importacion.TrabajoImportacionEstadoView.as_view(),
+        name='trabajo_importacion_estado',
+    ),
+    path(
+        'importaciones/<uuid:pk>/resultado/',
+        views_importacion.TrabajoImportacionResultadoView.as_view(),
+        name='trabajo_importacion_resultado',
+    ),
     # El modelo se aloja en cuadrillas por sus FKs operativas, pero el maestro
     # se expone al usuario bajo Parametrización (issue #226, A2).
     path('parametrizacion/vehiculos/', cuadrillas_views.VehiculoEntryView.as_view(), name='vehiculos_lista'),
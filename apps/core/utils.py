@@ -2,90 +2,256 @@
 Core utility functions for GCP integration and general utilities.
 
 Includes:
-- Google Cloud Storage upload/download
+- Cloud Storage access layer (pooled GCS client, streaming, local backend)
 - Google Secret Manager access
 - Google Cloud Tasks integration
 - Formatting utilities
 """
 from django.conf import settings
 from functools import lru_cache
-import io
 import json
 import logging
 import os
+import threading
 
 logger = logging.getLogger(__name__)
 
 
 # =============================================================================
-# Google Cloud Storage Functions
+# Cloud Storage access layer
 # =============================================================================
+#
+# Un único punto de acceso a archivos (evidencias, KMZ, procedimientos,
+# exportes de reportes). Antes cada llamada creaba un `storage.Client` nuevo
+# —autenticación + conexión TLS por archivo— y las descargas cargaban el
+# objeto entero en memoria; en local se hacía un `requests.get` sin pool
+# contra la URL de media (que ni siquiera es absoluta).
+#
+# - `get_storage_backend()` elige el backend: GCS si hay `GS_BUCKET_NAME`,
+#   si no el filesystem vía `default_storage` (también el de tests).
+# - El cliente GCS es uno por proceso (se recrea tras un fork: prefork de
+#   Celery / workers de gunicorn) con un pool HTTP de `STORAGE_POOL_SIZE`
+#   conexiones keep-alive.
+# - Lecturas y escrituras de archivos grandes van por chunks de
+#   `STORAGE_CHUNK_SIZE` (`open_from_storage`, `iter_storage_chunks`,
+#   `upload_to_gcs` con un file-like).
+
+STORAGE_CHUNK_SIZE = 8 * 1024 * 1024  # múltiplo de 256 KB (requisito de GCS)
+STORAGE_POOL_SIZE = 32
+GCS_PUBLIC_PREFIX = 'https://storage.googleapis.com/'
+
+_storage_clients = {}
+_storage_lock = threading.Lock()
+_http_sessions = {}
+
 
 def get_storage_client():
-    """Get GCS client, creating if necessary."""
+    """Get the process-wide GCS client (pooled HTTP session)."""
+    pid = os.getpid()
+    client = _storage_clients.get(pid)
+    if client is not None:
+        return client
+
+    with _storage_lock:
+        client = _storage_clients.get(pid)
+        if client is None:
+            client = _build_storage_client()
+            # Clientes heredados de otro PID (pre-fork) no se reutilizan:
+            # comparten sockets con el proceso padre.
+            _storage_clients.clear()
+            _storage_clients[pid] = client
+    return client
+
+
+def _build_storage_client():
+    import google.auth
+    from google.auth.transport.requests import AuthorizedSession
     from google.cloud import storage
-    return storage.Client(project=getattr(settings, 'GS_PROJECT_ID', None))
-
+    from requests.adapters import HTTPAdapter
+
+    # Same scopes the client requests on its own (full_control): uploads set
+    # predefined_acl='publicRead', which read_write does not allow.
+    credentials, _ = google.auth.default(scopes=storage.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=STORAGE_POOL_SIZE, pool_maxsize=STORAGE_POOL_SIZE)
+    session.mount('https://', adapter)
+    return storage.Client(
+        project=getattr(settings, 'GS_PROJECT_ID', None) or None,
+        credentials=credentials,
+        _http=session,
+    )
+
+
+def get_http_session():
+    """Process-wide pooled `requests` session for plain HTTP downloads."""
+    pid = os.getpid()
+    session = _http_sessions.get(pid)
+    if session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=STORAGE_POOL_SIZE, pool_maxsize=STORAGE_POOL_SIZE)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _http_sessions.clear()
+        _http_sessions[pid] = session
+    return session
+
+
+class GCSStorageBackend:
+    """Google Cloud Storage backend over the shared client."""
+
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+
+    def _blob(self, url: str):
+        # Parse bucket and blob name from URL
+        if url.startswith(GCS_PUBLIC_PREFIX):
+            bucket_name, blob_name = url[len(GCS_PUBLIC_PREFIX):].split('/', 1)
+        elif url.startswith('gs://'):
+            bucket_name, blob_name = url[len('gs://'):].split('/', 1)
+        else:
+            bucket_name, blob_name = self.bucket_name, url
+        return get_storage_client().bucket(bucket_name).blob(blob_name)
+
+    def upload(self, file_content, destination_path: str, content_type: str = None) -> str:
+        blob = self._blob(destination_path)
+        # ACL en la misma request del upload (antes: upload + make_public).
+        if isinstance(file_content, (bytes, bytearray)):
+            blob.upload_from_string(
+                bytes(file_content), content_type=content_type, predefined_acl='publicRead',
+            )
+        else:
+            # Upload resumable por chunks: el archivo nunca entra entero a memoria.
+            blob.chunk_size = STORAGE_CHUNK_SIZE
+            blob.upload_from_file(
+                file_content, rewind=True, content_type=content_type,
+                predefined_acl='publicRead',
+            )
+        return blob.public_url
+
+    def open(self, url: str):
+        return self._blob(url).open('rb', chunk_size=STORAGE_CHUNK_SIZE)
+
+    def download(self, url: str) -> bytes:
+        return self._blob(url).download_as_bytes()
+
+
+class LocalStorageBackend:
+    """Filesystem backend over Django's `default_storage`.
+
+    Drop-in for `GCSStorageBackend` in local development and tests: URLs are
+    `default_storage.url(path)` and are mapped back to storage paths on read.
+    """
 
-def upload_to_gcs(file_content, destination_path: str) -> str:
+    def __init__(self, storage=None):
+        self._storage = storage
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from django.core.files.storage import default_storage
+            return default_storage
+        return self._storage
+
+    def _path(self, url: str) -> str:
+        from urllib.parse import unquote, urlparse
+
+        ruta = urlparse(url).path if '://' in url else url
+        media_url = urlparse(settings.MEDIA_URL).path or '/'
+        if ruta.startswith(media_url):
+            ruta = ruta[len(media_url):]
+        return unquote(ruta.lstrip('/'))
+
+    def upload(self, file_content, destination_path: str, content_type: str = None) -> str:
+        from django.core.files.base import ContentFile, File
+
+        if isinstance(file_content, (bytes, bytearray)):
+            contenido = ContentFile(bytes(file_content))
+        else:
+            contenido = File(file_content)
+        path = self.storage.save(destination_path, contenido)
+        return self.storage.url(path)
+
+    def open(self, url: str):
+        path = self._path(url)
+        if self.storage.exists(path):
+            return self.storage.open(path, 'rb')
+        if url.startswith(('http://', 'https://')):
+            # URL externa (p. ej. dev apuntando a archivos remotos).
+            response = get_http_session().get(url, stream=True, timeout=60)
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return response.raw
+        raise FileNotFoundError(url)
+
+    def download(self, url: str) -> bytes:
+        with self.open(url) as archivo:
+            return archivo.read()
+
+
+def get_storage_backend():
+    """GCS when `GS_BUCKET_NAME` is configured, the local filesystem otherwise."""
+    bucket_name = getattr(settings, 'GS_BUCKET_NAME', '')
+    if bucket_name:
+        return GCSStorageBackend(bucket_name)
+    return LocalStorageBackend()
+
+
+def upload_to_gcs(file_content, destination_path: str, content_type: str = None) -> str:
     """
     Upload file to Google Cloud Storage.
 
     Args:
-        file_content: File content (bytes or file-like object)
+        file_content: File content (bytes or file-like object; file-like
+            objects are streamed in chunks)
         destination_path: Path in the bucket (e.g., 'evidencias/123/foto.jpg')
+        content_type: Optional MIME type
 
     Returns:
         Public URL of the uploaded file
     """
-    if not settings.GS_BUCKET_NAME:
-        # Local development - save to media folder
-        from django.core.files.storage import default_storage
-        path = default_storage.save(destination_path, io.BytesIO(file_content))
-        return default_storage.url(path)
-
-    client = storage.Client(project=settings.GS_PROJECT_ID)
-    bucket = client.bucket(settings.GS_BUCKET_NAME)
-    blob = bucket.blob(destination_path)
-
-    if isinstance(file_content, bytes):
-        blob.upload_from_string(file_content)
-    else:
-        blob.upload_from_file(file_content)
-
-    blob.make_public()
-    return blob.public_url
+    return get_storage_backend().upload(file_content, destination_path, content_type)
 
 
 def download_from_gcs(url: str) -> bytes:
     """
     Download file from Google Cloud Storage.
 
+    Prefer `open_from_storage` / `iter_storage_chunks` for large files: this
+    loads the whole object in memory.
+
     Args:
         url: Public URL or gs:// path
 
     Returns:
         File content as bytes
     """
-    if not settings.GS_BUCKET_NAME:
-        # Local development
-        import requests
-        response = requests.get(url)
-        return response.content
+    return get_storage_backend().download(url)
 
-    # Parse bucket and blob name from URL
-    if url.startswith('https://storage.googleapis.com/'):
-        path = url.replace('https://storage.googleapis.com/', '')
-        bucket_name, blob_name = path.split('/', 1)
-    else:
-        bucket_name = settings.GS_BUCKET_NAME
-        blob_name = url
 
-    client = storage.Client(project=settings.GS_PROJECT_ID)
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(blob_name)
+def open_from_storage(url: str):
+    """
+    Open a stored file for streaming reads.
+
+    Args:
+        url: Public URL, gs:// path or local media URL
+
+    Returns:
+        Binary file-like object (use as a context manager)
+    """
+    return get_storage_backend().open(url)
+
 
-    return blob.download_as_bytes()
+def iter_storage_chunks(url: str, chunk_size: int = STORAGE_CHUNK_SIZE):
+    """Yield the stored file in chunks of `chunk_size` bytes."""
+    with open_from_storage(url) as archivo:
+        while True:
+            chunk = archivo.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
 
 
 def format_currency(value, currency='COP'):
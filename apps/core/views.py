@@ -165,9 +165,8 @@ def health_check(request: HttpRequest) -> JsonResponse:
             old_handler = signal.signal(signal.SIGALRM, timeout_handler)
             signal.alarm(TIMEOUT_SECONDS)
             try:
-                from google.cloud import storage as gcs_storage
-                client = gcs_storage.Client()
-                bucket = client.bucket(bucket_name)
+                from apps.core.utils import get_storage_client
+                bucket = get_storage_client().bucket(bucket_name)
                 # Verify bucket exists and is accessible
                 bucket.reload()
                 checks['storage'] = 'healthy'
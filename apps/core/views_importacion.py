@@ -0,0 +1,77 @@
+"""
+Vistas de seguimiento de los trabajos de importación en segundo plano
+(ver apps/core/importaciones.py).
+
+- ``TrabajoImportacionView``: página del trabajo; mientras corre, el
+  parcial de estado se refresca por HTMX cada pocos segundos.
+- ``TrabajoImportacionEstadoView``: avance (JSON, o el parcial si la
+  request viene de HTMX).
+- ``TrabajoImportacionResultadoView``: resultado final en JSON.
+
+Cada usuario ve solo sus trabajos; superusuarios y roles nivel admin ven
+todos.
+"""
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views import View
+from django.views.generic import TemplateView
+
+from .importaciones import estado_trabajo
+from .models import TrabajoImportacion
+
+
+def trabajos_visibles(user):
+    qs = TrabajoImportacion.objects.all()
+    if user.is_superuser:
+        return qs
+    from .permissions import user_es_admin
+    if user_es_admin(user):
+        return qs
+    return qs.filter(usuario=user)
+
+
+class TrabajoImportacionMixin(LoginRequiredMixin):
+
+    def get_trabajo(self):
+        return get_object_or_404(trabajos_visibles(self.request.user), pk=self.kwargs['pk'])
+
+
+class TrabajoImportacionView(TrabajoImportacionMixin, TemplateView):
+    template_name = 'core/trabajo_importacion.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        trabajo = self.get_trabajo()
+        context['trabajo'] = trabajo
+        context['estado'] = estado_trabajo(trabajo)
+        return context
+
+
+class TrabajoImportacionEstadoView(TrabajoImportacionMixin, TemplateView):
+    template_name = 'core/partials/_trabajo_importacion_estado.html'
+
+    def get(self, request, *args, **kwargs):
+        trabajo = self.get_trabajo()
+        estado = estado_trabajo(trabajo)
+        if not request.headers.get('HX-Request'):
+            return JsonResponse(estado)
+        response = self.render_to_response({'trabajo': trabajo, 'estado': estado})
+        if estado['terminado']:
+            # Recarga la página completa para mostrar el resultado.
+            response['HX-Refresh'] = 'true'
+        return response
+
+
+class TrabajoImportacionResultadoView(TrabajoImportacionMixin, View):
+
+    def get(self, request, *args, **kwargs):
+        trabajo = self.get_trabajo()
+        if not trabajo.terminado:
+            return JsonResponse(estado_trabajo(trabajo), status=202)
+        return JsonResponse({
+            **estado_trabajo(trabajo),
+            'resultado': trabajo.resultado.get('resultado', {}),
+            'mensajes': trabajo.resultado.get('mensajes', []),
+            'redirect_url': trabajo.resultado.get('redirect_url'),
+        })
@@ -4,13 +4,18 @@ API endpoints for crews (Django Ninja).
 from typing import Any, Optional, Union
 from uuid import UUID
 from decimal import Decimal
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
 
 from ninja import Router, Schema
+from ninja.errors import HttpError
 from django.http import HttpRequest
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 from apps.api.auth import OptionalJWTAuth
-from .models import Cuadrilla, CuadrillaMiembro, TrackingUbicacion, Asistencia
+from .models import Cuadrilla, CuadrillaMiembro, TrackingUbicacion, UltimaUbicacionCuadrilla, Asistencia
+from .recorridos import recorrido
+from .tracking_historial import MAX_PUNTOS_LOTE, ingresar_lote
 
 router = Router(auth=OptionalJWTAuth())
 
@@ -45,6 +50,15 @@ class UbicacionIn(Schema):
     bateria: Optional[int] = None
 
 
+class UbicacionLoteIn(UbicacionIn):
+    # Momento de captura en el dispositivo (pings acumulados sin señal).
+    registrada_en: Optional[datetime] = None
+
+
+class UbicacionesLoteIn(Schema):
+    puntos: list[UbicacionLoteIn]
+
+
 class UbicacionOut(Schema):
     cuadrilla_codigo: str
     lat: float
@@ -129,27 +143,130 @@ def registrar_ubicacion(
     return {'status': 'ok', 'id': str(ubicacion.id)}
 
 
+@router.post('/ubicaciones/lote')
+def registrar_ubicaciones_lote(
+    request: HttpRequest,
+    data: UbicacionesLoteIn
+) -> Union[dict[str, Any], tuple[int, dict[str, str]]]:
+    """Register a batch of locations buffered by the mobile app (one bulk insert)."""
+    if len(data.puntos) > MAX_PUNTOS_LOTE:
+        raise HttpError(400, f'Máximo {MAX_PUNTOS_LOTE} puntos por lote.')
+
+    usuario = request.auth
+    cuadrilla = usuario.cuadrilla_actual
+
+    if not cuadrilla:
+        return 400, {'detail': 'Usuario no asignado a ninguna cuadrilla'}
+
+    ubicaciones, descartados = ingresar_lote(
+        cuadrilla, usuario, [punto.model_dump() for punto in data.puntos],
+    )
+
+    return {'status': 'ok', 'recibidos': len(ubicaciones), 'descartados': descartados}
+
+
 @router.get('/ubicaciones', response=list[UbicacionOut])
 def obtener_ubicaciones(request: HttpRequest) -> list[UbicacionOut]:
-    """Get latest location for all active crews."""
-    cuadrillas = Cuadrilla.objects.filter(activa=True)
-    ubicaciones: list[UbicacionOut] = []
-
-    for cuadrilla in cuadrillas:
-        ultima = TrackingUbicacion.objects.filter(
-            cuadrilla=cuadrilla
-        ).order_by('-created_at').first()
-
-        if ultima:
-            ubicaciones.append(UbicacionOut(
-                cuadrilla_codigo=cuadrilla.codigo,
-                lat=float(ultima.latitud),
-                lng=float(ultima.longitud),
-                precision=float(ultima.precision_metros) if ultima.precision_metros else None,
-                timestamp=ultima.created_at,
-            ))
-
-    return ubicaciones
+    """Get latest location for all active crews (single query)."""
+    ultimas = UltimaUbicacionCuadrilla.objects.filter(
+        cuadrilla__activa=True
+    ).select_related('cuadrilla').order_by('cuadrilla__codigo')
+
+    return [
+        UbicacionOut(
+            cuadrilla_codigo=ultima.cuadrilla.codigo,
+            lat=float(ultima.latitud),
+            lng=float(ultima.longitud),
+            precision=float(ultima.precision_metros) if ultima.precision_metros else None,
+            timestamp=ultima.registrada_en,
+        )
+        for ultima in ultimas
+    ]
+
+
+class ParadaOut(Schema):
+    lat: float
+    lng: float
+    inicio: datetime
+    fin: datetime
+    duracion_min: float
+    torre_id: Optional[UUID]
+    torre_numero: Optional[str]
+    distancia_torre_m: Optional[float]
+
+
+class RecorridoOut(Schema):
+    cuadrilla_codigo: str
+    desde: datetime
+    hasta: datetime
+    zoom: int
+    puntos_originales: int
+    puntos: int
+    tolerancia_m: float
+    polilinea: str
+    segundos: list[int]
+    paradas: list[ParadaOut]
+
+
+# Un recorrido se reproduce por jornada; una semana es el tope razonable.
+MAX_VENTANA_RECORRIDO = timedelta(days=7)
+
+
+@router.get('/cuadrillas/{cuadrilla_id}/recorrido', response=RecorridoOut)
+def obtener_recorrido(
+    request: HttpRequest,
+    cuadrilla_id: UUID,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    zoom: int = 15,
+) -> RecorridoOut:
+    """
+    Crew route for a time window (default: today), simplified for the map
+    zoom and encoded as a Google polyline, with stops near towers.
+    """
+    cuadrilla = get_object_or_404(Cuadrilla, id=cuadrilla_id)
+
+    if desde is None:
+        desde = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    elif timezone.is_naive(desde):
+        desde = timezone.make_aware(desde)
+    if hasta is None:
+        hasta = desde + timedelta(days=1)
+    elif timezone.is_naive(hasta):
+        hasta = timezone.make_aware(hasta)
+    if hasta <= desde:
+        raise HttpError(400, 'hasta debe ser posterior a desde.')
+    if hasta - desde > MAX_VENTANA_RECORRIDO:
+        raise HttpError(400, f'Ventana máxima de {MAX_VENTANA_RECORRIDO.days} días.')
+    if not 0 <= zoom <= 22:
+        raise HttpError(400, 'zoom debe estar entre 0 y 22.')
+
+    datos = recorrido(cuadrilla, desde, hasta, zoom)
+
+    return RecorridoOut(
+        cuadrilla_codigo=cuadrilla.codigo,
+        desde=desde,
+        hasta=hasta,
+        zoom=zoom,
+        puntos_originales=datos['puntos_originales'],
+        puntos=len(datos['segundos']),
+        tolerancia_m=datos['tolerancia_m'],
+        polilinea=datos['polilinea'],
+        segundos=datos['segundos'],
+        paradas=[
+            ParadaOut(
+                lat=round(p.latitud, 6),
+                lng=round(p.longitud, 6),
+                inicio=p.inicio,
+                fin=p.fin,
+                duracion_min=p.duracion_min,
+                torre_id=p.torre_id,
+                torre_numero=p.torre_numero,
+                distancia_torre_m=p.distancia_torre_m,
+            )
+            for p in datos['paradas']
+        ],
+    )
 
 
 # ==================== ASISTENCIA ENDPOINTS ====================
@@ -5,3 +5,6 @@ class CuadrillasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.cuadrillas'
     verbose_name = 'Cuadrillas'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,60 @@
+"""
+Procesador de la carga masiva de cuadrillas (ver ``apps.core.importaciones``).
+
+Auto-detecta el formato (Programación S18 o Aviso SAP) y delega en el
+importer correspondiente. Los importers ya confirman en transacciones
+propias y resuelven cuadrillas/usuarios por código y cédula, así que un
+reintento del trabajo reprocesa el archivo completo sin duplicar.
+"""
+from io import BytesIO
+
+from django.urls import reverse
+
+
+def procesar_cuadrillas(archivo, parametros, usuario=None, progreso=None):
+    """``parametros``: ``actualizar_existentes``, ``crear_usuarios_faltantes``,
+    ``linea_filtro_id``."""
+    from .importers import (
+        CuadrillaImporter,
+        ProgramacionS18CuadrillaImporter,
+        detectar_formato_cuadrillas,
+    )
+
+    # Leer el archivo a memoria una sola vez: lo usamos para detectar el
+    # formato y luego para importar (rebobinando el puntero en cada paso).
+    datos = BytesIO(archivo.read())
+    formato = detectar_formato_cuadrillas(datos)
+
+    datos.seek(0)
+    if formato == 'S18':
+        importer = ProgramacionS18CuadrillaImporter()
+    else:
+        importer = CuadrillaImporter()
+    resultado = importer.importar(datos, dict(parametros))
+    resultado.setdefault('formato', formato)
+
+    if resultado.get('exito'):
+        mensaje = (
+            f"Cuadrillas importadas: {resultado['cuadrillas_creadas']} creadas, "
+            f"{resultado['cuadrillas_actualizadas']} actualizadas, "
+            f"{resultado['miembros_agregados']} miembros agregados."
+        )
+        if resultado.get('advertencias'):
+            mensaje += f" {len(resultado['advertencias'])} advertencias."
+        mensajes = [['success', mensaje]]
+    else:
+        mensajes = [['error', f"Error: {resultado.get('error', 'desconocido')}"]]
+
+    # La vista de carga muestra el detalle completo (advertencias, omitidas)
+    # del trabajo indicado en `?trabajo=`.
+    url = reverse('cuadrillas:b4_upload_cuadrillas')
+    if progreso is not None:
+        url += f'?trabajo={progreso.trabajo.pk}'
+        if parametros.get('linea_filtro_id'):
+            url += f"&linea={parametros['linea_filtro_id']}"
+
+    return {
+        'resultado': resultado,
+        'mensajes': mensajes,
+        'redirect_url': url,
+    }
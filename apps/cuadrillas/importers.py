@@ -12,10 +12,13 @@ de encabezados + transacción atómica + resumen detallado de creación/error.
 """
 import logging
 from datetime import date
+from itertools import chain, islice
 
 from django.db import IntegrityError, transaction
 from openpyxl import load_workbook
 
+from apps.core.excel_streaming import abrir_libro, en_lotes, filas_numeradas, rangos_combinados
+
 logger = logging.getLogger(__name__)
 
 
@@ -685,38 +688,38 @@ class ProgramacionS18CuadrillaImporter:
         self.linea_filtro_id = (opciones.get('linea_filtro_id') or '').strip()
 
         try:
-            # Issue #178 (A1): NO usar read_only=True — openpyxl no expone
-            # `Worksheet.merged_cells` en modo read_only (AttributeError), y el
-            # parser de bloques necesita el RANGO real de la celda combinada de
-            # columna A/D para detectar el fin de bloque de forma 100% confiable
-            # (antes se dependía implícitamente de que la celda "#" viniera en
-            # blanco por el merge, sin verificar el merge en sí). El archivo es
-            # una programación semanal (decenas de filas por hoja) — cargarlo
-            # completo en memoria es seguro.
-            workbook = load_workbook(archivo_excel, data_only=True)
+            # Issue #178 (A1): el parser de bloques necesita el RANGO real de
+            # la celda combinada de columna A/D para detectar el fin de bloque
+            # de forma 100% confiable. openpyxl no expone
+            # `Worksheet.merged_cells` en modo read_only: los rangos salen de
+            # la pre-pasada liviana de `rangos_combinados` y las filas se leen
+            # en streaming, igual que `ProgramacionSemanalImporter`.
+            merges = rangos_combinados(archivo_excel)
+            workbook = abrir_libro(archivo_excel)
         except Exception as e:
             logger.error(f"Error cargando Excel S18: {e}")
             return self._resultado_error(f'Error al cargar archivo Excel: {e}')
 
         # Recolectar las cuadrillas de todas las hojas semanales válidas.
         bloques = []  # list[dict] cuadrilla+miembros
-        for sheet_name in workbook.sheetnames:
-            if not self._es_hoja_semanal(sheet_name):
-                continue
-            try:
-                semana = self._numero_semana(sheet_name)
-                nuevos = self._parsear_hoja(workbook[sheet_name], semana)
-                if nuevos:
-                    bloques.extend(nuevos)
-                    self.sheets_procesadas.append(sheet_name)
-            except Exception as e:
-                logger.exception(f"Error parseando hoja {sheet_name!r}")
-                self.errores.append(f'Hoja {sheet_name}: {e}')
-
         try:
-            workbook.close()
-        except Exception:
-            pass
+            for sheet_name in workbook.sheetnames:
+                if not self._es_hoja_semanal(sheet_name):
+                    continue
+                try:
+                    semana = self._numero_semana(sheet_name)
+                    nuevos = self._parsear_hoja(workbook[sheet_name], semana, merges.get(sheet_name, []))
+                    if nuevos:
+                        bloques.extend(nuevos)
+                        self.sheets_procesadas.append(sheet_name)
+                except Exception as e:
+                    logger.exception(f"Error parseando hoja {sheet_name!r}")
+                    self.errores.append(f'Hoja {sheet_name}: {e}')
+        finally:
+            try:
+                workbook.close()
+            except Exception:
+                pass
 
         # Issue #178 (A2): una hoja puede traer SOLO novedades (sin ninguna
         # actividad real) — no es un error, sigue siendo un import válido.
@@ -784,9 +787,11 @@ class ProgramacionS18CuadrillaImporter:
 
     # ---------- parseo ----------
 
-    def _parsear_hoja(self, sheet, semana):
+    def _parsear_hoja(self, sheet, semana, merges=()):
         """Devuelve lista de bloques {cuadrilla..., miembros[...]} de una hoja."""
-        rows = list(sheet.iter_rows(values_only=True))
+        filas = filas_numeradas(sheet)
+        cabecera = list(islice(filas, 6))
+        rows = [row for _, row in cabecera]
         if len(rows) < 3:
             return []
 
@@ -813,7 +818,7 @@ class ProgramacionS18CuadrillaImporter:
         # heurístico legado (columna '#' en blanco = continuación del bloque
         # anterior) con una advertencia explícita.
         mapa_bloques = self._mapa_bloques_por_merge(
-            sheet, self.column_indices.get('numero'), self.column_indices.get('tramo')
+            merges, self.column_indices.get('numero'), self.column_indices.get('tramo')
         )
         usa_fallback_legado = not mapa_bloques
         if usa_fallback_legado:
@@ -831,7 +836,9 @@ class ProgramacionS18CuadrillaImporter:
         en_novedades = False
         ultimo_anio = None
 
-        for row_idx, row in enumerate(rows[header_idx + 1:], start=header_idx + 2):
+        # En lotes solo para que el progreso de los trabajos en segundo plano avance.
+        datos = chain.from_iterable(en_lotes(filas))
+        for row_idx, row in chain(cabecera[header_idx + 1:], datos):
             numero = self._get_cell(row, 'numero')
             numero_str = '' if numero is None else str(numero).strip()
 
@@ -1347,14 +1354,14 @@ class ProgramacionS18CuadrillaImporter:
         return any(k in s for k in JT_KEYWORDS)
 
     @staticmethod
-    def _mapa_bloques_por_merge(sheet, col_numero, col_alt=None):
+    def _mapa_bloques_por_merge(merges, col_numero, col_alt=None):
         """Mapa ``{fila_excel_1based: 'inicio'|'continuacion'}`` derivado del
         RANGO de la celda combinada en la columna ``numero`` (o ``col_alt``,
         p.ej. ``tramo``/columna D, como respaldo si ``numero`` no viene
-        combinada) de ``sheet`` (issue #178, A1).
+        combinada) de la hoja (issue #178, A1).
 
-        Requiere que ``sheet`` se haya cargado SIN ``read_only=True`` —
-        openpyxl no expone ``merged_cells`` en modo read_only.
+        ``merges`` son los ``CellRange`` de la hoja tal como los devuelve
+        ``apps.core.excel_streaming.rangos_combinados``.
 
         Devuelve ``{}`` si no se encontró ningún merge de ≥2 filas en esas
         columnas (hoja "plana", sin formato de bloques) — el llamador debe
@@ -1362,13 +1369,10 @@ class ProgramacionS18CuadrillaImporter:
         """
         mapa = {}
         columnas = [c for c in (col_numero, col_alt) if c is not None]
-        merges = getattr(sheet, 'merged_cells', None)
-        if merges is None:
-            return mapa
         for col_idx in columnas:
             col_excel = col_idx + 1  # openpyxl es 1-based
             encontrados = False
-            for rango in merges.ranges:
+            for rango in merges:
                 if (
                     rango.min_col == col_excel
                     and rango.max_col == col_excel
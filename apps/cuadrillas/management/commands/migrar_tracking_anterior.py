@@ -0,0 +1,30 @@
+"""Mueve a ``tracking_ubicacion`` (particionada) las filas de la tabla plana
+que la migración 0031 renombró a ``tracking_ubicacion_anterior``.
+
+La migración no copia datos para no bloquear el ingreso de GPS; el deploy
+corre este comando después de migrar (job ``instelec-migrar-tracking`` en
+``deploy-cloudrun.yml``) y la tarea diaria de mantenimiento también avanza
+por tramos. Copia lo más reciente primero. Cada lote es su propia
+transacción: se puede interrumpir y volver a correr.
+
+Uso:
+    python manage.py migrar_tracking_anterior
+    python manage.py migrar_tracking_anterior --lote 2000 --max-lotes 100
+"""
+from django.core.management.base import BaseCommand
+
+from apps.cuadrillas.tracking_historial import TAMANO_MIGRACION, migrar_tracking_anterior
+
+
+class Command(BaseCommand):
+    help = 'Mueve por lotes el tracking previo al particionado a la tabla particionada'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANO_MIGRACION,
+                            help='Filas por transacción')
+        parser.add_argument('--max-lotes', type=int, default=None,
+                            help='Cortar tras N lotes (por defecto, hasta vaciar la tabla)')
+
+    def handle(self, *args, **opts):
+        movidas = migrar_tracking_anterior(opts['lote'], opts['max_lotes'])
+        self.stdout.write(self.style.SUCCESS(f'  ✓ {movidas} filas movidas'))
@@ -0,0 +1,133 @@
+# Última ubicación por cuadrilla para el mapa en vivo. Se puebla con el ping
+# más reciente de cada cuadrilla (DISTINCT ON, un solo query).
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def poblar_ultimas_ubicaciones(apps, schema_editor):
+    TrackingUbicacion = apps.get_model("cuadrillas", "TrackingUbicacion")
+    UltimaUbicacionCuadrilla = apps.get_model("cuadrillas", "UltimaUbicacionCuadrilla")
+
+    ultimas = (
+        TrackingUbicacion.objects.order_by("cuadrilla_id", "-created_at")
+        .distinct("cuadrilla_id")
+        .iterator(chunk_size=1000)
+    )
+    UltimaUbicacionCuadrilla.objects.bulk_create(
+        (
+            UltimaUbicacionCuadrilla(
+                cuadrilla_id=u.cuadrilla_id,
+                usuario_id=u.usuario_id,
+                latitud=u.latitud,
+                longitud=u.longitud,
+                precision_metros=u.precision_metros,
+                velocidad=u.velocidad,
+                bateria=u.bateria,
+                origen=u.origen,
+                registrada_en=u.created_at,
+            )
+            for u in ultimas
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cuadrillas", "0029_asistencia_festivo"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UltimaUbicacionCuadrilla",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Fecha de creación"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Fecha de actualización"),
+                ),
+                ("latitud", models.DecimalField(decimal_places=8, max_digits=10, verbose_name="Latitud")),
+                ("longitud", models.DecimalField(decimal_places=8, max_digits=11, verbose_name="Longitud")),
+                (
+                    "precision_metros",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=6, null=True,
+                        verbose_name="Precisión (metros)",
+                    ),
+                ),
+                (
+                    "velocidad",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=6, null=True,
+                        verbose_name="Velocidad (km/h)",
+                    ),
+                ),
+                (
+                    "bateria",
+                    models.PositiveIntegerField(blank=True, null=True, verbose_name="Nivel batería (%)"),
+                ),
+                (
+                    "origen",
+                    models.CharField(
+                        choices=[("auto", "Automático (GPS)"), ("manual", "Manual")],
+                        default="auto", max_length=10, verbose_name="Origen",
+                    ),
+                ),
+                (
+                    "registrada_en",
+                    models.DateTimeField(
+                        help_text="created_at del TrackingUbicacion copiado.",
+                        verbose_name="Registrada en",
+                    ),
+                ),
+                (
+                    "cuadrilla",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ultima_ubicacion",
+                        to="cuadrillas.cuadrilla",
+                        verbose_name="Cuadrilla",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Última ubicación de cuadrilla",
+                "verbose_name_plural": "Últimas ubicaciones de cuadrillas",
+                "db_table": "tracking_ultima_ubicacion",
+                "indexes": [
+                    models.Index(fields=["updated_at"], name="tracking_ultima_updated_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(poblar_ultimas_ubicaciones, migrations.RunPython.noop),
+    ]
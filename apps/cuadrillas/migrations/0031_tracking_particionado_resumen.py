@@ -0,0 +1,177 @@
+# Historial de tracking: tabla de resumen (minuto/hora) y, en PostgreSQL,
+# ``tracking_ubicacion`` pasa a estar particionada por mes sobre created_at.
+#
+# Una tabla particionada exige que la PK incluya la columna de partición:
+# la PK en BD pasa a (id, created_at). Para Django ``id`` sigue siendo la PK
+# (los UUID son únicos de por sí) y nadie tiene FK hacia esta tabla.
+#
+# Sin copiar datos dentro de la migración: la tabla plana se RENOMBRA a
+# ``tracking_ubicacion_anterior`` y se crea la particionada vacía (solo
+# catálogo, el lock dura milisegundos y el ingreso de GPS sigue enseguida).
+# Las filas viejas las mueve por lotes, cada uno en su transacción,
+# ``tracking_historial.migrar_tracking_anterior`` (comando
+# ``migrar_tracking_anterior`` y la tarea diaria de mantenimiento), que
+# borra la tabla anterior cuando queda vacía.
+#
+# Los índices de Meta.indexes se recrean con sus mismos nombres sobre la
+# tabla padre (se propagan a cada partición); los de la tabla anterior se
+# renombran antes para liberar el nombre. Los índices sueltos de las FK
+# no: ambos índices compuestos empiezan por la FK y los cubren.
+#
+# Reversa: no-op. La tabla particionada tiene las mismas columnas que la
+# plana y el modelo funciona igual sobre ambas.
+
+import uuid
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+TABLA = "tracking_ubicacion"
+MESES_ADELANTE = 2
+INDICES = ("tracking_ub_cuadril_9cf3bf_idx", "tracking_ub_usuario_b414fe_idx")
+
+
+def _inicio_de_mes(momento):
+    local = timezone.localtime(momento)
+    return local.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def particionar_tracking(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    quote = schema_editor.quote_name
+    cuadrillas = apps.get_model("cuadrillas", "Cuadrilla")._meta.db_table
+    usuarios = apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+    nueva = f"{TABLA}_nueva"
+    anterior = f"{TABLA}_anterior"
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(created_at) FROM {quote(TABLA)}")
+        (primero,) = cursor.fetchone()
+
+    ahora = timezone.now()
+    inicio = _inicio_de_mes(primero or ahora)
+    ultimo = _inicio_de_mes(ahora)
+    for _ in range(MESES_ADELANTE):
+        ultimo = _inicio_de_mes(ultimo + timedelta(days=32))
+
+    schema_editor.execute(
+        f"CREATE TABLE {quote(nueva)} (LIKE {quote(TABLA)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE (created_at)"
+    )
+    schema_editor.execute(f"ALTER TABLE {quote(nueva)} ADD PRIMARY KEY (id, created_at)")
+    schema_editor.execute(f"CREATE TABLE {quote(TABLA + '_default')} PARTITION OF {quote(nueva)} DEFAULT")
+    while inicio <= ultimo:
+        fin = _inicio_de_mes(inicio + timedelta(days=32))
+        schema_editor.execute(
+            f"CREATE TABLE {quote(f'{TABLA}_p{inicio:%Y_%m}')} PARTITION OF {quote(nueva)} "
+            f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fin.isoformat()}')"
+        )
+        inicio = fin
+
+    schema_editor.execute(f"ALTER TABLE {quote(TABLA)} RENAME TO {quote(anterior)}")
+    schema_editor.execute(f"ALTER INDEX {quote(TABLA + '_pkey')} RENAME TO {quote(anterior + '_pkey')}")
+    for indice in INDICES:
+        schema_editor.execute(
+            f"ALTER INDEX IF EXISTS {quote(indice)} RENAME TO {quote(indice + '_anterior')}"
+        )
+    schema_editor.execute(f"ALTER TABLE {quote(nueva)} RENAME TO {quote(TABLA)}")
+    schema_editor.execute(f"ALTER INDEX {quote(nueva + '_pkey')} RENAME TO {quote(TABLA + '_pkey')}")
+
+    schema_editor.execute(
+        f"CREATE INDEX tracking_ub_cuadril_9cf3bf_idx ON {quote(TABLA)} (cuadrilla_id, created_at DESC)"
+    )
+    schema_editor.execute(
+        f"CREATE INDEX tracking_ub_usuario_b414fe_idx ON {quote(TABLA)} (usuario_id, created_at DESC)"
+    )
+    for columna, destino in (("cuadrilla_id", cuadrillas), ("usuario_id", usuarios)):
+        schema_editor.execute(
+            f"ALTER TABLE {quote(TABLA)} ADD CONSTRAINT {quote(f'{TABLA}_{columna}_fk')} "
+            f"FOREIGN KEY ({columna}) REFERENCES {quote(destino)} (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cuadrillas", "0030_ultima_ubicacion_cuadrilla"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrackingUbicacionResumen",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Fecha de creación"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Fecha de actualización"),
+                ),
+                (
+                    "resolucion",
+                    models.CharField(
+                        choices=[("minuto", "Minuto"), ("hora", "Hora")],
+                        max_length=10,
+                        verbose_name="Resolución",
+                    ),
+                ),
+                ("inicio", models.DateTimeField(verbose_name="Inicio del periodo")),
+                ("latitud", models.DecimalField(decimal_places=8, max_digits=10, verbose_name="Latitud")),
+                ("longitud", models.DecimalField(decimal_places=8, max_digits=11, verbose_name="Longitud")),
+                (
+                    "velocidad",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=6, null=True,
+                        verbose_name="Velocidad promedio (km/h)",
+                    ),
+                ),
+                (
+                    "bateria",
+                    models.PositiveIntegerField(blank=True, null=True, verbose_name="Batería mínima (%)"),
+                ),
+                ("pings", models.PositiveIntegerField(verbose_name="Pings condensados")),
+                (
+                    "cuadrilla",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ubicaciones_resumen",
+                        to="cuadrillas.cuadrilla",
+                        verbose_name="Cuadrilla",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumen de tracking",
+                "verbose_name_plural": "Resúmenes de tracking",
+                "db_table": "tracking_ubicacion_resumen",
+                "ordering": ["cuadrilla", "inicio"],
+                "indexes": [
+                    models.Index(fields=["resolucion", "inicio"], name="tracking_resumen_res_idx"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("cuadrilla", "resolucion", "inicio"),
+                        name="tracking_resumen_unico",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(particionar_tracking, migrations.RunPython.noop),
+    ]
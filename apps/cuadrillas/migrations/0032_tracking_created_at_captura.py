@@ -0,0 +1,22 @@
+# ``TrackingUbicacion.created_at`` pasa a ser el momento de captura del ping
+# (default now, asignable) en vez de ``auto_now_add``. Sin cambio de esquema.
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cuadrillas", "0031_tracking_particionado_resumen"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="trackingubicacion",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, verbose_name="Fecha de creación"
+            ),
+        ),
+    ]
@@ -2,6 +2,7 @@
 Models for work crews (cuadrillas) management.
 """
 from django.db import models
+from django.utils import timezone
 
 from apps.core.models import BaseModel
 from apps.core.permissions import AREA_CHOICES
@@ -475,6 +476,15 @@ class TrackingUbicacion(BaseModel):
         AUTO = 'auto', 'Automático (GPS)'
         MANUAL = 'manual', 'Manual'
 
+    # Momento de CAPTURA del ping, no de inserción: los lotes que el
+    # dispositivo acumuló sin señal traen su propio ``registrada_en``. Es la
+    # llave de partición y lo que usan la retención y el recorrido, por eso
+    # no es ``auto_now_add``.
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha de creación'
+    )
+
     cuadrilla = models.ForeignKey(
         Cuadrilla,
         on_delete=models.CASCADE,
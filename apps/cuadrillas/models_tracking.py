@@ -0,0 +1,125 @@
+"""
+Modelos derivados del tracking GPS.
+
+Última ubicación conocida por cuadrilla (mapa en vivo).
+
+``TrackingUbicacion`` guarda el historial completo de pings GPS; el mapa
+solo necesita el último de cada cuadrilla. En vez de un
+``filter(cuadrilla=...).order_by('-created_at').first()`` por cuadrilla en
+cada refresco, esta tabla se mantiene al ingerir (``apps.cuadrillas.
+ultima_ubicacion``) y el mapa la lee con un único query. ``updated_at``
+(indexado) es el cursor del canal de push: los deltas son las filas
+tocadas desde el último evento enviado.
+
+Resumen del historial (``TrackingUbicacionResumen``): los pings crudos se
+conservan unos días y después se condensan a un punto por minuto, y más
+adelante a uno por hora (``apps.cuadrillas.tracking_historial``).
+
+NEW MODELS GO IN A NEW FILE (ver models.py:10) — re-exportado en
+apps/cuadrillas/models.py.
+"""
+
+from django.db import models
+
+from apps.core.models import BaseModel
+
+from .models_base import Cuadrilla, TrackingUbicacion
+
+
+class UltimaUbicacionCuadrilla(BaseModel):
+    """Copia del ping más reciente de ``TrackingUbicacion`` de una cuadrilla.
+
+    Solo avanza: un ping que llega tarde (sincronización offline) con
+    ``registrada_en`` anterior a la vigente no la pisa.
+    """
+
+    cuadrilla = models.OneToOneField(
+        Cuadrilla,
+        on_delete=models.CASCADE,
+        related_name='ultima_ubicacion',
+        verbose_name='Cuadrilla'
+    )
+    usuario = models.ForeignKey(
+        'usuarios.Usuario',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Usuario'
+    )
+    latitud = models.DecimalField('Latitud', max_digits=10, decimal_places=8)
+    longitud = models.DecimalField('Longitud', max_digits=11, decimal_places=8)
+    precision_metros = models.DecimalField(
+        'Precisión (metros)', max_digits=6, decimal_places=2, null=True, blank=True
+    )
+    velocidad = models.DecimalField(
+        'Velocidad (km/h)', max_digits=6, decimal_places=2, null=True, blank=True
+    )
+    bateria = models.PositiveIntegerField('Nivel batería (%)', null=True, blank=True)
+    origen = models.CharField(
+        'Origen',
+        max_length=10,
+        choices=TrackingUbicacion.OrigenUbicacion.choices,
+        default=TrackingUbicacion.OrigenUbicacion.AUTO,
+    )
+    registrada_en = models.DateTimeField(
+        'Registrada en',
+        help_text='created_at del TrackingUbicacion copiado.',
+    )
+
+    class Meta:
+        db_table = 'tracking_ultima_ubicacion'
+        verbose_name = 'Última ubicación de cuadrilla'
+        verbose_name_plural = 'Últimas ubicaciones de cuadrillas'
+        indexes = [
+            models.Index(fields=['updated_at'], name='tracking_ultima_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cuadrilla.codigo} - {self.registrada_en}"
+
+
+class TrackingUbicacionResumen(BaseModel):
+    """Historial de tracking condensado: un punto por cuadrilla y periodo.
+
+    La posición es el promedio de los pings del periodo, ponderado por
+    ``pings`` al pasar de minutos a horas.
+    """
+
+    class Resolucion(models.TextChoices):
+        MINUTO = 'minuto', 'Minuto'
+        HORA = 'hora', 'Hora'
+
+    cuadrilla = models.ForeignKey(
+        Cuadrilla,
+        on_delete=models.CASCADE,
+        related_name='ubicaciones_resumen',
+        verbose_name='Cuadrilla'
+    )
+    resolucion = models.CharField('Resolución', max_length=10, choices=Resolucion.choices)
+    inicio = models.DateTimeField('Inicio del periodo')
+    latitud = models.DecimalField('Latitud', max_digits=10, decimal_places=8)
+    longitud = models.DecimalField('Longitud', max_digits=11, decimal_places=8)
+    velocidad = models.DecimalField(
+        'Velocidad promedio (km/h)', max_digits=6, decimal_places=2, null=True, blank=True
+    )
+    bateria = models.PositiveIntegerField('Batería mínima (%)', null=True, blank=True)
+    pings = models.PositiveIntegerField('Pings condensados')
+
+    class Meta:
+        db_table = 'tracking_ubicacion_resumen'
+        verbose_name = 'Resumen de tracking'
+        verbose_name_plural = 'Resúmenes de tracking'
+        ordering = ['cuadrilla', 'inicio']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cuadrilla', 'resolucion', 'inicio'],
+                name='tracking_resumen_unico',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['resolucion', 'inicio'], name='tracking_resumen_res_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cuadrilla.codigo} - {self.inicio} ({self.resolucion})"
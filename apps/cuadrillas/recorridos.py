@@ -0,0 +1,216 @@
+"""
+Recorrido de una cuadrilla en una ventana de tiempo, listo para reproducir.
+
+El navegador no descarga cada ping: el servidor junta el historial (pings
+crudos y, donde ya se condensaron, los puntos por minuto/hora de
+``TrackingUbicacionResumen``), lo simplifica con Douglas-Peucker a una
+tolerancia de un píxel del zoom pedido y lo codifica como polilínea
+(formato de Google: ~4 bytes por punto contra ~40 en JSON).
+
+Las paradas se detectan sobre los puntos SIN simplificar (la
+simplificación colapsa justamente los tramos quietos) y se asocian a la
+torre más cercana de la línea asignada con el índice espacial en memoria
+(``apps.lineas.indice_espacial``).
+"""
+import math
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from apps.lineas.indice_espacial import RADIO_TIERRA_M, torre_cercana
+
+#: Metros por píxel en el ecuador a zoom 0 (tiles de 256 px, Web Mercator).
+METROS_PIXEL_Z0 = 156543.03392
+
+#: Una parada: la cuadrilla se mantiene dentro de ``RADIO_PARADA_M`` del
+#: primer punto durante al menos ``DURACION_MIN_PARADA_S``.
+RADIO_PARADA_M = 50.0
+DURACION_MIN_PARADA_S = 5 * 60
+#: Más lejos que esto la parada no se atribuye a una torre.
+RADIO_TORRE_M = 150.0
+
+
+@dataclass(frozen=True)
+class Parada:
+    latitud: float
+    longitud: float
+    inicio: object
+    fin: object
+    torre_id: object = None
+    torre_numero: Optional[str] = None
+    distancia_torre_m: Optional[float] = None
+
+    @property
+    def duracion_min(self):
+        return round((self.fin - self.inicio).total_seconds() / 60, 1)
+
+
+def puntos_recorrido(cuadrilla_id, desde, hasta):
+    """Historial de la cuadrilla en ``[desde, hasta)`` ordenado por tiempo.
+
+    Returns:
+        Lista de ``(latitud, longitud, momento)`` con floats. Los crudos y
+        los condensados no se solapan (un ping se borra al condensarse).
+    """
+    from .models import TrackingUbicacion, TrackingUbicacionResumen
+
+    condensados = TrackingUbicacionResumen.objects.filter(
+        cuadrilla_id=cuadrilla_id, inicio__gte=desde, inicio__lt=hasta,
+    ).values_list('latitud', 'longitud', 'inicio')
+    crudos = TrackingUbicacion.objects.filter(
+        cuadrilla_id=cuadrilla_id, created_at__gte=desde, created_at__lt=hasta,
+    ).order_by('created_at').values_list('latitud', 'longitud', 'created_at')
+
+    puntos = [(float(lat), float(lng), momento) for lat, lng, momento in condensados]
+    puntos.sort(key=lambda punto: punto[2])
+    puntos.extend((float(lat), float(lng), momento) for lat, lng, momento in crudos)
+    return puntos
+
+
+def _proyectar(puntos):
+    """Coordenadas planas en metros (equirectangular local)."""
+    if not puntos:
+        return []
+    lat0 = puntos[0][0]
+    cos_lat0 = math.cos(math.radians(lat0))
+    return [
+        (
+            RADIO_TIERRA_M * math.radians(lng) * cos_lat0,
+            RADIO_TIERRA_M * math.radians(lat),
+        )
+        for lat, lng, _ in puntos
+    ]
+
+
+def tolerancia_zoom(zoom, latitud):
+    """Metros que ocupa un píxel a ``zoom`` en ``latitud``."""
+    return METROS_PIXEL_Z0 * math.cos(math.radians(latitud)) / (2 ** zoom)
+
+
+def _distancia_recta(px, py, ax, ay, bx, by):
+    """Distancia de P a la recta AB (a A si A y B coinciden)."""
+    dx, dy = bx - ax, by - ay
+    largo = math.hypot(dx, dy)
+    if largo == 0:
+        return math.hypot(px - ax, py - ay)
+    return abs(dy * px - dx * py + bx * ay - by * ax) / largo
+
+
+def simplificar(puntos, tolerancia_m):
+    """Douglas-Peucker iterativo (sin recursión: tracks de decenas de miles).
+
+    Returns:
+        Los puntos conservados, en orden; siempre incluye el primero y el
+        último.
+    """
+    if len(puntos) < 3:
+        return list(puntos)
+
+    xy = _proyectar(puntos)
+    conservar = [False] * len(puntos)
+    conservar[0] = conservar[-1] = True
+    pendientes = [(0, len(puntos) - 1)]
+    while pendientes:
+        inicio, fin = pendientes.pop()
+        ax, ay = xy[inicio]
+        bx, by = xy[fin]
+        mayor, indice = 0.0, None
+        for i in range(inicio + 1, fin):
+            d = _distancia_recta(*xy[i], ax, ay, bx, by)
+            if d > mayor:
+                mayor, indice = d, i
+        if indice is not None and mayor > tolerancia_m:
+            conservar[indice] = True
+            pendientes.append((inicio, indice))
+            pendientes.append((indice, fin))
+    return [punto for punto, mantener in zip(puntos, conservar) if mantener]
+
+
+def _codificar_valor(valor):
+    valor = ~(valor << 1) if valor < 0 else valor << 1
+    partes = []
+    while valor >= 0x20:
+        partes.append(chr((0x20 | (valor & 0x1f)) + 63))
+        valor >>= 5
+    partes.append(chr(valor + 63))
+    return ''.join(partes)
+
+
+def codificar_polilinea(coordenadas, precision=5):
+    """Polilínea codificada (algoritmo de Google) de ``(lat, lng)``.
+
+    Leaflet la decodifica con ``L.PolylineUtil``/``@mapbox/polyline``.
+    """
+    factor = 10 ** precision
+    partes = []
+    lat_previa = lng_previa = 0
+    for lat, lng in coordenadas:
+        lat_e, lng_e = round(lat * factor), round(lng * factor)
+        partes.append(_codificar_valor(lat_e - lat_previa))
+        partes.append(_codificar_valor(lng_e - lng_previa))
+        lat_previa, lng_previa = lat_e, lng_e
+    return ''.join(partes)
+
+
+def detectar_paradas(puntos, radio_m=RADIO_PARADA_M, duracion_min_s=DURACION_MIN_PARADA_S):
+    """Tramos en los que la cuadrilla no se alejó ``radio_m`` del primer
+    punto durante al menos ``duracion_min_s``.
+
+    Returns:
+        Lista de ``Parada`` (centroide del tramo), sin torre asociada.
+    """
+    xy = _proyectar(puntos)
+    paradas = []
+    i, total = 0, len(puntos)
+    while i < total:
+        j = i + 1
+        while j < total and math.hypot(xy[j][0] - xy[i][0], xy[j][1] - xy[i][1]) <= radio_m:
+            j += 1
+        if (puntos[j - 1][2] - puntos[i][2]).total_seconds() >= duracion_min_s:
+            tramo = puntos[i:j]
+            paradas.append(Parada(
+                latitud=sum(p[0] for p in tramo) / len(tramo),
+                longitud=sum(p[1] for p in tramo) / len(tramo),
+                inicio=tramo[0][2],
+                fin=tramo[-1][2],
+            ))
+            i = j
+        else:
+            i += 1
+    return paradas
+
+
+def asociar_torres(paradas, linea_id, radio_m=RADIO_TORRE_M):
+    """Completa cada parada con la torre de la línea a menos de ``radio_m``."""
+    if not linea_id:
+        return paradas
+    asociadas = []
+    for parada in paradas:
+        torre = torre_cercana(linea_id, parada.latitud, parada.longitud)
+        if torre is not None and torre.distancia_m <= radio_m:
+            parada = replace(
+                parada, torre_id=torre.torre_id, torre_numero=torre.numero,
+                distancia_torre_m=torre.distancia_m,
+            )
+        asociadas.append(parada)
+    return asociadas
+
+
+def recorrido(cuadrilla, desde, hasta, zoom):
+    """Recorrido simplificado, codificado y con paradas.
+
+    Returns:
+        dict con ``puntos_originales``, ``tolerancia_m``, ``polilinea``,
+        ``segundos`` (desde ``desde``, uno por punto de la polilínea, para la
+        reproducción) y ``paradas``.
+    """
+    puntos = puntos_recorrido(cuadrilla.pk, desde, hasta)
+    tolerancia = tolerancia_zoom(zoom, puntos[0][0]) if puntos else 0.0
+    simplificados = simplificar(puntos, tolerancia)
+    paradas = asociar_torres(detectar_paradas(puntos), cuadrilla.linea_asignada_id)
+    return {
+        'puntos_originales': len(puntos),
+        'tolerancia_m': round(tolerancia, 2),
+        'polilinea': codificar_polilinea((lat, lng) for lat, lng, _ in simplificados),
+        'segundos': [round((momento - desde).total_seconds()) for _, _, momento in simplificados],
+        'paradas': paradas,
+    }
@@ -0,0 +1,17 @@
+"""Mantenimiento de ``UltimaUbicacionCuadrilla`` al registrar pings GPS.
+
+Los ingresos con ``bulk_create`` no disparan esta señal: quien los hace
+llama a ``actualizar_ultimas_ubicaciones`` con el lote.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import TrackingUbicacion
+from .ultima_ubicacion import actualizar_ultima_ubicacion
+
+
+@receiver(post_save, sender=TrackingUbicacion, dispatch_uid='ultima_ubicacion_tracking_save')
+def _actualizar_ultima_ubicacion(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    actualizar_ultima_ubicacion(instance)
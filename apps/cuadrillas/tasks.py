@@ -0,0 +1,33 @@
+"""Celery tasks for crew GPS tracking history (see apps.cuadrillas.tracking_historial)."""
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+# Daily chunk of the pre-partitioning backfill (40 x 5000 rows); the
+# migrar_tracking_anterior command moves everything at once.
+MAX_LOTES_MIGRACION = 40
+
+
+@shared_task(ignore_result=True)
+def mantener_historial_tracking():
+    """
+    Create the upcoming monthly partitions of tracking_ubicacion, move a
+    bounded chunk of the pre-partitioning table into it, roll old raw pings
+    up to per-minute points (dropping their partitions) and old per-minute
+    points up to per-hour points.
+    """
+    from .tracking_historial import crear_particiones, depurar_tracking, migrar_tracking_anterior
+
+    creadas = crear_particiones()
+    movidas = migrar_tracking_anterior(max_lotes=MAX_LOTES_MIGRACION)
+    if movidas:
+        logger.info(f"Tracking history: {movidas} rows moved from the pre-partitioning table")
+    resultado = depurar_tracking()
+    logger.info(
+        f"Tracking history: partitions created {creadas}, dropped "
+        f"{resultado['particiones_eliminadas']}, {resultado['crudos_eliminados']} raw rows "
+        f"deleted, {resultado['minutos']} minute / {resultado['horas']} hour points written"
+    )
+    return resultado
@@ -179,7 +179,7 @@ class TestA2ExportHorizontal(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertIn("spreadsheetml.sheet", resp["Content-Type"])
 
-        wb = load_workbook(BytesIO(resp.content))
+        wb = load_workbook(BytesIO(resp.getvalue()))
         ws = wb.active
         headers = [c.value for c in ws[1]]
         self.assertEqual(headers, HEADERS_ESPERADOS)
@@ -248,7 +248,7 @@ class TestA2ExportHorizontal(TestCase):
         )
 
         resp = self.client.get(reverse("cuadrillas:semanal_exportar_horizontal", args=[2026, 45]))
-        wb = load_workbook(BytesIO(resp.content))
+        wb = load_workbook(BytesIO(resp.getvalue()))
         fila = next(wb.active.iter_rows(min_row=2, values_only=True))
         # openpyxl retorna None al releer una celda a la que se escribió "".
         self.assertIsNone(fila[12])  # AVISOS
@@ -269,7 +269,7 @@ class TestA2ExportHorizontal(TestCase):
 
         resp = self.client.get(reverse("cuadrillas:semanal_exportar_horizontal", args=[2026, 45]))
         self.assertEqual(resp.status_code, 200)
-        wb = load_workbook(BytesIO(resp.content))
+        wb = load_workbook(BytesIO(resp.getvalue()))
         fila = next(wb.active.iter_rows(min_row=2, values_only=True))
         self.assertEqual(fila[4], "02/11/2026")  # INICIO sigue presente
         self.assertIsNone(fila[5])  # FIN vacío (None al releer), no rompe
@@ -279,5 +279,5 @@ class TestA2ExportHorizontal(TestCase):
         solo la fila de encabezados (no hay bloques que iterar)."""
         resp = self.client.get(reverse("cuadrillas:semanal_exportar_horizontal", args=[2099, 1]))
         self.assertEqual(resp.status_code, 200)
-        wb = load_workbook(BytesIO(resp.content))
+        wb = load_workbook(BytesIO(resp.getvalue()))
         self.assertEqual(wb.active.max_row, 1)
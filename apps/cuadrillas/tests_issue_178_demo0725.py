@@ -131,7 +131,7 @@ class TestIntegracionA1ImporterA2Exportador(TestCase):
         resp = self.client.get(reverse("cuadrillas:semanal_exportar_horizontal", args=[2026, 46]))
         self.assertEqual(resp.status_code, 200)
 
-        wb = load_workbook(BytesIO(resp.content))
+        wb = load_workbook(BytesIO(resp.getvalue()))
         fila = next(wb.active.iter_rows(min_row=2, values_only=True))
         # Columnas: #(0) ACTIVIDAD(1) LINEA(2) TRAMO(3) INICIO(4) FIN(5) ...
         self.assertEqual(fila[4], "09/11/2026")
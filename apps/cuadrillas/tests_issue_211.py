@@ -189,8 +189,9 @@ class TestExportarRangoView(TestCase):
             resp["Content-Type"],
             "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
-        self.assertGreater(len(resp.content), 2000)
-        nombres = _leer_columna_personal(resp.content)
+        contenido = resp.getvalue()  # FileResponse: el stream se consume una vez
+        self.assertGreater(len(contenido), 2000)
+        nombres = _leer_columna_personal(contenido)
         self.assertIn("ANA TORRES", nombres)
         self.assertIn("LUIS DIAZ", nombres)
 
@@ -0,0 +1,426 @@
+"""
+Historial de tracking GPS: ingreso por lotes, particiones y retención.
+
+- ``ingresar_lote``: inserta los pings que el dispositivo acumuló con un
+  ``bulk_create`` y actualiza la última ubicación una vez por cuadrilla.
+  ``created_at`` es el momento de captura que manda el dispositivo, no el
+  de llegada al servidor; los puntos con un momento imposible se descartan
+  (y se informan) sin perder el resto del lote.
+- Particiones: en PostgreSQL ``tracking_ubicacion`` está particionada por
+  mes sobre ``created_at`` (migración 0031). ``crear_particiones`` deja
+  creados los meses siguientes; los pings que no caen en ningún mes van a
+  ``tracking_ubicacion_default``.
+- ``migrar_tracking_anterior``: mueve por lotes, lo más reciente primero,
+  las filas de la tabla plana que la migración 0031 renombró (la migración
+  no copia datos; el deploy corre el comando a continuación).
+- ``depurar_tracking``: los pings crudos viven ``RETENCION_CRUDA`` (redondeado
+  al mes); después se condensan a un punto por minuto en
+  ``TrackingUbicacionResumen`` y se borra la partición entera (un ``DROP``,
+  no un ``DELETE`` fila por fila). Los minutos con más de
+  ``RETENCION_MINUTO`` pasan a un punto por hora.
+
+Fuera de PostgreSQL (tests, dev_lite) la tabla es plana y la retención borra
+por rango de fechas.
+"""
+import logging
+from datetime import timedelta
+from itertools import islice
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Avg, Count, DecimalField, ExpressionWrapper, F, Min, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .ultima_ubicacion import actualizar_ultimas_ubicaciones
+
+logger = logging.getLogger(__name__)
+
+TABLA = 'tracking_ubicacion'
+# Tabla plana previa a la migración 0031, pendiente de mover (ver
+# ``migrar_tracking_anterior``).
+TABLA_ANTERIOR = 'tracking_ubicacion_anterior'
+TAMANO_MIGRACION = 5000
+
+# Un dispositivo que sincroniza tras horas sin señal (un ping cada 30 s)
+# cabe en unos pocos lotes.
+MAX_PUNTOS_LOTE = 500
+TAMANO_INSERT = 500
+
+# Ventana aceptada para el ``registrada_en`` de cada punto: un dispositivo
+# puede pasar días sin señal, pero no adelantarse al servidor más que el
+# desfase de su reloj.
+MAX_ATRASO_PUNTO = timedelta(days=7)
+MAX_ADELANTO_PUNTO = timedelta(minutes=5)
+
+RETENCION_CRUDA = timedelta(days=30)
+RETENCION_MINUTO = timedelta(days=180)
+MESES_ADELANTE = 2
+
+
+def inicio_de_mes(momento):
+    """Primer instante del mes de ``momento`` en la zona horaria local."""
+    local = timezone.localtime(momento)
+    return local.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def mes_siguiente(inicio):
+    return inicio_de_mes(inicio + timedelta(days=32))
+
+
+def nombre_particion(inicio):
+    return f'{TABLA}_p{inicio:%Y_%m}'
+
+
+# ---------------------------------------------------------------------------
+# Ingreso
+# ---------------------------------------------------------------------------
+
+def momento_captura(registrada_en, ahora):
+    """Valida el momento de captura de un punto (``None`` → ``ahora``).
+
+    Raises:
+        ValueError: si cae fuera de ``[ahora - MAX_ATRASO_PUNTO,
+        ahora + MAX_ADELANTO_PUNTO]``.
+    """
+    if registrada_en is None:
+        return ahora
+    if timezone.is_naive(registrada_en):
+        registrada_en = timezone.make_aware(registrada_en)
+    if not ahora - MAX_ATRASO_PUNTO <= registrada_en <= ahora + MAX_ADELANTO_PUNTO:
+        raise ValueError(
+            f'registrada_en {registrada_en.isoformat()} fuera de la ventana aceptada '
+            f'({MAX_ATRASO_PUNTO.days} días atrás, {int(MAX_ADELANTO_PUNTO.total_seconds() // 60)} '
+            f'minutos adelante).'
+        )
+    return registrada_en
+
+
+def ingresar_lote(cuadrilla, usuario, puntos, ahora=None):
+    """Guarda ``puntos`` (dicts con los campos de ``UbicacionIn``) en bloque.
+
+    ``created_at`` es el ``registrada_en`` de cada punto (el momento en que
+    el dispositivo lo capturó): un lote sincronizado horas después cae en su
+    mes de partición, en sus minutos del resumen y en su lugar del
+    recorrido. Los puntos sin ``registrada_en`` toman ``ahora``.
+
+    ``bulk_create`` no dispara ``post_save``: la última ubicación se
+    actualiza una sola vez con el punto más reciente del lote.
+
+    Un punto con ``registrada_en`` fuera de la ventana (reloj del
+    dispositivo desfasado) se descarta: el resto del lote se guarda igual,
+    así el dispositivo no reenvía para siempre un lote que nunca entra.
+
+    Returns:
+        ``(ubicaciones, descartados)``: los ``TrackingUbicacion`` creados y
+        un dict ``{'indice', 'registrada_en', 'motivo'}`` por punto
+        descartado (``indice`` es su posición en ``puntos``).
+    """
+    from .models import TrackingUbicacion
+
+    ahora = ahora or timezone.now()
+    nuevas = []
+    descartados = []
+    for indice, punto in enumerate(puntos):
+        punto = dict(punto)
+        registrada_en = punto.pop('registrada_en', None)
+        try:
+            created_at = momento_captura(registrada_en, ahora)
+        except ValueError as exc:
+            descartados.append({
+                'indice': indice,
+                'registrada_en': registrada_en.isoformat(),
+                'motivo': str(exc),
+            })
+            continue
+        nuevas.append(TrackingUbicacion(
+            cuadrilla=cuadrilla, usuario=usuario, created_at=created_at, **punto,
+        ))
+
+    if descartados:
+        logger.warning(
+            "Cuadrilla %s: %d puntos de tracking descartados por registrada_en fuera de ventana",
+            cuadrilla.pk, len(descartados),
+        )
+    ubicaciones = TrackingUbicacion.objects.bulk_create(nuevas, batch_size=TAMANO_INSERT)
+    if ubicaciones:
+        actualizar_ultimas_ubicaciones(ubicaciones)
+    return ubicaciones, descartados
+
+
+# ---------------------------------------------------------------------------
+# Particiones (solo PostgreSQL)
+# ---------------------------------------------------------------------------
+
+def tracking_particionado():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass',
+            [TABLA],
+        )
+        return cursor.fetchone() is not None
+
+
+def _particiones():
+    """{nombre: inicio} de las particiones mensuales existentes."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = %s::regclass',
+            [TABLA],
+        )
+        nombres = [fila[0] for fila in cursor.fetchall()]
+
+    particiones = {}
+    prefijo = f'{TABLA}_p'
+    for nombre in nombres:
+        if not nombre.startswith(prefijo):
+            continue
+        try:
+            anio, mes = (int(parte) for parte in nombre[len(prefijo):].split('_'))
+        except ValueError:
+            continue
+        particiones[nombre] = inicio_de_mes(timezone.now()).replace(year=anio, month=mes)
+    return particiones
+
+
+def crear_particiones(ahora=None, meses=MESES_ADELANTE):
+    """Crea las particiones del mes actual y de los ``meses`` siguientes.
+
+    Returns:
+        Nombres de las particiones creadas.
+    """
+    if not tracking_particionado():
+        return []
+
+    existentes = _particiones()
+    creadas = []
+    inicio = inicio_de_mes(ahora or timezone.now())
+    for _ in range(meses + 1):
+        fin = mes_siguiente(inicio)
+        nombre = nombre_particion(inicio)
+        if nombre not in existentes:
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(
+                        f'CREATE TABLE {connection.ops.quote_name(nombre)} '
+                        f'PARTITION OF {connection.ops.quote_name(TABLA)} '
+                        f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fin.isoformat()}')"
+                    )
+                creadas.append(nombre)
+            except DatabaseError:
+                # Típicamente: la partición default ya tiene filas de ese mes.
+                logger.exception("No se pudo crear la partición %s", nombre)
+        inicio = fin
+    return creadas
+
+
+def _eliminar_particiones(corte):
+    """DROP de las particiones mensuales que terminan antes de ``corte``."""
+    eliminadas = []
+    for nombre, inicio in sorted(_particiones().items(), key=lambda item: item[1]):
+        if mes_siguiente(inicio) > corte:
+            continue
+        particion = connection.ops.quote_name(nombre)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'ALTER TABLE {connection.ops.quote_name(TABLA)} DETACH PARTITION {particion}'
+            )
+            cursor.execute(f'DROP TABLE {particion}')
+        eliminadas.append(nombre)
+    return eliminadas
+
+
+def _existe_tabla(nombre):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s)', [nombre])
+        return cursor.fetchone()[0] is not None
+
+
+def migrar_tracking_anterior(tamano_lote=TAMANO_MIGRACION, max_lotes=None):
+    """Mueve las filas de ``tracking_ubicacion_anterior`` (la tabla plana que
+    la migración 0031 dejó al particionar) a la particionada.
+
+    Cada lote es un ``DELETE ... RETURNING`` + ``INSERT`` en su propia
+    transacción: el ingreso de GPS nunca espera más que un lote y una corrida
+    interrumpida retoma donde quedó. Copia primero lo más reciente (lo que
+    consultan el mapa y los recorridos); para eso crea un índice sobre
+    ``created_at`` en la tabla anterior, que se va con ella. Con la tabla
+    vacía, la elimina.
+
+    Returns:
+        Filas movidas en esta corrida.
+    """
+    if connection.vendor != 'postgresql' or not _existe_tabla(TABLA_ANTERIOR):
+        return 0
+
+    tabla = connection.ops.quote_name(TABLA)
+    anterior = connection.ops.quote_name(TABLA_ANTERIOR)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS '
+            f'{connection.ops.quote_name(TABLA_ANTERIOR + "_created_at_idx")} '
+            f'ON {anterior} (created_at)'
+        )
+
+    movidas = lotes = 0
+    while max_lotes is None or lotes < max_lotes:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'WITH lote AS ('
+                f'  DELETE FROM {anterior} WHERE id IN ('
+                f'    SELECT id FROM {anterior} ORDER BY created_at DESC'
+                f'    LIMIT %s FOR UPDATE SKIP LOCKED'
+                f'  ) RETURNING *'
+                f') INSERT INTO {tabla} SELECT * FROM lote',
+                [tamano_lote],
+            )
+            filas = cursor.rowcount
+        movidas += filas
+        lotes += 1
+        if filas < tamano_lote:
+            break
+    else:
+        return movidas
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {anterior})')
+        if not cursor.fetchone()[0]:
+            cursor.execute(f'DROP TABLE {anterior}')
+            logger.info("Tabla %s migrada y eliminada", TABLA_ANTERIOR)
+    return movidas
+
+
+# ---------------------------------------------------------------------------
+# Retención
+# ---------------------------------------------------------------------------
+
+def _resumen_crudos(ubicaciones):
+    return (
+        ubicaciones.annotate(periodo=Trunc('created_at', 'minute'))
+        .values('cuadrilla_id', 'periodo')
+        .annotate(
+            lat=Avg('latitud'),
+            lng=Avg('longitud'),
+            vel=Avg('velocidad'),
+            bat=Min('bateria'),
+            n=Count('id'),
+        )
+        .order_by()
+        .iterator(chunk_size=TAMANO_INSERT)
+    )
+
+
+def _resumen_minutos(minutos):
+    def ponderado(campo):
+        return Sum(ExpressionWrapper(
+            F(campo) * F('pings'),
+            output_field=DecimalField(max_digits=20, decimal_places=8),
+        ))
+
+    filas = (
+        minutos.annotate(periodo=Trunc('inicio', 'hour'))
+        .values('cuadrilla_id', 'periodo')
+        .annotate(
+            lat_pond=ponderado('latitud'),
+            lng_pond=ponderado('longitud'),
+            vel=Avg('velocidad'),
+            bat=Min('bateria'),
+            n=Sum('pings'),
+        )
+        .order_by()
+    )
+    for fila in filas.iterator(chunk_size=TAMANO_INSERT):
+        fila['lat'] = fila['lat_pond'] / fila['n']
+        fila['lng'] = fila['lng_pond'] / fila['n']
+        yield fila
+
+
+def _guardar_resumen(filas, resolucion):
+    """Inserta los periodos resumidos; devuelve cuántos se guardaron.
+
+    Un periodo que ya existe (reintento tras una corrida interrumpida, o
+    pings del periodo que llegaron después de condensarlo) conserva la fila
+    existente y se registra en el log: ``ignore_conflicts`` lo descartaría
+    en silencio.
+    """
+    from .models import TrackingUbicacionResumen
+
+    total = 0
+    filas = iter(filas)
+    while lote := list(islice(filas, TAMANO_INSERT)):
+        existentes = set(
+            TrackingUbicacionResumen.objects.filter(
+                resolucion=resolucion,
+                cuadrilla_id__in={fila['cuadrilla_id'] for fila in lote},
+                inicio__in={fila['periodo'] for fila in lote},
+            ).values_list('cuadrilla_id', 'inicio')
+        )
+        descartadas = [f for f in lote if (f['cuadrilla_id'], f['periodo']) in existentes]
+        if descartadas:
+            logger.warning(
+                "Resumen %s: %d periodos ya existían y se conservan (%d pings sin condensar), p. ej. %s",
+                resolucion, len(descartadas), sum(f['n'] for f in descartadas),
+                ', '.join(f"{f['cuadrilla_id']}@{f['periodo'].isoformat()}" for f in descartadas[:5]),
+            )
+            lote = [f for f in lote if (f['cuadrilla_id'], f['periodo']) not in existentes]
+        TrackingUbicacionResumen.objects.bulk_create(
+            [
+                TrackingUbicacionResumen(
+                    cuadrilla_id=fila['cuadrilla_id'],
+                    resolucion=resolucion,
+                    inicio=fila['periodo'],
+                    latitud=round(fila['lat'], 8),
+                    longitud=round(fila['lng'], 8),
+                    velocidad=round(fila['vel'], 2) if fila['vel'] is not None else None,
+                    bateria=fila['bat'],
+                    pings=fila['n'],
+                )
+                for fila in lote
+            ],
+            # Una carrera con otra corrida entre el SELECT y el INSERT.
+            ignore_conflicts=True,
+        )
+        total += len(lote)
+    return total
+
+
+def depurar_tracking(ahora=None):
+    """Condensa y borra el historial viejo.
+
+    Los cortes se redondean al inicio de mes para que coincidan con las
+    particiones: un mes entero se condensa y se descarta de una vez.
+
+    Returns:
+        dict con los conteos de la corrida.
+    """
+    from .models import TrackingUbicacion, TrackingUbicacionResumen
+
+    ahora = ahora or timezone.now()
+    corte_crudo = inicio_de_mes(ahora - RETENCION_CRUDA)
+    corte_minuto = inicio_de_mes(ahora - RETENCION_MINUTO)
+    resultado = {'minutos': 0, 'horas': 0, 'particiones_eliminadas': [], 'crudos_eliminados': 0}
+
+    with transaction.atomic():
+        crudos = TrackingUbicacion.objects.filter(created_at__lt=corte_crudo)
+        resultado['minutos'] = _guardar_resumen(
+            _resumen_crudos(crudos), TrackingUbicacionResumen.Resolucion.MINUTO,
+        )
+        if tracking_particionado():
+            resultado['particiones_eliminadas'] = _eliminar_particiones(corte_crudo)
+        # Plana, o lo que cayó en la partición default.
+        resultado['crudos_eliminados'], _ = crudos.delete()
+
+    with transaction.atomic():
+        minutos = TrackingUbicacionResumen.objects.filter(
+            resolucion=TrackingUbicacionResumen.Resolucion.MINUTO,
+            inicio__lt=corte_minuto,
+        )
+        resultado['horas'] = _guardar_resumen(
+            _resumen_minutos(minutos), TrackingUbicacionResumen.Resolucion.HORA,
+        )
+        minutos.delete()
+
+    return resultado
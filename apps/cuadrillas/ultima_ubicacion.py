@@ -0,0 +1,154 @@
+"""
+Última ubicación por cuadrilla: mantenimiento al ingerir y lectura del mapa.
+
+- ``actualizar_ultima_ubicacion``: upsert monotónico de
+  ``UltimaUbicacionCuadrilla`` a partir de un ``TrackingUbicacion`` (la
+  señal ``post_save`` lo llama en cada ping; los ingresos masivos con
+  ``bulk_create`` usan ``actualizar_ultimas_ubicaciones``).
+- ``ubicaciones_mapa``: las posiciones de un queryset de cuadrillas en un
+  solo query, con el formato que ya consumía ``mapa.html``.
+- ``version_ubicaciones``/``notificar_ubicaciones``: versión en la cache
+  compartida que cambia con cada posición nueva. El canal de push del mapa
+  la consulta (una lectura de cache) y solo va a la BD cuando cambió.
+"""
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .utils_semana import _prefijo
+
+CACHE_KEY_UBICACIONES_VERSION = 'instelec:cuadrillas:ubicaciones:version'
+
+#: Solapamiento del cursor de deltas: una fila con ``updated_at`` anterior
+#: al cursor pero confirmada después del query anterior igual se reenvía.
+MARGEN_CURSOR = timedelta(seconds=5)
+
+
+def version_ubicaciones():
+    version = cache.get(CACHE_KEY_UBICACIONES_VERSION)
+    if version is None:
+        cache.add(CACHE_KEY_UBICACIONES_VERSION, int(time.time() * 1000), None)
+        version = cache.get(CACHE_KEY_UBICACIONES_VERSION)
+    return version
+
+
+def notificar_ubicaciones():
+    """Avisa a los canales de push que hay posiciones nuevas."""
+    try:
+        cache.incr(CACHE_KEY_UBICACIONES_VERSION)
+    except ValueError:
+        # Versión desalojada: la siguiente lectura arranca una nueva.
+        version_ubicaciones()
+
+
+def _campos(ubicacion):
+    return {
+        'usuario_id': ubicacion.usuario_id,
+        'latitud': ubicacion.latitud,
+        'longitud': ubicacion.longitud,
+        'precision_metros': ubicacion.precision_metros,
+        'velocidad': ubicacion.velocidad,
+        'bateria': ubicacion.bateria,
+        'origen': ubicacion.origen,
+        'registrada_en': ubicacion.created_at,
+    }
+
+
+def actualizar_ultima_ubicacion(ubicacion):
+    """Copia ``ubicacion`` como última de su cuadrilla si es la más reciente.
+
+    Returns:
+        True si la última ubicación cambió.
+    """
+    from .models import UltimaUbicacionCuadrilla
+
+    campos = _campos(ubicacion)
+    vigente = UltimaUbicacionCuadrilla.objects.filter(
+        cuadrilla_id=ubicacion.cuadrilla_id, registrada_en__lte=ubicacion.created_at,
+    )
+    # ``update`` no toca ``auto_now``: updated_at es el cursor de deltas.
+    actualizadas = vigente.update(**campos, updated_at=timezone.now())
+    if not actualizadas:
+        try:
+            with transaction.atomic():
+                _, creada = UltimaUbicacionCuadrilla.objects.get_or_create(
+                    cuadrilla_id=ubicacion.cuadrilla_id, defaults=campos,
+                )
+        except IntegrityError:
+            # Otro ping de la misma cuadrilla la creó en paralelo.
+            creada = bool(vigente.update(**campos, updated_at=timezone.now()))
+        if not creada:
+            # Ya hay una más reciente (ping offline sincronizado tarde).
+            return False
+
+    transaction.on_commit(notificar_ubicaciones)
+    return True
+
+
+def actualizar_ultimas_ubicaciones(ubicaciones):
+    """Versión para lotes (``bulk_create`` no dispara señales): solo la más
+    reciente de cada cuadrilla del lote."""
+    mas_recientes = {}
+    for ubicacion in ubicaciones:
+        actual = mas_recientes.get(ubicacion.cuadrilla_id)
+        if actual is None or ubicacion.created_at > actual.created_at:
+            mas_recientes[ubicacion.cuadrilla_id] = ubicacion
+    return sum(actualizar_ultima_ubicacion(u) for u in mas_recientes.values())
+
+
+def cuadrillas_del_mapa(anio=None, semana=None):
+    """Cuadrillas activas del mapa, opcionalmente de una semana ISO.
+
+    Issue #178 (F1): MISMO criterio ``codigo`` WW-YYYY- que usa todo el
+    módulo (``utils_semana._prefijo``). Parámetros vacíos o no numéricos ->
+    sin filtro (todas las activas) en vez de un 500.
+    """
+    from .models import Cuadrilla
+
+    cuadrillas = Cuadrilla.objects.filter(activa=True)
+    anio = (anio or '').strip()
+    semana = (semana or '').strip()
+    if anio and semana:
+        try:
+            cuadrillas = cuadrillas.filter(codigo__startswith=_prefijo(int(anio), int(semana)))
+        except (TypeError, ValueError):
+            pass
+    return cuadrillas
+
+
+def _a_dict(fila):
+    return {
+        'cuadrilla_id': str(fila['cuadrilla_id']),
+        'cuadrilla_codigo': fila['cuadrilla__codigo'],
+        'cuadrilla_nombre': fila['cuadrilla__nombre'],
+        'lat': float(fila['latitud']),
+        'lng': float(fila['longitud']),
+        'precision': float(fila['precision_metros']) if fila['precision_metros'] else None,
+        'timestamp': fila['registrada_en'].isoformat(),
+        # Issue #178 (F2): distingue un ping GPS automático de una entrada
+        # MANUAL (sitios sin señal) -- el frontend pinta otro marcador.
+        'origen': fila['origen'],
+    }
+
+
+def ubicaciones_mapa(cuadrillas, desde=None):
+    """Última ubicación de cada cuadrilla de ``cuadrillas`` (un query).
+
+    Args:
+        cuadrillas: queryset de ``Cuadrilla``
+        desde: datetime opcional; solo las actualizadas después de
+            ``desde - MARGEN_CURSOR`` (deltas del canal de push)
+    """
+    from .models import UltimaUbicacionCuadrilla
+
+    qs = UltimaUbicacionCuadrilla.objects.filter(cuadrilla__in=cuadrillas)
+    if desde is not None:
+        qs = qs.filter(updated_at__gt=desde - MARGEN_CURSOR)
+    filas = qs.order_by('cuadrilla__codigo').values(
+        'cuadrilla_id', 'cuadrilla__codigo', 'cuadrilla__nombre', 'latitud',
+        'longitud', 'precision_metros', 'registrada_en', 'origen',
+    )
+    return [_a_dict(fila) for fila in filas]
@@ -14,7 +14,7 @@ from .models import Asistencia, Cargo, Cuadrilla, CuadrillaMiembro, PersonalCuad
 from .forms_personal import PersonalCuadrillaForm
 from .forms_cargo import CargoForm
 from .forms_vehiculo import VehiculoForm
-from .utils_semana import _prefijo
+from .ultima_ubicacion import cuadrillas_del_mapa, ubicaciones_mapa
 
 
 def _valor_viatico_default():
@@ -724,53 +724,16 @@ class MapaCuadrillasPartialView(LoginRequiredMixin, RoleRequiredMixin, TemplateV
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Get latest location for each active crew
-        cuadrillas = Cuadrilla.objects.filter(activa=True)
-
         # Issue #178 (F1): filtro opcional por semana ISO (?anio=&semana=),
-        # MISMO criterio `codigo` WW-YYYY- que usa TODO el resto del módulo
-        # Cuadrillas (`_bloques_qs`/`_prefijo` de views_semanal.py, ahora en
-        # utils_semana.py) -- sin inventar un filtro de rango de fechas
-        # nuevo (`TrackingUbicacion` no tiene campo de "semana de trabajo",
-        # solo `created_at` del ping GPS; la semana vive en la FK a
-        # `Cuadrilla` vía su `codigo`). Sin parámetros -> comportamiento
-        # actual (todas las cuadrillas activas, sin filtrar).
-        anio_param = (self.request.GET.get('anio') or '').strip()
-        semana_param = (self.request.GET.get('semana') or '').strip()
-        if anio_param and semana_param:
-            try:
-                anio_filtro = int(anio_param)
-                semana_filtro = int(semana_param)
-                cuadrillas = cuadrillas.filter(
-                    codigo__startswith=_prefijo(anio_filtro, semana_filtro)
-                )
-            except (TypeError, ValueError):
-                # Parámetros no numéricos: se ignora el filtro (comportamiento
-                # actual) en vez de romper con un 500.
-                pass
-
-        ubicaciones = []
+        # MISMO criterio `codigo` WW-YYYY- que el resto del módulo (ver
+        # `cuadrillas_del_mapa`). Sin parámetros -> todas las activas.
+        cuadrillas = cuadrillas_del_mapa(
+            self.request.GET.get('anio'), self.request.GET.get('semana')
+        )
 
-        for cuadrilla in cuadrillas:
-            ultima = TrackingUbicacion.objects.filter(
-                cuadrilla=cuadrilla
-            ).order_by('-created_at').first()
-
-            if ultima:
-                ubicaciones.append({
-                    'cuadrilla_id': str(cuadrilla.id),
-                    'cuadrilla_codigo': cuadrilla.codigo,
-                    'cuadrilla_nombre': cuadrilla.nombre,
-                    'lat': float(ultima.latitud),
-                    'lng': float(ultima.longitud),
-                    'precision': float(ultima.precision_metros) if ultima.precision_metros else None,
-                    'timestamp': ultima.created_at.isoformat(),
-                    # Issue #178 (F2): distingue un ping GPS automático de una
-                    # entrada MANUAL (sitios sin señal) -- el frontend usa
-                    # esto para pintar un marcador distinto, evita confundir
-                    # una coordenada tecleada a mano con la posición real.
-                    'origen': ultima.origen,
-                })
+        # Última ubicación de cada cuadrilla: tabla mantenida al ingerir,
+        # un solo query sin importar cuántas cuadrillas haya.
+        ubicaciones = ubicaciones_mapa(cuadrillas)
 
         context['ubicaciones'] = ubicaciones
         return context
@@ -38,7 +38,8 @@ from .filtros import (
     choices_lineas,
     resolver_filtros,
 )
-from .models import Cuadrilla, TrackingUbicacion
+from .models import Cuadrilla
+from .ultima_ubicacion import ubicaciones_mapa
 
 
 # ---------------------------------------------------------------------------
@@ -174,20 +175,17 @@ def _b3_get_context_data(self, **kwargs):
 
     # ubicaciones: el original solo construye para activas porque el queryset
     # estaba filtrado. Replicar con el queryset actual del contexto.
-    ubicaciones = []
-    for cuadrilla in cuadrillas:
-        if not cuadrilla.activa:
-            continue
-        ultima = TrackingUbicacion.objects.filter(
-            cuadrilla=cuadrilla
-        ).order_by('-created_at').first()
-        if ultima:
-            ubicaciones.append({
-                'cuadrilla_id': str(cuadrilla.id),
-                'cuadrilla_codigo': cuadrilla.codigo,
-                'lat': float(ultima.latitud),
-                'lng': float(ultima.longitud),
-            })
+    # Un solo query contra la última ubicación mantenida al ingerir.
+    activas = [c.pk for c in cuadrillas if c.activa]
+    ubicaciones = [
+        {
+            'cuadrilla_id': ubi['cuadrilla_id'],
+            'cuadrilla_codigo': ubi['cuadrilla_codigo'],
+            'lat': ubi['lat'],
+            'lng': ubi['lng'],
+        }
+        for ubi in ubicaciones_mapa(activas)
+    ]
     context['cuadrillas_ubicaciones_json'] = json.dumps(ubicaciones)
 
     return context
@@ -21,19 +21,16 @@ chocar. Cuando el cliente valide B4, podremos retirar el view legacy.
 from io import BytesIO
 
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
 from django.http import HttpResponse
-from django.shortcuts import render
+from django.shortcuts import redirect, render
 from django.urls import path
 from django.views import View
 from django.views.generic import TemplateView
 
+from apps.core.importaciones import debe_encolar, ejecutar, encolar
 from apps.core.mixins import RoleRequiredMixin
-
-from .importers import (
-    CuadrillaImporter,
-    ProgramacionS18CuadrillaImporter,
-    detectar_formato_cuadrillas,
-)
+from apps.core.models import TrabajoImportacion
 
 
 class CuadrillaUploadView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
@@ -72,8 +69,23 @@ class CuadrillaUploadView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
         linea_filtro = self._resolver_linea_filtro(self.request.GET.get('linea'))
         context['linea_filtro'] = linea_filtro
         context['linea_filtro_id'] = str(linea_filtro.id) if linea_filtro else ''
+        trabajo = self._trabajo_terminado(self.request.GET.get('trabajo'))
+        if trabajo is not None:
+            context.update(self._contexto_resultado(trabajo.resultado.get('resultado', {})))
         return context
 
+    def _trabajo_terminado(self, trabajo_id):
+        """Trabajo de carga de cuadrillas completado del usuario (o ``None``)."""
+        from apps.core.views_importacion import trabajos_visibles
+        try:
+            return trabajos_visibles(self.request.user).get(
+                pk=trabajo_id,
+                tipo=TrabajoImportacion.Tipo.CUADRILLAS,
+                estado=TrabajoImportacion.Estado.COMPLETADO,
+            )
+        except (TrabajoImportacion.DoesNotExist, ValidationError, ValueError):
+            return None
+
     def post(self, request, *args, **kwargs):
         linea_filtro_id = (request.POST.get('linea_filtro_id') or '').strip()
         linea_filtro = self._resolver_linea_filtro(linea_filtro_id)
@@ -99,37 +111,36 @@ class CuadrillaUploadView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
                 'linea_filtro_id': linea_filtro_id,
             })
 
-        # Leer el archivo a memoria una sola vez: lo usamos para detectar el
-        # formato y luego para importar (rebobinando el puntero en cada paso).
-        from io import BytesIO
-        datos = BytesIO(archivo.read())
-
-        datos.seek(0)
-        formato = detectar_formato_cuadrillas(datos)
-
-        opciones = {
+        parametros = {
             'actualizar_existentes': request.POST.get('actualizar_existentes') == 'on',
             'crear_usuarios_faltantes': request.POST.get('crear_usuarios_faltantes') == 'on',
             # Issue #218 (A7): línea activa en pantalla acota/valida el Excel.
             'linea_filtro_id': linea_filtro_id,
         }
 
-        datos.seek(0)
-        if formato == 'S18':
-            importer = ProgramacionS18CuadrillaImporter()
-        else:
-            importer = CuadrillaImporter()
-        resultado = importer.importar(datos, opciones)
+        # Excel grande → TrabajoImportacion en Celery; el resultado vuelve a
+        # esta misma pantalla vía `?trabajo=<id>` (ver get_context_data).
+        tipo = TrabajoImportacion.Tipo.CUADRILLAS
+        if debe_encolar(archivo):
+            trabajo = encolar(tipo, parametros, usuario=request.user, archivo=archivo)
+            return redirect(trabajo.get_absolute_url())
 
+        resultado = ejecutar(tipo, archivo, parametros, usuario=request.user)['resultado']
         return render(request, self.template_name, {
             'titulo': 'Cargar Cuadrillas Masivamente',
             'linea_filtro': linea_filtro,
             'linea_filtro_id': linea_filtro_id,
+            **self._contexto_resultado(resultado),
+        })
+
+    def _contexto_resultado(self, resultado):
+        formato = resultado.get('formato')
+        return {
             'resultado': resultado,
             'formato_detectado': self.FORMATO_LABELS.get(formato, formato),
             'mensaje_exito': resultado.get('exito', False),
             'error': resultado.get('error') if not resultado.get('exito') else None,
-        })
+        }
 
 
 class DescargarPlantillaCuadrillasB4View(LoginRequiredMixin, RoleRequiredMixin, View):
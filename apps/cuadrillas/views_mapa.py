@@ -8,13 +8,25 @@ M1): las entradas manuales quedan marcadas ``origen='manual'`` para que el
 mapa (``mapa.html``) las pinte con un marcador distinto al GPS automático —
 evita que alguien confunda una coordenada tecleada a mano con la posición
 real reportada por el dispositivo.
+
+También vive acá el canal de push del mapa en vivo
+(``MapaCuadrillasStreamView``, Server-Sent Events): en vez de que cada
+pestaña abierta re-pida todas las posiciones cada 30s, recibe solo las
+cuadrillas cuya última ubicación cambió.
 """
 
+import asyncio
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
 from decimal import Decimal, InvalidOperation
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ValidationError
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from django.urls import path
 from django.views import View
@@ -22,6 +34,7 @@ from django.views import View
 from apps.core.mixins import RoleRequiredMixin
 
 from .models import Cuadrilla, TrackingUbicacion
+from .ultima_ubicacion import cuadrillas_del_mapa, ubicaciones_mapa, version_ubicaciones
 
 # Mismo set de roles que MapaCuadrillasView/MapaCuadrillasPartialView
 # (apps/cuadrillas/views.py) — cualquiera que puede VER el mapa puede
@@ -40,6 +53,18 @@ ROLES_MAPA = [
 LAT_MIN, LAT_MAX = Decimal("-90"), Decimal("90")
 LNG_MIN, LNG_MAX = Decimal("-180"), Decimal("180")
 
+# Canal de push (SSE). Bajo ASGI la conexión queda abierta hasta
+# STREAM_DURACION y se consulta la versión de ubicaciones (una lectura de
+# cache) cada STREAM_INTERVALO; la BD solo se toca cuando cambió. Bajo WSGI
+# (un hilo por conexión) responde un solo evento y el navegador reconecta a
+# los STREAM_RETRY_WSGI_MS con ``Last-Event-ID``: polling de un query con
+# deltas en vez de N queries con todo.
+STREAM_INTERVALO = 2
+STREAM_HEARTBEAT = 15
+STREAM_DURACION = 55
+STREAM_RETRY_MS = 2000
+STREAM_RETRY_WSGI_MS = 30000
+
 
 class TrackingUbicacionManualCreateView(LoginRequiredMixin, RoleRequiredMixin, View):
     """POST /cuadrillas/<uuid:pk_cuadrilla>/ubicacion/manual/
@@ -120,10 +145,105 @@ class TrackingUbicacionManualCreateView(LoginRequiredMixin, RoleRequiredMixin, V
         )
 
 
+
+def _cursor_desde_evento(last_event_id):
+    """``Last-Event-ID`` (epoch en ms) -> datetime, o None si no es válido."""
+    try:
+        return datetime.fromtimestamp(int(last_event_id) / 1000, tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _leer(cuadrillas, desde):
+    """Cursor (tomado ANTES del query) + posiciones cambiadas desde ``desde``."""
+    cursor = timezone.now()
+    return cursor, ubicaciones_mapa(cuadrillas, desde=desde)
+
+
+def _evento(nombre, ubicaciones, cursor):
+    return (
+        f"id: {int(cursor.timestamp() * 1000)}\n"
+        f"event: {nombre}\n"
+        f"data: {json.dumps({'ubicaciones': ubicaciones})}\n\n"
+    )
+
+
+def _nuevas(ubicaciones, enviadas):
+    """Descarta las ya enviadas en esta conexión (el cursor se solapa
+    ``MARGEN_CURSOR`` para no perder commits tardíos)."""
+    nuevas = [u for u in ubicaciones if enviadas.get(u["cuadrilla_id"]) != u["timestamp"]]
+    enviadas.update((u["cuadrilla_id"], u["timestamp"]) for u in nuevas)
+    return nuevas
+
+
+def _stream_unico(cuadrillas, desde):
+    cursor, ubicaciones = _leer(cuadrillas, desde)
+    yield f"retry: {STREAM_RETRY_WSGI_MS}\n\n"
+    yield _evento("snapshot" if desde is None else "ubicaciones", ubicaciones, cursor)
+
+
+async def _stream_async(cuadrillas, desde):
+    enviadas = {}
+    version = await sync_to_async(version_ubicaciones)()
+    cursor, ubicaciones = await sync_to_async(_leer)(cuadrillas, desde)
+    yield f"retry: {STREAM_RETRY_MS}\n\n"
+    yield _evento(
+        "snapshot" if desde is None else "ubicaciones", _nuevas(ubicaciones, enviadas), cursor
+    )
+
+    inicio = ultimo_envio = time.monotonic()
+    while time.monotonic() - inicio < STREAM_DURACION:
+        await asyncio.sleep(STREAM_INTERVALO)
+        actual = await sync_to_async(version_ubicaciones)()
+        if actual != version:
+            version = actual
+            cursor_nuevo, ubicaciones = await sync_to_async(_leer)(cuadrillas, cursor)
+            cursor = cursor_nuevo
+            nuevas = _nuevas(ubicaciones, enviadas)
+            if nuevas:
+                yield _evento("ubicaciones", nuevas, cursor)
+                ultimo_envio = time.monotonic()
+                continue
+        if time.monotonic() - ultimo_envio >= STREAM_HEARTBEAT:
+            # Comentario SSE: mantiene viva la conexión a través de proxies.
+            yield ": ping\n\n"
+            ultimo_envio = time.monotonic()
+
+
+class MapaCuadrillasStreamView(LoginRequiredMixin, RoleRequiredMixin, View):
+    """GET /cuadrillas/mapa/stream/?anio=&semana= (``text/event-stream``).
+
+    Eventos:
+    - ``snapshot``: todas las posiciones del filtro (primera conexión).
+    - ``ubicaciones``: solo las cuadrillas que cambiaron desde el evento
+      anterior (o desde ``Last-Event-ID`` al reconectar).
+
+    ``data`` es ``{"ubicaciones": [...]}`` con el mismo formato de
+    ``MapaCuadrillasPartialView``; el cliente hace upsert por
+    ``cuadrilla_id``. La conexión se cierra a los ``STREAM_DURACION``
+    segundos y ``EventSource`` reconecta solo."""
+
+    allowed_roles = ROLES_MAPA
+
+    def get(self, request):
+        cuadrillas = cuadrillas_del_mapa(request.GET.get("anio"), request.GET.get("semana"))
+        desde = _cursor_desde_evento(request.headers.get("Last-Event-ID"))
+        if isinstance(request, ASGIRequest):
+            contenido = _stream_async(cuadrillas, desde)
+        else:
+            contenido = _stream_unico(cuadrillas, desde)
+        resp = StreamingHttpResponse(contenido, content_type="text/event-stream")
+        resp["Cache-Control"] = "no-cache"
+        # Sin buffering en proxies (nginx) para que cada evento salga al instante.
+        resp["X-Accel-Buffering"] = "no"
+        return resp
+
+
 urlpatterns = [
     path(
         "<uuid:pk_cuadrilla>/ubicacion/manual/",
         TrackingUbicacionManualCreateView.as_view(),
         name="ubicacion_manual_crear",
     ),
+    path("mapa/stream/", MapaCuadrillasStreamView.as_view(), name="mapa_stream"),
 ]
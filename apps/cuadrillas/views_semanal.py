@@ -138,7 +138,26 @@ def _parse_hora_planeada(valor):
     raise ValueError(f"Hora inválida: {valor}")
 
 
-def _bloque_a_dict(cuadrilla):
+def _celulares_por_documento(cuadrillas):
+    """``{documento: celular}`` del maestro ``PersonalCuadrilla`` para los
+    miembros activos de TODAS las ``cuadrillas`` (miembros prefetcheados),
+    en un único query."""
+    documentos = {
+        getattr(m.usuario, "documento", "")
+        for cuadrilla in cuadrillas
+        for m in cuadrilla.miembros.all()
+        if m.activo and getattr(m.usuario, "documento", "")
+    }
+    if not documentos:
+        return {}
+    return dict(
+        PersonalCuadrilla.objects.filter(documento__in=documentos).values_list(
+            "documento", "celular"
+        )
+    )
+
+
+def _bloque_a_dict(cuadrilla, celulares_por_documento=None):
     """Normaliza una Cuadrilla + miembros a un dict listo para plantilla.
 
     Ordena los miembros con el Jefe de Trabajo (JT/CTA) primero.
@@ -149,17 +168,13 @@ def _bloque_a_dict(cuadrilla):
     El ``celular`` vive en el maestro ``PersonalCuadrilla`` (A1/A5), NO en
     ``Usuario.telefono`` (ese es un concepto distinto, poblado solo por los
     importers S18) — se resuelve por ``documento`` en un único query batched
-    (evita N+1 por miembro).
+    (evita N+1 por miembro). Los exports de muchos bloques pasan
+    ``celulares_por_documento`` ya resuelto por lote
+    (``_celulares_por_documento``) para no hacer ese query por bloque.
     """
     activos = [m for m in cuadrilla.miembros.all() if m.activo]
-    documentos = [
-        getattr(m.usuario, "documento", "") for m in activos if getattr(m.usuario, "documento", "")
-    ]
-    celulares_por_documento = dict(
-        PersonalCuadrilla.objects.filter(documento__in=documentos).values_list(
-            "documento", "celular"
-        )
-    )
+    if celulares_por_documento is None:
+        celulares_por_documento = _celulares_por_documento([cuadrilla])
     miembros = [
         {
             "miembro_pk": str(m.pk),
@@ -1274,17 +1289,11 @@ class ProgramacionSemanalExportarHorizontalView(LoginRequiredMixin, RoleRequired
 
     def get(self, request, anio, semana):
         from apps.actividades.exporters import ProgramacionSemanalHorizontalExporter
+        from apps.core.excel_escritura import respuesta_xlsx
 
         anio, semana = int(anio), int(semana)
         output = ProgramacionSemanalHorizontalExporter().generar_excel(anio, semana)
-        resp = HttpResponse(
-            output.read(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-        resp["Content-Disposition"] = (
-            f'attachment; filename="programacion_semana_{semana:02d}_{anio}.xlsx"'
-        )
-        return resp
+        return respuesta_xlsx(output, f"programacion_semana_{semana:02d}_{anio}.xlsx")
 
 
 class ProgramacionSemanalExportarRangoView(LoginRequiredMixin, NivelAdminRequiredMixin, View):
@@ -1299,6 +1308,7 @@ class ProgramacionSemanalExportarRangoView(LoginRequiredMixin, NivelAdminRequire
 
     def get(self, request):
         from apps.actividades.exporters import ProgramacionSemanalHorizontalExporter
+        from apps.core.excel_escritura import respuesta_xlsx
 
         fecha_inicio_str = (request.GET.get("fecha_inicio") or "").strip()
         fecha_fin_str = (request.GET.get("fecha_fin") or "").strip()
@@ -1316,17 +1326,14 @@ class ProgramacionSemanalExportarRangoView(LoginRequiredMixin, NivelAdminRequire
                 "La fecha fin no puede ser anterior a la fecha inicio.", status=400
             )
 
+        # Escrito en modo write-only a un archivo temporal y enviado por
+        # chunks: un rango de un año no arma el libro en memoria.
         output = ProgramacionSemanalHorizontalExporter().generar_excel_rango(
             fecha_inicio, fecha_fin
         )
-        resp = HttpResponse(
-            output.read(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-        resp["Content-Disposition"] = (
-            f'attachment; filename="programacion_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}.xlsx"'
+        return respuesta_xlsx(
+            output, f"programacion_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}.xlsx"
         )
-        return resp
 
 
 urlpatterns = [
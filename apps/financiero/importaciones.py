@@ -0,0 +1,202 @@
+"""
+Procesador de la carga de costos desde cuadrillas (ver ``apps.core.importaciones``).
+
+``CargarCostosCuadrillaView`` recorría los 12 meses de asistencia dentro de
+la request. Ahora encola un ``TrabajoImportacion`` sin archivo y el worker
+corre este procesador: cada mes calculado se guarda en el
+``PresupuestoDetallado`` y queda como checkpoint, así un reintento retoma
+desde el mes siguiente.
+"""
+from decimal import Decimal
+
+from django.urls import reverse
+
+# Colombian legal overtime multipliers over base hourly rate
+FACTOR_HE_DIURNA = Decimal('1.25')
+FACTOR_HE_NOCTURNA = Decimal('1.75')
+FACTOR_HE_DOMINICAL_DIURNA = Decimal('2.00')
+FACTOR_HE_DOMINICAL_NOCTURNA = Decimal('2.50')
+
+# Standard working hours per day (average)
+# La tarifa hora se deriva de la jornada legal vigente (42 h / 6 días).
+HORAS_JORNADA = Decimal('7')
+
+_TOTALES = ('nomina', 'he', 'viaticos', 'transporte')
+
+
+def _costos_mes(anio, mes_num, mes_name, datos):
+    """Llena ``datos`` con los costos de mano de obra y transporte del mes.
+
+    Devuelve ``{'nomina', 'he', 'viaticos', 'transporte'}`` del mes.
+    """
+    from calendar import monthrange
+    from datetime import date
+
+    from django.db.models import Q, Sum
+
+    from apps.cuadrillas.models import Asistencia, Cuadrilla, CuadrillaMiembro
+
+    fecha_inicio = date(anio, mes_num, 1)
+    _, last_day = monthrange(anio, mes_num)
+    fecha_fin = date(anio, mes_num, last_day)
+
+    # Get all attendance records for this month
+    asistencias = Asistencia.objects.filter(
+        fecha__gte=fecha_inicio,
+        fecha__lte=fecha_fin,
+    ).select_related('cuadrilla', 'usuario')
+
+    # --- Nomina operacion ---
+    # Sum of costo_dia for all present days
+    # #210: un día festivo/dominical trabajado se registra como
+    # PRESENTE + horas dominicales, y se PAGA por la vía de recargo
+    # (FACTOR_HE_DOMINICAL_*, abajo). Sumarle además el costo_dia
+    # ordinario lo cobraba DOS veces. Mismo criterio que el total de
+    # horas ordinarias de la grilla (apps/cuadrillas/views.py).
+    nomina_mes = Decimal('0')
+    for asist in asistencias.filter(tipo_novedad='PRESENTE').exclude(
+        Q(he_dominical_diurna__gt=0) | Q(he_dominical_nocturna__gt=0)
+    ):
+        # Get the member's daily cost
+        miembro = CuadrillaMiembro.objects.filter(
+            cuadrilla=asist.cuadrilla,
+            usuario=asist.usuario,
+            activo=True,
+        ).first()
+        if miembro and miembro.costo_dia:
+            nomina_mes += miembro.costo_dia
+
+    datos['costos_variables']['MO']['Nómina operación'][mes_name] = int(nomina_mes)
+
+    # --- Tiempo extra operacion ---
+    # Calculate overtime cost based on hourly rate and overtime multipliers
+    he_costo_mes = Decimal('0')
+    he_qs = asistencias.filter(
+        Q(he_diurna__gt=0) | Q(he_nocturna__gt=0) |
+        Q(he_dominical_diurna__gt=0) | Q(he_dominical_nocturna__gt=0)
+    )
+    for asist in he_qs:
+        miembro = CuadrillaMiembro.objects.filter(
+            cuadrilla=asist.cuadrilla,
+            usuario=asist.usuario,
+            activo=True,
+        ).first()
+        if miembro and miembro.costo_dia:
+            tarifa_hora = miembro.costo_dia / HORAS_JORNADA
+            he_costo = (
+                (asist.he_diurna or 0) * tarifa_hora * FACTOR_HE_DIURNA +
+                (asist.he_nocturna or 0) * tarifa_hora * FACTOR_HE_NOCTURNA +
+                (asist.he_dominical_diurna or 0) * tarifa_hora * FACTOR_HE_DOMINICAL_DIURNA +
+                (asist.he_dominical_nocturna or 0) * tarifa_hora * FACTOR_HE_DOMINICAL_NOCTURNA
+            )
+            he_costo_mes += he_costo
+
+    datos['costos_variables']['MO']['Tiempo extra operación'][mes_name] = int(he_costo_mes)
+
+    # --- Viaticos ---
+    viaticos_reemb = asistencias.filter(
+        viatico_aplica=True,
+    ).aggregate(total=Sum('viaticos'))['total'] or 0
+    datos['costos_variables']['MO']['Viáticos reembolsables operación'][mes_name] = int(viaticos_reemb)
+
+    # --- Transporte (vehicle costs for days with attendance) ---
+    cuadrillas_activas = Cuadrilla.objects.filter(
+        asistencias__fecha__gte=fecha_inicio,
+        asistencias__fecha__lte=fecha_fin,
+        vehiculo__isnull=False,
+    ).distinct()
+    transporte_mes = Decimal('0')
+    for cuad in cuadrillas_activas:
+        dias_activos = Asistencia.objects.filter(
+            cuadrilla=cuad,
+            fecha__gte=fecha_inicio,
+            fecha__lte=fecha_fin,
+            tipo_novedad='PRESENTE',
+        ).values('fecha').distinct().count()
+        if cuad.vehiculo and cuad.vehiculo.costo_dia:
+            transporte_mes += cuad.vehiculo.costo_dia * dias_activos
+
+    datos['costos_variables']['TA']['Transporte operación'][mes_name] = int(transporte_mes)
+
+    return {
+        'nomina': nomina_mes,
+        'he': he_costo_mes,
+        'viaticos': Decimal(viaticos_reemb),
+        'transporte': transporte_mes,
+    }
+
+
+def procesar_costos_cuadrilla(archivo, parametros, usuario=None, progreso=None):
+    """Calcula los costos del año desde asistencia y llena el Presupuesto Real.
+
+    ``parametros``: ``anio``, ``contrato_id`` (opcional), ``redirect_url``.
+    ``archivo`` no se usa (el proceso no tiene Excel).
+    """
+    from apps.contratos.models import Contrato
+
+    from .models import PresupuestoDetallado
+    from .views import MESES, _build_empty_datos
+
+    anio = int(parametros['anio'])
+
+    # Handle optional contrato filter
+    contrato = None
+    if parametros.get('contrato_id'):
+        try:
+            contrato = Contrato.objects.get(pk=parametros['contrato_id'])
+        except Contrato.DoesNotExist:
+            pass
+
+    obj, created = PresupuestoDetallado.objects.get_or_create(
+        anio=anio,
+        tipo='REAL',
+        contrato=contrato,
+        defaults={'datos': _build_empty_datos()},
+    )
+    datos = obj.datos or _build_empty_datos()
+
+    checkpoint = progreso.datos if progreso is not None else {}
+    mes_inicio = checkpoint.get('mes', 0) + 1
+    totales = {
+        clave: Decimal(str(checkpoint.get('totales', {}).get(clave, 0)))
+        for clave in _TOTALES
+    }
+    if progreso is not None:
+        progreso.sumar_total(12)
+        progreso.avanzar(mes_inicio - 1)
+
+    for mes_num in range(mes_inicio, 13):
+        del_mes = _costos_mes(anio, mes_num, MESES[mes_num - 1], datos)
+        for clave in _TOTALES:
+            totales[clave] += del_mes[clave]
+        if progreso is not None:
+            # Guardar el mes antes del checkpoint: al reanudar, `obj.datos` ya
+            # trae los meses confirmados.
+            obj.datos = datos
+            obj.save(update_fields=['datos', 'updated_at'])
+            progreso.avanzar()
+            progreso.checkpoint({'mes': mes_num, 'totales': totales})
+
+    obj.datos = datos
+    obj.save(update_fields=['datos', 'updated_at'])
+
+    url = f"{parametros.get('redirect_url') or reverse('financiero:presupuesto_real')}?anio={anio}"
+    if contrato:
+        url += f'&contrato={contrato.pk}'
+
+    return {
+        'resultado': {
+            'anio': anio,
+            'contrato_id': str(contrato.pk) if contrato else None,
+            **{f'total_{clave}': int(valor) for clave, valor in totales.items()},
+        },
+        'mensajes': [[
+            'success',
+            f'Costos cargados desde cuadrillas para {anio}: '
+            f"Nómina ${totales['nomina']:,.0f}, "
+            f"Horas Extra ${totales['he']:,.0f}, "
+            f"Viáticos ${totales['viaticos']:,.0f}, "
+            f"Transporte ${totales['transporte']:,.0f}.",
+        ]],
+        'redirect_url': url,
+    }
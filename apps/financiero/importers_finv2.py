@@ -26,6 +26,15 @@ ninguna columna de la matriz mensual. ``build_rubro_matrix_rows`` arma la matriz
 rubro × 12 meses + totales por columna; ``build_rubro_display_rows`` conserva la
 vista plana (fallback). La paridad ``sum(meses) + sin_mes == total`` la garantiza
 el acumulado por fila (un test la verifica).
+
+Hechos contables
+----------------
+El resultado trae además ``hechos`` (una fila por cuenta × mes fiscal) que
+``guardar_hechos`` carga en bloque en ``HechoContable``. Las vistas de
+Mantenimiento usan ``hechos_rubro_display_rows`` / ``hechos_rubro_matrix_rows``
+/ ``hechos_mes_filter_rows`` (agregados SQL, mismo contrato de salida que los
+``build_*``); los ``build_*`` sobre el JSON quedan para presupuestos sin hechos
+y para Construcción.
 """
 import datetime
 import unicodedata
@@ -78,6 +87,10 @@ MESES_FISCALES_KEYS = [m[0] for m in MESES_FISCALES]
 # {numero_mes_calendario: key_fiscal}, p.ej. {7: 'julio', 1: 'enero'}.
 _MES_NUM_A_KEY = {num: key for key, _label, num in MESES_FISCALES}
 
+# {key_fiscal: posición 1..12 en el año fiscal}, p.ej. {'julio': 1, 'junio': 12}.
+# Es el ``mes_fiscal`` de HechoContable (sin_mes → None).
+_MES_KEY_A_FISCAL = {key: i for i, key in enumerate(MESES_FISCALES_KEYS, start=1)}
+
 # Bucket para filas sin fecha reconocible — entra solo en el total ANUAL,
 # nunca en una columna mensual de la matriz (requerimiento #120).
 SIN_MES_KEY = 'sin_mes'
@@ -261,6 +274,7 @@ class ContableCompleteImporter:
               'advertencia': str | None,  # mensaje ⚠️ del issue
               'mensaje': str | None,      # mensaje ✅ del issue
               'datos': {...} | None,      # estructura finv2_bd para .datos
+              'hechos': [{...}, ...],     # filas para guardar_hechos
               'cuentas': int,
               'total': float,
               'no_mapeadas': [str, ...],
@@ -370,10 +384,21 @@ class ContableCompleteImporter:
             """Redondea cada bucket mensual a 2 decimales (incluye sin_mes)."""
             return {k: round(v, 2) for k, v in meses.items()}
 
+        # Filas de HechoContable (una por cuenta × mes): ver guardar_hechos.
+        hechos = []
+
         for cta, info in sorted(grupos.items()):
             rubro = self._rubro_para(cta, mapeo_tabla)
             if rubro == RUBRO_NO_CLASIFICADO:
                 no_mapeadas.append(cta)
+            for mk, mv in info['meses'].items():
+                hechos.append({
+                    'cta_equivalente': cta,
+                    'descripcion': info['descripcion'],
+                    'rubro': rubro,
+                    'mes_fiscal': _MES_KEY_A_FISCAL.get(mk),
+                    'monto': round(mv, 2),
+                })
             destino = rubros.setdefault(
                 rubro, {'total': 0.0, 'meses': {}, 'cuentas': []}
             )
@@ -423,6 +448,7 @@ class ContableCompleteImporter:
             'advertencia': None,
             'mensaje': mensaje,
             'datos': datos,
+            'hechos': hechos,
             'cuentas': len(grupos),
             'total': total_general,
             'no_mapeadas': no_mapeadas,
@@ -435,14 +461,16 @@ class ContableCompleteImporter:
     def _error(self, msg):
         return {
             'exito': False, 'error': msg, 'advertencia': None, 'mensaje': None,
-            'datos': None, 'cuentas': 0, 'total': 0.0, 'no_mapeadas': [],
+            'datos': None, 'hechos': [], 'cuentas': 0, 'total': 0.0,
+            'no_mapeadas': [],
             'warnings': self.warnings,
         }
 
     def _advertencia(self, msg):
         return {
             'exito': False, 'error': None, 'advertencia': msg, 'mensaje': None,
-            'datos': None, 'cuentas': 0, 'total': 0.0, 'no_mapeadas': [],
+            'datos': None, 'hechos': [], 'cuentas': 0, 'total': 0.0,
+            'no_mapeadas': [],
             'warnings': self.warnings,
         }
 
@@ -549,3 +577,145 @@ def build_mes_filter_rows(datos, mes_key):
 
     rows.sort(key=lambda r: r['total'], reverse=True)
     return rows, round(total_mes, 2), label
+
+
+# --------------------------------------------------------------------------- #
+# Hechos contables (tabla normalizada) — mismos contratos que los build_*
+# --------------------------------------------------------------------------- #
+def guardar_hechos(presupuesto, hechos):
+    """Reemplaza los ``HechoContable`` del presupuesto por ``hechos``.
+
+    ``hechos`` es la lista que devuelve ``procesar_bd_completa``. Una carga
+    nueva sustituye a la anterior (igual que pisa ``datos['finv2_bd']``).
+    """
+    from decimal import Decimal
+
+    from django.db import transaction
+
+    from .models_finv2_hechos import HechoContable
+
+    with transaction.atomic():
+        HechoContable.objects.filter(presupuesto=presupuesto).delete()
+        HechoContable.objects.bulk_create(
+            [
+                HechoContable(
+                    presupuesto=presupuesto,
+                    cta_equivalente=h['cta_equivalente'][:255],
+                    descripcion=(h['descripcion'] or '')[:255],
+                    rubro=h['rubro'][:255],
+                    mes_fiscal=h['mes_fiscal'],
+                    monto=Decimal(str(h['monto'])),
+                )
+                for h in hechos
+            ],
+            batch_size=1000,
+        )
+
+
+def _hechos(presupuesto):
+    from .models_finv2_hechos import HechoContable
+
+    return HechoContable.objects.filter(presupuesto=presupuesto).order_by()
+
+
+def hechos_rubro_display_rows(presupuesto):
+    """``build_rubro_display_rows`` leyendo ``HechoContable``.
+
+    Un GROUP BY (rubro, cuenta); los totales por rubro salen de esas filas.
+    """
+    from django.db.models import Sum
+
+    por_cuenta = (
+        _hechos(presupuesto)
+        .values('rubro', 'cta_equivalente', 'descripcion')
+        .annotate(total=Sum('monto'))
+        .order_by('rubro', 'cta_equivalente')
+    )
+    rubros = {}
+    for fila in por_cuenta:
+        rubro = rubros.setdefault(fila['rubro'], {'total': 0.0, 'cuentas': []})
+        total = float(fila['total'])
+        rubro['total'] += total
+        rubro['cuentas'].append({
+            'cta_equivalente': fila['cta_equivalente'],
+            'descripcion': fila['descripcion'],
+            'total': round(total, 2),
+        })
+
+    total_general = round(sum(r['total'] for r in rubros.values()), 2)
+    rows = []
+    for rubro, info in sorted(rubros.items(), key=lambda kv: kv[1]['total'], reverse=True):
+        rubro_total = round(info['total'], 2)
+        pct = (rubro_total / total_general * 100) if total_general else 0.0
+        rows.append({
+            'rubro': rubro,
+            'total': rubro_total,
+            'pct': round(pct, 1),
+            'cuentas': info['cuentas'],
+        })
+    return rows, total_general
+
+
+def hechos_rubro_matrix_rows(presupuesto):
+    """``build_rubro_matrix_rows`` leyendo ``HechoContable``.
+
+    Un GROUP BY (rubro, mes_fiscal); ``mes_fiscal`` vacío (sin mes) suma al
+    total anual del rubro pero a ninguna columna.
+    """
+    from django.db.models import Sum
+
+    rubros = {}
+    for fila in _hechos(presupuesto).values('rubro', 'mes_fiscal').annotate(total=Sum('monto')):
+        info = rubros.setdefault(
+            fila['rubro'], {'total': 0.0, 'meses': [0.0] * len(MESES_FISCALES_KEYS)}
+        )
+        valor = float(fila['total'])
+        info['total'] += valor
+        if fila['mes_fiscal']:
+            info['meses'][fila['mes_fiscal'] - 1] += valor
+
+    total_general = round(sum(r['total'] for r in rubros.values()), 2)
+    rows = []
+    totales_columna = [0.0] * len(MESES_FISCALES_KEYS)
+    for rubro, info in sorted(rubros.items(), key=lambda kv: kv[1]['total'], reverse=True):
+        fila_meses = [round(v, 2) for v in info['meses']]
+        for i, valor in enumerate(fila_meses):
+            totales_columna[i] += valor
+        rubro_total = round(info['total'], 2)
+        pct = (rubro_total / total_general * 100) if total_general else 0.0
+        rows.append({
+            'rubro': rubro,
+            'meses': fila_meses,
+            'total': rubro_total,
+            'pct': round(pct, 1),
+        })
+
+    totales_columna = [round(v, 2) for v in totales_columna]
+    return rows, totales_columna, MESES_FISCALES, total_general
+
+
+def hechos_mes_filter_rows(presupuesto, mes_key):
+    """``build_mes_filter_rows`` leyendo ``HechoContable``: filtra y agrupa
+    el mes en SQL (índice presupuesto + mes_fiscal)."""
+    from django.db.models import Sum
+
+    label = next((lbl for k, lbl, _n in MESES_FISCALES if k == mes_key), '')
+    if not label:
+        return [], 0.0, ''
+
+    por_rubro = (
+        _hechos(presupuesto)
+        .filter(mes_fiscal=_MES_KEY_A_FISCAL[mes_key])
+        .values('rubro')
+        .annotate(total=Sum('monto'))
+        .order_by('-total')
+    )
+    rows = []
+    total_mes = 0.0
+    for fila in por_rubro:
+        valor = round(float(fila['total']), 2)
+        if valor == 0.0:
+            continue
+        rows.append({'rubro': fila['rubro'], 'total': valor})
+        total_mes += valor
+    return rows, round(total_mes, 2), label
@@ -0,0 +1,79 @@
+# Hechos contables normalizados (BD contable por cuenta × mes fiscal).
+# Escrita a mano (entorno sin Django para makemigrations).
+#
+# Backfill: los presupuestos que ya tienen ``datos['finv2_bd']`` se vuelcan a
+# filas de HechoContable desde el mismo bloque (rubro → cuentas → meses), así
+# las vistas leen la tabla también para cargas anteriores a esta migración.
+# Reversa: no-op (el CreateModel inverso elimina la tabla con sus filas).
+
+import uuid
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Orden fiscal julio → junio (mismo que importers_finv2.MESES_FISCALES).
+MESES_FISCALES_KEYS = [
+    'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre',
+    'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+]
+
+
+def volcar_finv2_bd(apps, schema_editor):
+    PresupuestoDetallado = apps.get_model('financiero', 'PresupuestoDetallado')
+    HechoContable = apps.get_model('financiero', 'HechoContable')
+
+    for presupuesto in PresupuestoDetallado.objects.iterator():
+        bloque = (presupuesto.datos or {}).get('finv2_bd') or {}
+        hechos = []
+        for rubro, info in (bloque.get('rubros') or {}).items():
+            for cuenta in info.get('cuentas') or []:
+                for mes_key, valor in (cuenta.get('meses') or {}).items():
+                    mes_fiscal = (
+                        MESES_FISCALES_KEYS.index(mes_key) + 1
+                        if mes_key in MESES_FISCALES_KEYS else None
+                    )
+                    hechos.append(HechoContable(
+                        presupuesto=presupuesto,
+                        cta_equivalente=cuenta.get('cta_equivalente', '')[:255],
+                        descripcion=(cuenta.get('descripcion') or '')[:255],
+                        rubro=rubro[:255],
+                        mes_fiscal=mes_fiscal,
+                        monto=Decimal(str(round(valor or 0, 2))),
+                    ))
+        HechoContable.objects.bulk_create(hechos, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financiero', '0011_mapeo_cta_rubro'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HechoContable',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('cta_equivalente', models.CharField(max_length=255, verbose_name='Cuenta equivalente')),
+                ('descripcion', models.CharField(blank=True, max_length=255, verbose_name='Descripción')),
+                ('rubro', models.CharField(max_length=255, verbose_name='Rubro presupuestal')),
+                ('mes_fiscal', models.PositiveSmallIntegerField(blank=True, help_text='1 = julio … 12 = junio. Vacío: movimiento sin fecha (solo cuenta en el total anual).', null=True, verbose_name='Mes fiscal')),
+                ('monto', models.DecimalField(decimal_places=2, max_digits=18, verbose_name='Monto')),
+                ('presupuesto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hechos_contables', to='financiero.presupuestodetallado', verbose_name='Presupuesto')),
+            ],
+            options={
+                'verbose_name': 'Hecho contable',
+                'verbose_name_plural': 'Hechos contables',
+                'db_table': 'financiero_hecho_contable',
+                'ordering': ['presupuesto', 'rubro', 'cta_equivalente', 'mes_fiscal'],
+                'indexes': [
+                    models.Index(fields=['presupuesto', 'rubro'], name='fin_hecho_rubro_idx'),
+                    models.Index(fields=['presupuesto', 'mes_fiscal'], name='fin_hecho_mes_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(volcar_finv2_bd, migrations.RunPython.noop),
+    ]
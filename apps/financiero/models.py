@@ -7,6 +7,8 @@ several files so that ``apps.financiero.models`` keeps exposing every model
 
 - ``models_base``: monolito legacy (CostoRecurso, Presupuesto, ...).
 - ``models_finv2_mapeo``: mapeo contable v2 (B1 / #120 lo llena).
+- ``models_finv2_hechos``: hechos contables normalizados de la BD contable.
 """
 from .models_base import *  # noqa
 from .models_finv2_mapeo import *  # noqa
+from .models_finv2_hechos import *  # noqa
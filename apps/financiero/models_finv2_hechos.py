@@ -0,0 +1,52 @@
+"""
+Hechos contables v2 (financiero) — BD contable normalizada.
+
+``ContableCompleteImporter`` agrupa la BD contable por cuenta equivalente y
+mes fiscal; cada par (cuenta, mes) queda como una fila de ``HechoContable``
+colgada del ``PresupuestoDetallado`` donde se cargó. Las vistas del
+Presupuesto Planeado (rubros, matriz 12 meses, filtro mes) agregan estas
+filas en SQL en vez de recorrer ``datos['finv2_bd']`` en Python en cada
+request.
+
+El bloque ``finv2_bd`` del JSONField se sigue escribiendo: guarda el resumen
+de la carga (cuentas no mapeadas, filas sin mes) y es el fallback de los
+presupuestos que aún no tienen hechos.
+"""
+from django.db import models
+
+from apps.core.models import BaseModel
+
+
+class HechoContable(BaseModel):
+    """Neto acumulado de una cuenta equivalente en un mes fiscal."""
+
+    presupuesto = models.ForeignKey(
+        'financiero.PresupuestoDetallado',
+        on_delete=models.CASCADE,
+        related_name='hechos_contables',
+        verbose_name='Presupuesto',
+    )
+    cta_equivalente = models.CharField('Cuenta equivalente', max_length=255)
+    descripcion = models.CharField('Descripción', max_length=255, blank=True)
+    rubro = models.CharField('Rubro presupuestal', max_length=255)
+    mes_fiscal = models.PositiveSmallIntegerField(
+        'Mes fiscal',
+        null=True,
+        blank=True,
+        help_text='1 = julio … 12 = junio. Vacío: movimiento sin fecha '
+                  '(solo cuenta en el total anual).',
+    )
+    monto = models.DecimalField('Monto', max_digits=18, decimal_places=2)
+
+    class Meta:
+        db_table = 'financiero_hecho_contable'
+        verbose_name = 'Hecho contable'
+        verbose_name_plural = 'Hechos contables'
+        ordering = ['presupuesto', 'rubro', 'cta_equivalente', 'mes_fiscal']
+        indexes = [
+            models.Index(fields=['presupuesto', 'rubro'], name='fin_hecho_rubro_idx'),
+            models.Index(fields=['presupuesto', 'mes_fiscal'], name='fin_hecho_mes_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.cta_equivalente} ({self.rubro}) mes {self.mes_fiscal}: {self.monto}'
@@ -0,0 +1,122 @@
+"""Hechos contables (``HechoContable``): la carga de la BD contable se guarda
+normalizada por cuenta × mes fiscal y las vistas de rubros / matriz / filtro
+mes la agregan en SQL con el mismo resultado que los ``build_*`` sobre el
+JSON ``finv2_bd``.
+"""
+import datetime
+
+import pytest
+from django.urls import reverse
+
+from apps.financiero.importers_finv2 import (
+    MESES_FISCALES_KEYS,
+    ContableCompleteImporter,
+    build_mes_filter_rows,
+    build_rubro_display_rows,
+    build_rubro_matrix_rows,
+    guardar_hechos,
+    hechos_mes_filter_rows,
+    hechos_rubro_display_rows,
+    hechos_rubro_matrix_rows,
+)
+from apps.financiero.models import HechoContable, PresupuestoDetallado
+
+from .test_finv2_matriz import _excel_bytes, _row
+
+FILAS = [
+    _row(-100, 'Ingresos Operacionales', fecha=datetime.datetime(2025, 7, 15), desc='LINEAS'),
+    _row(-50, 'Ingresos Operacionales', fecha=datetime.datetime(2025, 7, 20), desc='LINEAS'),
+    _row(-25, 'Ingresos Operacionales', fecha=datetime.datetime(2026, 1, 9), desc='LINEAS'),
+    _row(300, 'salarios', fecha=datetime.datetime(2025, 7, 1)),
+    _row(80, 'salarios'),  # sin fecha: solo total anual
+    _row(40, 'combustible', periodo=202603),
+    _row(7, 'Cuenta Rara', periodo=202603),
+]
+
+
+@pytest.fixture
+def cargado(db):
+    res = ContableCompleteImporter().procesar_bd_completa(_excel_bytes(FILAS))
+    presupuesto = PresupuestoDetallado.objects.create(
+        anio=2026, tipo='PLANEADO', contrato=None, datos=res['datos'],
+    )
+    guardar_hechos(presupuesto, res['hechos'])
+    return presupuesto
+
+
+def test_hechos_por_cuenta_y_mes(cargado):
+    hechos = HechoContable.objects.filter(presupuesto=cargado)
+
+    # Ingresos (julio, enero) + salarios (julio, sin mes) + combustible + rara.
+    assert hechos.count() == 6
+    julio = hechos.get(cta_equivalente='Ingresos Operacionales', mes_fiscal=1)
+    assert (julio.rubro, julio.monto, julio.descripcion) == ('Ingresos Operacionales', -150, 'LINEAS')
+    assert hechos.get(cta_equivalente='salarios', mes_fiscal=None).monto == 80
+
+
+def test_agregados_sql_igualan_al_json(cargado):
+    datos = cargado.datos
+
+    filas_sql, total_sql = hechos_rubro_display_rows(cargado)
+    filas_json, total_json = build_rubro_display_rows(datos)
+    assert total_sql == total_json
+    assert [(f['rubro'], f['total'], f['pct']) for f in filas_sql] == [
+        (f['rubro'], f['total'], f['pct']) for f in filas_json
+    ]
+    assert [c['cta_equivalente'] for f in filas_sql for c in f['cuentas']] == [
+        c['cta_equivalente'] for f in filas_json for c in f['cuentas']
+    ]
+
+    assert hechos_rubro_matrix_rows(cargado) == build_rubro_matrix_rows(datos)
+    for mes_key in MESES_FISCALES_KEYS:
+        assert hechos_mes_filter_rows(cargado, mes_key) == build_mes_filter_rows(datos, mes_key)
+    assert hechos_mes_filter_rows(cargado, 'nofiscal') == ([], 0.0, '')
+
+
+def test_recarga_reemplaza_hechos(cargado):
+    res = ContableCompleteImporter().procesar_bd_completa(
+        _excel_bytes([_row(-10, 'Intereses', periodo=202602)])
+    )
+    guardar_hechos(cargado, res['hechos'])
+
+    assert list(HechoContable.objects.filter(presupuesto=cargado).values_list('rubro', 'monto')) == [
+        ('Intereses', -10),
+    ]
+
+
+def test_vista_filtro_mes_lee_hechos(client, admin_user, cargado):
+    client.force_login(admin_user)
+    # Solo el resumen de la carga en el JSON: los rubros tienen que salir de
+    # la tabla.
+    resumen = {k: v for k, v in cargado.datos['finv2_bd'].items() if k != 'rubros'}
+    PresupuestoDetallado.objects.filter(pk=cargado.pk).update(datos={'finv2_bd': resumen})
+
+    resp = client.get(
+        reverse('financiero:cargar_bd_contable'),
+        {'anio': 2026, 'tab': 'planeado', 'vista': 'mes', 'mes': 'julio'},
+    )
+
+    assert resp.status_code == 200
+    assert resp.context['tiene_datos_bd'] is True
+    assert resp.context['mes_rows'] == [
+        {'rubro': 'Personal', 'total': 300.0},
+        {'rubro': 'Ingresos Operacionales', 'total': -150.0},
+    ]
+    assert resp.context['matrix_total'] == 252.0
+
+
+def test_vista_ignora_hechos_sin_finv2_bd(client, admin_user, cargado):
+    # La importación legacy reemplaza ``datos`` entero: sin ``finv2_bd`` los
+    # hechos que hayan quedado no se muestran.
+    client.force_login(admin_user)
+    PresupuestoDetallado.objects.filter(pk=cargado.pk).update(datos={})
+
+    resp = client.get(
+        reverse('financiero:cargar_bd_contable'),
+        {'anio': 2026, 'tab': 'planeado', 'vista': 'mes', 'mes': 'julio'},
+    )
+
+    assert resp.status_code == 200
+    assert resp.context['tiene_datos_bd'] is False
+    assert resp.context['rubro_rows'] == []
+    assert resp.context['mes_rows'] == []
@@ -13,6 +13,7 @@ from django.views.generic import CreateView, DetailView, ListView, TemplateView,
 from apps.core.mixins import HTMXMixin, RoleRequiredMixin
 from apps.core.cache import get_lineas_activas, get_cuadrillas_activas
 
+from . import importaciones
 from .views_finv2_dashboard import DashboardFinancieroMixinV2
 
 from .models import (
@@ -1498,6 +1499,7 @@ class PresupuestoDetalladoBaseView(LoginRequiredMixin, RoleRequiredMixin, Templa
     def _handle_excel_import(self, request):
         """Handle Excel file upload and data import."""
         from django.contrib import messages
+        from django.db import transaction
         from django.shortcuts import redirect
         from django.utils import timezone
 
@@ -1584,13 +1586,13 @@ class PresupuestoDetalladoBaseView(LoginRequiredMixin, RoleRequiredMixin, Templa
             messages.error(request, f'Error al importar: {result.get("error", "Error desconocido")}')
             return redirect(redirect_url)
 
-        obj, created = self._get_or_create_presupuesto(anio, contrato)
-        if not created:
-            obj.datos = result['datos']
-            obj.save(update_fields=['datos', 'updated_at'])
-        else:
+        with transaction.atomic():
+            obj, _ = self._get_or_create_presupuesto(anio, contrato)
             obj.datos = result['datos']
             obj.save(update_fields=['datos', 'updated_at'])
+            # ``datos`` se reemplaza entero y pierde ``finv2_bd``: los hechos
+            # contables de esa carga ya no corresponden.
+            obj.hechos_contables.all().delete()
 
         matched = result['matched']
         unmatched = result['unmatched']
@@ -2227,158 +2229,32 @@ class DescargarPlantillaExcelView(LoginRequiredMixin, RoleRequiredMixin, Templat
 
 
 class CargarCostosCuadrillaView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
-    """Calculate labor costs from cuadrilla attendance data and fill Presupuesto Real."""
+    """Calculate labor costs from cuadrilla attendance data and fill Presupuesto Real.
+
+    El cálculo recorre un año de asistencia: se encola como
+    TrabajoImportacion (ver apps/financiero/importaciones.py) y el usuario
+    sigue el avance mes a mes en la página del trabajo.
+    """
     allowed_roles = ['admin', 'director', 'coordinador']
     template_name = 'financiero/presupuesto_detallado.html'
 
-    # Colombian legal overtime multipliers over base hourly rate
-    FACTOR_HE_DIURNA = Decimal('1.25')
-    FACTOR_HE_NOCTURNA = Decimal('1.75')
-    FACTOR_HE_DOMINICAL_DIURNA = Decimal('2.00')
-    FACTOR_HE_DOMINICAL_NOCTURNA = Decimal('2.50')
-
-    # Standard working hours per day (average)
-    # La tarifa hora se deriva de la jornada legal vigente (42 h / 6 días).
-    HORAS_JORNADA = Decimal('7')
+    FACTOR_HE_DIURNA = importaciones.FACTOR_HE_DIURNA
+    FACTOR_HE_NOCTURNA = importaciones.FACTOR_HE_NOCTURNA
+    FACTOR_HE_DOMINICAL_DIURNA = importaciones.FACTOR_HE_DOMINICAL_DIURNA
+    FACTOR_HE_DOMINICAL_NOCTURNA = importaciones.FACTOR_HE_DOMINICAL_NOCTURNA
+    HORAS_JORNADA = importaciones.HORAS_JORNADA
 
     def post(self, request, *args, **kwargs):
-        from calendar import monthrange
-
-        from django.contrib import messages
-        from django.db.models import Q, Sum
         from django.shortcuts import redirect
         from django.utils import timezone
 
-        from apps.contratos.models import Contrato
-        from apps.cuadrillas.models import Asistencia, CuadrillaMiembro
-
-        anio = int(request.POST.get('anio', timezone.now().year))
-        redirect_url = request.POST.get('redirect_url', reverse_lazy('financiero:presupuesto_real'))
-
-        # Handle optional contrato filter
-        contrato = None
-        contrato_id = request.POST.get('contrato')
-        if contrato_id:
-            try:
-                contrato = Contrato.objects.get(pk=contrato_id)
-            except Contrato.DoesNotExist:
-                pass
-
-        obj, created = PresupuestoDetallado.objects.get_or_create(
-            anio=anio,
-            tipo='REAL',
-            contrato=contrato,
-            defaults={'datos': _build_empty_datos()},
-        )
-        datos = obj.datos or _build_empty_datos()
-
-        total_nomina = 0
-        total_he = 0
-        total_viaticos = 0
-        total_transporte = 0
-
-        for mes_num in range(1, 13):
-            mes_name = MESES[mes_num - 1]
-            fecha_inicio = date(anio, mes_num, 1)
-            _, last_day = monthrange(anio, mes_num)
-            fecha_fin = date(anio, mes_num, last_day)
-
-            # Get all attendance records for this month
-            asistencias = Asistencia.objects.filter(
-                fecha__gte=fecha_inicio,
-                fecha__lte=fecha_fin,
-            ).select_related('cuadrilla', 'usuario')
-
-            # --- Nomina operacion ---
-            # Sum of costo_dia for all present days
-            # #210: un día festivo/dominical trabajado se registra como
-            # PRESENTE + horas dominicales, y se PAGA por la vía de recargo
-            # (FACTOR_HE_DOMINICAL_*, abajo). Sumarle además el costo_dia
-            # ordinario lo cobraba DOS veces. Mismo criterio que el total de
-            # horas ordinarias de la grilla (apps/cuadrillas/views.py).
-            nomina_mes = Decimal('0')
-            for asist in asistencias.filter(tipo_novedad='PRESENTE').exclude(
-                Q(he_dominical_diurna__gt=0) | Q(he_dominical_nocturna__gt=0)
-            ):
-                # Get the member's daily cost
-                miembro = CuadrillaMiembro.objects.filter(
-                    cuadrilla=asist.cuadrilla,
-                    usuario=asist.usuario,
-                    activo=True,
-                ).first()
-                if miembro and miembro.costo_dia:
-                    nomina_mes += miembro.costo_dia
-
-            datos['costos_variables']['MO']['Nómina operación'][mes_name] = int(nomina_mes)
-            total_nomina += nomina_mes
-
-            # --- Tiempo extra operacion ---
-            # Calculate overtime cost based on hourly rate and overtime multipliers
-            he_costo_mes = Decimal('0')
-            he_qs = asistencias.filter(
-                Q(he_diurna__gt=0) | Q(he_nocturna__gt=0) |
-                Q(he_dominical_diurna__gt=0) | Q(he_dominical_nocturna__gt=0)
-            )
-            for asist in he_qs:
-                miembro = CuadrillaMiembro.objects.filter(
-                    cuadrilla=asist.cuadrilla,
-                    usuario=asist.usuario,
-                    activo=True,
-                ).first()
-                if miembro and miembro.costo_dia:
-                    tarifa_hora = miembro.costo_dia / self.HORAS_JORNADA
-                    he_costo = (
-                        (asist.he_diurna or 0) * tarifa_hora * self.FACTOR_HE_DIURNA +
-                        (asist.he_nocturna or 0) * tarifa_hora * self.FACTOR_HE_NOCTURNA +
-                        (asist.he_dominical_diurna or 0) * tarifa_hora * self.FACTOR_HE_DOMINICAL_DIURNA +
-                        (asist.he_dominical_nocturna or 0) * tarifa_hora * self.FACTOR_HE_DOMINICAL_NOCTURNA
-                    )
-                    he_costo_mes += he_costo
-
-            datos['costos_variables']['MO']['Tiempo extra operación'][mes_name] = int(he_costo_mes)
-            total_he += he_costo_mes
-
-            # --- Viaticos ---
-            viaticos_reemb = asistencias.filter(
-                viatico_aplica=True,
-            ).aggregate(total=Sum('viaticos'))['total'] or 0
-            datos['costos_variables']['MO']['Viáticos reembolsables operación'][mes_name] = int(viaticos_reemb)
-            total_viaticos += viaticos_reemb
-
-            # --- Transporte (vehicle costs for days with attendance) ---
-            from apps.cuadrillas.models import Cuadrilla
-            cuadrillas_activas = Cuadrilla.objects.filter(
-                asistencias__fecha__gte=fecha_inicio,
-                asistencias__fecha__lte=fecha_fin,
-                vehiculo__isnull=False,
-            ).distinct()
-            transporte_mes = Decimal('0')
-            for cuad in cuadrillas_activas:
-                dias_activos = Asistencia.objects.filter(
-                    cuadrilla=cuad,
-                    fecha__gte=fecha_inicio,
-                    fecha__lte=fecha_fin,
-                    tipo_novedad='PRESENTE',
-                ).values('fecha').distinct().count()
-                if cuad.vehiculo and cuad.vehiculo.costo_dia:
-                    transporte_mes += cuad.vehiculo.costo_dia * dias_activos
-
-            datos['costos_variables']['TA']['Transporte operación'][mes_name] = int(transporte_mes)
-            total_transporte += transporte_mes
-
-        obj.datos = datos
-        obj.save(update_fields=['datos', 'updated_at'])
-
-        messages.success(
-            request,
-            f'Costos cargados desde cuadrillas para {anio}: '
-            f'Nómina ${total_nomina:,.0f}, '
-            f'Horas Extra ${total_he:,.0f}, '
-            f'Viáticos ${total_viaticos:,.0f}, '
-            f'Transporte ${total_transporte:,.0f}.',
-        )
+        from apps.core.importaciones import encolar
+        from apps.core.models import TrabajoImportacion
 
-        url = f'{redirect_url}?anio={anio}'
-        if contrato:
-            url += f'&contrato={contrato.pk}'
-        return redirect(url)
+        parametros = {
+            'anio': int(request.POST.get('anio', timezone.now().year)),
+            'contrato_id': request.POST.get('contrato') or None,
+            'redirect_url': str(request.POST.get('redirect_url', reverse_lazy('financiero:presupuesto_real'))),
+        }
+        trabajo = encolar(TrabajoImportacion.Tipo.COSTOS_CUADRILLA, parametros, usuario=request.user)
+        return redirect(trabajo.get_absolute_url())
@@ -10,6 +10,7 @@ Vistas financiero v2 — Presupuesto Planeado con carga de BD contable — B1 (#
 """
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.http import HttpResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
@@ -25,6 +26,10 @@ from .importers_finv2 import (
     build_mes_filter_rows,
     build_rubro_display_rows,
     build_rubro_matrix_rows,
+    guardar_hechos,
+    hechos_mes_filter_rows,
+    hechos_rubro_display_rows,
+    hechos_rubro_matrix_rows,
 )
 from .models_finv2_mapeo import MapeoCtaRubro
 from .views import PresupuestoDetalladoBaseView
@@ -44,48 +49,64 @@ class PresupuestoPlaneadoViewV2(PresupuestoDetalladoBaseView):
         context = super().get_context_data(**kwargs)
 
         obj = context['presupuesto_obj']
-        rubro_rows, total_general = build_rubro_display_rows(obj.datos)
+        bloque = (obj.datos or {}).get('finv2_bd') or {}
+        # Con hechos cargados se agrega en SQL; el JSON queda para cargas
+        # previas a la tabla. Sin ``finv2_bd`` no hay BD contable vigente
+        # aunque queden hechos de una carga anterior.
+        con_hechos = bool(bloque) and obj.hechos_contables.exists()
+        if con_hechos:
+            rubro_rows, total_general = hechos_rubro_display_rows(obj)
+        else:
+            rubro_rows, total_general = build_rubro_display_rows(obj.datos)
 
         # B1 (#120) — contexto para los partials _cargar_bd_contable.html y
         # _mapeo_cta_rubro.html (lección Consof#23: la view DEBE pasar las vars).
         context['cargar_bd_form'] = kwargs.get('cargar_bd_form') or CargarBDContableForm()
         context['rubro_rows'] = rubro_rows
         context['rubro_total'] = total_general
-        bloque = (obj.datos or {}).get('finv2_bd') or {}
         context['cuentas_count'] = bloque.get('cuentas_count', 0)
         context['cuentas_no_mapeadas'] = bloque.get('cuentas_no_mapeadas', [])
-        context['tiene_datos_bd'] = bool(bloque.get('rubros'))
+        context['tiene_datos_bd'] = con_hechos or bool(bloque.get('rubros'))
         context['mapeos'] = MapeoCtaRubro.objects.all()
         context['mapeo_form'] = MapeoCtaRubroForm()
         context['active_tab'] = self.request.GET.get('tab', 'cargar')
 
         # A2 (#120) — vista bi-modal: matriz 12 meses (julio→junio) + filtro mes.
-        context.update(self._build_bimodal_context(obj.datos))
+        context.update(self._build_bimodal_context(obj, con_hechos))
         return context
 
     # ------------------------------------------------------------------ #
     # A2 (#120) — contexto bi-modal (matriz / filtro mes)
     # ------------------------------------------------------------------ #
-    def _build_bimodal_context(self, datos):
+    def _build_bimodal_context(self, obj, con_hechos):
         """Arma el contexto compartido por el partial _presupuesto_bimodal_tabla.
 
         Lee ``?vista=`` (matriz|mes, default matriz) y ``?mes=`` (key fiscal).
         Devuelve un dict consumido por el partial — mismo contrato que usa
-        Construcción (A3), para no divergir.
+        Construcción (A3), para no divergir. Con ``con_hechos`` la matriz y
+        el filtro salen de ``HechoContable``; si no, de ``obj.datos``.
         """
         vista = self.request.GET.get('vista', 'matriz')
         if vista not in ('matriz', 'mes'):
             vista = 'matriz'
 
-        matrix_rows, totales_columna, meses_fiscales, total_general = (
-            build_rubro_matrix_rows(datos)
-        )
+        if con_hechos:
+            matrix_rows, totales_columna, meses_fiscales, total_general = (
+                hechos_rubro_matrix_rows(obj)
+            )
+        else:
+            matrix_rows, totales_columna, meses_fiscales, total_general = (
+                build_rubro_matrix_rows(obj.datos)
+            )
 
         # Filtro mes: validar contra las keys fiscales; default = primer mes.
         mes_sel = self.request.GET.get('mes') or MESES_FISCALES_KEYS[0]
         if mes_sel not in MESES_FISCALES_KEYS:
             mes_sel = MESES_FISCALES_KEYS[0]
-        mes_rows, mes_total, mes_label = build_mes_filter_rows(datos, mes_sel)
+        if con_hechos:
+            mes_rows, mes_total, mes_label = hechos_mes_filter_rows(obj, mes_sel)
+        else:
+            mes_rows, mes_total, mes_label = build_mes_filter_rows(obj.datos, mes_sel)
 
         # Querystring base (sin vista/mes) para los enlaces del toggle + hidden
         # params del form de filtro (preserva anio/tab/contrato al navegar).
@@ -149,12 +170,15 @@ class PresupuestoPlaneadoViewV2(PresupuestoDetalladoBaseView):
                 )
             return redirect(f'{request.path}?anio={anio}&tab=cargar')
 
-        # Guardar en PresupuestoDetallado.datos (preservando otras llaves).
-        obj, _ = self._get_or_create_presupuesto(anio, contrato)
-        datos = obj.datos or {}
-        datos['finv2_bd'] = resultado['datos']['finv2_bd']
-        obj.datos = datos
-        obj.save(update_fields=['datos', 'updated_at'])
+        # Guardar en PresupuestoDetallado.datos (preservando otras llaves)
+        # y reemplazar sus hechos contables en la misma transacción.
+        with transaction.atomic():
+            obj, _ = self._get_or_create_presupuesto(anio, contrato)
+            datos = obj.datos or {}
+            datos['finv2_bd'] = resultado['datos']['finv2_bd']
+            obj.datos = datos
+            obj.save(update_fields=['datos', 'updated_at'])
+            guardar_hechos(obj, resultado['hechos'])
 
         messages.success(request, resultado['mensaje'])
         for w in resultado.get('warnings', []):
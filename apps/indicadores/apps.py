@@ -5,3 +5,6 @@ class IndicadoresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.indicadores'
     verbose_name = 'Indicadores y ANS'
+
+    def ready(self):
+        from . import signals  # noqa: F401
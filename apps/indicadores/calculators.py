@@ -248,44 +248,12 @@ def calcular_indice_global(linea_id, anio, mes):
 
 
 def calcular_todos_indicadores(linea_id, anio, mes):
-    """Calculate and save all indicators for a period."""
-    from .models import Indicador, MedicionIndicador
+    """Calculate and save all indicators for a period.
 
-    calculadores = {
-        'GESTION': calcular_gestion_mantenimiento,
-        'EJECUCION': calcular_ejecucion_mantenimiento,
-        'AMBIENTAL': calcular_gestion_ambiental,
-        'CALIDAD': calcular_calidad_informacion,
-        'SEGURIDAD': calcular_seguridad_industrial,
-        'CRONOGRAMA': calcular_cumplimiento_cronograma,
-    }
+    Delegates to the set-based engine (``calculators_lote``) so a single line
+    also avoids the per-activity ``registros_campo.first()`` N+1.
+    """
+    from .calculators_lote import calcular_todos_indicadores_lote
 
-    resultados = []
-
-    for indicador in Indicador.objects.filter(activo=True):
-        calculador = calculadores.get(indicador.categoria)
-
-        if calculador:
-            numerador, denominador, valor = calculador(linea_id, anio, mes)
-
-            medicion, created = MedicionIndicador.objects.update_or_create(
-                indicador=indicador,
-                linea_id=linea_id,
-                anio=anio,
-                mes=mes,
-                defaults={
-                    'valor_numerador': numerador,
-                    'valor_denominador': denominador,
-                    'valor_calculado': valor,
-                    'cumple_meta': valor >= indicador.meta,
-                    'en_alerta': valor < indicador.umbral_alerta,
-                }
-            )
-
-            resultados.append({
-                'indicador': indicador.codigo,
-                'valor': float(valor),
-                'cumple': medicion.cumple_meta,
-            })
-
-    return resultados
+    resumen = calcular_todos_indicadores_lote([linea_id], anio, mes)
+    return next(iter(resumen.values()), [])
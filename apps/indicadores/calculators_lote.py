@@ -0,0 +1,264 @@
+"""
+Motor por lotes de los 6 indicadores de ``calculators`` para TODAS las líneas
+de un periodo.
+
+``calculators`` calcula línea por línea con ``count()`` separados y un
+``registros_campo.first()`` por actividad (N+1); la tarea mensual lo repite
+por cada ``Linea`` activa. Acá cada categoría sale de un agregado
+``GROUP BY linea_id`` sobre el periodo completo:
+
+- 1 query sobre ``Actividad`` -> GESTION, EJECUCION y CRONOGRAMA (el "primer"
+  registro de campo de cada actividad entra como subquery correlacionada).
+- 1 query sobre ``RegistroCampo`` -> CALIDAD (evidencias por ``Exists``).
+- 1 query sobre ``RegistroCampo`` (solo filas con la clave
+  ``accidente_reportado``) -> SEGURIDAD.
+- 1 query sobre ``InformeAmbiental`` -> AMBIENTAL.
+
+y ``guardar_mediciones_lote`` persiste todo con un único ``bulk_create``
+con ``update_conflicts`` (upsert sobre ``unique_together``).
+
+Los resultados son idénticos a las funciones por línea (mismas fórmulas,
+mismos ``(numerador, denominador, valor)``); las fechas de registros se
+comparan en UTC, igual que ``datetime.date()`` sobre los valores que
+devuelve el ORM.
+"""
+from __future__ import annotations
+
+import calendar
+import datetime as dt
+from decimal import Decimal
+from uuid import UUID
+
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import TruncDate
+
+CATEGORIAS = ('GESTION', 'EJECUCION', 'AMBIENTAL', 'CALIDAD', 'SEGURIDAD', 'CRONOGRAMA')
+
+_CERO = (Decimal('0'), Decimal('0'), Decimal('0'))
+
+
+def _ratio(numerador, denominador):
+    """``(num, den, num/den*100)`` con el mismo manejo de 0 que ``calculators``."""
+    if not denominador:
+        return _CERO
+    numerador, denominador = Decimal(numerador), Decimal(denominador)
+    return numerador, denominador, (numerador / denominador) * 100
+
+
+def _agregados_actividades(linea_ids, anio, mes):
+    """GESTION / EJECUCION / CRONOGRAMA en un solo GROUP BY linea_id."""
+    from apps.actividades.models import Actividad
+    from apps.campo.models import RegistroCampo
+
+    # `act.registros_campo.first()` respeta Meta.ordering ('-fecha_inicio').
+    primer_registro = RegistroCampo.objects.filter(
+        actividad=OuterRef('pk')
+    ).order_by('-fecha_inicio')
+
+    filas = (
+        Actividad.objects
+        .filter(linea_id__in=linea_ids, fecha_programada__year=anio, fecha_programada__month=mes)
+        .annotate(
+            _inicio=TruncDate(
+                Subquery(primer_registro.values('fecha_inicio')[:1]), tzinfo=dt.timezone.utc
+            ),
+            _fin=TruncDate(
+                Subquery(primer_registro.values('fecha_fin')[:1]), tzinfo=dt.timezone.utc
+            ),
+        )
+        .order_by()
+        .values('linea_id')
+        .annotate(
+            total=Count('id'),
+            completadas=Count('id', filter=Q(estado='COMPLETADA')),
+            completadas_a_tiempo=Count('id', filter=Q(
+                estado='COMPLETADA', _fin__isnull=False, _fin__lte=F('fecha_programada'),
+            )),
+            no_canceladas=Count('id', filter=~Q(estado='CANCELADA')),
+            iniciadas_a_tiempo=Count('id', filter=Q(
+                _inicio__isnull=False, _inicio__lte=F('fecha_programada'),
+            ) & ~Q(estado='CANCELADA')),
+        )
+    )
+    return {f['linea_id']: f for f in filas}
+
+
+def _agregados_calidad(linea_ids, anio, mes):
+    """CALIDAD: registros sincronizados con evidencias completas y formulario."""
+    from apps.campo.models import Evidencia, RegistroCampo
+
+    def _tiene(tipo):
+        return Exists(Evidencia.objects.filter(registro_campo=OuterRef('pk'), tipo=tipo))
+
+    completo = (
+        (Q(actividad__tipo_actividad__requiere_fotos_antes=False) | _tiene('ANTES'))
+        & (Q(actividad__tipo_actividad__requiere_fotos_durante=False) | _tiene('DURANTE'))
+        & (Q(actividad__tipo_actividad__requiere_fotos_despues=False) | _tiene('DESPUES'))
+        & Q(datos_formulario__isnull=False)
+        & ~Q(datos_formulario={})
+    )
+    filas = (
+        RegistroCampo.objects
+        .filter(
+            actividad__linea_id__in=linea_ids,
+            fecha_inicio__year=anio,
+            fecha_inicio__month=mes,
+            sincronizado=True,
+        )
+        .order_by()
+        .values('actividad__linea_id')
+        .annotate(total=Count('id'), completos=Count('id', filter=completo))
+    )
+    return {f['actividad__linea_id']: f for f in filas}
+
+
+def _accidentes_por_linea(linea_ids, anio, mes):
+    """SEGURIDAD: registros con ``accidente_reportado`` verdadero, por línea.
+
+    Solo viajan las filas que tienen la clave; la veracidad se evalúa en
+    Python para conservar la semántica de ``dict.get(..., False)``.
+    """
+    from apps.campo.models import RegistroCampo
+
+    filas = RegistroCampo.objects.filter(
+        actividad__linea_id__in=linea_ids,
+        fecha_inicio__year=anio,
+        fecha_inicio__month=mes,
+        datos_formulario__has_key='accidente_reportado',
+    ).order_by().values_list('actividad__linea_id', 'datos_formulario__accidente_reportado')
+
+    accidentes = {}
+    for linea_id, reportado in filas:
+        if reportado:
+            accidentes[linea_id] = accidentes.get(linea_id, 0) + 1
+    return accidentes
+
+
+def _informes_ambientales(linea_ids, anio, mes):
+    """AMBIENTAL: ``{linea_id: a_tiempo}`` para las líneas con informe del periodo."""
+    from apps.ambiental.models import InformeAmbiental
+
+    # Due date: 10th of following month (mismo criterio que calculators)
+    if mes == 12:
+        fecha_limite = dt.date(anio + 1, 1, 10)
+    else:
+        fecha_limite = dt.date(anio, mes + 1, 10)
+
+    filas = InformeAmbiental.objects.filter(
+        linea_id__in=linea_ids, periodo_anio=anio, periodo_mes=mes,
+    ).values_list('linea_id', 'fecha_envio')
+    return {
+        linea_id: bool(fecha_envio and fecha_envio.date() <= fecha_limite)
+        for linea_id, fecha_envio in filas
+    }
+
+
+def _dias_laborables(anio, mes):
+    cal = calendar.Calendar()
+    return sum(
+        1 for d in cal.itermonthdays2(anio, mes)
+        if d[0] != 0 and d[1] < 5  # weekdays only
+    )
+
+
+def calcular_indicadores_lote(linea_ids, anio, mes):
+    """
+    Calcula las 6 categorías para todas las líneas en un número fijo de queries.
+
+    Returns:
+        ``{linea_id: {categoria: (numerador, denominador, valor)}}`` con una
+        entrada por cada id de ``linea_ids`` (ceros si no hay datos).
+    """
+    linea_ids = [UUID(str(linea_id)) for linea_id in linea_ids]
+    if not linea_ids:
+        return {}
+
+    actividades = _agregados_actividades(linea_ids, anio, mes)
+    calidad = _agregados_calidad(linea_ids, anio, mes)
+    accidentes = _accidentes_por_linea(linea_ids, anio, mes)
+    informes = _informes_ambientales(linea_ids, anio, mes)
+    dias_laborables = _dias_laborables(anio, mes)
+
+    resultados = {}
+    for linea_id in linea_ids:
+        act = actividades.get(linea_id, {})
+        cal = calidad.get(linea_id, {})
+
+        a_tiempo = 1 if informes.get(linea_id) else 0
+        ambiental = (
+            Decimal(a_tiempo), Decimal('1'), Decimal('100') if a_tiempo else Decimal('0')
+        )
+
+        resultados[linea_id] = {
+            'GESTION': _ratio(act.get('completadas', 0), act.get('total', 0)),
+            'EJECUCION': _ratio(act.get('completadas_a_tiempo', 0), act.get('completadas', 0)),
+            'AMBIENTAL': ambiental,
+            'CALIDAD': _ratio(cal.get('completos', 0), cal.get('total', 0)),
+            'SEGURIDAD': _ratio(
+                dias_laborables - accidentes.get(linea_id, 0), dias_laborables
+            ),
+            'CRONOGRAMA': _ratio(act.get('iniciadas_a_tiempo', 0), act.get('no_canceladas', 0)),
+        }
+    return resultados
+
+
+def guardar_mediciones_lote(resultados, anio, mes):
+    """
+    Upsert de ``MedicionIndicador`` para todos los indicadores activos y líneas.
+
+    Un solo ``bulk_create(update_conflicts=True)`` sobre
+    ``(indicador, linea, anio, mes)``. Retorna ``{linea_id: [resumen]}`` con
+    la misma forma que ``calculators.calcular_todos_indicadores``.
+    """
+    from django.db import transaction
+
+    from .models import Indicador, MedicionIndicador
+    from .snapshots import invalidar_dashboard
+
+    indicadores = [
+        i for i in Indicador.objects.filter(activo=True) if i.categoria in CATEGORIAS
+    ]
+
+    mediciones = []
+    resumen = {linea_id: [] for linea_id in resultados}
+    for linea_id, por_categoria in resultados.items():
+        for indicador in indicadores:
+            numerador, denominador, valor = por_categoria[indicador.categoria]
+            cumple = valor >= indicador.meta
+            mediciones.append(MedicionIndicador(
+                indicador=indicador,
+                linea_id=linea_id,
+                anio=anio,
+                mes=mes,
+                valor_numerador=numerador,
+                valor_denominador=denominador,
+                valor_calculado=valor,
+                cumple_meta=cumple,
+                en_alerta=valor < indicador.umbral_alerta,
+            ))
+            resumen[linea_id].append({
+                'indicador': indicador.codigo,
+                'valor': float(valor),
+                'cumple': cumple,
+            })
+
+    if mediciones:
+        MedicionIndicador.objects.bulk_create(
+            mediciones,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['indicador', 'linea', 'anio', 'mes'],
+            update_fields=[
+                'valor_numerador', 'valor_denominador', 'valor_calculado',
+                'cumple_meta', 'en_alerta', 'updated_at',
+            ],
+        )
+        # bulk_create no dispara las señales del dashboard.
+        invalidar_dashboard()
+        transaction.on_commit(invalidar_dashboard)
+    return resumen
+
+
+def calcular_todos_indicadores_lote(linea_ids, anio, mes):
+    """Calcula y guarda todos los indicadores de todas las líneas de un periodo."""
+    return guardar_mediciones_lote(calcular_indicadores_lote(linea_ids, anio, mes), anio, mes)
@@ -0,0 +1,51 @@
+"""Invalidación de los snapshots del Dashboard de Indicadores (``snapshots.py``).
+
+Cualquier alta/edición/baja de las fuentes del dashboard incrementa la
+versión; una ``Actividad`` solo invalida los meses de su ``fecha_programada``
+(la actual y la previa, si se reprogramó). Se invalida en el momento y de
+nuevo tras el commit: si otra request armó el snapshot mientras la
+transacción seguía abierta, habría guardado los datos previos al cambio.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.actividades.models import Actividad
+from apps.financiero.models_base import PresupuestoDetallado
+
+from .models import IndicadorANSContractual, MedicionIndicador
+from .snapshots import invalidar_dashboard, invalidar_meses_dashboard
+
+
+@receiver(post_save, sender=MedicionIndicador, dispatch_uid='dashboard_medicion_save')
+@receiver(post_delete, sender=MedicionIndicador, dispatch_uid='dashboard_medicion_delete')
+@receiver(post_save, sender=PresupuestoDetallado, dispatch_uid='dashboard_presupuesto_save')
+@receiver(post_delete, sender=PresupuestoDetallado, dispatch_uid='dashboard_presupuesto_delete')
+@receiver(post_save, sender=IndicadorANSContractual, dispatch_uid='dashboard_ans_save')
+@receiver(post_delete, sender=IndicadorANSContractual, dispatch_uid='dashboard_ans_delete')
+def _invalidar_dashboard(sender, **kwargs):
+    invalidar_dashboard()
+    transaction.on_commit(invalidar_dashboard)
+
+
+@receiver(pre_save, sender=Actividad, dispatch_uid='dashboard_actividad_previa')
+def _capturar_fecha_previa(sender, instance, **kwargs):
+    """Guarda la ``fecha_programada`` en BD para que post_save invalide
+    también el mes de origen de una reprogramación."""
+    if instance._state.adding:
+        return
+    instance._previo_fecha_programada = (
+        Actividad.objects.filter(pk=instance.pk)
+        .values_list('fecha_programada', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Actividad, dispatch_uid='dashboard_actividad_save')
+@receiver(post_delete, sender=Actividad, dispatch_uid='dashboard_actividad_delete')
+def _invalidar_meses_actividad(sender, instance, **kwargs):
+    fechas = {instance.fecha_programada, getattr(instance, '_previo_fecha_programada', None)}
+    invalidar_meses_dashboard(fechas)
+    transaction.on_commit(partial(invalidar_meses_dashboard, fechas))
@@ -0,0 +1,295 @@
+"""
+Snapshots del Dashboard de Indicadores (``DashboardView``).
+
+Todo lo que el dashboard agrega (mediciones del mes, conteos de
+actividades, tendencia de 6 meses, por cuadrilla/tipo/prioridad y los KPIs
+técnico-financieros + ANS de ``contexto_indicadores_finv2``) se arma una
+vez por ``(anio, mes, mes_kpi, contrato, linea)`` y se guarda en la cache
+compartida como datos planos. La vista y los parciales HTMX de los gráficos
+solo leen el snapshot; cambiar de mes en el dashboard es una lectura de
+cache.
+
+Invalidación por VERSIÓN (mismo esquema que ``apps.core.cache``): las
+señales de ``MedicionIndicador``, ``Actividad``, ``PresupuestoDetallado`` e
+``IndicadorANSContractual`` (indicadores/signals.py) y las escrituras
+masivas que no disparan señales (cálculo mensual de KPIs, importadores,
+sync de campo) incrementan la versión. Una ``Actividad`` sola no toca la
+versión global: marca la versión de su mes (``invalidar_meses_dashboard``)
+y el snapshot de cada mes lleva en la clave las versiones de los 6 meses de
+su tendencia, así que solo se rearman los meses donde aparece.
+``precalcular_snapshots`` (tarea
+``precalcular_dashboard``) deja armadas las combinaciones que más se piden
+para que la primera visita tras un cambio tampoco espere.
+"""
+import logging
+import time
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import TruncMonth
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_TIMEOUT = 3600  # 1 hora
+CACHE_KEY_DASHBOARD_VERSION = 'instelec:indicadores:dashboard:version'
+CACHE_KEY_DASHBOARD_VERSION_MES = 'instelec:indicadores:dashboard:version:{anio}-{mes}'
+CACHE_KEY_DASHBOARD = (
+    'instelec:indicadores:dashboard:v{version}.{meses}:{anio}:{mes}:{mes_kpi}:{contrato}:{linea}'
+)
+
+MESES_CORTOS = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
+
+
+def _version():
+    version = cache.get(CACHE_KEY_DASHBOARD_VERSION)
+    if version is None:
+        cache.add(CACHE_KEY_DASHBOARD_VERSION, int(time.time() * 1000), None)
+        version = cache.get(CACHE_KEY_DASHBOARD_VERSION)
+    return version
+
+
+def invalidar_dashboard():
+    """Invalida todos los snapshots del dashboard (nueva versión)."""
+    try:
+        cache.incr(CACHE_KEY_DASHBOARD_VERSION)
+    except ValueError:
+        # Versión desalojada: la próxima lectura arranca una nueva.
+        pass
+
+
+def invalidar_meses_dashboard(fechas):
+    """Invalida solo los snapshots cuyos datos de actividades incluyen el mes
+    de alguna de ``fechas`` (el mes mismo y los 5 siguientes, por la
+    tendencia). Las fechas ``None`` se ignoran."""
+    marca = time.time_ns()
+    claves = {
+        CACHE_KEY_DASHBOARD_VERSION_MES.format(anio=fecha.year, mes=fecha.month): marca
+        for fecha in fechas if fecha is not None
+    }
+    if claves:
+        cache.set_many(claves, None)
+
+
+def _versiones_meses(anio, mes):
+    claves = [
+        CACHE_KEY_DASHBOARD_VERSION_MES.format(anio=a, mes=m)
+        for a, m in _meses_tendencia(anio, mes)
+    ]
+    versiones = cache.get_many(claves)
+    return '-'.join(str(versiones.get(clave, 0)) for clave in claves)
+
+
+def _clave(anio, mes, mes_kpi, contrato_id, linea_id):
+    return CACHE_KEY_DASHBOARD.format(
+        version=_version(), meses=_versiones_meses(anio, mes), anio=anio, mes=mes,
+        mes_kpi=mes_kpi, contrato=contrato_id or '-', linea=linea_id or '-',
+    )
+
+
+def _meses_tendencia(anio, mes):
+    """(anio, mes) de los 6 meses que terminan en ``mes``, del más viejo al actual."""
+    meses = []
+    for i in range(5, -1, -1):
+        m, a = mes - i, anio
+        if m <= 0:
+            m += 12
+            a -= 1
+        meses.append((a, m))
+    return meses
+
+
+def _mediciones(anio, mes):
+    from .models import MedicionIndicador
+
+    mediciones = MedicionIndicador.objects.filter(anio=anio, mes=mes)
+    resumen = mediciones.aggregate(
+        promedio=Avg('valor_calculado'),
+        en_alerta=Count('id', filter=Q(en_alerta=True)),
+        cumplen_meta=Count('id', filter=Q(cumple_meta=True)),
+    )
+    return {
+        'promedio_cumplimiento': resumen['promedio'] or 0,
+        'en_alerta': resumen['en_alerta'],
+        'cumplen_meta': resumen['cumplen_meta'],
+        'indicadores_data': [
+            {'nombre': nombre, 'valor': float(valor), 'meta': float(meta)}
+            for nombre, valor, meta in mediciones.values_list(
+                'indicador__nombre', 'valor_calculado', 'indicador__meta',
+            )
+        ],
+    }
+
+
+def _actividades(anio, mes):
+    from apps.actividades.models import Actividad, TipoActividad
+    from apps.cuadrillas.models import Cuadrilla
+
+    actividades = Actividad.objects.filter(fecha_programada__year=anio, fecha_programada__month=mes)
+    E, P = Actividad.Estado, Actividad.Prioridad
+    conteos = actividades.aggregate(
+        total=Count('id'),
+        completadas=Count('id', filter=Q(estado=E.COMPLETADA)),
+        en_curso=Count('id', filter=Q(estado=E.EN_CURSO)),
+        pendientes=Count('id', filter=Q(estado__in=[E.PENDIENTE, E.PROGRAMADA, E.REPROGRAMADA])),
+        canceladas=Count('id', filter=Q(estado=E.CANCELADA)),
+        urgente=Count('id', filter=Q(prioridad=P.URGENTE)),
+        alta=Count('id', filter=Q(prioridad=P.ALTA)),
+        normal=Count('id', filter=Q(prioridad=P.NORMAL)),
+        baja=Count('id', filter=Q(prioridad=P.BAJA)),
+    )
+    total, completadas = conteos['total'], conteos['completadas']
+    cumplimiento = (completadas / total * 100) if total > 0 else 0
+
+    # Cumplimiento por cuadrilla (las 10 primeras activas): un GROUP BY.
+    cuadrillas = list(Cuadrilla.objects.filter(activa=True).values_list('id', 'codigo')[:10])
+    por_cuadrilla = {
+        fila['cuadrilla']: fila
+        for fila in actividades.filter(cuadrilla__in=[c[0] for c in cuadrillas])
+        .values('cuadrilla')
+        .annotate(total=Count('id'), completadas=Count('id', filter=Q(estado=E.COMPLETADA)))
+        .order_by()
+    }
+    cuadrillas_data = []
+    for cuadrilla_id, _ in cuadrillas:
+        fila = por_cuadrilla.get(cuadrilla_id)
+        pct = (fila['completadas'] / fila['total'] * 100) if fila and fila['total'] else 0
+        cuadrillas_data.append(round(pct, 1))
+
+    # Tendencia de los últimos 6 meses: un GROUP BY mes.
+    meses = _meses_tendencia(anio, mes)
+    (a0, m0), (a1, m1) = meses[0], meses[-1]
+    por_mes = {
+        (fila['periodo'].year, fila['periodo'].month): fila
+        for fila in Actividad.objects.filter(
+            fecha_programada__gte=date(a0, m0, 1),
+            fecha_programada__lt=date(a1 + m1 // 12, m1 % 12 + 1, 1),
+        )
+        .annotate(periodo=TruncMonth('fecha_programada'))
+        .values('periodo')
+        .annotate(total=Count('id'), completadas=Count('id', filter=Q(estado=E.COMPLETADA)))
+        .order_by()
+    }
+
+    # Por tipo de actividad (los 8 primeros activos, solo los que tienen).
+    tipos = list(TipoActividad.objects.filter(activo=True).values_list('id', 'nombre')[:8])
+    por_tipo = dict(
+        actividades.filter(tipo_actividad__in=[t[0] for t in tipos])
+        .values('tipo_actividad')
+        .annotate(n=Count('id'))
+        .order_by()
+        .values_list('tipo_actividad', 'n')
+    )
+
+    return {
+        'kpis': {
+            'cumplimiento': cumplimiento,
+            'actividades_completadas': completadas,
+            'actividades_programadas': total,
+            'dias_sin_accidentes': 45,  # Placeholder - should come from safety model
+            'record_dias_sin_accidentes': 120,
+            'informes_tiempo': 92.5,  # Placeholder
+        },
+        'actividades_stats': {
+            'total': total,
+            'completadas': completadas,
+            'en_curso': conteos['en_curso'],
+            'pendientes': conteos['pendientes'],
+            'canceladas': conteos['canceladas'],
+            'pct_completadas': round(cumplimiento),
+        },
+        'prioridad_data': {
+            'urgente': conteos['urgente'],
+            'alta': conteos['alta'],
+            'normal': conteos['normal'],
+            'baja': conteos['baja'],
+        },
+        'cuadrillas_labels': [codigo for _, codigo in cuadrillas],
+        'cuadrillas_data': cuadrillas_data,
+        'meses_labels': [MESES_CORTOS[m - 1] for _, m in meses],
+        'planeado_data': [por_mes.get(periodo, {}).get('total', 0) for periodo in meses],
+        'ejecutado_data': [por_mes.get(periodo, {}).get('completadas', 0) for periodo in meses],
+        'tipo_data': [
+            {'value': por_tipo[tipo_id], 'name': nombre}
+            for tipo_id, nombre in tipos if por_tipo.get(tipo_id)
+        ],
+    }
+
+
+def construir_snapshot(anio, mes, mes_kpi, contrato_id=None, linea_id=None):
+    """Arma el snapshot (sin cache).
+
+    Returns:
+        dict de datos planos; ``completo`` es False si el cálculo financiero
+        falló (el dashboard se muestra igual, pero no se cachea).
+    """
+    from apps.contratos.models import Contrato
+    from apps.financiero.models_base import PresupuestoDetallado
+    from apps.lineas.models import Linea
+
+    snapshot = {'completo': True}
+    snapshot.update(_mediciones(anio, mes))
+    snapshot.update(_actividades(anio, mes))
+    snapshot['anios_presupuesto'] = sorted(
+        PresupuestoDetallado.objects.values_list('anio', flat=True).distinct()
+    )
+
+    try:
+        from apps.financiero.indicadores_finv2 import contexto_indicadores_finv2
+
+        contrato = Contrato.objects.filter(pk=contrato_id).first() if contrato_id else None
+        linea = Linea.objects.filter(id=linea_id).first() if linea_id else None
+        snapshot.update(
+            contexto_indicadores_finv2(anio=anio, mes=mes_kpi, contrato=contrato, linea=linea)
+        )
+    except Exception:
+        # Nunca romper el dashboard de indicadores si el cálculo financiero falla.
+        logger.exception("Fallo el cálculo financiero del dashboard %s/%s", anio, mes_kpi)
+        snapshot['completo'] = False
+        snapshot.setdefault('indicadores_tecnico_financieros', [])
+        snapshot.setdefault('indicadores_ans', [])
+        snapshot.setdefault('resumen_ans', None)
+    return snapshot
+
+
+def obtener_snapshot(anio, mes, mes_kpi, contrato_id=None, linea_id=None):
+    """Snapshot desde la cache; si no está (o cambió la versión) lo arma."""
+    key = _clave(anio, mes, mes_kpi, contrato_id, linea_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = construir_snapshot(anio, mes, mes_kpi, contrato_id, linea_id)
+        if snapshot['completo']:
+            cache.set(key, snapshot, DASHBOARD_TIMEOUT)
+    return snapshot
+
+
+def combinaciones_frecuentes(hoy, contrato_ids=()):
+    """Lo que el dashboard pide sin filtros o cambiando de mes en el año actual.
+
+    - Vista nacional: entrada sin filtros (mes corriente, KPIs anuales) y
+      cada opción del select de mes (0 = todo el año).
+    - Por contrato: la entrada sin filtros.
+    """
+    anio, mes = hoy.year, hoy.month
+    combinaciones = [(anio, mes, 0, None, None)]
+    combinaciones += [(anio, m, m, None, None) for m in range(13)]
+    combinaciones += [(anio, mes, 0, contrato_id, None) for contrato_id in contrato_ids]
+    return combinaciones
+
+
+def precalcular_snapshots(combinaciones):
+    """Arma y cachea los snapshots que falten bajo la versión vigente.
+
+    Returns:
+        Cantidad de snapshots armados.
+    """
+    armados = 0
+    for anio, mes, mes_kpi, contrato_id, linea_id in combinaciones:
+        key = _clave(anio, mes, mes_kpi, contrato_id, linea_id)
+        if cache.get(key) is not None:
+            continue
+        snapshot = construir_snapshot(anio, mes, mes_kpi, contrato_id, linea_id)
+        if snapshot['completo']:
+            cache.set(key, snapshot, DASHBOARD_TIMEOUT)
+            armados += 1
+    return armados
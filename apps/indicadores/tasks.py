@@ -16,7 +16,7 @@ def calcular_indicadores_mensuales(self, linea_id=None, anio=None, mes=None):
     Runs automatically on the 5th of each month for the previous month.
     """
     from apps.lineas.models import Linea
-    from .calculators import calcular_todos_indicadores
+    from .calculators_lote import calcular_todos_indicadores_lote
 
     # Default to previous month
     if anio is None or mes is None:
@@ -34,16 +34,19 @@ def calcular_indicadores_mensuales(self, linea_id=None, anio=None, mes=None):
         else:
             lineas = Linea.objects.filter(activa=True)
 
-        resultados = []
-        for linea in lineas:
-            logger.info(f"Calculating KPIs for line {linea.codigo} - {anio}/{mes}")
-            resultado = calcular_todos_indicadores(linea.id, anio, mes)
-            resultados.append({
-                'linea': linea.codigo,
-                'indicadores': resultado
-            })
+        codigos = dict(lineas.values_list('id', 'codigo'))
+        logger.info(f"Calculating KPIs for {len(codigos)} lines - {anio}/{mes}")
+
+        # Un GROUP BY linea_id por categoría + un upsert para todas las líneas
+        por_linea = calcular_todos_indicadores_lote(codigos.keys(), anio, mes)
+        resultados = [
+            {'linea': codigos[id_linea], 'indicadores': indicadores}
+            for id_linea, indicadores in por_linea.items()
+        ]
 
         logger.info(f"Calculated KPIs for {len(resultados)} lines")
+        # The upsert invalidated the dashboard snapshots: rebuild the common ones.
+        precalcular_dashboard.delay()
         return resultados
 
     except DatabaseError as exc:
@@ -54,6 +57,22 @@ def calcular_indicadores_mensuales(self, linea_id=None, anio=None, mes=None):
         raise self.retry(exc=exc, countdown=60 * 5)
 
 
+@shared_task(ignore_result=True)
+def precalcular_dashboard():
+    """
+    Build the KPI dashboard snapshots users ask for most (national view for
+    every month of the current year, default view per active contract) that
+    are missing under the current cache version. Cheap when nothing changed.
+    """
+    from apps.contratos.models import Contrato
+    from .snapshots import combinaciones_frecuentes, precalcular_snapshots
+
+    contratos = Contrato.objects.filter(estado='ACTIVO').values_list('pk', flat=True)
+    armados = precalcular_snapshots(combinaciones_frecuentes(timezone.localdate(), contratos))
+    logger.info(f"Dashboard snapshots built: {armados}")
+    return armados
+
+
 @shared_task(bind=True)
 def calcular_indice_global_todas_lineas(self, anio=None, mes=None):
     """Calculate global performance index for all lines."""
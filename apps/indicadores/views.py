@@ -7,6 +7,7 @@ from datetime import timedelta
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.db.models import Count
 from django.db.models.functions import TruncMonth
 from django.http import HttpResponse
@@ -36,21 +37,19 @@ class DashboardView(LoginRequiredMixin, HTMXMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        import json
-
-        from django.db.models import Avg
-        from django.utils import timezone
-
         from apps.actividades.models import Actividad
         from apps.contratos.models import Contrato
-        from apps.cuadrillas.models import Cuadrilla
         from apps.lineas.models import Linea
 
+        from .snapshots import obtener_snapshot
+
         hoy = timezone.now()
         try:
             mes = int(self.request.GET.get("mes", hoy.month))
         except (ValueError, TypeError):
             mes = hoy.month
+        if not 0 <= mes <= 12:
+            mes = hoy.month
         try:
             anio = int(self.request.GET.get("anio", hoy.year))
         except (ValueError, TypeError):
@@ -62,45 +61,16 @@ class DashboardView(LoginRequiredMixin, HTMXMixin, TemplateView):
         mes_param = self.request.GET.get("mes")
 
         # Get all active indicators
-        indicadores = Indicador.objects.filter(activo=True)
-        context["indicadores"] = indicadores
+        context["indicadores"] = Indicador.objects.filter(activo=True)
 
         # Get measurements for current period
-        mediciones = MedicionIndicador.objects.filter(anio=anio, mes=mes).select_related(
+        context["mediciones"] = MedicionIndicador.objects.filter(anio=anio, mes=mes).select_related(
             "indicador", "linea"
         )
 
-        context["mediciones"] = mediciones
-
-        # Calculate summary
-        context["promedio_cumplimiento"] = (
-            mediciones.aggregate(promedio=Avg("valor_calculado"))["promedio"] or 0
-        )
-
-        context["en_alerta"] = mediciones.filter(en_alerta=True).count()
-        context["cumplen_meta"] = mediciones.filter(cumple_meta=True).count()
-
         context["mes"] = mes
         context["anio"] = anio
 
-        # Get activities for KPIs
-        actividades = Actividad.objects.filter(
-            fecha_programada__year=anio, fecha_programada__month=mes
-        )
-        total_actividades = actividades.count()
-        completadas = actividades.filter(estado="COMPLETADA").count()
-
-        # KPIs
-        cumplimiento = (completadas / total_actividades * 100) if total_actividades > 0 else 0
-        context["kpis"] = {
-            "cumplimiento": cumplimiento,
-            "actividades_completadas": completadas,
-            "actividades_programadas": total_actividades,
-            "dias_sin_accidentes": 45,  # Placeholder - should come from safety model
-            "record_dias_sin_accidentes": 120,
-            "informes_tiempo": 92.5,  # Placeholder
-        }
-
         # Period filters
         context["periodos"] = [
             {"value": "mes", "label": "Este mes"},
@@ -114,14 +84,6 @@ class DashboardView(LoginRequiredMixin, HTMXMixin, TemplateView):
         # Lines for filter
         context["lineas"] = Linea.objects.filter(activa=True)
 
-        # #167: filtros Año / Mes / Contrato sobre los KPIs técnico-financieros
-        # (paridad con /financiero/). Se exponen al template para pintar los
-        # selects; el cableado HTMX vive en dashboard.html.
-        from apps.financiero.models_base import PresupuestoDetallado
-
-        anios_db = list(PresupuestoDetallado.objects.values_list("anio", flat=True).distinct())
-        context["anios_disponibles"] = sorted(set(anios_db) | set(range(anio - 2, anio + 3)))
-
         meses_nombres = [
             "Enero",
             "Febrero",
@@ -151,88 +113,11 @@ class DashboardView(LoginRequiredMixin, HTMXMixin, TemplateView):
         context["unidades_negocio"] = Contrato.UnidadNegocio.choices
         context["unidad_filter"] = unidad_filter
 
-        # Cumplimiento por cuadrilla
-        cuadrillas = Cuadrilla.objects.filter(activa=True)
-        cuadrillas_labels = []
-        cuadrillas_data = []
-        for cuadrilla in cuadrillas[:10]:
-            cuadrillas_labels.append(cuadrilla.codigo)
-            acts = actividades.filter(cuadrilla=cuadrilla)
-            total = acts.count()
-            comp = acts.filter(estado="COMPLETADA").count()
-            pct = (comp / total * 100) if total > 0 else 0
-            cuadrillas_data.append(round(pct, 1))
-
-        context["cuadrillas_labels"] = json.dumps(cuadrillas_labels)
-        context["cuadrillas_data"] = json.dumps(cuadrillas_data)
-
-        # Tendencia mensual (últimos 6 meses)
-        meses_labels = []
-        planeado_data = []
-        ejecutado_data = []
-        meses_nombres = [
-            "Ene",
-            "Feb",
-            "Mar",
-            "Abr",
-            "May",
-            "Jun",
-            "Jul",
-            "Ago",
-            "Sep",
-            "Oct",
-            "Nov",
-            "Dic",
-        ]
-        for i in range(5, -1, -1):
-            m = mes - i
-            a = anio
-            if m <= 0:
-                m += 12
-                a -= 1
-            meses_labels.append(f"{meses_nombres[m - 1]}")
-            acts_mes = Actividad.objects.filter(fecha_programada__year=a, fecha_programada__month=m)
-            planeado_data.append(acts_mes.count())
-            ejecutado_data.append(acts_mes.filter(estado="COMPLETADA").count())
-
-        context["meses_labels"] = json.dumps(meses_labels)
-        context["planeado_data"] = json.dumps(planeado_data)
-        context["ejecutado_data"] = json.dumps(ejecutado_data)
-
-        # Por tipo de actividad
-        from apps.actividades.models import TipoActividad
-
-        tipos = TipoActividad.objects.filter(activo=True)
-        tipo_data = []
-        for tipo in tipos[:8]:
-            count = actividades.filter(tipo_actividad=tipo).count()
-            if count > 0:
-                tipo_data.append({"value": count, "name": tipo.nombre})
-        context["tipo_data"] = json.dumps(tipo_data)
-
-        # Por prioridad
-        context["prioridad_data"] = {
-            "urgente": actividades.filter(prioridad="URGENTE").count(),
-            "alta": actividades.filter(prioridad="ALTA").count(),
-            "normal": actividades.filter(prioridad="NORMAL").count(),
-            "baja": actividades.filter(prioridad="BAJA").count(),
-        }
-
         # Actividades recientes
         context["actividades_recientes"] = Actividad.objects.select_related("torre").order_by(
             "-updated_at"
         )[:5]
 
-        # Data for charts
-        context["indicadores_data"] = [
-            {
-                "nombre": m.indicador.nombre,
-                "valor": float(m.valor_calculado),
-                "meta": float(m.indicador.meta),
-            }
-            for m in mediciones
-        ]
-
         # #122 (rebote): los 6 KPIs técnico-financieros + ANS deben verse en ESTE
         # dashboard (el que usa el cliente), no solo en /financiero/. Reutilizamos
         # el cálculo del módulo financiero (misma fuente de verdad) filtrando por
@@ -261,32 +146,61 @@ class DashboardView(LoginRequiredMixin, HTMXMixin, TemplateView):
             # 'trimestre' explícito, o NINGÚN filtro temporal -> anual.
             mes_kpi = 0
         context["mes_kpi"] = mes_kpi
-        try:
-            from apps.financiero.indicadores_finv2 import contexto_indicadores_finv2
-
-            linea_sel = None
-            linea_id = self.request.GET.get("linea")
-            if linea_id:
-                linea_sel = Linea.objects.filter(id=linea_id).first()
-            contrato_sel = None
-            contrato_id = self.request.GET.get("contrato")
-            if contrato_id:
-                contrato_sel = Contrato.objects.filter(pk=contrato_id).first()
-            context["contrato_seleccionado"] = contrato_sel
-            context.update(
-                contexto_indicadores_finv2(
-                    anio=anio, mes=mes_kpi, contrato=contrato_sel, linea=linea_sel
+
+        linea_sel = _por_pk(Linea, self.request.GET.get("linea"))
+        contrato_sel = _por_pk(Contrato, self.request.GET.get("contrato"))
+        context["contrato_seleccionado"] = contrato_sel
+
+        # Agregados (KPIs, gráficos y técnico-financieros): snapshot cacheado
+        # por (anio, mes, mes_kpi, contrato, línea) -- ver snapshots.py.
+        snapshot = obtener_snapshot(
+            anio,
+            mes,
+            mes_kpi,
+            contrato_id=contrato_sel.pk if contrato_sel else None,
+            linea_id=linea_sel.pk if linea_sel else None,
+        )
+        context.update(
+            {
+                clave: snapshot[clave]
+                for clave in (
+                    "promedio_cumplimiento",
+                    "en_alerta",
+                    "cumplen_meta",
+                    "indicadores_data",
+                    "kpis",
+                    "actividades_stats",
+                    "prioridad_data",
+                    "indicadores_tecnico_financieros",
+                    "resumen_ans",
+                    "indicadores_ans",
                 )
-            )
-        except Exception:
-            # Nunca romper el dashboard de indicadores si el cálculo financiero falla.
-            context.setdefault("indicadores_tecnico_financieros", [])
-            context.setdefault("indicadores_ans", [])
-            context.setdefault("resumen_ans", None)
+            }
+        )
+        for clave in ("cuadrillas_labels", "cuadrillas_data", "meses_labels", "planeado_data",
+                      "ejecutado_data", "tipo_data"):
+            context[clave] = json.dumps(snapshot[clave])
+
+        # #167: filtros Año / Mes / Contrato sobre los KPIs técnico-financieros
+        # (paridad con /financiero/). Se exponen al template para pintar los
+        # selects; el cableado HTMX vive en dashboard.html.
+        context["anios_disponibles"] = sorted(
+            set(snapshot["anios_presupuesto"]) | set(range(anio - 2, anio + 3))
+        )
 
         return context
 
 
+def _por_pk(modelo, pk):
+    """Instancia de ``modelo`` con esa pk, o None (vacía, inexistente o mal formada)."""
+    if not pk:
+        return None
+    try:
+        return modelo.objects.filter(pk=pk).first()
+    except (ValueError, ValidationError):
+        return None
+
+
 class IndicadorDetailView(LoginRequiredMixin, DetailView):
     """Indicator detail with history."""
 
@@ -6,7 +6,8 @@ from uuid import UUID
 from decimal import Decimal
 
 from ninja import Router, Schema
-from django.http import HttpRequest
+from ninja.errors import HttpError
+from django.http import HttpRequest, HttpResponse
 
 from apps.api.auth import OptionalJWTAuth
 from .models import Linea, Torre, PoligonoServidumbre
@@ -71,6 +72,61 @@ class ValidarUbicacionOut(Schema):
     mensaje: str
 
 
+class ValidarUbicacionLoteIn(Schema):
+    puntos: list[ValidarUbicacionIn]
+
+
+class ValidarUbicacionPuntoOut(Schema):
+    torre_id: UUID
+    encontrada: bool
+    dentro_poligono: bool
+    torre_numero: Optional[str]
+    linea_codigo: Optional[str]
+    mensaje: str
+
+
+class ValidarUbicacionLoteOut(Schema):
+    total: int
+    fuera_poligono: int
+    resultados: list[ValidarUbicacionPuntoOut]
+
+
+# Tope de puntos por lote (una jornada offline son unos cientos).
+MAX_PUNTOS_LOTE = 2000
+
+MENSAJE_SIN_POLIGONO = 'No hay polígono de servidumbre definido. Ubicación aceptada.'
+MENSAJE_DENTRO = 'Ubicación dentro del área de servidumbre autorizada.'
+MENSAJE_FUERA = 'ADVERTENCIA: Ubicación fuera del área de servidumbre.'
+
+
+def _poligonos_por_torre(torre_ids) -> dict[UUID, list]:
+    """Geometrías preparadas de servidumbre por torre, en UNA query.
+
+    ``geometria.prepared`` indexa el polígono la primera vez; los siguientes
+    ``contains`` contra el mismo polígono son mucho más baratos que el
+    ``contains`` plano de GEOS.
+    """
+    poligonos: dict[UUID, list] = {}
+    for torre_id, geometria in PoligonoServidumbre.objects.filter(
+        torre_id__in=torre_ids,
+    ).values_list('torre_id', 'geometria'):
+        poligonos.setdefault(torre_id, []).append(geometria.prepared)
+    return poligonos
+
+
+def _validar_punto(preparados: list, latitud, longitud) -> tuple[bool, str]:
+    """(dentro, mensaje) de un punto contra las servidumbres de su torre."""
+    from django.contrib.gis.geos import Point
+
+    if not preparados:
+        # No polygon defined - allow but warn
+        return True, MENSAJE_SIN_POLIGONO
+    punto = Point(float(longitud), float(latitud), srid=4326)
+    if any(preparado.contains(punto) for preparado in preparados):
+        return True, MENSAJE_DENTRO
+    return False, MENSAJE_FUERA
+
+
 @router.get('/lineas', response=list[LineaOut])
 def listar_lineas(
     request: HttpRequest,
@@ -293,57 +349,88 @@ def torres_geojson(
     - `unidad_negocio`: 'MANTENIMIENTO' o 'CONSTRUCCION' (vía contrato de la línea).
       Si no se especifica, lee la sesión.
     """
-    from apps.core.utils import get_unidad_negocio
-
-    qs = Torre.objects.select_related('linea').filter(
-        latitud__isnull=False, longitud__isnull=False,
-    )
-
-    if linea_id:
-        qs = qs.filter(linea_id=linea_id)
+    from django.contrib.gis.geos import Polygon
 
-    if tension_kv:
-        qs = qs.filter(linea__tension_kv=tension_kv)
+    from apps.core.utils import get_unidad_negocio
 
-    if inspection_status:
-        qs = qs.filter(inspection_status=inspection_status)
+    from .tiles import feature_torre, torres_filtradas
 
-    unidad = (unidad_negocio or get_unidad_negocio(request)).upper()
-    if unidad in ('MANTENIMIENTO', 'CONSTRUCCION'):
-        qs = qs.filter(linea__contrato__unidad_negocio=unidad)
+    qs = torres_filtradas(
+        linea_id=linea_id,
+        tension_kv=tension_kv,
+        inspection_status=inspection_status,
+        unidad_negocio=(unidad_negocio or get_unidad_negocio(request)).upper(),
+    ).select_related('linea')
 
     if bbox:
         try:
-            lon_min, lat_min, lon_max, lat_max = (float(x) for x in bbox.split(','))
-            qs = qs.filter(
-                latitud__gte=lat_min, latitud__lte=lat_max,
-                longitud__gte=lon_min, longitud__lte=lon_max,
-            )
+            envelope = Polygon.from_bbox(tuple(float(x) for x in bbox.split(',')))
+            envelope.srid = 4326
+            # `geometria && bbox` usa el índice GiST; las columnas decimales no.
+            qs = qs.filter(geometria__bboxoverlaps=envelope)
         except (TypeError, ValueError):
             pass
 
-    features = []
-    for t in qs[:limite]:
-        features.append({
-            'type': 'Feature',
-            'geometry': {'type': 'Point', 'coordinates': [float(t.longitud), float(t.latitud)]},
-            'properties': {
-                'id': str(t.id),
-                # #100: etiqueta normalizada T-{n} para el popup del mapa (web).
-                # El identificador sigue siendo `id`.
-                'numero': t.numero_display,
-                'tipo': t.tipo,
-                'estado': t.estado,
-                'inspection_status': t.inspection_status,
-                'linea_id': str(t.linea_id),
-                'linea_codigo': t.linea.codigo,
-                'tension_kv': t.linea.tension_kv,
-            },
-        })
-
+    features = [feature_torre(t) for t in qs[:limite]]
     return {'type': 'FeatureCollection', 'features': features}
 
 
+def _filtros_tesela(request, linea_id, tension_kv, inspection_status, unidad_negocio):
+    from apps.core.utils import get_unidad_negocio
+
+    return {
+        'linea_id': linea_id,
+        'tension_kv': tension_kv,
+        'inspection_status': inspection_status,
+        'unidad_negocio': (unidad_negocio or get_unidad_negocio(request)).upper(),
+    }
+
+
+@router.get('/torres/clusters/{z}/{x}/{y}')
+def torres_clusters(
+    request: HttpRequest,
+    z: int,
+    x: int,
+    y: int,
+    tension_kv: Optional[int] = None,
+    inspection_status: Optional[str] = None,
+    unidad_negocio: Optional[str] = None,
+    linea_id: Optional[UUID] = None,
+) -> dict[str, Any]:
+    """Torres de una tesela XYZ para el mapa: clusters con conteo por debajo
+    de ``tiles.ZOOM_DETALLE`` y torres individuales desde ahí (mismas
+    propiedades que ``/torres/geojson``). Cacheado por tesela."""
+    from .tiles import TeselaInvalida, clusters_geojson
+
+    filtros = _filtros_tesela(request, linea_id, tension_kv, inspection_status, unidad_negocio)
+    try:
+        return clusters_geojson(z, x, y, **filtros)
+    except TeselaInvalida as e:
+        raise HttpError(400, str(e))
+
+
+@router.get('/torres/tiles/{z}/{x}/{y}.mvt')
+def torres_tile_mvt(
+    request: HttpRequest,
+    z: int,
+    x: int,
+    y: int,
+    tension_kv: Optional[int] = None,
+    inspection_status: Optional[str] = None,
+    unidad_negocio: Optional[str] = None,
+    linea_id: Optional[UUID] = None,
+) -> HttpResponse:
+    """Mapbox Vector Tile (capa ``torres``) para clientes vectoriales."""
+    from .tiles import TeselaInvalida, torres_mvt
+
+    filtros = _filtros_tesela(request, linea_id, tension_kv, inspection_status, unidad_negocio)
+    try:
+        tile = torres_mvt(z, x, y, **filtros)
+    except TeselaInvalida as e:
+        raise HttpError(400, str(e))
+    return HttpResponse(tile, content_type='application/vnd.mapbox-vector-tile')
+
+
 @router.post('/validar-ubicacion', response=ValidarUbicacionOut)
 def validar_ubicacion(request: HttpRequest, data: ValidarUbicacionIn) -> ValidarUbicacionOut:
     """
@@ -351,23 +438,9 @@ def validar_ubicacion(request: HttpRequest, data: ValidarUbicacionIn) -> Validar
     Used by mobile app before allowing field data capture.
     """
     torre = Torre.objects.select_related('linea').get(id=data.torre_id)
-    poligono = PoligonoServidumbre.objects.filter(torre=torre).first()
+    poligonos = _poligonos_por_torre([torre.id])
 
-    if not poligono:
-        # No polygon defined - allow but warn
-        return ValidarUbicacionOut(
-            dentro_poligono=True,
-            torre_numero=torre.numero,
-            linea_codigo=torre.linea.codigo,
-            mensaje='No hay polígono de servidumbre definido. Ubicación aceptada.',
-        )
-
-    dentro = poligono.punto_dentro(float(data.latitud), float(data.longitud))
-
-    if dentro:
-        mensaje = 'Ubicación dentro del área de servidumbre autorizada.'
-    else:
-        mensaje = 'ADVERTENCIA: Ubicación fuera del área de servidumbre.'
+    dentro, mensaje = _validar_punto(poligonos.get(torre.id, []), data.latitud, data.longitud)
 
     return ValidarUbicacionOut(
         dentro_poligono=dentro,
@@ -375,3 +448,63 @@ def validar_ubicacion(request: HttpRequest, data: ValidarUbicacionIn) -> Validar
         linea_codigo=torre.linea.codigo,
         mensaje=mensaje,
     )
+
+
+@router.post('/validar-ubicacion/lote', response=ValidarUbicacionLoteOut)
+def validar_ubicacion_lote(
+    request: HttpRequest, data: ValidarUbicacionLoteIn,
+) -> ValidarUbicacionLoteOut:
+    """
+    Validate many GPS points (captured offline) against their towers'
+    easement polygons in one request.
+
+    Two queries for the whole batch (towers and polygons); each polygon is
+    prepared once and reused for every point of its tower. Results keep the
+    input order; unknown towers are reported per point instead of failing
+    the batch.
+    """
+    if len(data.puntos) > MAX_PUNTOS_LOTE:
+        raise HttpError(400, f'Máximo {MAX_PUNTOS_LOTE} puntos por lote.')
+
+    torre_ids = {punto.torre_id for punto in data.puntos}
+    torres = {
+        torre.id: torre
+        for torre in Torre.objects.filter(id__in=torre_ids)
+        .select_related('linea')
+        .only('id', 'numero', 'linea__codigo')
+    }
+    poligonos = _poligonos_por_torre(torres)
+
+    resultados = []
+    fuera = 0
+    for punto in data.puntos:
+        torre = torres.get(punto.torre_id)
+        if torre is None:
+            resultados.append(ValidarUbicacionPuntoOut(
+                torre_id=punto.torre_id,
+                encontrada=False,
+                dentro_poligono=False,
+                torre_numero=None,
+                linea_codigo=None,
+                mensaje='Torre no encontrada.',
+            ))
+            continue
+
+        dentro, mensaje = _validar_punto(
+            poligonos.get(torre.id, []), punto.latitud, punto.longitud,
+        )
+        fuera += not dentro
+        resultados.append(ValidarUbicacionPuntoOut(
+            torre_id=torre.id,
+            encontrada=True,
+            dentro_poligono=dentro,
+            torre_numero=torre.numero,
+            linea_codigo=torre.linea.codigo,
+            mensaje=mensaje,
+        ))
+
+    return ValidarUbicacionLoteOut(
+        total=len(resultados),
+        fuera_poligono=fuera,
+        resultados=resultados,
+    )
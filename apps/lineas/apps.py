@@ -5,3 +5,7 @@ class LineasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.lineas'
     verbose_name = 'Líneas de Transmisión'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import apps.lineas.signals  # noqa
@@ -9,6 +9,7 @@ import logging
 import zipfile
 
 from django.db import transaction
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
@@ -524,6 +525,7 @@ class KMZImporter:
         torres_creadas = 0
         torres_actualizadas = 0
         torres_saltadas = 0
+        lineas_tocadas = []
 
         from django.contrib.gis.geos import Point
 
@@ -537,6 +539,7 @@ class KMZImporter:
                         'tension_kv': l['tension_kv'],
                     },
                 )
+                lineas_tocadas.append(linea_obj.id)
                 if created:
                     lineas_creadas += 1
                 else:
@@ -568,6 +571,9 @@ class KMZImporter:
                                 longitud=t['lon'],
                                 altitud=t['alt'],
                                 geometria=Point(t['lon'], t['lat'], srid=4326),
+                                # update() no toca auto_now: el change-feed
+                                # móvil (campo.sync) avanza por updated_at.
+                                updated_at=timezone.now(),
                             )
                             torres_actualizadas += 1
                         else:
@@ -598,6 +604,14 @@ class KMZImporter:
                     )
                     torres_creadas += creadas_real
 
+        # bulk_create/update no disparan las señales de las teselas del mapa
+        # ni del índice espacial por línea.
+        from .indice_espacial import invalidar_indice_linea
+        from .tiles import invalidar_tiles
+        invalidar_tiles()
+        for linea_id in lineas_tocadas:
+            invalidar_indice_linea(linea_id)
+
         return {
             'exito': True,
             'lineas_creadas': lineas_creadas,
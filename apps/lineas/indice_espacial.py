@@ -0,0 +1,244 @@
+"""
+Índice espacial en memoria por línea: torre y vano más cercanos a un punto GPS.
+
+La app de campo auto-selecciona la estructura donde está parada la
+cuadrilla. Con una query por fix (``ORDER BY geometria <-> punto``) cada
+lectura del GPS iba a la BD; acá cada línea se carga UNA vez por proceso
+en una grilla uniforme en metros y las consultas no tocan la BD:
+
+- Proyección equirectangular local centrada en la línea (error < 0.1 % en
+  la extensión de una línea de transmisión, sobra para elegir estructura).
+- Torres: punto por celda. Vanos: segmento ``torre_inicio → torre_fin`` en
+  todas las celdas que cubre su caja.
+- Búsqueda por anillos de celdas alrededor del punto; si tras
+  ``MAX_ANILLOS`` no hay candidato seguro, recorre todo (una línea tiene a
+  lo sumo unos miles de elementos).
+
+El índice se cachea en memoria del proceso junto con la versión de la
+línea en la cache de Django; ``invalidar_indice_linea`` (señales de
+Torre/Vano y escrituras masivas) incrementa esa versión y cada worker
+reconstruye en su próxima consulta.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from django.core.cache import cache
+
+#: Lado de la celda de la grilla (m), del orden de un vano corto.
+CELDA_M = 250.0
+#: Anillos de celdas recorridos antes de caer a búsqueda lineal.
+MAX_ANILLOS = 8
+#: Líneas con índice en memoria por proceso (LRU).
+MAX_LINEAS_EN_MEMORIA = 64
+
+RADIO_TIERRA_M = 6371008.8
+
+CACHE_KEY_INDICE_VERSION = 'instelec:indice_linea:{linea_id}:version'
+
+
+@dataclass(frozen=True)
+class TorreCercana:
+    torre_id: object
+    numero: str
+    distancia_m: float
+
+
+@dataclass(frozen=True)
+class VanoCercano:
+    vano_id: object
+    numero: str
+    torre_inicio_id: object
+    torre_fin_id: object
+    distancia_m: float
+
+
+def _distancia_segmento(px, py, ax, ay, bx, by):
+    dx, dy = bx - ax, by - ay
+    largo2 = dx * dx + dy * dy
+    if largo2 == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / largo2))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+class IndiceLinea:
+    """Grilla uniforme de torres y vanos de una línea (coordenadas en m)."""
+
+    def __init__(self, torres, vanos):
+        """
+        Args:
+            torres: iterable de ``(id, numero, latitud, longitud)``
+            vanos: iterable de ``(id, numero, torre_inicio_id, torre_fin_id)``;
+                se indexan solo los que tienen ambas torres ubicadas.
+        """
+        torres = [(tid, numero, float(lat), float(lon)) for tid, numero, lat, lon in torres]
+        if torres:
+            self._lat0 = sum(t[2] for t in torres) / len(torres)
+            self._lon0 = sum(t[3] for t in torres) / len(torres)
+        else:
+            self._lat0 = self._lon0 = 0.0
+        self._cos_lat0 = math.cos(math.radians(self._lat0))
+
+        self.torres = []
+        self._celdas_torres = {}
+        posiciones = {}
+        for tid, numero, lat, lon in torres:
+            x, y = self._proyectar(lat, lon)
+            posiciones[tid] = (x, y)
+            self._celdas_torres.setdefault(self._celda(x, y), []).append(len(self.torres))
+            self.torres.append((tid, numero, x, y))
+
+        self.vanos = []
+        self._celdas_vanos = {}
+        for vid, numero, inicio_id, fin_id in vanos:
+            if inicio_id not in posiciones or fin_id not in posiciones:
+                continue
+            (ax, ay), (bx, by) = posiciones[inicio_id], posiciones[fin_id]
+            cx0, cy0 = self._celda(min(ax, bx), min(ay, by))
+            cx1, cy1 = self._celda(max(ax, bx), max(ay, by))
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    self._celdas_vanos.setdefault((cx, cy), []).append(len(self.vanos))
+            self.vanos.append((vid, numero, inicio_id, fin_id, ax, ay, bx, by))
+
+    def _proyectar(self, lat, lon):
+        x = RADIO_TIERRA_M * math.radians(lon - self._lon0) * self._cos_lat0
+        y = RADIO_TIERRA_M * math.radians(lat - self._lat0)
+        return x, y
+
+    @staticmethod
+    def _celda(x, y):
+        return math.floor(x / CELDA_M), math.floor(y / CELDA_M)
+
+    def _mas_cercano(self, celdas, elementos, distancia, x, y):
+        """Índice y distancia del elemento más cercano, o (None, inf)."""
+        if not elementos:
+            return None, math.inf
+        cx, cy = self._celda(x, y)
+        mejor, mejor_d = None, math.inf
+        vistos = set()
+        for anillo in range(MAX_ANILLOS + 1):
+            for celda in self._anillo(cx, cy, anillo):
+                for i in celdas.get(celda, ()):
+                    if i in vistos:
+                        continue
+                    vistos.add(i)
+                    d = distancia(elementos[i], x, y)
+                    if d < mejor_d:
+                        mejor, mejor_d = i, d
+            # Todo lo que está en el anillo siguiente queda a ≥ anillo * CELDA_M.
+            if mejor is not None and mejor_d <= anillo * CELDA_M:
+                return mejor, mejor_d
+
+        # Punto lejos de la línea: recorrido lineal.
+        for i, elemento in enumerate(elementos):
+            d = distancia(elemento, x, y)
+            if d < mejor_d:
+                mejor, mejor_d = i, d
+        return mejor, mejor_d
+
+    @staticmethod
+    def _anillo(cx, cy, r):
+        if r == 0:
+            yield cx, cy
+            return
+        for dx in range(-r, r + 1):
+            yield cx + dx, cy - r
+            yield cx + dx, cy + r
+        for dy in range(-r + 1, r):
+            yield cx - r, cy + dy
+            yield cx + r, cy + dy
+
+    def torre_cercana(self, latitud, longitud) -> Optional[TorreCercana]:
+        x, y = self._proyectar(float(latitud), float(longitud))
+        i, d = self._mas_cercano(
+            self._celdas_torres, self.torres,
+            lambda t, px, py: math.hypot(px - t[2], py - t[3]), x, y,
+        )
+        if i is None:
+            return None
+        tid, numero, _, _ = self.torres[i]
+        return TorreCercana(torre_id=tid, numero=numero, distancia_m=round(d, 1))
+
+    def vano_cercano(self, latitud, longitud) -> Optional[VanoCercano]:
+        x, y = self._proyectar(float(latitud), float(longitud))
+        i, d = self._mas_cercano(
+            self._celdas_vanos, self.vanos,
+            lambda v, px, py: _distancia_segmento(px, py, *v[4:]), x, y,
+        )
+        if i is None:
+            return None
+        vid, numero, inicio_id, fin_id = self.vanos[i][:4]
+        return VanoCercano(
+            vano_id=vid, numero=numero, torre_inicio_id=inicio_id,
+            torre_fin_id=fin_id, distancia_m=round(d, 1),
+        )
+
+
+def construir_indice(linea_id) -> IndiceLinea:
+    """Dos queries: torres ubicadas de la línea y sus vanos con torres."""
+    from .models import Torre, Vano
+
+    torres = Torre.objects.filter(
+        linea_id=linea_id, latitud__isnull=False, longitud__isnull=False,
+    ).values_list('id', 'numero', 'latitud', 'longitud')
+    vanos = Vano.objects.filter(
+        linea_id=linea_id, torre_inicio__isnull=False, torre_fin__isnull=False,
+    ).values_list('id', 'numero', 'torre_inicio_id', 'torre_fin_id')
+    return IndiceLinea(torres, vanos)
+
+
+_indices: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def _version(linea_id):
+    key = CACHE_KEY_INDICE_VERSION.format(linea_id=linea_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def indice_linea(linea_id) -> IndiceLinea:
+    """Índice de la línea: memoria del proceso si la versión sigue vigente."""
+    version = _version(linea_id)
+    with _lock:
+        memo = _indices.get(linea_id)
+        if memo is not None and memo[0] == version:
+            _indices.move_to_end(linea_id)
+            return memo[1]
+
+    indice = construir_indice(linea_id)
+    with _lock:
+        _indices[linea_id] = (version, indice)
+        _indices.move_to_end(linea_id)
+        while len(_indices) > MAX_LINEAS_EN_MEMORIA:
+            _indices.popitem(last=False)
+    return indice
+
+
+def torre_cercana(linea_id, latitud, longitud) -> Optional[TorreCercana]:
+    """Torre de la línea más cercana al punto (None si no hay torres ubicadas)."""
+    return indice_linea(linea_id).torre_cercana(latitud, longitud)
+
+
+def vano_cercano(linea_id, latitud, longitud) -> Optional[VanoCercano]:
+    """Vano de la línea más cercano al punto (None si no hay vanos con torres)."""
+    return indice_linea(linea_id).vano_cercano(latitud, longitud)
+
+
+def invalidar_indice_linea(linea_id):
+    """Invalida el índice de la línea en todos los workers (nueva versión)."""
+    if not linea_id:
+        return
+    try:
+        cache.incr(CACHE_KEY_INDICE_VERSION.format(linea_id=linea_id))
+    except ValueError:
+        # Versión desalojada: la próxima consulta arranca una nueva.
+        pass
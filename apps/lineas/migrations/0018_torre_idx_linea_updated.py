@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lineas', '0017_carga_vanos_semestre_completa'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='torre',
+            index=models.Index(fields=['linea', 'updated_at'], name='idx_torre_linea_updated'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.15 on 2026-10-17 12:00
+
+from django.db import migrations
+
+# Las teselas del mapa filtran por `geometria` (índice GiST). Torres viejas
+# cargadas con `update()` sobre latitud/longitud pueden haber quedado sin
+# punto; se completa desde las columnas decimales.
+BACKFILL_SQL = """
+    UPDATE torres
+    SET geometria = ST_SetSRID(ST_MakePoint(longitud::float8, latitud::float8), 4326)
+    WHERE geometria IS NULL AND latitud IS NOT NULL AND longitud IS NOT NULL
+"""
+
+
+def backfill_geometria(apps, schema_editor):
+    # Solo PostGIS: dev_lite (SQLite) guarda la geometría como texto.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(BACKFILL_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lineas', '0018_torre_idx_linea_updated'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_geometria, migrations.RunPython.noop),
+    ]
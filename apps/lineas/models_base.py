@@ -405,6 +405,10 @@ class Torre(BaseModel):
         verbose_name_plural = 'Torres'
         unique_together = ['linea', 'numero']
         ordering = ['linea', 'numero']
+        indexes = [
+            # Change-feed móvil (apps.campo.sync.cambios_desde)
+            models.Index(fields=['linea', 'updated_at'], name='idx_torre_linea_updated'),
+        ]
 
     # Prefijos del campo `numero` que corresponden a TORRES (se renombran a T-{n}).
     # 'P*' son postes (se preservan como P-{n}); el resto (pórticos, códigos
@@ -0,0 +1,59 @@
+"""Invalidación de las teselas del mapa de torres (``apps.lineas.tiles``) y
+del índice espacial por línea (``apps.lineas.indice_espacial``).
+
+Las escrituras masivas (``bulk_create``/``bulk_update``/``update``) no
+disparan estas señales: quien las hace llama a ``invalidar_tiles`` /
+``invalidar_indice_linea`` a mano (importador KMZ multilínea, resumen de
+inspección de ``apps.campo``).
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .indice_espacial import invalidar_indice_linea
+from .models import Linea, Torre, Vano
+from .tiles import invalidar_tiles
+
+# Campos que cambian la geometría del índice; un save con ``update_fields``
+# que no los toca (estado del vano, resumen de inspección) no invalida.
+CAMPOS_INDICE = {
+    Torre: {'linea', 'numero', 'latitud', 'longitud', 'geometria'},
+    Vano: {'linea', 'numero', 'torre_inicio', 'torre_fin'},
+}
+
+
+@receiver(post_save, sender=Torre, dispatch_uid='tiles_torre_save')
+@receiver(post_delete, sender=Torre, dispatch_uid='tiles_torre_delete')
+@receiver(post_save, sender=Linea, dispatch_uid='tiles_linea_save')
+@receiver(post_delete, sender=Linea, dispatch_uid='tiles_linea_delete')
+def _invalidar_tiles(sender, **kwargs):
+    # De nuevo tras el commit: una tesela calculada mientras la transacción
+    # seguía abierta habría guardado las torres previas al cambio.
+    invalidar_tiles()
+    transaction.on_commit(invalidar_tiles)
+
+
+@receiver(pre_save, sender=Torre, dispatch_uid='indice_torre_previa')
+@receiver(pre_save, sender=Vano, dispatch_uid='indice_vano_previa')
+def _capturar_linea_previa(sender, instance, update_fields=None, **kwargs):
+    """Guarda el ``linea_id`` en BD: si la torre/vano cambia de línea, el
+    índice de la línea de origen también queda desactualizado."""
+    if instance._state.adding or (update_fields and 'linea' not in update_fields):
+        return
+    instance._previo_linea_id = (
+        sender.objects.filter(pk=instance.pk).values_list('linea_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Torre, dispatch_uid='indice_torre_save')
+@receiver(post_delete, sender=Torre, dispatch_uid='indice_torre_delete')
+@receiver(post_save, sender=Vano, dispatch_uid='indice_vano_save')
+@receiver(post_delete, sender=Vano, dispatch_uid='indice_vano_delete')
+def _invalidar_indice_linea(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not CAMPOS_INDICE[sender] & set(update_fields):
+        return
+    for linea_id in {instance.linea_id, getattr(instance, '_previo_linea_id', None)} - {None}:
+        invalidar_indice_linea(linea_id)
+        transaction.on_commit(partial(invalidar_indice_linea, linea_id))
@@ -0,0 +1,265 @@
+"""
+Torres del mapa por tesela (z/x/y).
+
+``torres_geojson`` serializaba hasta 5.000 torres por pan/zoom, filtrando el
+bbox sobre las columnas decimales ``latitud``/``longitud`` (sin índice
+espacial). Con el inventario nacional completo el mapa se trababa.
+
+Acá el mapa pide teselas XYZ (las mismas de Leaflet/MapLibre):
+
+- ``clusters_geojson``: por debajo de ``ZOOM_DETALLE`` agrupa las torres en
+  una grilla de ``CELDAS_POR_TESELA``² celdas (``ST_SnapToGrid``) y devuelve
+  un punto por celda con el conteo; desde ``ZOOM_DETALLE`` devuelve las
+  torres individuales con las mismas propiedades que ``torres_geojson``.
+- ``torres_mvt``: Mapbox Vector Tile armado en PostGIS (``ST_AsMVT``) para
+  clientes vectoriales.
+
+Ambos filtran con ``geometria && envelope`` —usa el índice GiST del
+``PointField``— y se cachean por tesela bajo una VERSIÓN que
+``invalidar_tiles`` incrementa al editar torres o líneas (signals.py y las
+escrituras masivas que no disparan señales).
+
+Los cambios que no mueven torres (estado de inspección que llega de la
+sincronización de campo) usan ``invalidar_teselas``: marca solo las teselas,
+en todos los zooms, donde se dibujan esas torres, y el resto del mapa
+nacional sigue en cache.
+"""
+import hashlib
+import math
+import time
+
+from django.contrib.gis.geos import Polygon
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Avg, Count, Q
+
+#: Desde este zoom se devuelven torres individuales en vez de clusters.
+ZOOM_DETALLE = 13
+MAX_ZOOM = 22
+
+#: La grilla de clustering divide cada tesela en N×N celdas.
+CELDAS_POR_TESELA = 8
+
+MVT_EXTENT = 4096
+MVT_BUFFER = 64
+MVT_CAPA = 'torres'
+
+CACHE_TIMEOUT = 24 * 3600
+CACHE_KEY_VERSION = 'instelec:torres_tiles:version'
+CACHE_KEY_VERSION_TESELA = 'instelec:torres_tiles:version:{z}/{x}/{y}'
+
+
+class TeselaInvalida(ValueError):
+    pass
+
+
+def _version():
+    version = cache.get(CACHE_KEY_VERSION)
+    if version is None:
+        # Timestamp y no 1: si la cache desaloja la versión, nunca se
+        # reusan claves viejas.
+        cache.add(CACHE_KEY_VERSION, int(time.time() * 1000), None)
+        version = cache.get(CACHE_KEY_VERSION)
+    return version
+
+
+def invalidar_tiles():
+    """Invalida todas las teselas cacheadas (nueva versión)."""
+    try:
+        cache.incr(CACHE_KEY_VERSION)
+    except ValueError:
+        pass
+
+
+def teselas_de(latitud, longitud):
+    """Teselas (z, x, y) de todos los zooms que dibujan el punto.
+
+    Incluye las vecinas cuyo buffer MVT alcanza al punto cuando cae cerca
+    del borde.
+    """
+    margen = MVT_BUFFER / MVT_EXTENT
+    lat = math.radians(max(min(float(latitud), 85.0511), -85.0511))
+    fx = (float(longitud) + 180) / 360
+    fy = (1 - math.asinh(math.tan(lat)) / math.pi) / 2
+
+    teselas = set()
+    for z in range(MAX_ZOOM + 1):
+        n = 2 ** z
+        xs = {min(max(int(fx * n + d), 0), n - 1) for d in (-margen, 0, margen)}
+        ys = {min(max(int(fy * n + d), 0), n - 1) for d in (-margen, 0, margen)}
+        teselas.update((z, x, y) for x in xs for y in ys)
+    return teselas
+
+
+def invalidar_teselas(puntos):
+    """Invalida solo las teselas que dibujan los puntos ``(latitud, longitud)``."""
+    marca = time.time_ns()
+    claves = {
+        CACHE_KEY_VERSION_TESELA.format(z=z, x=x, y=y): marca
+        for latitud, longitud in puntos
+        for z, x, y in teselas_de(latitud, longitud)
+    }
+    if claves:
+        # Cada tesela vive CACHE_TIMEOUT: pasado ese lapso no queda ninguna
+        # cacheada con la versión anterior y la marca puede expirar (si no,
+        # cada punto deja ~70 claves para siempre).
+        cache.set_many(claves, CACHE_TIMEOUT)
+
+
+def validar_tesela(z, x, y):
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise TeselaInvalida(f'Tesela fuera de rango: {z}/{x}/{y}')
+
+
+def limites_tesela(z, x, y):
+    """(lon_min, lat_min, lon_max, lat_max) de la tesela XYZ (Web Mercator)."""
+    n = 2 ** z
+
+    def lat(fila):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * fila / n))))
+
+    return (x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y))
+
+
+def _envelope(z, x, y):
+    envelope = Polygon.from_bbox(limites_tesela(z, x, y))
+    envelope.srid = 4326
+    return envelope
+
+
+def torres_filtradas(linea_id=None, tension_kv=None, inspection_status=None, unidad_negocio=None):
+    """Queryset base del mapa: torres con coordenadas y los filtros de la UI."""
+    from .models import Torre
+
+    qs = Torre.objects.filter(latitud__isnull=False, longitud__isnull=False)
+    if linea_id:
+        qs = qs.filter(linea_id=linea_id)
+    if tension_kv:
+        qs = qs.filter(linea__tension_kv=tension_kv)
+    if inspection_status:
+        qs = qs.filter(inspection_status=inspection_status)
+    if unidad_negocio in ('MANTENIMIENTO', 'CONSTRUCCION'):
+        qs = qs.filter(linea__contrato__unidad_negocio=unidad_negocio)
+    return qs
+
+
+def feature_torre(t):
+    """Feature GeoJSON de una torre (requiere ``select_related('linea')``)."""
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [float(t.longitud), float(t.latitud)]},
+        'properties': {
+            'id': str(t.id),
+            # #100: etiqueta normalizada T-{n} para el popup del mapa (web).
+            # El identificador sigue siendo `id`.
+            'numero': t.numero_display,
+            'tipo': t.tipo,
+            'estado': t.estado,
+            'inspection_status': t.inspection_status,
+            'linea_id': str(t.linea_id),
+            'linea_codigo': t.linea.codigo,
+            'tension_kv': t.linea.tension_kv,
+        },
+    }
+
+
+def _clave(formato, z, x, y, filtros):
+    firma = hashlib.md5(
+        repr(sorted((k, str(v)) for k, v in filtros.items() if v)).encode(),
+        usedforsecurity=False,
+    ).hexdigest()[:12]
+    local = cache.get(CACHE_KEY_VERSION_TESELA.format(z=z, x=x, y=y), 0)
+    return f'instelec:torres_tiles:v{_version()}.{local}:{formato}:{z}/{x}/{y}:{firma}'
+
+
+def clusters_geojson(z, x, y, **filtros):
+    """FeatureCollection de la tesela: clusters o torres según el zoom."""
+    validar_tesela(z, x, y)
+    clave = _clave('geojson', z, x, y, filtros)
+    datos = cache.get(clave)
+    if datos is None:
+        datos = _calcular_clusters(z, x, y, filtros)
+        cache.set(clave, datos, CACHE_TIMEOUT)
+    return datos
+
+
+def _calcular_clusters(z, x, y, filtros):
+    from django.contrib.gis.db.models.functions import SnapToGrid
+
+    qs = torres_filtradas(**filtros).filter(geometria__bboxoverlaps=_envelope(z, x, y))
+
+    if z >= ZOOM_DETALLE:
+        features = [feature_torre(t) for t in qs.select_related('linea')]
+        return {'type': 'FeatureCollection', 'features': features, 'zoom_detalle': True}
+
+    celda = 360 / 2 ** z / CELDAS_POR_TESELA
+    # order_by() vacío: el ordering del modelo (linea, numero) entraría al
+    # GROUP BY y rompería la agregación por celda.
+    grupos = (
+        qs.order_by()
+        .annotate(celda=SnapToGrid('geometria', celda))
+        .values('celda')
+        .annotate(
+            total=Count('id'),
+            lon=Avg('longitud'),
+            lat=Avg('latitud'),
+            criticas=Count('id', filter=Q(inspection_status='CRITICA')),
+            vencidas=Count('id', filter=Q(inspection_status='VENCIDA')),
+        )
+    )
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [float(g['lon']), float(g['lat'])]},
+            'properties': {
+                'cluster': True,
+                'total': g['total'],
+                'criticas': g['criticas'],
+                'vencidas': g['vencidas'],
+            },
+        }
+        for g in grupos
+    ]
+    return {'type': 'FeatureCollection', 'features': features, 'zoom_detalle': False}
+
+
+def torres_mvt(z, x, y, **filtros):
+    """Mapbox Vector Tile (bytes) de la tesela, capa ``torres``."""
+    validar_tesela(z, x, y)
+    clave = _clave('mvt', z, x, y, filtros)
+    tile = cache.get(clave)
+    if tile is None:
+        tile = _calcular_mvt(z, x, y, filtros)
+        cache.set(clave, tile, CACHE_TIMEOUT)
+    return tile
+
+
+def _calcular_mvt(z, x, y, filtros):
+    from .models import Linea, Torre
+
+    ids_sql, ids_params = (
+        torres_filtradas(**filtros)
+        .filter(geometria__bboxoverlaps=_envelope(z, x, y))
+        .order_by()
+        .values('id')
+        .query.sql_with_params()
+    )
+    sql = f"""
+        SELECT ST_AsMVT(capa, %s, %s, 'geom') FROM (
+            SELECT
+                ST_AsMVTGeom(
+                    ST_Transform(t.geometria, 3857), ST_TileEnvelope(%s, %s, %s), %s, %s, true
+                ) AS geom,
+                t.id::text AS id, t.numero, t.tipo, t.estado, t.inspection_status,
+                l.id::text AS linea_id, l.codigo AS linea_codigo, l.tension_kv
+            FROM {Torre._meta.db_table} t
+            JOIN {Linea._meta.db_table} l ON l.id = t.linea_id
+            WHERE t.id IN ({ids_sql})
+        ) capa
+    """
+    params = (MVT_CAPA, MVT_EXTENT, z, x, y, MVT_EXTENT, MVT_BUFFER, *ids_params)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        fila = cursor.fetchone()
+    return bytes(fila[0]) if fila and fila[0] is not None else b''
+
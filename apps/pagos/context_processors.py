@@ -1,6 +1,7 @@
 from django.utils import timezone
 from datetime import date
-from .models import Suscripcion
+
+from apps.core.cache import get_contexto_global
 
 
 MESES_ES = [
@@ -14,10 +15,9 @@ def recordatorio_pago(request):
     if not user or not user.is_authenticated:
         return {}
 
-    try:
-        suscripcion = Suscripcion.objects.select_related('plan').first()
-    except Exception:
-        return {}
+    # Cacheada junto al resto del sidebar; invalidada por señal al guardar
+    # la Suscripcion (apps/core/signals_contexto.py).
+    suscripcion = get_contexto_global(request)['suscripcion']
 
     if not suscripcion:
         return {}
@@ -0,0 +1,23 @@
+"""Invalidación del usuario cacheado por JWT (``apps.core.cache``).
+
+Guardar o borrar un usuario (desactivación, cambio de rol, de contraseña...)
+incrementa su versión: la próxima request autenticada con cualquiera de sus
+tokens vuelve a leerlo de la BD. Se invalida en el momento y de nuevo tras
+el commit, igual que el contexto global.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.cache import invalidate_usuario_jwt
+
+from .models import Usuario
+
+
+@receiver(post_save, sender=Usuario, dispatch_uid='jwt_usuario_save')
+@receiver(post_delete, sender=Usuario, dispatch_uid='jwt_usuario_delete')
+def _invalidar_usuario_jwt(sender, instance, **kwargs):
+    invalidate_usuario_jwt(instance.pk)
+    transaction.on_commit(partial(invalidate_usuario_jwt, instance.pk))
@@ -1,5 +1,12 @@
 """
 ASGI config for TransMaint project.
+
+Entry point for long-lived responses: the live crew map push channel
+(``/cuadrillas/mapa/stream/``, Server-Sent Events) keeps its connection open
+and waits on an async generator only when served through this application
+(e.g. ``gunicorn -k uvicorn.workers.UvicornWorker config.asgi:application``).
+Under WSGI the same endpoint answers one event per request and lets the
+browser reconnect.
 """
 import os
 from django.core.asgi import get_asgi_application
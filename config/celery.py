@@ -26,6 +26,8 @@ app.conf.task_routes = {
     'apps.ambiental.tasks.*': {'queue': 'reports'},
     'apps.financiero.tasks.*': {'queue': 'reports'},
     'apps.indicadores.tasks.*': {'queue': 'default'},
+    'apps.core.tasks.*': {'queue': 'default'},
+    'apps.cuadrillas.tasks.*': {'queue': 'default'},
 }
 
 # Celery Beat schedule - automated periodic tasks
@@ -46,6 +48,11 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour=7, minute=0, day_of_week=1),  # Mondays at 7 AM
         'description': 'Generate weekly KPI summary'
     },
+    'precalcular-dashboard-indicadores': {
+        'task': 'apps.indicadores.tasks.precalcular_dashboard',
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+        'description': 'Rebuild missing KPI dashboard snapshots'
+    },
 
     # Environmental Reports
     'verificar-permisos-vencidos': {
@@ -81,6 +88,20 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour=4, minute=0, day_of_month=2),  # 2nd of each month at 4 AM
         'description': 'Consolidate monthly costs by category'
     },
+
+    # Background imports
+    'reanudar-importaciones-colgadas': {
+        'task': 'apps.core.tasks.reanudar_trabajos_colgados',
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+        'description': 'Resume import jobs whose worker stopped responding'
+    },
+
+    # GPS tracking history
+    'mantener-historial-tracking': {
+        'task': 'apps.cuadrillas.tasks.mantener_historial_tracking',
+        'schedule': crontab(hour=2, minute=30),  # Daily at 2:30 AM
+        'description': 'Create tracking partitions and roll up / purge old GPS pings'
+    },
 }
 
 # Timezone for beat schedule
@@ -218,6 +218,11 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+# Importaciones Excel: por encima de este tamaño se encolan como
+# TrabajoImportacion en Celery (apps/core/importaciones.py); por debajo se
+# procesan en la misma request.
+IMPORTACION_SINCRONA_MAX_BYTES = config('IMPORTACION_SINCRONA_MAX_BYTES', default=512 * 1024, cast=int)
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -260,7 +265,7 @@ LOGGING = {
 GS_BUCKET_NAME = config('GS_BUCKET_NAME', default='')
 GS_PROJECT_ID = config('GS_PROJECT_ID', default='')
 if GS_BUCKET_NAME:
-    DEFAULT_FILE_STORAGE = 'storages.backends.gcloud.GoogleCloudStorage'
+    DEFAULT_FILE_STORAGE = 'apps.core.storage_backends.PooledGoogleCloudStorage'
     GS_DEFAULT_ACL = 'publicRead'
 
 # Rate Limiting Configuration
@@ -62,7 +62,8 @@ DATABASES['default']['CONN_HEALTH_CHECKS'] = True
 # y cae a FileSystemStorage (efímero en Cloud Run). Issue #95.
 STORAGES = {
     "default": {
-        "BACKEND": "storages.backends.gcloud.GoogleCloudStorage",
+        # GoogleCloudStorage sobre el cliente GCS compartido (pool HTTP).
+        "BACKEND": "apps.core.storage_backends.PooledGoogleCloudStorage",
     },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
@@ -71,6 +72,8 @@ STORAGES = {
 GS_DEFAULT_ACL = 'publicRead'
 GS_QUERYSTRING_AUTH = False
 GS_FILE_OVERWRITE = False
+# Uploads resumables por chunks (= apps.core.utils.STORAGE_CHUNK_SIZE).
+GS_BLOB_CHUNK_SIZE = 8 * 1024 * 1024
 
 # =============================================================================
 # Cache Configuration
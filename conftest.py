@@ -65,6 +65,19 @@ def django_db_setup(django_db_setup, django_db_blocker):
             )
 
 
+@pytest.fixture(autouse=True)
+def _cache_limpia():
+    """Cache vacía al empezar cada test.
+
+    La cache de tests (LocMem) vive todo el proceso, pero la BD de cada test
+    se revierte sin disparar señales: un snapshot cacheado por un test (p.ej.
+    el del dashboard de indicadores) no debe verlo el siguiente.
+    """
+    from django.core.cache import cache
+
+    cache.clear()
+
+
 # ==============================================================================
 # User Fixtures
 # ==============================================================================
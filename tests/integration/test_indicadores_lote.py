@@ -0,0 +1,94 @@
+"""Integration tests for the set-based KPI engine (calculators_lote)."""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from apps.indicadores import calculators
+from apps.indicadores.calculators_lote import (
+    calcular_indicadores_lote,
+    calcular_todos_indicadores_lote,
+)
+
+CALCULADORES = {
+    'GESTION': calculators.calcular_gestion_mantenimiento,
+    'EJECUCION': calculators.calcular_ejecucion_mantenimiento,
+    'AMBIENTAL': calculators.calcular_gestion_ambiental,
+    'CALIDAD': calculators.calcular_calidad_informacion,
+    'SEGURIDAD': calculators.calcular_seguridad_industrial,
+    'CRONOGRAMA': calculators.calcular_cumplimiento_cronograma,
+}
+
+
+def _poblar_linea(n_actividades):
+    """Line with a mix of on-time, late, pending and cancelled activities."""
+    from tests.factories import (
+        ActividadFactory,
+        EvidenciaAntesFactory,
+        EvidenciaDespuesFactory,
+        EvidenciaDuranteFactory,
+        LineaFactory,
+        RegistroCampoFactory,
+    )
+
+    linea = LineaFactory()
+    estados = ['COMPLETADA', 'COMPLETADA', 'PENDIENTE', 'CANCELADA']
+    for i in range(n_actividades):
+        actividad = ActividadFactory(
+            linea=linea,
+            fecha_programada=date(2024, 1, 15),
+            estado=estados[i % len(estados)],
+        )
+        dia = 15 if i % 3 else 20  # every third one is late
+        registro = RegistroCampoFactory(
+            actividad=actividad,
+            fecha_inicio=timezone.make_aware(datetime(2024, 1, dia, 8, 0)),
+            fecha_fin=timezone.make_aware(datetime(2024, 1, dia, 16, 0)),
+            sincronizado=True,
+            datos_formulario={'accidente_reportado': i == 1},
+        )
+        if i % 2 == 0:
+            EvidenciaAntesFactory(registro_campo=registro)
+            EvidenciaDuranteFactory(registro_campo=registro)
+            EvidenciaDespuesFactory(registro_campo=registro)
+    return linea
+
+
+@pytest.mark.django_db
+class TestCalcularIndicadoresLote:
+    """The batch engine must match the per-line calculators exactly."""
+
+    def test_paridad_con_calculadores_por_linea(self):
+        lineas = [_poblar_linea(n) for n in (0, 3, 7)]
+
+        lote = calcular_indicadores_lote([linea.id for linea in lineas], 2024, 1)
+
+        for linea in lineas:
+            for categoria, calculador in CALCULADORES.items():
+                esperado = calculador(linea.id, 2024, 1)
+                assert lote[linea.id][categoria] == esperado, (linea.codigo, categoria)
+
+    def test_queries_no_escalan_con_lineas(self, django_assert_max_num_queries):
+        lineas = [_poblar_linea(2) for _ in range(5)]
+
+        with django_assert_max_num_queries(4):
+            calcular_indicadores_lote([linea.id for linea in lineas], 2024, 1)
+
+    def test_upsert_de_mediciones(self):
+        from apps.indicadores.models import Indicador, MedicionIndicador
+
+        linea = _poblar_linea(4)
+        Indicador.objects.create(
+            codigo='KPI-G', nombre='Gestión', categoria='GESTION', formula='x',
+            meta=Decimal('90'), umbral_alerta=Decimal('80'), activo=True,
+        )
+
+        calcular_todos_indicadores_lote([linea.id], 2024, 1)
+        resumen = calcular_todos_indicadores_lote([linea.id], 2024, 1)
+
+        medicion = MedicionIndicador.objects.get(linea=linea, anio=2024, mes=1)
+        assert medicion.valor_calculado == Decimal('50.00')
+        assert medicion.en_alerta is True
+        assert resumen[linea.id] == [{'indicador': 'KPI-G', 'valor': 50.0, 'cumple': False}]
@@ -0,0 +1,127 @@
+"""Avance ponderado por lote (``calculators_avance_ponderado``): mismo
+resultado que las properties por instancia, con queries fijas por proyecto."""
+
+from decimal import Decimal
+
+import pytest
+
+from apps.construccion.calculators_avance_ponderado import (
+    aplicar_avance_ponderado,
+    avance_ponderado_por_torre,
+    cargar_columnas_y_valores,
+)
+from apps.construccion.models import (
+    ColumnaConfigurable,
+    MontajeEstructuraTorre,
+    ObraCivilTorre,
+    ProyectoConstruccion,
+    TendidoTorre,
+    TorreConstruccion,
+)
+from apps.contratos.models import Contrato
+
+OC = ColumnaConfigurable.CAPITULO_OBRA_CIVIL
+CONDUCTOR = ColumnaConfigurable.CAPITULO_TENDIDO_CONDUCTOR
+FIBRA = ColumnaConfigurable.CAPITULO_TENDIDO_FIBRA
+
+
+@pytest.fixture
+def proyecto(db):
+    contrato = Contrato.objects.create(
+        unidad_negocio=Contrato.UnidadNegocio.CONSTRUCCION,
+        codigo="CT-AVANCE-LOTE",
+        nombre="Proyecto avance lote",
+        cliente="Cliente",
+        estado=Contrato.Estado.ACTIVO,
+    )
+    return ProyectoConstruccion.objects.create(
+        contrato=contrato, nombre="Proyecto avance lote", estado="EJECUCION",
+    )
+
+
+@pytest.fixture
+def torres(proyecto):
+    return [
+        TorreConstruccion.objects.create(proyecto=proyecto, numero=f"T-{i}", tipo="A")
+        for i in range(1, 6)
+    ]
+
+
+def _columna_custom(proyecto, capitulo, clave, tipo, peso):
+    return ColumnaConfigurable.objects.create(
+        proyecto=proyecto, capitulo=capitulo, clave=clave, etiqueta=clave,
+        peso_pct=peso, tipo_valor=tipo, orden=99,
+    )
+
+
+@pytest.mark.django_db
+class TestParidadConProperties:
+
+    def test_obra_civil_con_columnas_custom(self, proyecto, torres):
+        decimal = _columna_custom(proyecto, OC, "drenaje", ColumnaConfigurable.TIPO_DECIMAL, 10)
+        check = _columna_custom(proyecto, OC, "senal", ColumnaConfigurable.TIPO_BOOLEAN, 5)
+        for i, torre in enumerate(torres):
+            ObraCivilTorre.objects.create(
+                proyecto=proyecto, torre=torre,
+                avance_excavacion=Decimal("0.25") * (i % 5),
+                avance_vaciado=Decimal("1") if i % 2 else Decimal("0"),
+            )
+            if i % 2:
+                decimal.set_valor_para_torre(torre, Decimal("0.4"))
+            if i % 3 == 0:
+                check.set_valor_para_torre(torre, True)
+
+        lote = avance_ponderado_por_torre(proyecto, OC)
+
+        for oc in ObraCivilTorre.objects.filter(proyecto=proyecto):
+            assert lote[oc.torre_id] == oc.avance_ponderado
+
+    def test_montaje_columna_desactivada(self, proyecto, torres):
+        ColumnaConfigurable.objects.filter(
+            proyecto=proyecto, capitulo=ColumnaConfigurable.CAPITULO_MONTAJE, clave="revisada",
+        ).update(activa=False)
+        for torre in torres:
+            MontajeEstructuraTorre.objects.create(
+                proyecto=proyecto, torre=torre,
+                avance_prearamada=Decimal("1"), avance_revisada=Decimal("1"),
+            )
+
+        lote = avance_ponderado_por_torre(proyecto, ColumnaConfigurable.CAPITULO_MONTAJE)
+
+        for m in MontajeEstructuraTorre.objects.filter(proyecto=proyecto):
+            assert lote[m.torre_id] == m.avance_ponderado
+
+    def test_tendido_conductor_y_fibra(self, proyecto, torres):
+        custom = _columna_custom(proyecto, FIBRA, "empalme_extra", ColumnaConfigurable.TIPO_BOOLEAN, 15)
+        for i, torre in enumerate(torres):
+            TendidoTorre.objects.create(
+                proyecto=proyecto, torre=torre,
+                tendido_conductor=bool(i % 2), riega_manila_fibra=True, tendido_opgw=i > 2,
+            )
+            if i % 2 == 0:
+                custom.set_valor_para_torre(torre, True)
+
+        filas = list(TendidoTorre.objects.filter(proyecto=proyecto))
+        aplicar_avance_ponderado(proyecto, [CONDUCTOR, FIBRA], filas)
+
+        for fila in filas:
+            fresca = TendidoTorre.objects.get(pk=fila.pk)
+            assert fila.avance_conductor == fresca.avance_conductor
+            assert fila.avance_fibra == fresca.avance_fibra
+
+
+@pytest.mark.django_db
+def test_pesos_y_valores_en_una_query(proyecto, torres, django_assert_num_queries):
+    columna = _columna_custom(proyecto, OC, "drenaje", ColumnaConfigurable.TIPO_DECIMAL, 10)
+    for torre in torres:
+        columna.set_valor_para_torre(torre, Decimal("0.5"))
+        ObraCivilTorre.objects.create(proyecto=proyecto, torre=torre)
+    filas = list(ObraCivilTorre.objects.filter(proyecto=proyecto))
+
+    with django_assert_num_queries(1):
+        aplicar_avance_ponderado(proyecto, [OC], filas)
+        assert all(f.avance_ponderado > 0 for f in filas)
+
+    columnas, valores = cargar_columnas_y_valores(proyecto, [OC])
+    assert len(columnas[OC]) == 7
+    assert len(valores) == len(torres)
@@ -0,0 +1,153 @@
+"""Avance materializado por torre y fase (``AvanceTorreFase``) — los signals
+lo mantienen al día y los dashboards de ``calculators_avance_real`` leen de ahí."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from apps.construccion import calculators_avance_real as calc
+from apps.construccion.models import (
+    AvanceTorreFase,
+    FaseTorre,
+    MontajeEstructuraTorreDetalle,
+    ObraCivilTorreDetalle,
+    ProyectoConstruccion,
+    TendidoTorre,
+    TorreConstruccion,
+)
+from apps.contratos.models import Contrato
+
+
+@pytest.fixture
+def proyecto(db):
+    contrato = Contrato.objects.create(
+        unidad_negocio=Contrato.UnidadNegocio.CONSTRUCCION,
+        codigo="CT-AVANCE-MAT",
+        nombre="Proyecto avance materializado",
+        cliente="Cliente",
+        estado=Contrato.Estado.ACTIVO,
+    )
+    return ProyectoConstruccion.objects.create(
+        contrato=contrato, nombre="Proyecto avance materializado", estado="EJECUCION",
+    )
+
+
+@pytest.fixture
+def torres(proyecto):
+    return [
+        TorreConstruccion.objects.create(proyecto=proyecto, numero=f"T-{i}", tipo="A")
+        for i in range(1, 4)
+    ]
+
+
+def _avance(torre, fase):
+    return AvanceTorreFase.objects.get(torre=torre, fase=fase)
+
+
+@pytest.mark.django_db
+class TestMantenimientoPorSignals:
+
+    def test_patas_oc_promedian_y_se_retiran_al_borrar(self, proyecto, torres):
+        ObraCivilTorreDetalle.objects.create(
+            proyecto=proyecto, torre=torres[0], pata="A", exc_ejecutada_pct=Decimal("1"),
+        )
+        pata_b = ObraCivilTorreDetalle.objects.create(proyecto=proyecto, torre=torres[0], pata="B")
+
+        # Excavación pesa 30%: pata A = 0.30, pata B = 0 -> torre = 0.15.
+        assert _avance(torres[0], calc.FASE_OOCC).avance == Decimal("0.150000")
+        assert "Excavación" in _avance(torres[0], calc.FASE_OOCC).pendientes
+
+        pata_b.delete()
+        assert _avance(torres[0], calc.FASE_OOCC).avance == Decimal("0.300000")
+
+    def test_cambio_de_pesos_del_proyecto_rematerializa_oc(self, proyecto, torres):
+        ObraCivilTorreDetalle.objects.create(
+            proyecto=proyecto, torre=torres[0], pata="A", exc_ejecutada_pct=Decimal("1"),
+        )
+        proyecto.peso_excavacion_pct = 60
+        proyecto.peso_vaciado_pct = 0
+        proyecto.save()
+
+        assert _avance(torres[0], calc.FASE_OOCC).avance == Decimal("0.600000")
+
+    def test_montaje_guarda_tramo_de_gantt(self, proyecto, torres):
+        MontajeEstructuraTorreDetalle.objects.create(
+            proyecto=proyecto, torre=torres[1], prearmada_ok=True,
+            prearmado_fecha_inicio=date(2025, 2, 1), montaje_fecha_fin=date(2025, 2, 20),
+        )
+        avance = _avance(torres[1], calc.FASE_MONTAJE)
+        assert avance.avance == Decimal("0.200000")
+        assert (avance.fecha_inicio, avance.fecha_fin) == (date(2025, 2, 1), date(2025, 2, 20))
+
+    def test_tendido_y_fase_torre(self, proyecto, torres):
+        FaseTorre.objects.create(
+            proyecto=proyecto, torre=torres[2], tendido_conductor_a_fecha=date(2025, 3, 6),
+        )
+        assert _avance(torres[2], calc.FASE_TENDIDO).con_detalle is False
+
+        TendidoTorre.objects.create(
+            proyecto=proyecto, torre=torres[2], riega_manila_conductor=True, tendido_opgw=True,
+        )
+        avance = _avance(torres[2], calc.FASE_TENDIDO)
+        assert avance.con_detalle is True
+        assert avance.fecha_avance == date(2025, 3, 6)
+        assert avance.avance > 0
+
+
+@pytest.mark.django_db
+class TestLecturasDashboard:
+
+    def test_paridad_con_properties_del_detalle(self, proyecto, torres):
+        for torre in torres:
+            for pata in "AB":
+                ObraCivilTorreDetalle.objects.create(
+                    proyecto=proyecto, torre=torre, pata=pata,
+                    cerr_finalizado_ok=True, exc_ejecutada_pct=Decimal("0.5"),
+                )
+            MontajeEstructuraTorreDetalle.objects.create(
+                proyecto=proyecto, torre=torre, estructura_en_sitio_ok=True,
+            )
+
+        esperado_oc = sum(
+            float(d.avance_ponderado) for d in ObraCivilTorreDetalle.objects.all()
+        ) / 2 / len(torres) * 100
+        general = {f["seccion"]: f["pct"] for f in calc.avance_general(proyecto)["fases"]}
+        assert general["OBRA_CIVIL"] == round(esperado_oc, 2)
+        assert general["MONTAJE"] == 10.0
+
+        vista = calc.vista_por_torre(proyecto, calc.FASE_MONTAJE)
+        assert [fila["numero"] for fila in vista] == ["T-1", "T-2", "T-3"]
+        assert vista[0]["pendientes"] == ["Prearmada", "Torre montada", "Revisada"]
+
+    def test_respeta_aplica_sin_rematerializar(self, proyecto, torres):
+        for torre in torres:
+            MontajeEstructuraTorreDetalle.objects.create(
+                proyecto=proyecto, torre=torre, revisada_ok=True,
+            )
+        TorreConstruccion.objects.filter(pk=torres[0].pk).update(aplica=False)
+
+        ids = {fila["torre_id"] for fila in calc.vista_por_torre(proyecto, calc.FASE_MONTAJE)}
+        assert torres[0].pk not in ids
+        assert len(ids) == 2
+
+    def test_autocorrige_proyecto_sin_materializar(self, proyecto, torres):
+        MontajeEstructuraTorreDetalle.objects.create(
+            proyecto=proyecto, torre=torres[0], torre_montada_ok=True,
+        )
+        AvanceTorreFase.objects.all().delete()
+
+        assert calc.serie_curva_s_real(proyecto, calc.FASE_MONTAJE)["ejecutado"] == [15.0]
+        assert AvanceTorreFase.objects.filter(fase=calc.FASE_MONTAJE).count() == 1
+
+    def test_queries_no_escalan_con_torres(self, proyecto, django_assert_max_num_queries):
+        for i in range(12):
+            torre = TorreConstruccion.objects.create(proyecto=proyecto, numero=f"X-{i}")
+            for pata in "ABCD":
+                ObraCivilTorreDetalle.objects.create(proyecto=proyecto, torre=torre, pata=pata)
+            TendidoTorre.objects.create(proyecto=proyecto, torre=torre, tendido_conductor=True)
+
+        with django_assert_max_num_queries(4):
+            calc.vista_por_torre(proyecto, calc.FASE_TENDIDO)
+        with django_assert_max_num_queries(3):
+            calc.serie_curva_s_real(proyecto, calc.FASE_OOCC)
@@ -0,0 +1,140 @@
+"""Métricas de calidad de foto (``apps.campo.calidad_foto``): deterministas,
+independientes del tamaño de decodificación y compartidas por la
+validación asíncrona y ``PhotoValidator``. El corte de nitidez se valida
+con escenas de campo a distintas resoluciones y desenfoques (tiempos y
+memoria: ``manage.py benchmark_calidad_foto`` con fotos reales)."""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFilter
+
+from apps.campo.calidad_foto import MIN_NITIDEZ, medir, medir_bytes
+from apps.campo.tasks import validar_imagen_simple
+from apps.campo.validators import PhotoValidator
+
+
+def _escena(ancho=4032, alto=3024, desenfoque=0, ganancia=1.0):
+    """Foto "de campo" sintética: cielo en degradé, estructura con bordes
+    duros (cuadrícula tipo celosía) y ruido de sensor."""
+    rng = np.random.default_rng(11)
+    y = np.linspace(0, 1, alto, dtype=np.float32)[:, None]
+    x = np.linspace(0, 1, ancho, dtype=np.float32)[None, :]
+    cielo = 200 - 80 * y + 0 * x
+    celosia = ((np.arange(alto)[:, None] // 48 + np.arange(ancho)[None, :] // 48) % 2) * 70.0
+    mascara = (x > 0.35) & (x < 0.65)
+    gris = np.where(mascara, 60 + celosia, cielo)
+    rgb = np.stack([gris, gris * 0.95, gris * 0.9], axis=-1)
+    rgb = (rgb + 6 * rng.standard_normal(rgb.shape, dtype=np.float32)) * ganancia
+    imagen = Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8), 'RGB')
+    return _jpeg(imagen, desenfoque)
+
+
+def _jpeg(imagen, desenfoque=0):
+    if desenfoque:
+        imagen = imagen.filter(ImageFilter.GaussianBlur(desenfoque))
+    buffer = io.BytesIO()
+    imagen.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def _vegetacion(ancho, alto):
+    """Follaje: ruido suavizado en varias escalas, sin bordes duros."""
+    rng = np.random.default_rng(5)
+    gris = np.full((alto, ancho), 110.0, dtype=np.float32)
+    for escala, amplitud in ((256, 50), (64, 35), (16, 25), (4, 15)):
+        ruido = Image.fromarray(
+            rng.standard_normal((alto // escala + 2, ancho // escala + 2)).astype(np.float32)
+        ).resize((ancho + 2 * escala, alto + 2 * escala), Image.Resampling.BICUBIC)
+        gris += amplitud * np.asarray(ruido)[:alto, :ancho]
+    rgb = np.stack([gris * 0.7, gris, gris * 0.6], axis=-1)
+    return Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8), 'RGB')
+
+
+def _cables(ancho, alto):
+    """Cielo casi liso con conductores finos y una torre al costado."""
+    rng = np.random.default_rng(3)
+    y = np.linspace(0, 1, alto, dtype=np.float32)[:, None]
+    gris = np.repeat(210 - 60 * y, ancho, axis=1)
+    rgb = np.stack([gris * 0.85, gris * 0.92, gris], axis=-1)
+    rgb += 4 * rng.standard_normal(rgb.shape, dtype=np.float32)
+    imagen = Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8), 'RGB')
+    dibujo = ImageDraw.Draw(imagen)
+    trazo = max(3, ancho // 400)
+    for i in range(4):
+        y0 = alto * (0.2 + 0.15 * i)
+        dibujo.line([(0, y0), (ancho, y0 + alto * 0.1)], fill=(30, 30, 30), width=max(2, ancho // 800))
+    dibujo.rectangle([ancho * 0.75, alto * 0.3, ancho * 0.9, alto], outline=(40, 40, 40), width=trazo)
+    for k in range(10):
+        dibujo.line(
+            [(ancho * 0.75, alto * (0.3 + 0.07 * k)), (ancho * 0.9, alto * (0.37 + 0.07 * k))],
+            fill=(40, 40, 40), width=trazo,
+        )
+    return imagen
+
+
+@pytest.fixture(scope='module')
+def nitida():
+    return _escena()
+
+
+def test_determinista(nitida):
+    assert medir_bytes(nitida) == medir_bytes(nitida)
+
+
+def test_independiente_del_tamano_de_decodificacion(nitida):
+    completa = Image.open(io.BytesIO(nitida))
+    completa.load()
+
+    desde_archivo = medir_bytes(nitida)
+    desde_decodificada = medir(completa)
+
+    assert desde_archivo.iluminacion == pytest.approx(desde_decodificada.iluminacion, abs=0.02)
+    assert desde_archivo.contraste == pytest.approx(desde_decodificada.contraste, abs=0.02)
+    assert desde_archivo.es_valida == desde_decodificada.es_valida
+
+
+def test_detecta_borrosa_oscura_y_nitida(nitida):
+    assert medir_bytes(nitida).es_valida
+
+    borrosa = medir_bytes(_escena(1600, 1200, desenfoque=12))
+    assert borrosa.nitidez < MIN_NITIDEZ
+    assert borrosa.mensaje == 'Imagen borrosa'
+
+    oscura = medir_bytes(_escena(1600, 1200, ganancia=0.1))
+    assert oscura.mensaje == 'Imagen muy oscura'
+
+
+def test_ambos_validadores_usan_las_mismas_metricas(nitida):
+    metricas = medir_bytes(nitida)
+
+    simple = validar_imagen_simple(Image.open(io.BytesIO(nitida)))
+    resultado = PhotoValidator(nitida).validate()
+
+    assert simple['nitidez'] == resultado.metadata['sharpness'] == round(metricas.nitidez, 2)
+    assert simple['iluminacion'] == resultado.metadata['brightness'] == round(metricas.iluminacion, 2)
+    assert simple['contraste'] == resultado.metadata['contrast'] == round(metricas.contraste, 2)
+
+
+@pytest.mark.parametrize('escena', [_vegetacion, _cables])
+@pytest.mark.parametrize('ancho, alto', [(4032, 3024), (1600, 1200)])
+def test_corte_de_nitidez_en_escenas_de_campo(escena, ancho, alto):
+    """Desenfoque en px equivalentes a una foto de 12 MP: hasta 2 px sigue
+    siendo nítida, desde 8 px es borrosa, en cualquier resolución."""
+    base = escena(ancho, alto)
+    escala = ancho / 4032
+
+    for desenfoque in (0, 2):
+        assert medir_bytes(_jpeg(base, desenfoque * escala)).es_valida
+    for desenfoque in (8, 12):
+        assert medir_bytes(_jpeg(base, desenfoque * escala)).mensaje == 'Imagen borrosa'
+
+
+def test_jpeg_grande_no_se_decodifica_completo(nitida):
+    imagen = Image.open(io.BytesIO(nitida))
+
+    medir(imagen)
+
+    # Draft mode: libjpeg entregó una versión reducida, no los 12 MP.
+    assert max(imagen.size) < 4032
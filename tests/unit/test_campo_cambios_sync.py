@@ -0,0 +1,98 @@
+"""Tests del change-feed móvil (``apps.campo.sync.cambios_desde``)."""
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.actividades.models import Actividad
+from apps.campo.sync import MARGEN_CURSOR, CursorInvalido, cambios_desde
+from apps.lineas.models import Torre
+from tests.factories import ActividadFactory, TorreFactory
+
+
+def _envejecer():
+    """Lo creado por los fixtures pasa a ser anterior al margen del cursor."""
+    hace_una_hora = timezone.now() - timedelta(hours=1)
+    Actividad.objects.update(updated_at=hace_una_hora)
+    Torre.objects.update(updated_at=hace_una_hora)
+
+
+@pytest.mark.django_db
+class TestCambiosDesde:
+
+    def test_sync_inicial_y_cursor_sin_cambios(self, cuadrilla, actividad_pendiente):
+        _envejecer()
+        inicial = cambios_desde(cuadrilla)
+
+        assert [a["id"] for a in inicial["actividades"]] == [actividad_pendiente.id]
+        assert actividad_pendiente.torre_id in {t["id"] for t in inicial["torres"]}
+        assert inicial["has_more"] is False
+
+        siguiente = cambios_desde(cuadrilla, cursor=inicial["cursor"])
+        assert siguiente["actividades"] == []
+        assert siguiente["torres"] == []
+        assert siguiente["eliminados"] == []
+
+    def test_solo_devuelve_lo_modificado(self, cuadrilla, actividad_pendiente):
+        otra = ActividadFactory(cuadrilla=cuadrilla, linea=actividad_pendiente.linea)
+        _envejecer()
+        cursor = cambios_desde(cuadrilla)["cursor"]
+
+        otra.estado = "EN_CURSO"
+        otra.save(update_fields=["estado", "updated_at"])
+        cambios = cambios_desde(cuadrilla, cursor=cursor)
+
+        assert [a["id"] for a in cambios["actividades"]] == [otra.id]
+        assert cambios["actividades"][0]["estado"] == "EN_CURSO"
+
+    def test_excluye_otras_cuadrillas(self, cuadrilla, actividad_pendiente):
+        ajena = ActividadFactory()
+
+        ids = {a["id"] for a in cambios_desde(cuadrilla)["actividades"]}
+
+        assert actividad_pendiente.id in ids
+        assert ajena.id not in ids
+
+    def test_eliminacion_genera_tombstone(self, cuadrilla, actividad_pendiente):
+        torre_extra = TorreFactory(linea=actividad_pendiente.linea)
+        cursor = cambios_desde(cuadrilla)["cursor"]
+
+        torre_id = torre_extra.id
+        torre_extra.delete()
+        cambios = cambios_desde(cuadrilla, cursor=cursor)
+
+        assert {"entidad": "torres", "id": torre_id} in cambios["eliminados"]
+
+    def test_paginacion_por_keyset(self, cuadrilla, actividad_pendiente):
+        for _ in range(2):
+            ActividadFactory(cuadrilla=cuadrilla, linea=actividad_pendiente.linea)
+
+        vistos = []
+        cursor = ""
+        for _ in range(5):
+            pagina = cambios_desde(cuadrilla, cursor=cursor, limite=1)
+            vistos.extend(a["id"] for a in pagina["actividades"])
+            cursor = pagina["cursor"]
+            if not pagina["has_more"]:
+                break
+
+        assert len(vistos) == 3
+        assert len(set(vistos)) == 3
+
+    def test_commit_tardio_dentro_del_margen(self, cuadrilla, actividad_pendiente):
+        cursor = cambios_desde(cuadrilla)["cursor"]
+        # Escrita (updated_at) antes que la última entregada, pero confirmada
+        # después de la llamada anterior.
+        tardia = ActividadFactory(cuadrilla=cuadrilla, linea=actividad_pendiente.linea)
+        Actividad.objects.filter(pk=tardia.pk).update(
+            updated_at=actividad_pendiente.updated_at - MARGEN_CURSOR / 2,
+        )
+
+        ids = {a["id"] for a in cambios_desde(cuadrilla, cursor=cursor)["actividades"]}
+
+        assert tardia.id in ids
+
+    def test_cursor_invalido(self, cuadrilla):
+        with pytest.raises(CursorInvalido):
+            cambios_desde(cuadrilla, cursor="no-es-un-cursor")
@@ -0,0 +1,96 @@
+"""Tests del sync masivo de registros de campo (``apps.campo.sync``)."""
+
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from apps.actividades.models import HistorialIntervencion
+from apps.campo.api import RegistroIn
+from apps.campo.sync import sincronizar_registros_lote
+from tests.factories import ActividadEnCursoFactory, RegistroCampoFactory
+
+
+def _payload(actividad, avance="0", **extra):
+    return RegistroIn(
+        actividad_id=actividad.id,
+        datos_formulario={"estado_torre": "Bueno"},
+        observaciones="Sync lote",
+        latitud_fin=Decimal("10.12345678"),
+        longitud_fin=Decimal("-74.87654321"),
+        porcentaje_avance_reportado=Decimal(avance),
+        **extra,
+    )
+
+
+@pytest.mark.django_db
+class TestSincronizarRegistrosLote:
+
+    def test_actualiza_registro_y_actividad(self, liniero_user):
+        registro = RegistroCampoFactory(usuario=liniero_user)
+        actividad = registro.actividad
+
+        resultados = sincronizar_registros_lote([_payload(actividad, "100")])
+
+        assert resultados == [{
+            "id": str(actividad.id),
+            "status": "ok",
+            "message": "Sincronizado correctamente",
+        }]
+        registro.refresh_from_db()
+        actividad.refresh_from_db()
+        assert registro.sincronizado is True
+        assert registro.fecha_sincronizacion is not None
+        assert registro.observaciones == "Sync lote"
+        assert actividad.porcentaje_avance == Decimal("100")
+        assert actividad.estado == "COMPLETADA"
+
+    def test_avance_menor_no_retrocede_actividad(self, liniero_user):
+        registro = RegistroCampoFactory(usuario=liniero_user)
+        actividad = registro.actividad
+        actividad.porcentaje_avance = Decimal("60")
+        actividad.save(update_fields=["porcentaje_avance"])
+
+        sincronizar_registros_lote([_payload(actividad, "30")])
+
+        actividad.refresh_from_db()
+        assert actividad.porcentaje_avance == Decimal("60")
+        assert actividad.estado == "EN_CURSO"
+
+    def test_registro_inexistente_conserva_contrato_por_registro(self, liniero_user):
+        registro = RegistroCampoFactory(usuario=liniero_user)
+        huerfana = ActividadEnCursoFactory()
+        inexistente = uuid.uuid4()
+
+        payload = [_payload(registro.actividad), _payload(huerfana)]
+        payload.append(_payload(registro.actividad).model_copy(update={"actividad_id": inexistente}))
+        resultados = sincronizar_registros_lote(payload)
+
+        assert [r["status"] for r in resultados] == ["ok", "error", "error"]
+        assert resultados[1]["message"] == "Registro no encontrado"
+        assert resultados[2]["id"] == str(inexistente)
+
+    def test_historial_e_inspeccion_una_vez_por_lote(self, liniero_user):
+        registros = [RegistroCampoFactory(usuario=liniero_user) for _ in range(3)]
+
+        sincronizar_registros_lote([_payload(r.actividad) for r in registros])
+        # Re-sincronizar no duplica historial.
+        sincronizar_registros_lote([_payload(r.actividad) for r in registros])
+
+        assert HistorialIntervencion.objects.filter(
+            registro_campo__in=[r.pk for r in registros]
+        ).count() == 3
+        for r in registros:
+            r.actividad.torre.refresh_from_db()
+            r.actividad.linea.refresh_from_db()
+            assert r.actividad.torre.last_inspection_date == r.fecha_inicio.date()
+            assert r.actividad.linea.last_inspection_date == r.fecha_inicio.date()
+
+    def test_queries_no_escalan_con_el_lote(self, liniero_user, django_assert_max_num_queries):
+        registros = [RegistroCampoFactory(usuario=liniero_user) for _ in range(25)]
+        payload = [_payload(r.actividad) for r in registros]
+
+        with django_assert_max_num_queries(15):
+            resultados = sincronizar_registros_lote(payload)
+
+        assert all(r["status"] == "ok" for r in resultados)
@@ -0,0 +1,56 @@
+"""Contexto global del sidebar cacheado y versionado: los context processors
+no consultan la BD en cada render y las señales invalidan al guardar."""
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from apps.construccion.models import ProyectoConstruccion
+from apps.contratos.models import Contrato
+from apps.core.cache import invalidate_contexto_global
+from apps.core.context_processors import modulo_context
+from apps.pagos.context_processors import recordatorio_pago
+
+
+def _request(user=None):
+    request = RequestFactory().get('/')
+    request.session = {}
+    request.user = user or AnonymousUser()
+    return request
+
+
+def _contrato(codigo, unidad=Contrato.UnidadNegocio.MANTENIMIENTO):
+    return Contrato.objects.create(
+        unidad_negocio=unidad, codigo=codigo, nombre=f'Contrato {codigo}',
+        cliente='Cliente', estado=Contrato.Estado.ACTIVO,
+    )
+
+
+@pytest.mark.django_db
+class TestContextoGlobal:
+
+    @pytest.fixture(autouse=True)
+    def _limpiar(self):
+        invalidate_contexto_global()
+
+    def test_renders_siguientes_no_consultan(self, admin_user, django_assert_num_queries):
+        _contrato('CTX-M-1')
+        modulo_context(_request())
+
+        request = _request(admin_user)
+        with django_assert_num_queries(0):
+            ctx = modulo_context(request)
+            recordatorio_pago(request)
+
+        assert [c.codigo for c in ctx['contratos_mantenimiento']] == ['CTX-M-1']
+
+    def test_guardar_invalida(self):
+        contrato = _contrato('CTX-C-1', Contrato.UnidadNegocio.CONSTRUCCION)
+        assert modulo_context(_request())['proyectos_construccion'] == []
+
+        ProyectoConstruccion.objects.create(contrato=contrato, nombre='P', estado='EJECUCION')
+        assert [p.contrato.codigo for p in modulo_context(_request())['proyectos_construccion']] == ['CTX-C-1']
+
+        contrato.estado = Contrato.Estado.FINALIZADO
+        contrato.save()
+        assert modulo_context(_request())['contratos_construccion'] == []
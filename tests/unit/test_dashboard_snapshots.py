@@ -0,0 +1,98 @@
+"""Snapshots del Dashboard de Indicadores (``apps.indicadores.snapshots``):
+la segunda visita sale de la cache, las escrituras invalidan por versión y
+el precálculo deja listo el cambio de mes."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.indicadores.models import MedicionIndicador
+from apps.indicadores.snapshots import (
+    combinaciones_frecuentes,
+    obtener_snapshot,
+    precalcular_snapshots,
+)
+from tests.factories import ActividadFactory
+
+ANIO, MES = 2026, 3
+
+
+@pytest.mark.django_db
+def test_segunda_visita_sale_del_snapshot(client, admin_user, linea, tipo_actividad, cuadrilla):
+    ActividadFactory(
+        linea=linea, tipo_actividad=tipo_actividad, cuadrilla=cuadrilla,
+        fecha_programada=date(ANIO, MES, 10), estado='COMPLETADA',
+    )
+    client.force_login(admin_user)
+    url = reverse('indicadores:dashboard')
+
+    with CaptureQueriesContext(connection) as primera:
+        resp = client.get(url, {'anio': ANIO, 'mes': MES})
+    assert resp.context['kpis']['actividades_programadas'] == 1
+    assert resp.context['actividades_stats']['completadas'] == 1
+
+    with CaptureQueriesContext(connection) as segunda:
+        client.get(url, {'anio': ANIO, 'mes': MES})
+    assert len(segunda) < len(primera)
+
+    # Una actividad nueva (post_save) invalida el snapshot.
+    ActividadFactory(
+        linea=linea, tipo_actividad=tipo_actividad, cuadrilla=cuadrilla,
+        fecha_programada=date(ANIO, MES, 20), estado='PENDIENTE',
+    )
+    resp = client.get(url, {'anio': ANIO, 'mes': MES})
+    assert resp.context['kpis']['actividades_programadas'] == 2
+    assert resp.context['actividades_stats']['pendientes'] == 1
+
+
+@pytest.mark.django_db
+def test_medicion_nueva_invalida_el_snapshot(indicadores_base, linea):
+    assert obtener_snapshot(ANIO, MES, MES)['indicadores_data'] == []
+
+    MedicionIndicador.objects.create(
+        indicador=indicadores_base['gestion'], linea=linea, anio=ANIO, mes=MES,
+        valor_calculado=Decimal('97.5'),
+    )
+
+    [dato] = obtener_snapshot(ANIO, MES, MES)['indicadores_data']
+    assert dato['valor'] == 97.5
+
+
+@pytest.mark.django_db
+def test_cambio_de_mes_lee_snapshot_precalculado(django_assert_num_queries):
+    combinaciones = combinaciones_frecuentes(date(ANIO, MES, 17))
+
+    assert precalcular_snapshots(combinaciones) == len(combinaciones)
+    # Ya armados: una segunda pasada no recalcula nada.
+    assert precalcular_snapshots(combinaciones) == 0
+
+    with django_assert_num_queries(0):
+        obtener_snapshot(ANIO, 7, 7)
+
+
+@pytest.mark.django_db
+def test_actividad_solo_invalida_sus_meses(
+    linea, tipo_actividad, cuadrilla, django_assert_num_queries,
+):
+    actividad = ActividadFactory(
+        linea=linea, tipo_actividad=tipo_actividad, cuadrilla=cuadrilla,
+        fecha_programada=date(ANIO, MES, 10),
+    )
+    assert obtener_snapshot(ANIO, MES, MES)['kpis']['actividades_programadas'] == 1
+
+    # Seis meses después ya no entra ni en la tendencia de marzo.
+    ActividadFactory(
+        linea=linea, tipo_actividad=tipo_actividad, cuadrilla=cuadrilla,
+        fecha_programada=date(ANIO, MES + 6, 1),
+    )
+    with django_assert_num_queries(0):
+        obtener_snapshot(ANIO, MES, MES)
+
+    # Reprogramada fuera de marzo: el mes de origen también se invalida.
+    actividad.fecha_programada = date(ANIO, MES + 6, 2)
+    actividad.save()
+    assert obtener_snapshot(ANIO, MES, MES)['kpis']['actividades_programadas'] == 0
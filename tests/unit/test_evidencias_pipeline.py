@@ -0,0 +1,95 @@
+"""Pipeline de evidencias (``apps.campo.evidencias``): una sola
+decodificación —en draft mode para JPEG— produce miniatura, preview,
+versión estampada y validación."""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+from apps.campo import evidencias
+from apps.campo.evidencias import (
+    ESTAMPADA_MAX_LADO,
+    PREVIEW_MAX_LADO,
+    THUMB_MAX_LADO,
+    decodificar,
+    procesar_imagen,
+)
+
+
+def _foto(ancho=4032, alto=3024, formato='JPEG'):
+    rng = np.random.default_rng(7)
+    pixeles = rng.integers(40, 220, size=(alto, ancho, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixeles).save(buffer, format=formato)
+    return buffer.getvalue()
+
+
+def _lado_mayor(jpeg):
+    return max(Image.open(io.BytesIO(jpeg)).size)
+
+
+def test_draft_mode_reduce_el_decode_sin_bajar_del_objetivo():
+    imagen, formato, tamano = decodificar(_foto(), ESTAMPADA_MAX_LADO)
+
+    assert formato == 'JPEG'
+    assert tamano == (4032, 3024)
+    # 1/2 de la resolución: 4x menos píxeles que el original.
+    assert imagen.size == (2016, 1512)
+    assert imagen.mode == 'RGB'
+
+
+def test_png_se_decodifica_completo():
+    imagen, formato, _ = decodificar(_foto(800, 600, 'PNG'), THUMB_MAX_LADO)
+
+    assert formato == 'PNG'
+    assert imagen.size == (800, 600)
+
+
+def test_una_sola_decodificacion_produce_todas_las_versiones(monkeypatch):
+    aperturas = []
+    abrir = Image.open
+    monkeypatch.setattr(Image, 'open', lambda *a, **k: aperturas.append(1) or abrir(*a, **k))
+
+    salida = procesar_imagen(_foto(), texto='Torre: T-1 | Línea: L-1')
+
+    assert len(aperturas) == 1
+    assert _lado_mayor(salida['estampada']) == ESTAMPADA_MAX_LADO
+    assert _lado_mayor(salida['preview']) == PREVIEW_MAX_LADO
+    assert _lado_mayor(salida['thumb']) == THUMB_MAX_LADO
+    assert set(salida['validacion']) >= {'valida', 'nitidez', 'iluminacion', 'contraste'}
+
+
+def test_sin_texto_no_estampa_y_apunta_al_preview():
+    salida = procesar_imagen(_foto())
+
+    assert salida['estampada'] is None
+    assert _lado_mayor(salida['preview']) == PREVIEW_MAX_LADO
+
+
+def test_procesar_evidencia_sube_cada_version(monkeypatch):
+    from types import SimpleNamespace
+
+    subidas = {}
+    monkeypatch.setattr('apps.core.utils.download_from_gcs', lambda url: _foto(1000, 800))
+    monkeypatch.setattr(
+        'apps.core.utils.upload_to_gcs',
+        lambda contenido, ruta: subidas.setdefault(ruta, f'https://cdn/{ruta}'),
+    )
+    monkeypatch.setattr(evidencias, 'texto_estampa', lambda evidencia: 'Torre: T-1')
+
+    guardado = {}
+    evidencia = SimpleNamespace(
+        url_original='https://cdn/media/evidencias/r/ANTES/f.jpg',
+        url_thumbnail='', url_preview='', url_estampada='', validacion_ia={},
+        save=lambda update_fields: guardado.setdefault('campos', update_fields),
+    )
+
+    evidencias.procesar_evidencia(evidencia)
+
+    assert evidencia.url_thumbnail.endswith('/thumbs/r/ANTES/f.jpg')
+    assert evidencia.url_preview.endswith('/previews/r/ANTES/f.jpg')
+    assert evidencia.url_estampada.endswith('/estampadas/r/ANTES/f.jpg')
+    assert set(guardado['campos']) == {
+        'validacion_ia', 'updated_at', 'url_thumbnail', 'url_preview', 'url_estampada',
+    }
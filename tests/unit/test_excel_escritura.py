@@ -0,0 +1,110 @@
+"""Escritura de Excel en streaming (``apps.core.excel_escritura``): libro
+write-only con estilos con nombre, archivo temporal enviado por chunks y
+export horizontal por lotes con queries constantes."""
+
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
+
+from apps.actividades.exporters import ProgramacionSemanalHorizontalExporter
+from apps.core.excel_escritura import (
+    CONTENT_TYPE_XLSX,
+    LibroStreaming,
+    celda,
+    estilo_relleno,
+    respuesta_xlsx,
+)
+from apps.cuadrillas.models import Cargo, Cuadrilla, CuadrillaMiembro
+
+
+def test_estilos_con_nombre_y_anchos():
+    libro = LibroStreaming({'completo': estilo_relleno('006400', texto_blanco=True)})
+    hoja = libro.hoja('Sem 02-2026', [5, 28])
+    hoja.fila(['#', 'ACTIVIDAD'], estilo='encabezado')
+    hoja.fila([1, celda('Poda', 'completo')])
+    hoja.vacias()
+    libro.hoja('Resumen').fila([celda('RESUMEN', 'titulo')])
+
+    salida = libro.guardar()
+    assert salida.tell() == 0
+    wb = load_workbook(salida)
+
+    ws = wb['Sem 02-2026']
+    assert wb.sheetnames == ['Sem 02-2026', 'Resumen']
+    assert [c.value for c in ws[1]] == ['#', 'ACTIVIDAD']
+    assert ws['A1'].style == 'encabezado'
+    assert ws['A1'].font.bold
+    assert ws['B2'].style == 'completo'
+    assert ws['B2'].fill.fgColor.rgb.endswith('006400')
+    assert ws['A2'].style == 'Normal'
+    assert ws.column_dimensions['B'].width == 28
+    assert wb['Resumen']['A1'].font.size == 14
+
+
+def test_titulo_de_hoja_truncado_a_31():
+    libro = LibroStreaming()
+    libro.hoja('x' * 40).fila(['a'])
+    assert load_workbook(libro.guardar()).sheetnames == ['x' * 31]
+
+
+def test_respuesta_por_chunks():
+    libro = LibroStreaming()
+    libro.hoja('Datos').fila(['a', 'b'])
+
+    respuesta = respuesta_xlsx(libro.guardar(), 'programacion.xlsx')
+
+    assert respuesta.streaming
+    assert respuesta['Content-Type'] == CONTENT_TYPE_XLSX
+    assert respuesta['Content-Disposition'] == 'attachment; filename="programacion.xlsx"'
+    assert b''.join(respuesta.streaming_content).startswith(b'PK')
+
+
+def _bloques(cantidad, usuario, inicio=date(2026, 1, 5)):
+    # tests/unit no tiene el seed de cargos de apps/cuadrillas/conftest.py.
+    Cargo.objects.get_or_create(codigo='LINIERO_I', defaults={'nombre': 'Liniero I'})
+    for i in range(cantidad):
+        cuadrilla = Cuadrilla.objects.create(
+            codigo=f'02-2026-{i:04d}-EXW',
+            nombre='MANTENIMIENTO - EXW',
+            activa=True,
+            observaciones='Avisos: 1001 | Orden: 77',
+            fecha=inicio + timedelta(days=i % 5),
+        )
+        CuadrillaMiembro.objects.create(
+            cuadrilla=cuadrilla,
+            usuario=usuario,
+            rol_cuadrilla_id='LINIERO_I',
+            cargo='JT_CTA',
+            costo_dia=0,
+            fecha_inicio=cuadrilla.fecha,
+            activo=True,
+        )
+
+
+@pytest.mark.django_db
+def test_export_rango_con_queries_constantes(liniero_user):
+    exporter = ProgramacionSemanalHorizontalExporter()
+    rango = (date(2026, 1, 1), date(2026, 1, 31))
+
+    _bloques(2, liniero_user)
+    with CaptureQueriesContext(connection) as pocos:
+        exporter.generar_excel_rango(*rango)
+
+    Cuadrilla.objects.all().delete()
+    _bloques(12, liniero_user)
+    with CaptureQueriesContext(connection) as muchos:
+        salida = exporter.generar_excel_rango(*rango)
+
+    # Celulares y miembros por lote, no por bloque.
+    assert len(muchos) == len(pocos)
+
+    ws = load_workbook(salida).active
+    filas = list(ws.iter_rows(values_only=True))
+    assert list(filas[0]) == exporter.HEADERS
+    assert len(filas) == 1 + 12
+    assert [f[0] for f in filas[1:]] == list(range(1, 13))
+    assert filas[1][12] == '1001'
+    assert filas[1][13] == '77'
@@ -0,0 +1,130 @@
+"""Lectura de Excel en streaming (``apps.core.excel_streaming``): filas en
+lotes sin materializar la hoja y celdas combinadas sin cargar el libro
+completo (``read_only`` no expone ``merged_cells``)."""
+
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook
+
+from apps.actividades.importers import (
+    AvancesImporter,
+    ImportadorExcelGenerico,
+    ProgramacionSemanalImporter,
+)
+from apps.core.excel_streaming import (
+    abrir_libro,
+    en_lotes,
+    filas_numeradas,
+    rangos_combinados,
+)
+
+
+def _xlsx(hojas):
+    """``hojas``: ``{nombre: (filas, ['A3:A5', ...])}`` → BytesIO .xlsx."""
+    wb = Workbook()
+    wb.remove(wb.active)
+    for nombre, (filas, merges) in hojas.items():
+        ws = wb.create_sheet(nombre)
+        for fila in filas:
+            ws.append(fila)
+        for ref in merges:
+            ws.merge_cells(ref)
+    buf = BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    return buf
+
+
+class TestRangosCombinados:
+
+    def test_devuelve_los_merges_de_cada_hoja(self):
+        archivo = _xlsx({
+            '05': ([['#'], [1], [None], [None], [2]], ['A2:A4', 'C1:D1']),
+            'Hoja1': ([['x']], []),
+        })
+
+        rangos = rangos_combinados(archivo)
+
+        assert sorted(r.coord for r in rangos['05']) == ['A2:A4', 'C1:D1']
+        assert rangos['Hoja1'] == []
+        # El archivo queda rebobinado para la lectura en streaming.
+        assert archivo.tell() == 0
+
+    def test_filtra_por_hojas(self):
+        archivo = _xlsx({
+            '05': ([[1], [None]], ['A1:A2']),
+            '06': ([[1], [None]], ['A1:A2']),
+        })
+        assert set(rangos_combinados(archivo, hojas={'06'})) == {'06'}
+
+    def test_archivo_no_xlsx_devuelve_vacio(self):
+        assert rangos_combinados(BytesIO(b'no es un zip')) == {}
+
+
+class TestFilasEnLotes:
+
+    def test_lotes_de_tamano_fijo_con_numeracion_excel(self):
+        archivo = _xlsx({'datos': ([['h']] + [[i] for i in range(1, 8)], [])})
+        sheet = abrir_libro(archivo)['datos']
+
+        filas = filas_numeradas(sheet)
+        assert next(filas) == (1, ('h',))
+        lotes = list(en_lotes(filas, tamano=3))
+
+        assert [len(lote) for lote in lotes] == [3, 3, 1]
+        assert lotes[0][0] == (2, (1,))
+        assert lotes[-1][-1] == (8, (7,))
+
+    def test_en_lotes_vacio(self):
+        assert list(en_lotes(iter([]))) == []
+
+
+class TestImportadoresStreaming:
+
+    def test_leer_excel_generico_aplica_mapping(self):
+        archivo = _xlsx({'datos': ([['Aviso', 'Nota'], ['123', 'ok'], ['456', None]], [])})
+
+        data = ImportadorExcelGenerico({'aviso': 'aviso_sap'}).leer_excel(archivo)
+
+        assert data == [
+            {'aviso_sap': '123', 'Nota': 'ok'},
+            {'aviso_sap': '456', 'Nota': None},
+        ]
+
+    def test_avances_sin_columna_aviso_reporta_encabezado(self, monkeypatch):
+        archivo = _xlsx({'datos': ([['Avance', 'Estado'], [50, 'en curso']], [])})
+        libros = []
+        monkeypatch.setattr(
+            'apps.actividades.importers.abrir_libro',
+            lambda archivo: libros.append(abrir_libro(archivo)) or libros[-1],
+        )
+
+        resultado = AvancesImporter().importar(archivo)
+
+        assert resultado['exito'] is False
+        assert resultado['columnas_recibidas'] == ['Avance', 'Estado']
+        # El retorno temprano también cierra el libro (read_only deja el
+        # zip abierto hasta ``close``).
+        assert libros[0]._archive.fp is None
+
+    def test_mapa_bloques_desde_rangos_de_la_pre_pasada(self):
+        archivo = _xlsx({'05': ([['#']] + [[None]] * 6, ['A3:A5', 'D6:D7'])})
+        merges = rangos_combinados(archivo)['05']
+
+        mapa = ProgramacionSemanalImporter._mapa_bloques_por_merge(merges, 0, 3)
+
+        assert mapa == {3: 'inicio', 4: 'continuacion', 5: 'continuacion'}
+        assert ProgramacionSemanalImporter._mapa_bloques_por_merge(merges, 1, 3) == {
+            6: 'inicio', 7: 'continuacion',
+        }
+
+
+@pytest.mark.django_db
+def test_programacion_semanal_hoja_sin_header_en_streaming():
+    archivo = _xlsx({'05': ([['Banner'], ['otro'], ['nada'], ['x']], [])})
+
+    resultado = ProgramacionSemanalImporter().importar(archivo)
+
+    assert resultado['exito'] is True
+    assert resultado['resumen_por_hoja']['05']['nota'] == 'sin header'
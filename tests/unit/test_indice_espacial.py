@@ -0,0 +1,120 @@
+"""Índice espacial por línea (``apps.lineas.indice_espacial``): torre y vano
+más cercanos sin consultar la BD, e invalidación al editar la línea."""
+
+import math
+import random
+from decimal import Decimal
+
+import pytest
+
+from apps.lineas.indice_espacial import IndiceLinea, indice_linea, torre_cercana, vano_cercano
+from apps.lineas.models import Linea, Torre, Vano
+
+
+def _linea_sintetica(n=500, seed=3):
+    """Línea en zigzag de ~200 km con vanos entre torres consecutivas."""
+    rng = random.Random(seed)
+    torres, lat, lon = [], 10.0, -74.0
+    for i in range(n):
+        lat += 0.0035 + rng.uniform(-0.0005, 0.0005)
+        lon += rng.uniform(-0.002, 0.002)
+        torres.append((i, str(i + 1), lat, lon))
+    vanos = [(1000 + i, str(i + 1), i, i + 1) for i in range(n - 1)]
+    return torres, vanos
+
+
+def _bruto(indice, lat, lon):
+    x, y = indice._proyectar(lat, lon)
+    return min(indice.torres, key=lambda t: math.hypot(x - t[2], y - t[3]))[0]
+
+
+def test_coincide_con_busqueda_exhaustiva():
+    torres, vanos = _linea_sintetica()
+    indice = IndiceLinea(torres, vanos)
+    rng = random.Random(9)
+
+    for _ in range(300):
+        _, _, lat, lon = rng.choice(torres)
+        lat += rng.uniform(-0.01, 0.01)
+        lon += rng.uniform(-0.01, 0.01)
+        assert indice.torre_cercana(lat, lon).torre_id == _bruto(indice, lat, lon)
+
+
+def test_punto_lejano_y_linea_vacia():
+    torres, vanos = _linea_sintetica(50)
+    indice = IndiceLinea(torres, vanos)
+
+    lejos = indice.torre_cercana(0.0, -60.0)
+    assert lejos.torre_id == _bruto(indice, 0.0, -60.0)
+
+    vacio = IndiceLinea([], [])
+    assert vacio.torre_cercana(10, -74) is None
+    assert vacio.vano_cercano(10, -74) is None
+
+
+def test_vano_cercano_sobre_el_segmento():
+    torres = [(1, '1', 10.0, -74.0), (2, '2', 10.0, -73.99), (3, '3', 10.01, -73.99)]
+    indice = IndiceLinea(torres, [('a', '1', 1, 2), ('b', '2', 2, 3), ('c', '3', 3, None)])
+
+    # A mitad del primer vano, 11 m al sur: más cerca del vano que de las torres.
+    vano = indice.vano_cercano(9.9999, -73.995)
+    assert vano.vano_id == 'a'
+    assert vano.distancia_m == pytest.approx(11.1, abs=0.5)
+    assert indice.torre_cercana(9.9999, -73.995).distancia_m > 500
+    # El vano sin torre_fin no se indexa.
+    assert len(indice.vanos) == 2
+
+
+@pytest.fixture
+def linea(db):
+    linea = Linea.objects.create(
+        codigo='LT-IDX', nombre='Línea índice', cliente='TRANSELCA', tension_kv=220,
+    )
+    t1 = Torre.objects.create(linea=linea, numero='1', latitud=Decimal('10.9'), longitud=Decimal('-74.8'))
+    t2 = Torre.objects.create(linea=linea, numero='2', latitud=Decimal('10.904'), longitud=Decimal('-74.8'))
+    Vano.objects.create(linea=linea, numero='1', torre_inicio=t1, torre_fin=t2)
+    return linea
+
+
+@pytest.mark.django_db
+def test_consultas_repetidas_no_tocan_la_bd(linea, django_assert_num_queries):
+    indice_linea(linea.id)
+
+    with django_assert_num_queries(0):
+        assert torre_cercana(linea.id, 10.9005, -74.8).numero == '1'
+        assert vano_cercano(linea.id, 10.902, -74.8001).numero == '1'
+
+
+@pytest.mark.django_db
+def test_editar_torre_invalida(linea):
+    assert torre_cercana(linea.id, 10.95, -74.8).numero == '2'
+
+    Torre.objects.create(linea=linea, numero='3', latitud=Decimal('10.95'), longitud=Decimal('-74.8'))
+
+    assert torre_cercana(linea.id, 10.95, -74.8).numero == '3'
+
+
+@pytest.mark.django_db
+def test_cambio_de_estado_del_vano_no_invalida(linea):
+    anterior = indice_linea(linea.id)
+    vano = Vano.objects.get(linea=linea)
+    vano.estado = Vano.Estado.EJECUTADO
+    vano.save(update_fields=['estado'])
+
+    assert indice_linea(linea.id) is anterior
+
+
+@pytest.mark.django_db
+def test_torre_que_cambia_de_linea_invalida_ambas(linea):
+    otra = Linea.objects.create(
+        codigo='LT-IDX2', nombre='Otra línea', cliente='TRANSELCA', tension_kv=220,
+    )
+    assert torre_cercana(linea.id, 10.904, -74.8).numero == '2'
+    assert torre_cercana(otra.id, 10.904, -74.8) is None
+
+    torre = Torre.objects.get(linea=linea, numero='2')
+    torre.linea = otra
+    torre.save()
+
+    assert torre_cercana(linea.id, 10.904, -74.8).numero == '1'
+    assert torre_cercana(otra.id, 10.904, -74.8).numero == '2'
@@ -0,0 +1,68 @@
+"""Usuario cacheado en ``JWTAuth``: requests repetidas sin tocar la BD,
+invalidación al desactivar o cambiar el rol y sin el hash de la contraseña
+en la cache."""
+
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.api.auth import JWTAuth
+from apps.core.cache import CACHE_KEY_JWT_USUARIO
+
+
+@pytest.fixture
+def autenticar():
+    auth = JWTAuth()
+    request = RequestFactory().get('/api/campo/registros')
+    return lambda token: auth.authenticate(request, str(token))
+
+
+@pytest.mark.django_db
+def test_segunda_request_sin_consultas(autenticar, liniero_user, django_assert_num_queries):
+    token = AccessToken.for_user(liniero_user)
+    assert autenticar(token) == liniero_user
+
+    with django_assert_num_queries(0):
+        assert autenticar(token) == liniero_user
+
+
+@pytest.mark.django_db
+def test_desactivar_invalida(autenticar, liniero_user):
+    token = AccessToken.for_user(liniero_user)
+    assert autenticar(token) is not None
+
+    liniero_user.is_active = False
+    liniero_user.save()
+
+    assert autenticar(token) is None
+
+
+@pytest.mark.django_db
+def test_cambio_de_rol_se_refleja(autenticar, liniero_user):
+    token = AccessToken.for_user(liniero_user)
+    assert autenticar(token).rol == liniero_user.rol
+
+    liniero_user.rol = 'supervisor'
+    liniero_user.save(update_fields=['rol'])
+
+    assert autenticar(token).rol == 'supervisor'
+
+
+@pytest.mark.django_db
+def test_cache_sin_hash_de_contrasena(autenticar, liniero_user):
+    token = AccessToken.for_user(liniero_user)
+    autenticar(token)
+
+    _, fila = cache.get(CACHE_KEY_JWT_USUARIO.format(user_id=liniero_user.id, jti=token['jti']))
+    assert 'password' not in fila
+    assert liniero_user.password not in repr(fila)
+
+    usuario = autenticar(token)
+    assert usuario.email == liniero_user.email
+    assert usuario.get_deferred_fields() == {'password'}
+
+
+@pytest.mark.django_db
+def test_token_invalido(autenticar):
+    assert autenticar('no-es-un-jwt') is None
@@ -0,0 +1,84 @@
+"""Entrega streaming de procedimientos (``apps.core.descargas``): Range,
+ETag/Last-Modified y 304 sin releer el archivo."""
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from apps.campo.models import Procedimiento
+from apps.core.descargas import parsear_rango
+
+CONTENIDO = bytes(range(256)) * 40  # 10 240 bytes
+
+
+@pytest.fixture
+def url(settings, tmp_path, authenticated_client, admin_user):
+    settings.MEDIA_ROOT = str(tmp_path)
+    procedimiento = Procedimiento.objects.create(
+        titulo='Manual de izado',
+        archivo=SimpleUploadedFile('izado.xlsx', CONTENIDO),
+        nombre_original='izado.xlsx',
+        tipo_archivo='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        tamanio=len(CONTENIDO),
+        subido_por=admin_user,
+    )
+    return reverse('campo:procedimiento_proxy', kwargs={'pk': procedimiento.pk})
+
+
+def test_parsear_rango():
+    assert parsear_rango('', 100) is None
+    assert parsear_rango('bytes=0-9', 100) == (0, 9)
+    assert parsear_rango('bytes=90-', 100) == (90, 99)
+    assert parsear_rango('bytes=-10', 100) == (90, 99)
+    assert parsear_rango('bytes=50-500', 100) == (50, 99)
+    assert parsear_rango('bytes=0-1,5-6', 100) is None
+    with pytest.raises(ValueError):
+        parsear_rango('bytes=100-', 100)
+
+
+def test_respuesta_completa_es_streaming(url, authenticated_client):
+    resp = authenticated_client.get(url)
+
+    assert resp.status_code == 200
+    assert resp.streaming
+    assert b''.join(resp.streaming_content) == CONTENIDO
+    assert resp['Content-Length'] == str(len(CONTENIDO))
+    assert resp['Accept-Ranges'] == 'bytes'
+    assert resp['ETag'] and resp['Last-Modified']
+    assert resp['Content-Disposition'] == 'inline; filename="izado.xlsx"'
+
+
+def test_range_devuelve_solo_el_tramo(url, authenticated_client):
+    resp = authenticated_client.get(url, HTTP_RANGE='bytes=1000-1999')
+
+    assert resp.status_code == 206
+    assert resp['Content-Range'] == f'bytes 1000-1999/{len(CONTENIDO)}'
+    assert b''.join(resp.streaming_content) == CONTENIDO[1000:2000]
+
+
+def test_range_fuera_del_archivo_es_416(url, authenticated_client):
+    resp = authenticated_client.get(url, HTTP_RANGE=f'bytes={len(CONTENIDO)}-')
+
+    assert resp.status_code == 416
+    assert resp['Content-Range'] == f'bytes */{len(CONTENIDO)}'
+
+
+def test_if_range_desactualizado_ignora_el_rango(url, authenticated_client):
+    resp = authenticated_client.get(url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"otro"')
+
+    assert resp.status_code == 200
+    assert b''.join(resp.streaming_content) == CONTENIDO
+
+
+def test_revalidacion_responde_304_sin_abrir_el_archivo(url, authenticated_client, monkeypatch):
+    etag = authenticated_client.get(url)['ETag']
+
+    def _no_abrir(*args, **kwargs):
+        raise AssertionError('el 304 no debe abrir el archivo')
+
+    monkeypatch.setattr('apps.core.descargas.abrir_archivo', _no_abrir)
+    resp = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert resp.status_code == 304
+    assert resp['ETag'] == etag
+    assert resp.content == b''
@@ -0,0 +1,86 @@
+"""Rate limiter de ``apps.api.ratelimit``: ventana deslizante atómica,
+exacta con requests concurrentes y con fallback en proceso sin Redis."""
+
+import threading
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.api import ratelimit
+from apps.api.ratelimit import LocalSlidingWindow, check_rate_limit
+
+
+@pytest.fixture(autouse=True)
+def limitador_limpio(monkeypatch):
+    monkeypatch.setattr(ratelimit, '_local_limiter', LocalSlidingWindow())
+    monkeypatch.setattr(ratelimit, '_get_redis_client', lambda: None)
+    monkeypatch.setitem(ratelimit.RATELIMIT_CONFIG, 'upload', {'rate': '20/m', 'key': 'ip'})
+    # Reloj fijo: ningún test cruza un borde de ventana.
+    monkeypatch.setattr(ratelimit.time, 'time', lambda: 1_000_000.0)
+
+
+def _request(ip='10.0.0.1'):
+    return RequestFactory().post('/api/campo/evidencias/upload', REMOTE_ADDR=ip)
+
+
+def test_limite_exacto_bajo_concurrencia():
+    permitidos = []
+    barrera = threading.Barrier(50)
+
+    def _golpear():
+        barrera.wait()
+        permitidos.append(check_rate_limit(_request(), 'upload')[0])
+
+    hilos = [threading.Thread(target=_golpear) for _ in range(50)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert permitidos.count(True) == 20
+    # Otra IP tiene su propio contador.
+    assert check_rate_limit(_request('10.0.0.2'), 'upload')[0]
+
+
+def test_ventana_anterior_pondera_en_la_deslizante():
+    limitador = LocalSlidingWindow()
+    for _ in range(10):
+        assert limitador.hit('k', window=1, max_requests=10, weight=0.5)[0]
+    assert not limitador.hit('k', window=1, max_requests=10, weight=0.5)[0]
+
+    # A mitad de la ventana siguiente la anterior aún cuenta 10 * 0.5 = 5.
+    resultados = [limitador.hit('k', window=2, max_requests=10, weight=0.5)[0] for _ in range(6)]
+    assert resultados == [True] * 5 + [False]
+
+    # Dos ventanas después la anterior ya no existe.
+    assert limitador.hit('k', window=4, max_requests=10, weight=1.0) == (True, 1, 0)
+
+
+def test_fallback_en_proceso_si_redis_no_responde(monkeypatch):
+    class _RedisCaido:
+        def register_script(self, script):
+            def _ejecutar(**kwargs):
+                raise ConnectionError('redis caído')
+            return _ejecutar
+
+    monkeypatch.setattr(ratelimit, '_get_redis_client', _RedisCaido)
+    monkeypatch.setattr(ratelimit, '_sliding_window_script', None)
+
+    resultados = [check_rate_limit(_request(), 'upload')[0] for _ in range(21)]
+
+    assert resultados == [True] * 20 + [False]
+
+
+def test_decorador_mantiene_headers():
+    vista = ratelimit.ratelimit('upload')(lambda request: HttpResponse('ok'))
+
+    for _ in range(20):
+        respuesta = vista(_request())
+    assert respuesta.status_code == 200
+    assert respuesta['X-RateLimit-Limit'] == '20'
+    assert respuesta['X-RateLimit-Remaining'] == '0'
+
+    bloqueada = vista(_request())
+    assert bloqueada.status_code == 429
+    assert bloqueada['Retry-After'] == '60'
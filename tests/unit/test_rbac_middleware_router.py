@@ -0,0 +1,157 @@
+"""Router de prefijos precompilado de ``RBACModuloMiddleware`` y permisos
+memoizados por request: misma clasificación que los tres
+``any(startswith)`` y una sola resolución del rol por request. Incluye el
+micro-benchmark (``slow``, solo informa tiempos) contra la versión anterior."""
+
+import time
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.core import permissions
+from apps.core.middleware import (
+    CONSTRUCCION_PREFIXES,
+    EXEMPT_PREFIXES,
+    MANTENIMIENTO_PREFIXES,
+    RBACModuloMiddleware,
+    compilar_prefijos,
+)
+from apps.core.permissions import (
+    MODULO_CONSTRUCCION,
+    MODULO_MANTENIMIENTO,
+    permisos_de_request,
+    request_can_access_modulo,
+    user_can_access_modulo,
+)
+
+PATHS = (
+    '/', '/admin/usuarios/', '/static/css/app.css', '/api/campo/sync',
+    '/construccion/', '/construccion/proyectos/7/', '/campo/', '/campo/registros/3/',
+    '/cuadrillas/mapa/', '/cuadrillas/', '/cuadrillas/mapa', '/financiero/cierre/',
+    '/usuarios/perfil/', '/health', '/healthz/', '/lineas', '/lineas/12/torres/',
+)
+
+
+def _clasificar_anterior(path):
+    if any(path.startswith(p) for p in EXEMPT_PREFIXES):
+        return 'exento'
+    if any(path.startswith(p) for p in CONSTRUCCION_PREFIXES):
+        return MODULO_CONSTRUCCION
+    if any(path.startswith(p) for p in MANTENIMIENTO_PREFIXES):
+        return MODULO_MANTENIMIENTO
+    return None
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_misma_clasificacion_que_los_startswith(path):
+    clasificar = RBACModuloMiddleware(lambda r: None).clasificar
+    assert clasificar(path) == _clasificar_anterior(path)
+
+
+def test_precedencia_por_orden_de_tablas():
+    clasificar = compilar_prefijos([('a', ('/x/y',)), ('b', ('/x/',)), ('c', ())])
+    assert clasificar('/x/y/z') == 'a'
+    assert clasificar('/x/z') == 'b'
+    assert clasificar('/z') is None
+    assert compilar_prefijos([])('/x/') is None
+
+
+@pytest.mark.django_db
+def test_permisos_se_resuelven_una_vez_por_request(liniero_user, monkeypatch):
+    llamadas = []
+    original = permissions._get_role_permisos
+    monkeypatch.setattr(
+        permissions, '_get_role_permisos',
+        lambda codigo: llamadas.append(codigo) or original(codigo),
+    )
+    request = RequestFactory().get('/campo/')
+    request.user = liniero_user
+
+    for _ in range(10):
+        assert request_can_access_modulo(request, MODULO_MANTENIMIENTO) == \
+            user_can_access_modulo(liniero_user, MODULO_MANTENIMIENTO)
+    # user_can_access_modulo (sin memo) + modulos y submodulos una sola vez.
+    assert len(llamadas) == 10 + 2
+
+    # Si cambia el usuario de la request, la memo se descarta.
+    from django.contrib.auth.models import AnonymousUser
+    request.user = AnonymousUser()
+    assert permisos_de_request(request)['modulos'] == set()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('path', PATHS)
+def test_middleware_y_sidebar_comparten_la_memo(admin_user, monkeypatch, path):
+    """Middleware + los chequeos del sidebar de un render: los módulos del
+    usuario se resuelven una sola vez, sea cual sea la ruta."""
+    llamadas = []
+    original = permissions.user_modulos
+    monkeypatch.setattr(
+        permissions, 'user_modulos',
+        lambda user: llamadas.append(user) or original(user),
+    )
+    request = RequestFactory().get(path)
+    request.user = admin_user
+    respuesta = HttpResponse(status=204)
+
+    assert RBACModuloMiddleware(lambda r: respuesta)(request) is respuesta
+    for _ in range(12):
+        assert request_can_access_modulo(request, MODULO_CONSTRUCCION)
+
+    assert llamadas == [admin_user]
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+def test_benchmark_overhead_por_request(admin_user):
+    """Middleware + 12 chequeos del sidebar por request, antes y después.
+
+    Solo imprime los tiempos (``pytest -m slow -s``): dependen de la máquina,
+    así que no se comparan.
+    """
+    factory = RequestFactory()
+    requests = []
+    for path in PATHS * 20:
+        request = factory.get(path)
+        # Admin: accede a todo, el middleware nunca corta (sin messages).
+        request.user = admin_user
+        requests.append(request)
+    chequeos = 12
+    respuesta = HttpResponse(status=204)
+
+    def _anterior(request):
+        modulo = _clasificar_anterior(request.path)
+        if modulo != 'exento' and modulo:
+            user_can_access_modulo(request.user, modulo)
+        for _ in range(chequeos):
+            user_can_access_modulo(request.user, MODULO_CONSTRUCCION)
+
+    mw = RBACModuloMiddleware(lambda request: respuesta)
+
+    def _nuevo(request):
+        mw(request)
+        for _ in range(chequeos):
+            request_can_access_modulo(request, MODULO_CONSTRUCCION)
+
+    def _medir(funcion):
+        for request in requests:
+            request.__dict__.pop('_rbac_permisos', None)
+            funcion(request)  # calentamiento (cache del rol poblada)
+        inicio = time.perf_counter()
+        for _ in range(5):
+            for request in requests:
+                request.__dict__.pop('_rbac_permisos', None)
+                funcion(request)
+        return (time.perf_counter() - inicio) / (5 * len(requests))
+
+    t_anterior = _medir(_anterior)
+    t_nuevo = _medir(_nuevo)
+    clasificar = mw.clasificar
+    t_router_anterior = _medir(lambda r: _clasificar_anterior(r.path))
+    t_router_nuevo = _medir(lambda r: clasificar(r.path))
+
+    print(
+        f"\nRBAC por request: anterior {t_anterior * 1e6:.1f} µs -> nuevo {t_nuevo * 1e6:.1f} µs"
+        f" (router: {t_router_anterior * 1e6:.2f} µs -> {t_router_nuevo * 1e6:.2f} µs)"
+    )
@@ -0,0 +1,85 @@
+"""Recorrido de una cuadrilla (``apps.cuadrillas.recorridos``): simplificación
+Douglas-Peucker, polilínea codificada y paradas junto a torres
+(``GET /api/cuadrillas/cuadrillas/{id}/recorrido``)."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.cuadrillas.models import TrackingUbicacion
+from apps.cuadrillas.recorridos import codificar_polilinea, simplificar
+from apps.lineas.models import Linea, Torre
+
+INICIO = timezone.make_aware(datetime(2026, 10, 14, 7, 0))
+
+
+def test_polilinea_codificada():
+    # Ejemplo de la especificación del formato.
+    coordenadas = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+    assert codificar_polilinea(coordenadas) == '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+
+
+def test_simplificar_descarta_puntos_alineados():
+    recta = [(10.9, -74.8 + i * 0.0001, INICIO) for i in range(100)]
+    desvio = [(10.91, -74.79, INICIO)]
+    puntos = recta + desvio
+
+    simplificados = simplificar(puntos, tolerancia_m=5)
+
+    assert simplificados == [recta[0], recta[-1], desvio[0]]
+
+
+@pytest.mark.django_db
+def test_recorrido_simplificado_con_parada_en_torre(client, cuadrilla, liniero_user):
+    linea = Linea.objects.create(
+        codigo='LT-REC', nombre='Línea recorrido', cliente='TRANSELCA', tension_kv=220,
+    )
+    Torre.objects.create(linea=linea, numero='42', latitud=Decimal('10.9'), longitud=Decimal('-74.79'))
+    cuadrilla.linea_asignada = linea
+    cuadrilla.save(update_fields=['linea_asignada'])
+
+    # Avanza por la recta, se queda 10 minutos junto a la torre 42, sigue.
+    trayecto = (
+        [(Decimal('10.9'), Decimal('-74.8') + Decimal('0.0005') * i) for i in range(21)]
+        + [(Decimal('10.9'), Decimal('-74.79'))] * 20
+        + [(Decimal('10.9') + Decimal('0.0005') * i, Decimal('-74.79')) for i in range(1, 21)]
+    )
+    for i, (lat, lng) in enumerate(trayecto):
+        ping = TrackingUbicacion.objects.create(
+            cuadrilla=cuadrilla, usuario=liniero_user, latitud=lat, longitud=lng,
+        )
+        TrackingUbicacion.objects.filter(pk=ping.pk).update(
+            created_at=INICIO + timedelta(seconds=30 * i),
+        )
+
+    resp = client.get(
+        f'/api/cuadrillas/cuadrillas/{cuadrilla.pk}/recorrido',
+        {'desde': INICIO.isoformat(), 'hasta': (INICIO + timedelta(hours=2)).isoformat(), 'zoom': 16},
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(liniero_user)}',
+    )
+
+    assert resp.status_code == 200
+    datos = resp.json()
+    assert datos['puntos_originales'] == len(trayecto)
+    # Dos tramos rectos: inicio, esquina y fin.
+    assert datos['puntos'] == 3
+    assert datos['segundos'][0] == 0
+    assert datos['segundos'][-1] == 30 * (len(trayecto) - 1)
+    [parada] = datos['paradas']
+    assert parada['torre_numero'] == '42'
+    assert parada['distancia_torre_m'] < 1
+    assert parada['duracion_min'] >= 9.5
+
+
+@pytest.mark.django_db
+def test_recorrido_ventana_invalida(client, cuadrilla, liniero_user):
+    resp = client.get(
+        f'/api/cuadrillas/cuadrillas/{cuadrilla.pk}/recorrido',
+        {'desde': INICIO.isoformat(), 'hasta': (INICIO + timedelta(days=8)).isoformat()},
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(liniero_user)}',
+    )
+
+    assert resp.status_code == 400
@@ -0,0 +1,122 @@
+"""Capa de almacenamiento de ``apps.core.utils``: cliente GCS por proceso,
+lecturas por chunks y backend local intercambiable para tests."""
+
+import io
+
+import pytest
+
+from apps.core import utils
+from apps.core.utils import (
+    GCSStorageBackend,
+    LocalStorageBackend,
+    download_from_gcs,
+    get_storage_backend,
+    iter_storage_chunks,
+    open_from_storage,
+    upload_to_gcs,
+)
+
+
+@pytest.fixture
+def local(settings, tmp_path):
+    settings.GS_BUCKET_NAME = ''
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.MEDIA_URL = '/media/'
+    return tmp_path
+
+
+def test_sin_bucket_usa_el_backend_local(local):
+    assert isinstance(get_storage_backend(), LocalStorageBackend)
+
+
+def test_local_ida_y_vuelta(local):
+    url = upload_to_gcs(b'foto', 'evidencias/r1/ANTES/a.jpg')
+
+    assert url == '/media/evidencias/r1/ANTES/a.jpg'
+    assert (local / 'evidencias/r1/ANTES/a.jpg').read_bytes() == b'foto'
+    assert download_from_gcs(url) == b'foto'
+    # También con la URL absoluta que arma el frontend.
+    assert download_from_gcs(f'https://instelec.test{url}') == b'foto'
+
+
+def test_local_streaming_por_chunks(local):
+    contenido = bytes(range(256)) * 100
+    url = upload_to_gcs(io.BytesIO(contenido), 'reportes/r.xlsx')
+
+    chunks = list(iter_storage_chunks(url, chunk_size=1000))
+
+    assert [len(c) for c in chunks] == [1000] * 25 + [600]
+    assert b''.join(chunks) == contenido
+    with open_from_storage(url) as archivo:
+        assert archivo.read(4) == contenido[:4]
+
+
+def test_local_inexistente(local):
+    with pytest.raises(FileNotFoundError):
+        download_from_gcs('/media/no/existe.jpg')
+
+
+def test_cliente_gcs_uno_por_proceso(monkeypatch):
+    monkeypatch.setattr(utils, '_storage_clients', {})
+    monkeypatch.setattr(utils, '_build_storage_client', object)
+    monkeypatch.setattr(utils.os, 'getpid', lambda: 100)
+
+    primero = utils.get_storage_client()
+    assert utils.get_storage_client() is primero
+
+    # Tras un fork el hijo arma su propio cliente (no hereda sockets).
+    monkeypatch.setattr(utils.os, 'getpid', lambda: 101)
+    assert utils.get_storage_client() is not primero
+    assert list(utils._storage_clients) == [101]
+
+
+class _Blob:
+    def __init__(self, bucket, name):
+        self.bucket, self.name = bucket, name
+        self.public_url = f'https://storage.googleapis.com/{bucket}/{name}'
+        self.subidas = []
+
+    def upload_from_string(self, data, **kwargs):
+        self.subidas.append(('string', data, kwargs))
+
+    def upload_from_file(self, fileobj, **kwargs):
+        self.subidas.append(('file', self.chunk_size, kwargs))
+
+
+class _Cliente:
+    def __init__(self):
+        self.blobs = []
+
+    def bucket(self, nombre):
+        cliente = self
+
+        class _Bucket:
+            def blob(self, name):
+                blob = _Blob(nombre, name)
+                cliente.blobs.append(blob)
+                return blob
+        return _Bucket()
+
+
+def test_gcs_urls_y_subida_en_una_request(monkeypatch):
+    cliente = _Cliente()
+    monkeypatch.setattr(utils, 'get_storage_client', lambda: cliente)
+    backend = GCSStorageBackend('bucket-default')
+
+    assert backend.upload(b'x', 'evidencias/a.jpg') == (
+        'https://storage.googleapis.com/bucket-default/evidencias/a.jpg'
+    )
+    backend.upload(io.BytesIO(b'y' * 10), 'reportes/b.pdf')
+    backend._blob('https://storage.googleapis.com/otro/c/d.jpg')
+    backend._blob('gs://tercero/e.kmz')
+
+    assert [(b.bucket, b.name) for b in cliente.blobs] == [
+        ('bucket-default', 'evidencias/a.jpg'),
+        ('bucket-default', 'reportes/b.pdf'),
+        ('otro', 'c/d.jpg'),
+        ('tercero', 'e.kmz'),
+    ]
+    tipo, _, kwargs = cliente.blobs[0].subidas[0]
+    assert tipo == 'string' and kwargs['predefined_acl'] == 'publicRead'
+    tipo, chunk, _ = cliente.blobs[1].subidas[0]
+    assert tipo == 'file' and chunk == utils.STORAGE_CHUNK_SIZE
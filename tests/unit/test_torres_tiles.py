@@ -0,0 +1,131 @@
+"""Teselas del mapa de torres (``apps.lineas.tiles``): clusters por zoom,
+torres individuales desde ``ZOOM_DETALLE``, cache por tesela e
+invalidación al editar torres."""
+
+import math
+from decimal import Decimal
+
+import pytest
+
+from apps.lineas.models import Linea, Torre
+from apps.lineas.tiles import (
+    ZOOM_DETALLE,
+    TeselaInvalida,
+    clusters_geojson,
+    invalidar_teselas,
+    invalidar_tiles,
+    limites_tesela,
+    teselas_de,
+    torres_mvt,
+    validar_tesela,
+)
+
+
+def _tesela(lat, lon, z):
+    n = 2 ** z
+    r = math.radians(lat)
+    x = int((lon + 180) / 360 * n)
+    y = int((1 - math.log(math.tan(r) + 1 / math.cos(r)) / math.pi) / 2 * n)
+    return z, x, y
+
+
+def test_limites_tesela_raiz_cubre_el_mundo():
+    lon_min, lat_min, lon_max, lat_max = limites_tesela(0, 0, 0)
+    assert (lon_min, lon_max) == (-180, 180)
+    assert lat_max == pytest.approx(85.0511, abs=1e-4)
+    assert lat_min == pytest.approx(-85.0511, abs=1e-4)
+
+
+def test_teselas_de_un_punto_en_todos_los_zooms():
+    teselas = teselas_de(10.9, -74.8)
+
+    for z in (0, 6, ZOOM_DETALLE, 22):
+        assert _tesela(10.9, -74.8, z) in teselas
+    # Lejos del borde: una tesela por zoom.
+    assert len([t for t in teselas if t[0] == 6]) == 1
+
+
+def test_tesela_fuera_de_rango():
+    with pytest.raises(TeselaInvalida):
+        validar_tesela(3, 8, 0)
+
+
+@pytest.fixture
+def torres(db):
+    invalidar_tiles()
+    linea = Linea.objects.create(
+        codigo='LT-TILE', nombre='Línea teselas', cliente='TRANSELCA', tension_kv=220,
+    )
+    return [
+        Torre.objects.create(
+            linea=linea, numero=str(i),
+            latitud=Decimal('10.90') + Decimal(i) / 10000,
+            longitud=Decimal('-74.80'),
+            inspection_status='CRITICA' if i == 0 else 'OK',
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.mark.django_db
+class TestClusters:
+
+    def test_zoom_bajo_agrupa(self, torres):
+        fc = clusters_geojson(*_tesela(10.9, -74.8, 6))
+
+        assert fc['zoom_detalle'] is False
+        assert len(fc['features']) == 1
+        props = fc['features'][0]['properties']
+        assert props['cluster'] is True
+        assert props['total'] == 5
+        assert props['criticas'] == 1
+
+    def test_zoom_detalle_devuelve_torres(self, torres):
+        fc = clusters_geojson(*_tesela(10.9, -74.8, ZOOM_DETALLE + 2))
+
+        assert fc['zoom_detalle'] is True
+        assert sorted(f['properties']['numero'] for f in fc['features']) == [
+            'T-0', 'T-1', 'T-2', 'T-3', 'T-4',
+        ]
+        assert fc['features'][0]['properties']['linea_codigo'] == 'LT-TILE'
+
+    def test_filtros_y_teselas_vecinas(self, torres):
+        z, x, y = _tesela(10.9, -74.8, 6)
+
+        assert clusters_geojson(z, x + 1, y)['features'] == []
+        fc = clusters_geojson(z, x, y, inspection_status='CRITICA')
+        assert fc['features'][0]['properties']['total'] == 1
+
+    def test_cache_por_tesela_e_invalidacion(self, torres, django_assert_num_queries):
+        tesela = _tesela(10.9, -74.8, 6)
+        clusters_geojson(*tesela)
+
+        with django_assert_num_queries(0):
+            clusters_geojson(*tesela)
+
+        torres[1].inspection_status = 'VENCIDA'
+        torres[1].save()
+
+        props = clusters_geojson(*tesela)['features'][0]['properties']
+        assert props['vencidas'] == 1
+
+    def test_mvt(self, torres):
+        tile = torres_mvt(*_tesela(10.9, -74.8, ZOOM_DETALLE))
+
+        assert isinstance(tile, bytes)
+        assert b'torres' in tile
+        assert torres_mvt(*_tesela(-10.9, 74.8, ZOOM_DETALLE)) == b''
+
+    def test_invalidar_teselas_respeta_el_resto_del_mapa(self, torres, django_assert_num_queries):
+        tesela = _tesela(10.9, -74.8, 6)
+        lejana = _tesela(-10.9, 74.8, 6)
+        clusters_geojson(*tesela)
+        clusters_geojson(*lejana)
+
+        Torre.objects.filter(pk=torres[1].pk).update(inspection_status='VENCIDA')
+        invalidar_teselas([(torres[1].latitud, torres[1].longitud)])
+
+        with django_assert_num_queries(0):
+            clusters_geojson(*lejana)
+        props = clusters_geojson(*tesela)['features'][0]['properties']
+        assert props['vencidas'] == 1
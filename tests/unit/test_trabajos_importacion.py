@@ -0,0 +1,218 @@
+"""Importaciones en segundo plano (``apps.core.importaciones``): los Excel
+grandes se encolan como ``TrabajoImportacion``, el worker reporta avance
+por lote y los avances reanudan desde el último checkpoint."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
+
+from apps.actividades.importers import AvancesImporter
+from apps.actividades.models import Actividad, TipoActividad
+from apps.core import importaciones
+from apps.core.excel_streaming import abrir_libro, en_lotes, filas_numeradas, observar_progreso
+from apps.core.importaciones import MINUTOS_SIN_LATIDO, ejecutar_trabajo, encolar, estado_trabajo
+from apps.core.models import TrabajoImportacion
+from apps.lineas.models import Linea, Torre
+
+
+def _xlsx(header, filas):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(header)
+    for fila in filas:
+        ws.append(fila)
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+class _Observador:
+    def __init__(self):
+        self.total = 0
+        self.procesadas = 0
+
+    def sumar_total(self, filas):
+        self.total += filas
+
+    def avanzar(self, filas=1):
+        self.procesadas += filas
+
+
+def test_pipeline_reporta_total_y_lotes_consumidos():
+    sheet = abrir_libro(BytesIO(_xlsx(['h'], [[i] for i in range(7)])))['Sheet']
+    observador = _Observador()
+
+    with observar_progreso(observador):
+        filas = filas_numeradas(sheet)
+        next(filas)
+        vistos = []
+        for _ in en_lotes(filas, tamano=3):
+            vistos.append(observador.procesadas)
+
+    assert observador.total == 8
+    # Un lote cuenta recién cuando se pide el siguiente.
+    assert vistos == [0, 3, 6]
+    assert observador.procesadas == 7
+
+
+@pytest.fixture
+def actividades(db):
+    linea = Linea.objects.create(
+        codigo='L-800', nombre='Línea L-800', longitud_km=Decimal('10.00'),
+        tension_kv=110, activa=True,
+    )
+    torre = Torre.objects.create(
+        linea=linea, numero='T-001', tipo=Torre.TipoTorre.SUSPENSION,
+        latitud=Decimal('10.0'), longitud=Decimal('-75.0'),
+    )
+    tipo = TipoActividad.objects.create(codigo='PODA-T', nombre='Poda', categoria='PODA', activo=True)
+    return [
+        Actividad.objects.create(
+            linea=linea, torre=torre, tipo_actividad=tipo,
+            aviso_sap=f'AV-{i}', fecha_programada=date(2030, 1, 1),
+        )
+        for i in range(5)
+    ]
+
+
+AVANCES = [['Aviso', 'Observaciones']] + [[f'AV-{i}', f'nota {i}'] for i in range(5)]
+
+
+@pytest.mark.django_db
+def test_avances_reanuda_desde_checkpoint(actividades):
+    archivo = BytesIO(_xlsx(AVANCES[0], AVANCES[1:]))
+    checkpoints = []
+
+    resultado = AvancesImporter().importar(
+        archivo,
+        checkpoint={'fila': 3, 'actividades_actualizadas': ['AV-0', 'AV-1']},
+        al_confirmar_lote=checkpoints.append,
+    )
+
+    assert resultado['actividades_actualizadas'] == 5
+    assert checkpoints[-1]['fila'] == 6
+    assert Actividad.objects.get(aviso_sap='AV-1').observaciones_programacion == ''
+    assert Actividad.objects.get(aviso_sap='AV-4').observaciones_programacion == 'nota 4'
+
+
+@pytest.mark.django_db
+class TestTrabajoImportacion:
+
+    @pytest.fixture(autouse=True)
+    def _media(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.IMPORTACION_SINCRONA_MAX_BYTES = 0
+
+    def test_vista_encola_y_el_worker_completa(
+        self, actividades, authenticated_client, admin_user, django_capture_on_commit_callbacks,
+    ):
+        archivo = SimpleUploadedFile('avances.xlsx', _xlsx(AVANCES[0], AVANCES[1:]))
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = authenticated_client.post(
+                reverse('actividades:importar_avances'), {'archivo': archivo},
+            )
+
+        trabajo = TrabajoImportacion.objects.get()
+        assert response.status_code == 302
+        assert response.url == trabajo.get_absolute_url()
+        assert len(callbacks) == 1
+        assert trabajo.usuario == admin_user
+        assert trabajo.estado == TrabajoImportacion.Estado.PENDIENTE
+        assert trabajo.nombre_archivo == 'avances.xlsx'
+
+        trabajo = ejecutar_trabajo(trabajo.pk)
+
+        assert trabajo.estado == TrabajoImportacion.Estado.COMPLETADO
+        assert trabajo.intentos == 1
+        assert trabajo.checkpoint == {}
+        assert trabajo.resultado['mensajes'][0][1].startswith('✓ 5 actividades actualizadas')
+        assert estado_trabajo(trabajo)['porcentaje'] == 100
+
+        resultado = authenticated_client.get(
+            reverse('core:trabajo_importacion_resultado', kwargs={'pk': trabajo.pk})
+        ).json()
+        assert resultado['resultado']['actividades_actualizadas'] == 5
+        assert resultado['redirect_url'] == reverse('actividades:programacion')
+
+    def test_error_del_procesador_marca_fallido(self, admin_user):
+        trabajo = encolar(
+            TrabajoImportacion.Tipo.PDEO, {'proyecto_id': '00000000-0000-0000-0000-000000000000'},
+            usuario=admin_user, archivo=SimpleUploadedFile('pdeo.xlsx', _xlsx(['x'], [])),
+        )
+
+        trabajo = ejecutar_trabajo(trabajo.pk)
+
+        assert trabajo.estado == TrabajoImportacion.Estado.FALLIDO
+        assert 'does not exist' in trabajo.error
+
+    def test_trabajo_en_proceso_no_se_corre_dos_veces(self, admin_user):
+        trabajo = encolar(TrabajoImportacion.Tipo.AVANCES, {}, usuario=admin_user)
+        # Otro worker ya lo reclamó (re-entrega de acks_late / re-despacho).
+        TrabajoImportacion.objects.filter(pk=trabajo.pk).update(
+            estado=TrabajoImportacion.Estado.EN_PROCESO, intentos=1,
+        )
+
+        trabajo = ejecutar_trabajo(trabajo.pk)
+
+        assert trabajo.estado == TrabajoImportacion.Estado.EN_PROCESO
+        assert trabajo.intentos == 1
+
+    def test_reentrega_de_trabajo_colgado_lo_reanuda(self, actividades, admin_user):
+        trabajo = encolar(
+            TrabajoImportacion.Tipo.AVANCES, {}, usuario=admin_user,
+            archivo=SimpleUploadedFile('avances.xlsx', _xlsx(AVANCES[0], AVANCES[1:])),
+        )
+        # El worker murió: EN_PROCESO sin latido desde hace más del límite.
+        TrabajoImportacion.objects.filter(pk=trabajo.pk).update(
+            estado=TrabajoImportacion.Estado.EN_PROCESO, intentos=1,
+            checkpoint={'fila': 3, 'actividades_actualizadas': ['AV-0', 'AV-1']},
+            updated_at=timezone.now() - timedelta(minutes=MINUTOS_SIN_LATIDO + 1),
+        )
+
+        trabajo = ejecutar_trabajo(trabajo.pk)
+
+        assert trabajo.estado == TrabajoImportacion.Estado.COMPLETADO
+        assert trabajo.intentos == 2
+        assert Actividad.objects.get(aviso_sap='AV-1').observaciones_programacion == ''
+        assert Actividad.objects.get(aviso_sap='AV-4').observaciones_programacion == 'nota 4'
+
+    def test_error_transitorio_vuelve_a_pendiente_y_propaga(self, admin_user, monkeypatch):
+        trabajo = encolar(TrabajoImportacion.Tipo.AVANCES, {}, usuario=admin_user)
+
+        def caida(*args, **kwargs):
+            raise OperationalError('server closed the connection unexpectedly')
+
+        monkeypatch.setattr(importaciones, 'procesar', caida)
+
+        with pytest.raises(OperationalError):
+            ejecutar_trabajo(trabajo.pk)
+
+        trabajo.refresh_from_db()
+        assert trabajo.estado == TrabajoImportacion.Estado.PENDIENTE
+        assert trabajo.intentos == 1
+        assert 'server closed' in trabajo.error
+
+        # Agotados los intentos, queda FALLIDO sin propagar.
+        TrabajoImportacion.objects.filter(pk=trabajo.pk).update(intentos=importaciones.MAX_INTENTOS - 1)
+        trabajo = ejecutar_trabajo(trabajo.pk)
+        assert trabajo.estado == TrabajoImportacion.Estado.FALLIDO
+
+    def test_estado_solo_para_el_duenio(self, client, admin_user, liniero_user):
+        trabajo = encolar(TrabajoImportacion.Tipo.AVANCES, {}, usuario=admin_user)
+        url = reverse('core:trabajo_importacion_estado', kwargs={'pk': trabajo.pk})
+
+        client.force_login(liniero_user)
+        assert client.get(url).status_code == 404
+
+        client.force_login(admin_user)
+        estado = client.get(url).json()
+        assert estado['estado'] == 'PENDIENTE'
+        assert estado['terminado'] is False
@@ -0,0 +1,173 @@
+"""Historial de tracking (``apps.cuadrillas.tracking_historial``): ingreso
+por lotes con queries constantes y retención que condensa los pings viejos
+a minutos y los minutos viejos a horas."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.cuadrillas import tracking_historial
+from apps.cuadrillas.models import (
+    TrackingUbicacion,
+    TrackingUbicacionResumen,
+    UltimaUbicacionCuadrilla,
+)
+from apps.cuadrillas.tracking_historial import MAX_PUNTOS_LOTE, depurar_tracking
+
+URL = '/api/cuadrillas/ubicaciones/lote'
+AHORA = timezone.make_aware(datetime(2026, 10, 17, 12, 0))
+
+
+@pytest.fixture
+def auth(liniero_user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(liniero_user)}'}
+
+
+def _lote(cantidad, lat='4.0'):
+    return {
+        'puntos': [
+            {'latitud': f'{lat}{i:03d}', 'longitud': '-74.1', 'velocidad': '12.5', 'bateria': 80}
+            for i in range(cantidad)
+        ],
+    }
+
+
+@pytest.mark.django_db
+def test_lote_se_inserta_en_bloque(client, auth, cuadrilla):
+    resp = client.post(URL, _lote(3), content_type='application/json', **auth)
+
+    assert resp.status_code == 200
+    assert resp.json() == {'status': 'ok', 'recibidos': 3, 'descartados': []}
+    assert TrackingUbicacion.objects.filter(cuadrilla=cuadrilla).count() == 3
+    # El último punto del lote queda como posición actual del mapa.
+    assert UltimaUbicacionCuadrilla.objects.get(cuadrilla=cuadrilla).latitud == Decimal('4.0002')
+
+    with CaptureQueriesContext(connection) as pocos:
+        client.post(URL, _lote(5), content_type='application/json', **auth)
+    with CaptureQueriesContext(connection) as muchos:
+        client.post(URL, _lote(200), content_type='application/json', **auth)
+    assert len(muchos) == len(pocos)
+
+
+@pytest.mark.django_db
+def test_lote_offline_conserva_momento_de_captura(client, auth, cuadrilla):
+    # Tres pings capturados sin señal hace 6 horas, a 30 s entre sí, y
+    # sincronizados ahora (desordenados).
+    captura = timezone.now().replace(microsecond=0) - timedelta(hours=6)
+    lote = _lote(3)
+    for i, punto in enumerate(lote['puntos']):
+        punto['registrada_en'] = (captura + timedelta(seconds=30 * i)).isoformat()
+    lote['puntos'].reverse()
+
+    resp = client.post(URL, lote, content_type='application/json', **auth)
+
+    assert resp.status_code == 200
+    assert list(
+        TrackingUbicacion.objects.filter(cuadrilla=cuadrilla)
+        .order_by('created_at').values_list('latitud', 'created_at')
+    ) == [
+        (Decimal(f'4.000{i}'), captura + timedelta(seconds=30 * i)) for i in range(3)
+    ]
+    # La posición actual es la captura más reciente, no la última del lote.
+    ultima = UltimaUbicacionCuadrilla.objects.get(cuadrilla=cuadrilla)
+    assert (ultima.latitud, ultima.registrada_en) == (Decimal('4.0002'), captura + timedelta(seconds=60))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('desfase', [timedelta(days=8), -timedelta(hours=1)])
+def test_lote_con_captura_fuera_de_ventana(client, auth, cuadrilla, desfase):
+    lote = _lote(2)
+    lote['puntos'][1]['registrada_en'] = (timezone.now() - desfase).isoformat()
+
+    resp = client.post(URL, lote, content_type='application/json', **auth)
+
+    # Solo se descarta el punto imposible; el resto del lote se guarda.
+    assert resp.status_code == 200
+    cuerpo = resp.json()
+    assert cuerpo['recibidos'] == 1
+    assert [d['indice'] for d in cuerpo['descartados']] == [1]
+    assert 'fuera de la ventana' in cuerpo['descartados'][0]['motivo']
+    assert list(TrackingUbicacion.objects.values_list('latitud', flat=True)) == [Decimal('4.0000')]
+
+
+@pytest.mark.django_db
+def test_lote_demasiado_grande(client, auth, cuadrilla):
+    resp = client.post(URL, _lote(MAX_PUNTOS_LOTE + 1), content_type='application/json', **auth)
+
+    assert resp.status_code == 400
+    assert not TrackingUbicacion.objects.exists()
+
+
+def _ping(cuadrilla, usuario, lat, momento, velocidad=None):
+    ubicacion = TrackingUbicacion.objects.create(
+        cuadrilla=cuadrilla, usuario=usuario, latitud=Decimal(lat),
+        longitud=Decimal('-74.1'), velocidad=velocidad,
+    )
+    TrackingUbicacion.objects.filter(pk=ubicacion.pk).update(created_at=momento)
+
+
+@pytest.mark.django_db
+def test_retencion_condensa_crudos_a_minutos(cuadrilla, liniero_user):
+    viejo = AHORA - timedelta(days=70)
+    minuto = viejo.replace(second=0, microsecond=0)
+    _ping(cuadrilla, liniero_user, '4.1', minuto + timedelta(seconds=10), Decimal('10'))
+    _ping(cuadrilla, liniero_user, '4.3', minuto + timedelta(seconds=40), Decimal('20'))
+    _ping(cuadrilla, liniero_user, '4.5', minuto + timedelta(minutes=1))
+    _ping(cuadrilla, liniero_user, '4.9', AHORA - timedelta(days=1))
+
+    resultado = depurar_tracking(AHORA)
+
+    assert resultado['minutos'] == 2
+    assert resultado['crudos_eliminados'] == 3
+    assert list(TrackingUbicacion.objects.values_list('latitud', flat=True)) == [Decimal('4.9')]
+    primero, segundo = TrackingUbicacionResumen.objects.filter(
+        resolucion=TrackingUbicacionResumen.Resolucion.MINUTO,
+    ).order_by('inicio')
+    assert primero.inicio == minuto
+    assert (primero.latitud, primero.velocidad, primero.pings) == (Decimal('4.2'), Decimal('15'), 2)
+    assert (segundo.latitud, segundo.pings) == (Decimal('4.5'), 1)
+
+
+@pytest.mark.django_db
+def test_retencion_informa_periodos_ya_resumidos(cuadrilla, liniero_user, monkeypatch):
+    avisos = []
+    monkeypatch.setattr(tracking_historial.logger, 'warning', lambda msg, *args: avisos.append(msg % args))
+    minuto = (AHORA - timedelta(days=70)).replace(second=0, microsecond=0)
+    _ping(cuadrilla, liniero_user, '4.1', minuto + timedelta(seconds=10))
+    _ping(cuadrilla, liniero_user, '4.5', minuto + timedelta(minutes=1))
+    TrackingUbicacionResumen.objects.create(
+        cuadrilla=cuadrilla, resolucion=TrackingUbicacionResumen.Resolucion.MINUTO,
+        inicio=minuto, latitud=Decimal('4.0'), longitud=Decimal('-74.1'), pings=3,
+    )
+
+    resultado = depurar_tracking(AHORA)
+
+    assert resultado['minutos'] == 1
+    [aviso] = avisos
+    assert '1 periodos ya existían' in aviso
+    # El periodo existente no se pisa.
+    assert TrackingUbicacionResumen.objects.get(inicio=minuto).pings == 3
+
+
+@pytest.mark.django_db
+def test_retencion_condensa_minutos_a_horas(cuadrilla):
+    hora = (AHORA - timedelta(days=250)).replace(minute=0, second=0, microsecond=0)
+    for minutos, lat, pings in ((0, '4.0', 1), (30, '5.0', 3)):
+        TrackingUbicacionResumen.objects.create(
+            cuadrilla=cuadrilla, resolucion=TrackingUbicacionResumen.Resolucion.MINUTO,
+            inicio=hora + timedelta(minutes=minutos), latitud=Decimal(lat),
+            longitud=Decimal('-74.1'), pings=pings,
+        )
+
+    assert depurar_tracking(AHORA)['horas'] == 1
+
+    [resumen] = TrackingUbicacionResumen.objects.all()
+    assert resumen.resolucion == TrackingUbicacionResumen.Resolucion.HORA
+    assert resumen.inicio == hora
+    # Promedio ponderado por pings: (4.0 * 1 + 5.0 * 3) / 4.
+    assert (resumen.latitud, resumen.pings) == (Decimal('4.75'), 4)
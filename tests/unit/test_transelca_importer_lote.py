@@ -0,0 +1,145 @@
+"""Importadores Transelca en dos fases: parseo de todas las filas y luego
+resolución de claves con una query por modelo + ``bulk_create`` /
+``bulk_update``, conservando el reporte por fila."""
+
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook
+
+from apps.actividades.importers import AvisosTranselcaImporter, ProgramaTranselcaImporter
+from apps.actividades.models import Actividad, ProgramacionMensual, TipoActividad
+from apps.lineas.models import Linea, Torre
+
+
+def _xlsx(header, filas):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(header)
+    for fila in filas:
+        ws.append(fila)
+    buf = BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    return buf
+
+
+def _linea(codigo, torres=('T-001', 'T-002')):
+    linea = Linea.objects.create(
+        codigo=codigo, nombre=f'Línea {codigo}', longitud_km=Decimal('10.00'),
+        tension_kv=110, activa=True,
+    )
+    for i, numero in enumerate(torres):
+        Torre.objects.create(
+            linea=linea, numero=numero, tipo=Torre.TipoTorre.SUSPENSION,
+            latitud=Decimal('10.0') + i, longitud=Decimal('-75.0'),
+        )
+    return linea
+
+
+@pytest.fixture
+def catalogo(db):
+    poda = TipoActividad.objects.create(codigo='PODA-L', nombre='Poda', categoria='PODA', activo=True)
+    TipoActividad.objects.create(codigo='TERM-L', nombre='Termografía', categoria='TERMOGRAFIA', activo=True)
+    return {'L-900': _linea('L-900'), 'L-901': _linea('L-901'), 'poda': poda}
+
+
+PROGRAMA_HEADER = ['Aviso SAP', 'Línea', 'Tipo Actividad', 'Torre inicio', 'Valor']
+AVISOS_HEADER = ['Aviso', 'Línea', 'Tipo', 'Torre', 'Fecha']
+
+
+@pytest.mark.django_db
+class TestProgramaTranselcaLote:
+
+    def test_crea_actualiza_y_reporta_por_fila(self, catalogo):
+        linea = catalogo['L-900']
+        programacion = ProgramacionMensual.objects.create(anio=2030, mes=3, linea=linea)
+        existente = Actividad.objects.create(
+            linea=linea, torre=linea.torres.first(), tipo_actividad=catalogo['poda'],
+            aviso_sap='A-1', fecha_programada=date(2030, 3, 1),
+        )
+        archivo = _xlsx(PROGRAMA_HEADER, [
+            ['A-1', 'l-900', 'termografía', 'T-002', 100],
+            ['A-2', 'L-901', 'Poda', 'T-001', None],
+            ['A-3', 'L-900', 'Inexistente', 'T-001', None],
+            ['A-4', 'L-900', 'Poda', 'T-999', None],
+            ['A-2', 'L-900', 'Poda', 'T-002', None],
+        ])
+
+        resultado = ProgramaTranselcaImporter().importar(
+            archivo, programacion, opciones={'actualizar_existentes': True},
+        )
+
+        assert resultado['exito'] is True
+        assert resultado['actividades_creadas'] == 1
+        assert resultado['actividades_actualizadas'] == 2
+        assert resultado['filas_omitidas'] == 1
+        assert [e['fila'] for e in resultado['errores']] == [5]
+        mensajes = [(a['fila'], a['mensaje']) for a in resultado['advertencias']]
+        assert (4, 'Tipo de actividad no encontrado: Inexistente') in mensajes
+        assert (5, 'Torre no encontrada: T-999') in mensajes
+
+        existente.refresh_from_db()
+        assert existente.tipo_actividad.categoria == 'TERMOGRAFIA'
+        assert existente.torre.numero == 'T-002'
+        assert existente.valor_facturacion == Decimal('100')
+        # El aviso repetido en el archivo actualiza la actividad recién creada.
+        nueva = Actividad.objects.get(aviso_sap='A-2')
+        assert nueva.linea_id == linea.id
+        assert nueva.torre.numero == 'T-002'
+
+    def test_queries_no_escalan_con_filas(self, catalogo, django_assert_max_num_queries):
+        linea = catalogo['L-900']
+        programacion = ProgramacionMensual.objects.create(anio=2030, mes=4, linea=linea)
+        archivo = _xlsx(PROGRAMA_HEADER, [
+            [f'B-{i}', 'L-900', 'Poda', 'T-001', None] for i in range(200)
+        ])
+
+        # tipos, líneas, tramos, torres, existentes, INSERT, conteo + save.
+        with django_assert_max_num_queries(12):
+            resultado = ProgramaTranselcaImporter().importar(archivo, programacion)
+
+        assert resultado['actividades_creadas'] == 200
+        programacion.refresh_from_db()
+        assert programacion.total_actividades == 200
+
+
+@pytest.mark.django_db
+class TestAvisosTranselcaLote:
+
+    def test_crea_programaciones_y_omite_existentes(self, catalogo):
+        linea = catalogo['L-901']
+        Actividad.objects.create(
+            linea=linea, torre=linea.torres.first(), tipo_actividad=catalogo['poda'],
+            aviso_sap='C-1', fecha_programada=date(2030, 5, 1),
+        )
+        archivo = _xlsx(AVISOS_HEADER, [
+            ['C-1', 'L-901', 'Poda', 'T001', date(2030, 5, 10)],
+            ['C-2', 'L-901', 'Poda', 'T002', date(2030, 5, 11)],
+            ['C-3', 'L-900', 'Termografia', 'T001', date(2030, 6, 2)],
+            ['C-4', 'L-900', 'Poda', 'T404', date(2030, 6, 2)],
+        ])
+
+        resultado = AvisosTranselcaImporter().importar(archivo)
+
+        assert resultado['exito'] is True
+        assert resultado['actividades_creadas'] == 2
+        assert resultado['actividades_omitidas'] == 2
+        assert resultado['meses_tocados'] == [(2030, 5), (2030, 6)]
+        assert [a['fila'] for a in resultado['advertencias']] == [5]
+        assert ProgramacionMensual.objects.get(anio=2030, mes=6, linea=catalogo['L-900']).total_actividades == 1
+        assert Actividad.objects.get(aviso_sap='C-2').torre.numero == 'T-002'
+
+    def test_queries_no_escalan_con_filas(self, catalogo, django_assert_max_num_queries):
+        archivo = _xlsx(AVISOS_HEADER, [
+            [f'D-{i}', 'L-900' if i % 2 else 'L-901', 'Poda', 'T001', date(2030, 7, 1 + i % 28)]
+            for i in range(200)
+        ])
+
+        # líneas, tipos, torres, programaciones, existentes, 2 INSERT + 2 conteos.
+        with django_assert_max_num_queries(12):
+            resultado = AvisosTranselcaImporter().importar(archivo)
+
+        assert resultado['actividades_creadas'] == 200
@@ -0,0 +1,111 @@
+"""Última ubicación por cuadrilla (``apps.cuadrillas.ultima_ubicacion``):
+mantenida al ingerir, leída por el mapa con un query y empujada como
+deltas por el canal SSE."""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from apps.cuadrillas import views_mapa
+from apps.cuadrillas.models import Cuadrilla, TrackingUbicacion, UltimaUbicacionCuadrilla
+from apps.cuadrillas.ultima_ubicacion import (
+    actualizar_ultima_ubicacion,
+    ubicaciones_mapa,
+)
+from tests.factories import CuadrillaFactory
+
+
+def _ping(cuadrilla, usuario, lat, lng='-74.1'):
+    return TrackingUbicacion.objects.create(
+        cuadrilla=cuadrilla, usuario=usuario, latitud=Decimal(lat), longitud=Decimal(lng),
+    )
+
+
+def _eventos(texto):
+    return [
+        {k: v for k, _, v in (linea.partition(': ') for linea in bloque.splitlines())}
+        for bloque in texto.split('\n\n') if bloque.startswith('id:')
+    ]
+
+
+@pytest.mark.django_db
+def test_se_mantiene_al_ingerir_y_solo_avanza(cuadrilla, liniero_user):
+    primero = _ping(cuadrilla, liniero_user, '4.1')
+    _ping(cuadrilla, liniero_user, '4.2')
+
+    ultima = UltimaUbicacionCuadrilla.objects.get(cuadrilla=cuadrilla)
+    assert ultima.latitud == Decimal('4.2')
+
+    # Un ping viejo sincronizado tarde no pisa la posición vigente.
+    primero.created_at -= timedelta(hours=1)
+    assert not actualizar_ultima_ubicacion(primero)
+    ultima.refresh_from_db()
+    assert ultima.latitud == Decimal('4.2')
+
+
+@pytest.mark.django_db
+def test_mapa_lee_con_un_query(liniero_user, django_assert_num_queries):
+    cuadrillas = [CuadrillaFactory() for _ in range(6)]
+    for i, cuadrilla in enumerate(cuadrillas):
+        _ping(cuadrilla, liniero_user, f'4.{i}')
+
+    with django_assert_num_queries(1):
+        ubicaciones = ubicaciones_mapa(Cuadrilla.objects.filter(activa=True))
+
+    assert {u['cuadrilla_id'] for u in ubicaciones} == {str(c.pk) for c in cuadrillas}
+    assert ubicaciones[0]['origen'] == 'auto'
+
+
+@pytest.mark.django_db
+def test_stream_wsgi_responde_un_evento_con_reintento(authenticated_client, cuadrilla, liniero_user):
+    _ping(cuadrilla, liniero_user, '4.5')
+
+    resp = authenticated_client.get(reverse('cuadrillas:mapa_stream'))
+
+    assert resp['Content-Type'] == 'text/event-stream'
+    texto = b''.join(resp.streaming_content).decode()
+    assert texto.startswith(f'retry: {views_mapa.STREAM_RETRY_WSGI_MS}')
+    [evento] = _eventos(texto)
+    assert evento['event'] == 'snapshot'
+    assert json.loads(evento['data'])['ubicaciones'][0]['lat'] == 4.5
+
+    # Al reconectar con Last-Event-ID solo llega lo que cambió desde ese
+    # evento (nada: la posición es anterior al cursor más el margen).
+    ultima = UltimaUbicacionCuadrilla.objects.get()
+    UltimaUbicacionCuadrilla.objects.update(updated_at=ultima.updated_at - timedelta(minutes=1))
+    resp = authenticated_client.get(
+        reverse('cuadrillas:mapa_stream'), HTTP_LAST_EVENT_ID=evento['id'],
+    )
+    [delta] = _eventos(b''.join(resp.streaming_content).decode())
+    assert delta['event'] == 'ubicaciones'
+    assert json.loads(delta['data'])['ubicaciones'] == []
+
+
+@pytest.mark.django_db
+def test_stream_async_empuja_solo_deltas(
+    cuadrilla, liniero_user, monkeypatch, django_capture_on_commit_callbacks,
+):
+    monkeypatch.setattr(views_mapa, 'STREAM_INTERVALO', 0)
+    monkeypatch.setattr(views_mapa, 'STREAM_DURACION', 60)
+    otra = CuadrillaFactory()
+    _ping(cuadrilla, liniero_user, '4.5')
+    _ping(otra, liniero_user, '5.5')
+
+    stream = views_mapa._stream_async(Cuadrilla.objects.filter(activa=True), None)
+    siguiente = async_to_sync(stream.__anext__)
+    assert siguiente().startswith('retry:')
+    [snapshot] = _eventos(siguiente())
+    assert len(json.loads(snapshot['data'])['ubicaciones']) == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _ping(otra, liniero_user, '5.6')
+
+    [delta] = _eventos(siguiente())
+    assert delta['event'] == 'ubicaciones'
+    ubicaciones = json.loads(delta['data'])['ubicaciones']
+    assert [(u['cuadrilla_id'], u['lat']) for u in ubicaciones] == [(str(otra.pk), 5.6)]
+    async_to_sync(stream.aclose)()
@@ -0,0 +1,92 @@
+"""Validación en lote de puntos GPS contra la servidumbre de su torre
+(``POST /api/lineas/validar-ubicacion/lote``)."""
+
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.contrib.gis.geos import Polygon
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.lineas.models import Linea, PoligonoServidumbre, Torre
+
+URL = '/api/lineas/validar-ubicacion/lote'
+
+
+@pytest.fixture
+def auth(liniero_user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(liniero_user)}'}
+
+
+@pytest.fixture
+def torres(db):
+    linea = Linea.objects.create(
+        codigo='LT-SERV', nombre='Línea servidumbre', cliente='TRANSELCA', tension_kv=220,
+    )
+    con_poligono = Torre.objects.create(
+        linea=linea, numero='1', latitud=Decimal('10.9000'), longitud=Decimal('-74.8000'),
+    )
+    sin_poligono = Torre.objects.create(
+        linea=linea, numero='2', latitud=Decimal('10.9100'), longitud=Decimal('-74.8000'),
+    )
+    PoligonoServidumbre.objects.create(
+        torre=con_poligono,
+        geometria=Polygon.from_bbox((-74.801, 10.899, -74.799, 10.901)),
+    )
+    return con_poligono, sin_poligono
+
+
+def _punto(torre_id, lat, lon):
+    return {'torre_id': str(torre_id), 'latitud': lat, 'longitud': lon}
+
+
+@pytest.mark.django_db
+def test_resultados_por_punto_en_orden(client, auth, torres):
+    con_poligono, sin_poligono = torres
+    desconocida = uuid.uuid4()
+    puntos = [
+        _punto(con_poligono.id, 10.9, -74.8),
+        _punto(con_poligono.id, 10.95, -74.8),
+        _punto(sin_poligono.id, 10.95, -74.8),
+        _punto(desconocida, 10.9, -74.8),
+    ]
+
+    response = client.post(URL, {'puntos': puntos}, content_type='application/json', **auth)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data['total'], data['fuera_poligono']) == (4, 1)
+    assert [r['dentro_poligono'] for r in data['resultados']] == [True, False, True, False]
+    assert [r['encontrada'] for r in data['resultados']] == [True, True, True, False]
+    assert data['resultados'][0]['linea_codigo'] == 'LT-SERV'
+    assert data['resultados'][3]['torre_id'] == str(desconocida)
+
+
+@pytest.mark.django_db
+def test_consultas_constantes_con_cientos_de_puntos(
+    client, auth, torres, django_assert_max_num_queries,
+):
+    con_poligono, sin_poligono = torres
+    puntos = [
+        _punto(torre.id, 10.9 + i / 10000, -74.8)
+        for i in range(200)
+        for torre in (con_poligono, sin_poligono)
+    ]
+
+    # Torres + polígonos (la autenticación va cacheada por token).
+    client.post(URL, {'puntos': puntos[:2]}, content_type='application/json', **auth)
+    with django_assert_max_num_queries(2):
+        response = client.post(URL, {'puntos': puntos}, content_type='application/json', **auth)
+
+    assert response.json()['total'] == 400
+
+
+@pytest.mark.django_db
+def test_lote_demasiado_grande(client, auth, torres):
+    from apps.lineas.api import MAX_PUNTOS_LOTE
+
+    puntos = [_punto(torres[0].id, 10.9, -74.8)] * (MAX_PUNTOS_LOTE + 1)
+
+    response = client.post(URL, {'puntos': puntos}, content_type='application/json', **auth)
+
+    assert response.status_code == 400